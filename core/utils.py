@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
-from typing import Optional
-from datetime import datetime
+import re
+import unicodedata
+from typing import List, Optional, Tuple, Union
+from datetime import date, datetime, timedelta
 
 
 def format_money(amount: float, currency_symbol: str) -> str:
@@ -30,3 +32,129 @@ def get_currency_symbol(ejecutar_query) -> str:
     return "S/"
 
 
+def rango_fechas(desde: Union[str, date, None], hasta: Union[str, date, None]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Convertir un rango de días inclusivo en un rango semiabierto [desde, hasta + 1 día).
+
+    Permite filtrar con ``fecha >= %s AND fecha < %s`` sin envolver la columna
+    en ``DATE()``, de modo que MySQL pueda usar el índice sobre ``fecha``.
+    """
+    def _a_datetime(valor) -> Optional[datetime]:
+        if valor is None or valor == "":
+            return None
+        if isinstance(valor, datetime):
+            return valor.replace(hour=0, minute=0, second=0, microsecond=0)
+        if isinstance(valor, date):
+            return datetime(valor.year, valor.month, valor.day)
+        return datetime.strptime(str(valor).strip()[:10], "%Y-%m-%d")
+
+    inicio = _a_datetime(desde)
+    fin = _a_datetime(hasta)
+    return inicio, (fin + timedelta(days=1) if fin else None)
+
+
+
+# Ancho máximo del rango (en días) para cada tamaño de intervalo de los gráficos de ventas
+GRANULARIDADES = (
+    ("hora", 3),
+    ("dia", 92),
+    ("semana", 730),
+    ("mes", None),
+)
+
+
+def elegir_granularidad(inicio: Optional[datetime], fin: Optional[datetime]) -> str:
+    """Intervalo de agrupación según el ancho del rango semiabierto [inicio, fin)"""
+    if inicio is None or fin is None:
+        return "mes"
+    dias = (fin - inicio).total_seconds() / 86400
+    for granularidad, maximo in GRANULARIDADES:
+        if maximo is None or dias <= maximo:
+            return granularidad
+    return "mes"
+
+
+def inicio_periodo(fecha: Union[date, datetime], granularidad: str) -> datetime:
+    if not isinstance(fecha, datetime):
+        fecha = datetime(fecha.year, fecha.month, fecha.day)
+    if granularidad == "hora":
+        return fecha.replace(minute=0, second=0, microsecond=0)
+    dia = fecha.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularidad == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if granularidad == "mes":
+        return dia.replace(day=1)
+    return dia
+
+
+def siguiente_periodo(inicio: datetime, granularidad: str) -> datetime:
+    if granularidad == "hora":
+        return inicio + timedelta(hours=1)
+    if granularidad == "semana":
+        return inicio + timedelta(weeks=1)
+    if granularidad == "mes":
+        return inicio.replace(year=inicio.year + inicio.month // 12, month=inicio.month % 12 + 1)
+    return inicio + timedelta(days=1)
+
+
+def completar_periodos(filas: List[Tuple], inicio: Optional[datetime], fin: Optional[datetime],
+                       granularidad: str) -> List[Tuple[datetime, int, float]]:
+    """Agregar con cero los intervalos sin ventas; ``filas`` = [(periodo, num_ventas, total)]"""
+    por_periodo = {inicio_periodo(f[0], granularidad): (int(f[1] or 0), float(f[2] or 0)) for f in filas}
+    if not por_periodo and (inicio is None or fin is None):
+        return []
+    actual = inicio_periodo(inicio if inicio is not None else min(por_periodo), granularidad)
+    limite = fin if fin is not None else siguiente_periodo(max(por_periodo), granularidad)
+    serie = []
+    while actual < limite:
+        num, total = por_periodo.get(actual, (0, 0.0))
+        serie.append((actual, num, total))
+        actual = siguiente_periodo(actual, granularidad)
+    return serie
+
+
+def reducir_puntos(serie: List[Tuple[datetime, int, float]], maximo: int) -> List[Tuple[datetime, int, float]]:
+    """Unir intervalos consecutivos hasta que la serie tenga como mucho ``maximo`` puntos.
+
+    Cada punto resultante conserva el inicio del primer intervalo y suma ventas y
+    totales, así el gráfico no pierde montos al reducirse.
+    """
+    if maximo <= 0 or len(serie) <= maximo:
+        return list(serie)
+    tamano = -(-len(serie) // maximo)
+    reducida = []
+    for i in range(0, len(serie), tamano):
+        grupo = serie[i:i + tamano]
+        reducida.append((grupo[0][0], sum(p[1] for p in grupo), sum(p[2] for p in grupo)))
+    return reducida
+
+
+def etiqueta_periodo(periodo: datetime, granularidad: str) -> str:
+    if granularidad == "hora":
+        return periodo.strftime("%d/%m %H:00")
+    if granularidad == "semana":
+        return "Sem. " + periodo.strftime("%d/%m/%Y")
+    if granularidad == "mes":
+        return periodo.strftime("%Y-%m")
+    return periodo.strftime("%Y-%m-%d")
+
+
+def terminos_fulltext(texto: str, minimo: int = 3) -> Optional[str]:
+    """Búsqueda booleana de MySQL "+palabra*" (todas las palabras, por prefijo), o None.
+
+    Devuelve None si alguna palabra es más corta que ``minimo`` (innodb_ft_min_token_size):
+    el índice FULLTEXT no la contiene y hay que buscar con ``LIKE``.
+    """
+    palabras = re.sub(r'[+\-<>()~*"@]', " ", texto or "").split()
+    if not palabras or any(len(p) < minimo for p in palabras):
+        return None
+    return " ".join(f"+{p}*" for p in palabras)
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Minúsculas, sin tildes y con un solo espacio entre palabras ("Café  Moca" -> "cafe moca").
+
+    Compara nombres como lo hace la collation utf8mb4_unicode_ci de las tablas.
+    """
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.lower().split())
@@ -8,20 +8,62 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import datetime
 import os
-from PIL import Image, ImageTk
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import pandas as pd
 import json
 import hashlib
+import itertools
+import uuid
+import multiprocessing
 import mysql.connector
-from decimal import Decimal
 
 # Importar módulos personalizados
+from config import DB_PATH
+from core.utils import rango_fechas
 from modules.database import DatabaseManager
 from modules.models import Usuario, Producto, Venta, Cliente, Configuracion
-from modules.pdf_generator import PDFGenerator
+from modules.carga_diferida import ModuloDiferido, ObjetoDiferido, precargar
+from modules.catalogo import obtener_catalogo
+from modules.alertas_stock import obtener_alertas
+from modules.busqueda import BusquedaIncremental, obtener_buscador
+from modules import exportacion, importacion
+from modules.trabajos import ColaTrabajos
+from modules.panel_trabajos import PanelTrabajos
+from modules.panel_rendimiento import PanelRendimiento
+from modules.tareas import EjecutorTareas
+from modules.tabla_paginada import TablaPaginada
+from modules.ordenamiento import OrdenadorTabla
+from nexus_core import versiones
+from nexus_core.db import MySQLDatabase
+from nexus_core.instrumentacion import obtener_instrumentacion
+from nexus_core.diario_ventas import DiarioVentas, PENDIENTE, ERROR, CONFLICTO
+from services.venta_service import VentaService, StockInsuficienteError
+from services.producto_service import ProductoService
+from services.dashboard_stats_service import DashboardStatsService
+from services.sincronizador_ventas import SincronizadorVentas
+from services.reserva_service import ReservaStockService, RENOVACION_RESERVA
+
+# Bibliotecas pesadas: se importan en el primer uso (gráficos, imágenes, PDF)
+# para que la ventana de login aparezca sin esperarlas
+Image = ModuloDiferido("PIL.Image")
+ImageTk = ModuloDiferido("PIL.ImageTk")
+plt = ModuloDiferido("matplotlib.pyplot")
+Figure = ObjetoDiferido("matplotlib.figure", "Figure")
+FigureCanvasTkAgg = ObjetoDiferido("matplotlib.backends.backend_tkagg", "FigureCanvasTkAgg")
+NavigationToolbar2Tk = ObjetoDiferido("matplotlib.backends.backend_tkagg", "NavigationToolbar2Tk")
+PDFGenerator = ObjetoDiferido("modules.pdf_generator", "PDFGenerator")
+GraficosReportes = ObjetoDiferido("modules.graficos_reportes", "GraficosReportes")
+
+# Orden de precarga tras el login: primero lo que usa el resumen inicial
+MODULOS_PRECARGA = [
+    "matplotlib.pyplot",
+    "matplotlib.backends.backend_tkagg",
+    "openpyxl",
+    "modules.pdf_generator",
+    "modules.graficos_reportes",
+    "PIL.ImageTk",
+]
+
+# Cada cuánto se revisan las alertas de stock (sin consulta si los productos no cambiaron)
+INTERVALO_ALERTAS_MS = 5000
 
 class NexusCafeApp:
     def __init__(self, root):
@@ -33,7 +75,6 @@ class NexusCafeApp:
         # Variables de tema
         self.tema_actual = tk.StringVar(value="claro")
         self.usuario_actual = None
-        self.reverse_sort = False  # Para ordenamiento
         
         # Configuración de base de datos MySQL
         self.db_config = {
@@ -47,15 +88,28 @@ class NexusCafeApp:
         # Inicializar gestor de base de datos
         self.db_manager = DatabaseManager(self.db_config)
         
+        # Diario local de la caja (SQLite en DB_PATH): ventas cobradas que esperan registrarse en MySQL
+        self.diario = DiarioVentas(DB_PATH)
+        self.sin_conexion = False
+        self._pendientes_sincronizar = 0
+        
         # Intentar conectar a MySQL
         if not self.db_manager.verificar_conexion():
-            messagebox.showerror("Error de Base de Datos", 
-                               "No se pudo conectar a MySQL. Por favor verifica que MySQL esté ejecutándose y las credenciales sean correctas.")
-            self.root.quit()
-            return
+            # Si ya hubo sesiones en este equipo se puede abrir la caja con la copia local
+            if self.diario.hay_usuarios() and messagebox.askyesno(
+                    "Sin conexión",
+                    "No se pudo conectar a MySQL.\n\n¿Abrir la caja sin conexión? Las ventas se guardarán "
+                    "en este equipo y se registrarán cuando vuelva la conexión."):
+                self.sin_conexion = True
+            else:
+                messagebox.showerror("Error de Base de Datos", 
+                                   "No se pudo conectar a MySQL. Por favor verifica que MySQL esté ejecutándose y las credenciales sean correctas.")
+                self.root.quit()
+                return
             
         # Inicializar base de datos
-        self.db_manager.inicializar_bd()
+        if not self.sin_conexion:
+            self.db_manager.inicializar_bd()
         
         # CORREGIDO: Pasar el db_manager en lugar de db_config
         self.models = {
@@ -66,11 +120,43 @@ class NexusCafeApp:
             'configuracion': Configuracion(self.db_manager)
         }
         
-        # Inicializar generador de PDF
-        self.pdf_generator = PDFGenerator()
+        # Catálogo de productos en memoria (POS, inventario); se recarga solo cuando cambia la tabla
+        self.catalogo = obtener_catalogo(self.db_manager)
+        self.catalogo.respaldo = self.diario
+        # Índices de búsqueda mientras se escribe (se arman al abrir cada vista)
+        self.buscador_productos = obtener_buscador(self.db_manager, "productos")
+        self.buscador_clientes = obtener_buscador(self.db_manager, "clientes")
+        # Productos con stock bajo (índice de la columna generada bajo_stock) y avisos al cambiar
+        self.alertas_stock = obtener_alertas(self.db_manager)
+        self._vigilancia_stock = None
+        self._stock_resumen_frame = None
+        
+        # Servicios transaccionales (comparten el pool de conexiones con db_manager)
+        self.db = MySQLDatabase(self.db_config)
+        self.venta_service = VentaService(self.db)
+        self.producto_service = ProductoService(self.db)
+        self.dashboard_stats = DashboardStatsService(self.db)
+        # Registra en MySQL, en segundo plano, las ventas del diario local
+        self.sincronizador = SincronizadorVentas(self.diario, self.venta_service)
+        # Reservas de stock de las ventas en curso: dos cajas no venden la misma unidad
+        self.reservas = ReservaStockService(self.db)
+        
+        # Consultas en segundo plano: la interfaz no se bloquea mientras responde MySQL
+        self.tareas = EjecutorTareas(self.root)
+        
+        # Reportes y exportaciones: cola de trabajos en segundo plano con progreso y cancelación
+        self.trabajos = ColaTrabajos(self.root, al_cambiar=self._trabajo_actualizado)
+        self.panel_trabajos = None
+        self.panel_rendimiento = None
+        
+        # Generador de PDF: se crea (e importa reportlab) al generar el primer reporte
+        self._pdf_generator = None
+        # Gráficos de la vista previa de reportes: figuras que se reutilizan entre vistas previas
+        self._graficos = None
         
         # Crear usuario admin por defecto si no existe
-        self.crear_usuario_admin_default()
+        if not self.sin_conexion:
+            self.crear_usuario_admin_default()
         
         # Mostrar pantalla de login
         self.mostrar_login()
@@ -78,6 +164,18 @@ class NexusCafeApp:
         # Iniciar el bucle principal
         self.root.mainloop()
         
+    @property
+    def pdf_generator(self):
+        if self._pdf_generator is None:
+            self._pdf_generator = PDFGenerator()
+        return self._pdf_generator
+    
+    @property
+    def graficos(self):
+        if self._graficos is None:
+            self._graficos = GraficosReportes()
+        return self._graficos
+        
     def crear_usuario_admin_default(self):
         """Crea un usuario administrador por defecto si no existe"""
         try:
@@ -155,10 +253,24 @@ class NexusCafeApp:
         
         # Validar credenciales
         usuario = self.models['usuario'].autenticar(username, password)
+        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        if usuario:
+            # Recordar al usuario para poder iniciar sesión sin conexión
+            try:
+                self.diario.recordar_usuario(usuario, password_hash)
+            except Exception as e:
+                print(f"Error guardando el usuario en el diario local: {e}")
+        elif not self.db_manager.verificar_conexion():
+            usuario = self.diario.autenticar(username, password_hash)
         
         if usuario:
             self.usuario_actual = usuario
             self.mostrar_dashboard()
+            # Cargar en segundo plano las bibliotecas de gráficos y reportes, y el catálogo
+            precargar(MODULOS_PRECARGA)
+            self.tareas.enviar(self.catalogo.cargar, grupo="catalogo")
+            self.sincronizador.iniciar()
+            self._vigilar_stock()
         else:
             messagebox.showerror("Error", "Credenciales inválidas")
             
@@ -221,6 +333,18 @@ class NexusCafeApp:
             usuario_menu.add_separator()
             usuario_menu.add_command(label="Cerrar Sesión", command=self.cerrar_sesion)
         
+        # Indicador de stock bajo: aparece con la primera revisión de alertas que encuentre productos
+        self.alerta_stock_btn = tk.Button(botones_frame, text="", font=("Arial", 10, "bold"),
+                                        bg="#E74C3C", fg="white", bd=0, padx=8,
+                                        activebackground="#C0392B", activeforeground="white",
+                                        command=self.mostrar_resumen)
+        
+        # Ventas cobradas que todavía no llegaron a MySQL (se muestra solo si hay alguna)
+        self.sincronizacion_btn = tk.Button(botones_frame, text="", font=("Arial", 10, "bold"),
+                                          bg="#E67E22", fg="white", bd=0, padx=8,
+                                          activebackground="#D35400", activeforeground="white",
+                                          command=self.sincronizar_ahora)
+        
         # Botón de configuración (solo si tiene permisos)
         if self.verificar_permiso('configuracion'):
             config_btn = tk.Button(botones_frame, text="⚙", font=("Arial", 16), 
@@ -278,7 +402,8 @@ class NexusCafeApp:
             'editar_entrada': ['admin', 'inventario'],
             'eliminar_entrada': ['admin', 'inventario'],
             'ver_configuracion': ['admin'],
-            'editar_configuracion': ['admin']
+            'editar_configuracion': ['admin'],
+            'ver_rendimiento': ['admin']
         }
         
         return rol in permisos_acciones.get(accion, ['admin'])
@@ -324,11 +449,27 @@ class NexusCafeApp:
         # Botón de cerrar sesión (siempre disponible)
         tk.Button(panel_frame, text="Cerrar Sesión", command=self.cerrar_sesion, **btn_style).pack(fill="x")
         
+    def limpiar_contenido(self):
+        """Limpia el área de contenido y descarta las consultas pendientes de la vista anterior"""
+        self.tareas.cancelar("vista")
+        for widget in self.contenido_frame.winfo_children():
+            widget.destroy()
+    
+    def mostrar_cargando(self, parent, texto="Cargando...", superpuesto=False):
+        """Muestra un indicador de carga mientras llegan los datos"""
+        etiqueta = tk.Label(parent, text=texto, font=("Arial", 11, "italic"),
+                            bg=parent.cget("bg"), fg="#7F8C8D")
+        if superpuesto:
+            # Centrado sobre el contenido ya empaquetado (p.ej. una tabla vacía)
+            etiqueta.place(relx=0.5, rely=0.5, anchor="center")
+        else:
+            etiqueta.pack(pady=20)
+        return etiqueta
+    
     def mostrar_resumen(self):
         """Muestra la pantalla de resumen"""
         # Limpiar frame de contenido
-        for widget in self.contenido_frame.winfo_children():
-            widget.destroy()
+        self.limpiar_contenido()
         
         # Título
         titulo_frame = tk.Frame(self.contenido_frame, bg="#ECF0F1", padx=20, pady=10)
@@ -364,13 +505,37 @@ class NexusCafeApp:
         canvas.bind("<Button-4>", _wheel)
         canvas.bind("<Button-5>", _wheel)
         
-        # Obtener datos para el resumen
-        fecha_hoy = datetime.datetime.now().strftime("%Y-%m-%d")
-        ventas_hoy = self.models['venta'].obtener_ventas_por_periodo(fecha_hoy, fecha_hoy)
-        total_ventas_hoy = sum(venta[2] for venta in ventas_hoy) if ventas_hoy else 0
+        # Obtener datos para el resumen en segundo plano
+        cargando = self.mostrar_cargando(contenido)
         
-        # CORREGIDO: Usar el método correcto
-        productos_bajo_stock = self.models['producto'].obtener_stock_bajo()
+        def cargar():
+            # Cifras de las tarjetas en una sola consulta agregada (con caché de corta duración)
+            stats = self.dashboard_stats.obtener()
+            # El gráfico del resumen usa matplotlib: importarlo aquí, fuera del hilo de Tk
+            try:
+                plt.cargar()
+                FigureCanvasTkAgg.cargar()
+            except ImportError as e:
+                print(f"Gráficos no disponibles: {e}")
+            return {
+                'stats': stats,
+                'productos_bajo_stock': self.models['producto'].obtener_stock_bajo() if stats.productos_stock_bajo else [],
+                'top_productos': self.models['venta'].obtener_productos_mas_vendidos(5),
+            }
+        
+        def pintar(datos):
+            cargando.destroy()
+            self._pintar_resumen(contenido, canvas, datos)
+        
+        self.tareas.enviar(cargar, pintar)
+    
+    def _pintar_resumen(self, contenido, canvas, datos):
+        """Dibuja las tarjetas, el gráfico y las tablas del resumen con los datos ya cargados"""
+        stats = datos['stats']
+        total_ventas_hoy = stats.total_hoy
+        productos_bajo_stock = datos['productos_bajo_stock']
+        ventas_semana = [(dia, total) for dia, _, total in stats.serie_7_dias]
+        top_productos = datos['top_productos']
         
         # Tarjetas de resumen
         cards_frame = tk.Frame(contenido, bg="#ECF0F1")
@@ -387,26 +552,22 @@ class NexusCafeApp:
         
         tk.Label(card_ventas, text="Ventas del Día", font=("Arial", 12, "bold"), bg="white", fg="#2C3E50").pack(anchor="w")
         tk.Label(card_ventas, text=f"S/ {total_ventas_hoy:.2f}", font=("Arial", 20, "bold"), bg="white", fg="#27AE60").pack(anchor="w", pady=5)
-        tk.Label(card_ventas, text=f"Total de {len(ventas_hoy) if ventas_hoy else 0} ventas", font=("Arial", 10), bg="white", fg="#7F8C8D").pack(anchor="w")
+        tk.Label(card_ventas, text=f"Total de {stats.ventas_hoy} ventas", font=("Arial", 10), bg="white", fg="#7F8C8D").pack(anchor="w")
         
         # Tarjeta de productos
         card_productos = tk.Frame(cards_frame, bg="white", padx=15, pady=15, relief="solid", bd=1)
         card_productos.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
         
-        productos_total = self.models['producto'].obtener_todos()
-        
         tk.Label(card_productos, text="Productos", font=("Arial", 12, "bold"), bg="white", fg="#2C3E50").pack(anchor="w")
-        tk.Label(card_productos, text=f"{len(productos_total) if productos_total else 0}", font=("Arial", 20, "bold"), bg="white", fg="#3498DB").pack(anchor="w", pady=5)
-        tk.Label(card_productos, text=f"{len(productos_bajo_stock) if productos_bajo_stock else 0} con bajo stock", font=("Arial", 10), bg="white", fg="#7F8C8D").pack(anchor="w")
+        tk.Label(card_productos, text=f"{stats.productos}", font=("Arial", 20, "bold"), bg="white", fg="#3498DB").pack(anchor="w", pady=5)
+        tk.Label(card_productos, text=f"{stats.productos_stock_bajo} con bajo stock", font=("Arial", 10), bg="white", fg="#7F8C8D").pack(anchor="w")
         
         # Tarjeta de clientes
         card_clientes = tk.Frame(cards_frame, bg="white", padx=15, pady=15, relief="solid", bd=1)
         card_clientes.grid(row=0, column=2, padx=10, pady=10, sticky="nsew")
         
-        clientes_total = self.models['cliente'].obtener_todos()
-        
         tk.Label(card_clientes, text="Clientes", font=("Arial", 12, "bold"), bg="white", fg="#2C3E50").pack(anchor="w")
-        tk.Label(card_clientes, text=f"{len(clientes_total) if clientes_total else 0}", font=("Arial", 20, "bold"), bg="white", fg="#9B59B6").pack(anchor="w", pady=5)
+        tk.Label(card_clientes, text=f"{stats.clientes}", font=("Arial", 20, "bold"), bg="white", fg="#9B59B6").pack(anchor="w", pady=5)
         tk.Label(card_clientes, text="Registrados", font=("Arial", 10), bg="white", fg="#7F8C8D").pack(anchor="w")
         
         # Gráfico de ventas
@@ -417,8 +578,6 @@ class NexusCafeApp:
         
         # Crear gráfico
         try:
-            ventas_semana = self.models['venta'].obtener_total_ventas_por_dia(7)
-            
             if ventas_semana:
                 fig, ax = plt.subplots(figsize=(8, 3))
                 
@@ -430,50 +589,23 @@ class NexusCafeApp:
                 ax.set_title("Ventas por día")
                 
                 # Mostrar gráfico en tkinter
-                canvas = FigureCanvasTkAgg(fig, master=grafico_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack(fill="both", expand=True)
+                canvas_grafico = FigureCanvasTkAgg(fig, master=grafico_frame)
+                canvas_grafico.draw()
+                canvas_grafico.get_tk_widget().pack(fill="both", expand=True)
             else:
                 tk.Label(grafico_frame, text="No hay datos de ventas para mostrar", font=("Arial", 10), bg="white", fg="#7F8C8D").pack(pady=20)
         except Exception as e:
             tk.Label(grafico_frame, text=f"Error al generar gráfico: {e}", font=("Arial", 10), bg="white", fg="#E74C3C").pack(pady=20)
         
-        # Productos con bajo stock
+        # Productos con bajo stock (se repinta solo cuando cambian las alertas)
         stock_frame = tk.Frame(contenido, bg="white", padx=15, pady=15, relief="solid", bd=1)
         stock_frame.pack(fill="x", pady=10)
         
         tk.Label(stock_frame, text="Productos con Bajo Stock", font=("Arial", 12, "bold"), bg="white", fg="#2C3E50").pack(anchor="w", pady=(0, 10))
         
-        if productos_bajo_stock:
-            tabla_frame = tk.Frame(stock_frame, bg="white")
-            tabla_frame.pack(fill="both", expand=True)
-
-            columnas = ("id", "producto", "stock", "stock_min")
-            tabla = ttk.Treeview(tabla_frame, columns=columnas, show="headings", selectmode="extended")
-            tabla.heading("id", text="ID", command=lambda: self.ordenar_columna(tabla, "id", False))
-            tabla.heading("producto", text="Producto", command=lambda: self.ordenar_columna(tabla, "producto", False))
-            tabla.heading("stock", text="Stock Actual", command=lambda: self.ordenar_columna(tabla, "stock", False))
-            tabla.heading("stock_min", text="Stock Mínimo", command=lambda: self.ordenar_columna(tabla, "stock_min", False))
-
-            tabla.column("id", width=50, anchor="center")
-            tabla.column("producto", width=200, anchor="w")
-            tabla.column("stock", width=100, anchor="center")
-            tabla.column("stock_min", width=120, anchor="center")
-
-            tabla.tag_configure("stock_bajo", background="#FADBD8", foreground="#E74C3C")
-
-            for producto in productos_bajo_stock:
-                tags = ("stock_bajo",) if producto[4] <= producto[5] else ()
-                fila = (producto[0], producto[1], producto[4], producto[5])
-                tabla.insert("", "end", values=fila, tags=tags)
-
-            scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=tabla.yview)
-            tabla.configure(yscrollcommand=scrollbar.set)
-
-            scrollbar.pack(side="right", fill="y")
-            tabla.pack(side="left", fill="both", expand=True)
-        else:
-            tk.Label(stock_frame, text="No hay productos con bajo stock", font=("Arial", 10), bg="white", fg="#7F8C8D").pack(pady=10)
+        self._stock_resumen_frame = tk.Frame(stock_frame, bg="white")
+        self._stock_resumen_frame.pack(fill="both", expand=True)
+        self._pintar_stock_bajo(productos_bajo_stock)
         
         # Productos más vendidos
         top_productos_frame = tk.Frame(contenido, bg="white", padx=15, pady=15, relief="solid", bd=1)
@@ -482,8 +614,6 @@ class NexusCafeApp:
         tk.Label(top_productos_frame, text="Productos Más Vendidos", font=("Arial", 12, "bold"), bg="white", fg="#2C3E50").pack(anchor="w", pady=(0, 10))
         
         try:
-            top_productos = self.models['venta'].obtener_productos_mas_vendidos(5)
-            
             if top_productos:
                 # Crear tabla
                 tabla_frame = tk.Frame(top_productos_frame, bg="white")
@@ -509,6 +639,142 @@ class NexusCafeApp:
         except Exception:
             pass
     
+    def _pintar_stock_bajo(self, productos_bajo_stock):
+        """Tabla de productos con bajo stock del resumen (todas las filas vienen de las alertas)"""
+        marco = self._stock_resumen_frame
+        for widget in marco.winfo_children():
+            widget.destroy()
+        
+        if productos_bajo_stock:
+            columnas = ("id", "producto", "stock", "stock_min")
+            tabla = ttk.Treeview(marco, columns=columnas, show="headings", selectmode="extended",
+                                 height=min(10, len(productos_bajo_stock)))
+            tabla.heading("id", text="ID")
+            tabla.heading("producto", text="Producto")
+            tabla.heading("stock", text="Stock Actual")
+            tabla.heading("stock_min", text="Stock Mínimo")
+            ordenador = OrdenadorTabla(tabla)
+
+            tabla.column("id", width=50, anchor="center")
+            tabla.column("producto", width=200, anchor="w")
+            tabla.column("stock", width=100, anchor="center")
+            tabla.column("stock_min", width=120, anchor="center")
+
+            tabla.tag_configure("stock_bajo", background="#FADBD8", foreground="#E74C3C")
+
+            for producto in productos_bajo_stock:
+                fila = (producto[0], producto[1], producto[4], producto[5])
+                ordenador.insertar(fila, fila, ("stock_bajo",))
+
+            scrollbar = ttk.Scrollbar(marco, orient="vertical", command=tabla.yview)
+            tabla.configure(yscrollcommand=scrollbar.set)
+
+            scrollbar.pack(side="right", fill="y")
+            tabla.pack(side="left", fill="both", expand=True)
+        else:
+            tk.Label(marco, text="No hay productos con bajo stock", font=("Arial", 10), bg="white", fg="#7F8C8D").pack(pady=10)
+    
+    def _vigilar_stock(self):
+        """Revisa periódicamente las alertas de stock; solo consulta si cambiaron los productos"""
+        if not self.usuario_actual:
+            self._vigilancia_stock = None
+            return
+        self.tareas.enviar(
+            lambda: self.alertas_stock.cambios() + (self.alertas_stock.productos(),),
+            lambda datos: self._avisar_stock(*datos),
+            grupo="alertas",
+        )
+        self._avisar_sincronizacion(self.diario.contar())
+        self._vigilancia_stock = self.root.after(INTERVALO_ALERTAS_MS, self._vigilar_stock)
+    
+    def _avisar_stock(self, nuevos, repuestos, productos):
+        """Actualiza el indicador del menú y el resumen, y avisa de los productos que bajaron del mínimo"""
+        if not self.usuario_actual:
+            return
+        try:
+            if self.alerta_stock_btn.winfo_exists():
+                if productos:
+                    self.alerta_stock_btn.configure(text=f"⚠ {len(productos)} con bajo stock")
+                    self.alerta_stock_btn.pack(side="left", padx=10)
+                else:
+                    self.alerta_stock_btn.pack_forget()
+        except (AttributeError, tk.TclError):
+            pass
+        if not nuevos and not repuestos:
+            return
+        self.dashboard_stats.invalidar()
+        try:
+            if self._stock_resumen_frame is not None and self._stock_resumen_frame.winfo_exists():
+                self._pintar_stock_bajo(productos)
+        except tk.TclError:
+            pass
+        if nuevos:
+            nombres = ", ".join(p[1] for p in nuevos[:3]) + ("..." if len(nuevos) > 3 else "")
+            aviso = tk.Label(self.root, text=f"⚠ Stock bajo: {nombres}", font=("Arial", 10, "bold"),
+                             bg="#E74C3C", fg="white", padx=12, pady=8, cursor="hand2")
+            aviso.place(relx=1.0, rely=1.0, x=-15, y=-15, anchor="se")
+            aviso.bind("<Button-1>", lambda e: (aviso.destroy(), self.mostrar_resumen()))
+            self.root.after(8000, lambda: aviso.winfo_exists() and aviso.destroy())
+    
+    def _avisar_sincronizacion(self, conteo):
+        """Indicador del menú con las ventas pendientes de registrar en MySQL y las que tuvieron faltantes"""
+        pendientes, errores, conflictos = conteo[PENDIENTE], conteo[ERROR], conteo[CONFLICTO]
+        try:
+            if self.sincronizacion_btn.winfo_exists():
+                if pendientes or errores or conflictos:
+                    texto = f"⟳ {pendientes} por sincronizar"
+                    if errores:
+                        texto += f" · {errores} con error"
+                    if conflictos:
+                        texto += f" · {conflictos} con faltante"
+                    if self.sincronizador.en_linea is False:
+                        texto += " (sin conexión)"
+                    self.sincronizacion_btn.configure(text=texto,
+                                                      bg="#C0392B" if errores or conflictos else "#E67E22")
+                    self.sincronizacion_btn.pack(side="left", padx=10)
+                else:
+                    self.sincronizacion_btn.pack_forget()
+        except (AttributeError, tk.TclError):
+            pass
+        # Se registraron ventas del diario: refrescar lo que las muestra
+        if pendientes < self._pendientes_sincronizar:
+            self.dashboard_stats.invalidar()
+            try:
+                if hasattr(self, 'lista_ventas') and self.lista_ventas.tree.winfo_exists():
+                    self.lista_ventas.recargar()
+                if hasattr(self, 'lista_clientes') and self.lista_clientes.tree.winfo_exists():
+                    self.lista_clientes.recargar()
+            except Exception:
+                pass
+        self._pendientes_sincronizar = pendientes
+    
+    def sincronizar_ahora(self):
+        """Muestra las ventas con faltante y reintenta de inmediato las pendientes (también las que quedaron con error)"""
+        conteo = self.diario.contar()
+        if conteo[CONFLICTO]:
+            # Ya están registradas en MySQL: solo falta que alguien revise el stock de esos productos
+            conflictos = self.diario.conflictos()
+            detalle = "\n".join(f"- {fecha} {cliente} (venta {venta_id}): {nota}"
+                                 for _, fecha, cliente, venta_id, nota in conflictos[:5])
+            if len(conflictos) > 5:
+                detalle += f"\n... y {len(conflictos) - 5} más"
+            if messagebox.askyesno(
+                    "Ventas con faltante de stock",
+                    f"{len(conflictos)} venta(s) se registraron sin stock suficiente:\n\n{detalle}\n\n"
+                    "Revise el inventario de esos productos. ¿Marcarlas como revisadas?"):
+                self.diario.resolver_conflictos([clave for clave, *_ in conflictos])
+        if conteo[ERROR]:
+            errores = self.diario.errores()
+            detalle = "\n".join(f"- {fecha} {cliente}: {error}" for fecha, cliente, error in errores[:5])
+            if not messagebox.askyesno(
+                    "Ventas con error",
+                    f"{conteo[ERROR]} venta(s) no se pudieron registrar en MySQL:\n\n{detalle}\n\n"
+                    "¿Volver a intentarlo?"):
+                return
+            self.diario.reintentar_errores()
+        self.sincronizador.despertar()
+        self._avisar_sincronizacion(self.diario.contar())
+    
     def mostrar_ventas(self):
         """Muestra la pantalla de ventas"""
         # Verificar permisos de acceso
@@ -517,8 +783,7 @@ class NexusCafeApp:
             return
             
         # Limpiar frame de contenido
-        for widget in self.contenido_frame.winfo_children():
-            widget.destroy()
+        self.limpiar_contenido()
         
         # Título
         titulo_frame = tk.Frame(self.contenido_frame, bg="#ECF0F1", padx=20, pady=10)
@@ -578,49 +843,27 @@ class NexusCafeApp:
         tabla_frame = tk.Frame(contenido, bg="white", padx=15, pady=15, relief="solid", bd=1)
         tabla_frame.pack(fill="both", expand=True, pady=10)
         
-        # Obtener ventas
-        ventas = self.models['venta'].obtener_todas()
+        # Tabla paginada: solo se cargan las páginas visibles (keyset sobre ventas.id)
+        def formatear_venta(venta):
+            # venta = (id, cliente, total, fecha)
+            fecha_val = venta[3]
+            fecha_formateada = fecha_val.strftime("%Y-%m-%d %H:%M") if isinstance(fecha_val, datetime.datetime) else str(fecha_val)
+            return (venta[0], fecha_formateada, venta[1], f"S/ {float(venta[2]):.2f}"), ()
         
-        # Crear tabla con ordenación y multi-selección
-        self.tabla_ventas = ttk.Treeview(
+        self.lista_ventas = TablaPaginada(
             tabla_frame,
-            columns=("id", "fecha", "cliente", "total"),
-            show="headings",
-            selectmode="extended",
+            [("id", "ID", 50), ("fecha", "Fecha", 150), ("cliente", "Cliente", 200), ("total", "Total", 100)],
+            self.models['venta'].consulta_paginada(),
+            formatear_venta,
+            ejecutor=self.tareas,
+            orden_columnas={"id": "id", "fecha": "fecha", "cliente": "cliente", "total": "total"},
         )
-        self.tabla_ventas.pack(fill="both", expand=True)
+        self.tabla_ventas = self.lista_ventas.tree
         
-        # Configurar columnas con ordenación al hacer clic
-        self.tabla_ventas.heading("id", text="ID", command=lambda: self.ordenar_columna(self.tabla_ventas, "id", False))
-        self.tabla_ventas.heading("fecha", text="Fecha", command=lambda: self.ordenar_columna(self.tabla_ventas, "fecha", False))
-        self.tabla_ventas.heading("cliente", text="Cliente", command=lambda: self.ordenar_columna(self.tabla_ventas, "cliente", False))
-        self.tabla_ventas.heading("total", text="Total", command=lambda: self.ordenar_columna(self.tabla_ventas, "total", False))
+        btn_buscar.configure(command=lambda: self.buscar_ventas(busqueda_entry.get()))
+        btn_filtrar.configure(command=lambda: self.buscar_ventas(busqueda_entry.get(), desde_entry.get(), hasta_entry.get()))
         
-        self.tabla_ventas.column("id", width=50)
-        self.tabla_ventas.column("fecha", width=150)
-        self.tabla_ventas.column("cliente", width=200)
-        self.tabla_ventas.column("total", width=100)
-        
-        # Insertar datos
-        if ventas:
-            for venta in ventas:
-                if len(venta) >= 4:
-                    # venta = (id, cliente, total, fecha)
-                    fecha_val = venta[3]
-                    fecha_formateada = fecha_val.strftime("%Y-%m-%d %H:%M") if isinstance(fecha_val, datetime.datetime) else str(fecha_val)
-                    self.tabla_ventas.insert("", "end", values=(
-                        venta[0],              # ID
-                        fecha_formateada,      # Fecha
-                        venta[1],              # Cliente
-                        f"S/ {float(venta[2]):.2f}"  # Total
-                    ))
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=self.tabla_ventas.yview)
-        scrollbar_x = ttk.Scrollbar(tabla_frame, orient="horizontal", command=self.tabla_ventas.xview)
-        self.tabla_ventas.configure(yscrollcommand=scrollbar.set, xscrollcommand=scrollbar_x.set)
-        scrollbar.pack(side="right", fill="y")
-        scrollbar_x.pack(side="bottom", fill="x")
+        self.lista_ventas.recargar()
         
         # Frame de botones de acción con control de permisos
         acciones_frame = tk.Frame(contenido, bg="#ECF0F1")
@@ -647,6 +890,34 @@ class NexusCafeApp:
                                    command=self.eliminar_venta)
             btn_eliminar.pack(side="right", padx=5)
     
+    def buscar_ventas(self, texto, desde=None, hasta=None):
+        """Filtra la lista de ventas por cliente o número y, opcionalmente, por rango de fechas"""
+        filtros = []
+        texto = (texto or "").strip()
+        if texto:
+            if texto.isdigit():
+                filtros.append(("id = %s", (int(texto),)))
+            else:
+                filtros.append(("cliente LIKE %s", (f"%{texto}%",)))
+        if desde or hasta:
+            try:
+                inicio, fin = rango_fechas(desde, hasta)
+                if inicio:
+                    filtros.append(("fecha >= %s", (inicio,)))
+                if fin:
+                    filtros.append(("fecha < %s", (fin,)))
+            except ValueError:
+                messagebox.showerror("Error", "Formato de fecha inválido. Use AAAA-MM-DD")
+                return
+        
+        self.lista_ventas.fuente.establecer_filtros(filtros)
+        
+        def al_terminar(cantidad):
+            if cantidad == 0 and filtros:
+                messagebox.showinfo("Información", "No se encontraron ventas con esos criterios")
+        
+        self.lista_ventas.recargar(al_terminar)
+    
     def crear_nueva_venta(self):
         """Crea una nueva venta"""
         # Verificar permisos
@@ -659,6 +930,9 @@ class NexusCafeApp:
         venta_window.geometry("800x600")
         venta_window.configure(bg="#ECF0F1")
         
+        # Clave de la venta: identifica sus reservas de stock y es su clave de idempotencia
+        clave_venta = str(uuid.uuid4())
+        
         # Frame principal
         main_frame = tk.Frame(venta_window, bg="#ECF0F1", padx=20, pady=20)
         main_frame.pack(fill="both", expand=True)
@@ -724,9 +998,8 @@ class NexusCafeApp:
         tk.Label(add_frame, text="Producto:", font=("Arial", 10, "bold"), 
                bg="white", fg="#2C3E50").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         
-        # Obtener productos
-        productos = self.models['producto'].obtener_todos()
-        nombres_productos = [p[1] for p in productos] if productos else []
+        # Obtener productos (del catálogo en memoria)
+        nombres_productos = self.catalogo.nombres()
         
         producto_var = tk.StringVar()
         producto_combo = ttk.Combobox(add_frame, textvariable=producto_var, values=nombres_productos, 
@@ -748,6 +1021,35 @@ class NexusCafeApp:
         quitar_entry.grid(row=1, column=4, padx=5, pady=5, sticky="w")
         quitar_entry.insert(0, "1")
 
+        # Código de barras: al presionar Enter se añade el producto leído
+        tk.Label(add_frame, text="Código:", font=("Arial", 10, "bold"), 
+               bg="white", fg="#2C3E50").grid(row=0, column=3, padx=5, pady=5, sticky="w")
+        codigo_entry = tk.Entry(add_frame, font=("Arial", 10), width=15)
+        codigo_entry.grid(row=0, column=4, columnspan=2, padx=5, pady=5, sticky="w")
+
+        # Filas del carrito por id de producto (id -> item del Treeview)
+        lineas = {}
+
+        # Reservas de stock: se piden en segundo plano y la fila se agrega al confirmarse
+        def _liberar(producto_id=None, cantidad=None):
+            self.tareas.enviar(lambda: self.reservas.liberar(clave_venta, producto_id, cantidad),
+                               al_fallar=lambda e: print(f"No se pudo liberar la reserva: {e}"),
+                               grupo="reservas")
+
+        def _renovar_reservas():
+            if not venta_window.winfo_exists():
+                return
+            self.tareas.enviar(lambda: self.reservas.renovar(clave_venta), al_fallar=lambda e: None,
+                               grupo="reservas")
+            self.root.after(RENOVACION_RESERVA * 1000, _renovar_reservas)
+
+        def _cancelar_venta():
+            _liberar()
+            venta_window.destroy()
+
+        venta_window.protocol("WM_DELETE_WINDOW", _cancelar_venta)
+        self.root.after(RENOVACION_RESERVA * 1000, _renovar_reservas)
+
         # Helpers
         def _recalcular_total():
             try:
@@ -763,15 +1065,16 @@ class NexusCafeApp:
                 pass
         
         # Botón añadir con acumulación
-        def _añadir_producto():
+        def _añadir_producto(prod=None):
             try:
-                nombre_elegido = producto_var.get()
-                if not nombre_elegido:
-                    messagebox.showwarning("Advertencia", "Seleccione un producto")
-                    return
-
-                # Buscar producto por nombre
-                prod = next((p for p in productos if len(p) > 1 and str(p[1]) == str(nombre_elegido)), None)
+                if prod is None:
+                    nombre_elegido = producto_var.get()
+                    if not nombre_elegido:
+                        messagebox.showwarning("Advertencia", "Seleccione un producto")
+                        return
+
+                    # Buscar producto por nombre (índice del catálogo)
+                    prod = self.catalogo.por_nombre(nombre_elegido)
                 if not prod:
                     messagebox.showerror("Error", "Producto no encontrado")
                     return
@@ -801,33 +1104,56 @@ class NexusCafeApp:
                     stock_num = 0
 
                 # Verificar si ya existe el producto en la tabla
-                existente_id = None
+                existente_id = lineas.get(int(prod[0]))
+                if existente_id is not None and not tabla_productos.exists(existente_id):
+                    existente_id = None
                 cantidad_existente = 0
-                for item_id in tabla_productos.get_children():
-                    vals = tabla_productos.item(item_id)['values']
-                    if int(vals[0]) == int(prod[0]):
-                        existente_id = item_id
-                        try:
-                            cantidad_existente = int(float(vals[3]))
-                        except Exception:
-                            cantidad_existente = 0
-                        break
+                if existente_id is not None:
+                    try:
+                        cantidad_existente = int(float(tabla_productos.item(existente_id)['values'][3]))
+                    except Exception:
+                        cantidad_existente = 0
 
                 nueva_cantidad = cantidad_existente + cantidad
                 if nueva_cantidad > stock_num:
                     messagebox.showwarning("Stock insuficiente", f"Stock disponible: {stock_num}")
                     return
 
-                if existente_id is not None:
-                    # Actualizar fila existente
-                    nuevo_subtotal = precio_num * nueva_cantidad
-                    tabla_productos.item(existente_id, values=(prod[0], prod[1], precio_num, nueva_cantidad, nuevo_subtotal))
+                producto_id = int(prod[0])
+
+                def _aplicar(_=None):
+                    if not venta_window.winfo_exists():
+                        # La ventana se cerró mientras se reservaba
+                        _liberar(producto_id, cantidad)
+                        return
+                    # La fila pudo cambiar mientras se confirmaba la reserva
+                    existente_id = lineas.get(producto_id)
+                    if existente_id is not None and tabla_productos.exists(existente_id):
+                        # Actualizar fila existente
+                        nueva = int(float(tabla_productos.item(existente_id)['values'][3])) + cantidad
+                        tabla_productos.item(existente_id, values=(prod[0], prod[1], precio_num, nueva, precio_num * nueva))
+                    else:
+                        # Insertar nueva fila
+                        subtotal = precio_num * cantidad
+                        lineas[producto_id] = tabla_productos.insert("", "end", values=(prod[0], prod[1], precio_num, cantidad, subtotal))
+                    _recalcular_total()
+
+                def _sin_reserva(error):
+                    if isinstance(error, StockInsuficienteError):
+                        messagebox.showwarning("Stock insuficiente",
+                                               f"Otras cajas tienen reservado este producto. "
+                                               f"Disponible: {error.faltantes[0][2]}", parent=venta_window)
+                        return
+                    # Sin conexión: se vende con el stock local y el sincronizador informa
+                    # el faltante si otra caja se adelantó
+                    print(f"No se pudo reservar stock: {error}")
+                    _aplicar()
+
+                if self.sin_conexion or self.sincronizador.en_linea is False:
+                    _aplicar()
                 else:
-                    # Insertar nueva fila
-                    subtotal = precio_num * cantidad
-                    tabla_productos.insert("", "end", values=(prod[0], prod[1], precio_num, cantidad, subtotal))
-
-                _recalcular_total()
+                    self.tareas.enviar(lambda: self.reservas.reservar(clave_venta, producto_id, cantidad),
+                                       _aplicar, _sin_reserva, grupo="reservas")
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo añadir el producto: {e}")
 
@@ -835,6 +1161,20 @@ class NexusCafeApp:
                                bg="#3498DB", fg="white", padx=10, pady=5, command=_añadir_producto)
         btn_añadir.grid(row=1, column=2, padx=5, pady=5, sticky="w")
 
+        def _añadir_por_codigo(event=None):
+            codigo = codigo_entry.get().strip()
+            if not codigo:
+                return
+            prod = self.catalogo.por_codigo(codigo)
+            if not prod:
+                messagebox.showerror("Error", f"No hay productos con el código {codigo}")
+                return
+            producto_var.set(prod[1])
+            _añadir_producto(prod)
+            codigo_entry.delete(0, tk.END)
+
+        codigo_entry.bind("<Return>", _añadir_por_codigo)
+
         # Botones para quitar/eliminar
         def _quitar_cantidad():
             sel = tabla_productos.selection()
@@ -855,12 +1195,15 @@ class NexusCafeApp:
             except Exception:
                 cantidad_actual = 0
             if quitar >= cantidad_actual:
+                lineas.pop(int(vals[0]), None)
                 tabla_productos.delete(sel[0])
+                _liberar(int(vals[0]))
             else:
                 nueva = cantidad_actual - quitar
                 precio_num = float(vals[2])
                 subtotal = precio_num * nueva
                 tabla_productos.item(sel[0], values=(vals[0], vals[1], precio_num, nueva, subtotal))
+                _liberar(int(vals[0]), quitar)
             _recalcular_total()
 
         def _eliminar_producto():
@@ -868,7 +1211,10 @@ class NexusCafeApp:
             if not sel:
                 messagebox.showwarning("Advertencia", "Seleccione un producto en la tabla")
                 return
+            producto_id = int(tabla_productos.item(sel[0])['values'][0])
+            lineas.pop(producto_id, None)
             tabla_productos.delete(sel[0])
+            _liberar(producto_id)
             _recalcular_total()
 
         btn_quitar = tk.Button(add_frame, text="Quitar Cantidad", font=("Arial", 10, "bold"),
@@ -897,16 +1243,17 @@ class NexusCafeApp:
         # Botón cancelar
         btn_cancelar = tk.Button(botones_frame, text="Cancelar", font=("Arial", 10, "bold"),
                                 bg="#95A5A6", fg="white", padx=15, pady=5,
-                                command=venta_window.destroy)
+                                command=_cancelar_venta)
         btn_cancelar.pack(side="right", padx=5)
         
         # Botón guardar
         btn_guardar = tk.Button(botones_frame, text="Guardar Venta", font=("Arial", 10, "bold"),
                                bg="#27AE60", fg="white", padx=15, pady=5,
-                               command=lambda: self.guardar_venta(venta_window, cliente_entry.get(), tabla_productos))
+                               command=lambda: self.guardar_venta(venta_window, cliente_entry.get(), tabla_productos,
+                                                                  clave_venta))
         btn_guardar.pack(side="right", padx=5)
     
-    def guardar_venta(self, ventana, cliente, tabla_productos):
+    def guardar_venta(self, ventana, cliente, tabla_productos, clave=None):
         """Guarda una venta en la base de datos"""
         try:
             # Obtener productos de la tabla
@@ -916,84 +1263,50 @@ class NexusCafeApp:
                 messagebox.showerror("Error", "No hay productos en la venta")
                 return
             
-            # Calcular total y obtener detalles
+            # Líneas de la venta: (producto_id, cantidad, precio_unitario)
             detalles = []
-            total = 0
-            
             for item in items:
                 values = tabla_productos.item(item)['values']
-                producto_id = values[0]
-                cantidad = values[3]
-                subtotal = float(values[4])
-                total += subtotal
-                
-                detalles.append({
-                    'producto_id': int(values[0]),
-                    'cantidad': int(values[3]),
-                    'precio': float(values[2]),
-                    'subtotal': float(values[4])
-                })
-            
-            # Insertar venta
-            query = "INSERT INTO ventas (cliente, total, usuario_id) VALUES (%s, %s, %s)"
-            venta_id = self.db_manager.ejecutar_query(query, (cliente, total, self.usuario_actual['id']))
+                detalles.append((int(values[0]), int(values[3]), float(values[2])))
+            
+            # Stock según el catálogo en memoria (ya descuenta las ventas aún sin sincronizar)
+            pedidos = {}
+            for producto_id, cantidad, _ in detalles:
+                pedidos[producto_id] = pedidos.get(producto_id, 0) + cantidad
+            faltantes = []
+            for producto_id, cantidad in pedidos.items():
+                producto = self.catalogo.por_id(producto_id)
+                if producto is not None and int(producto[4]) < cantidad:
+                    faltantes.append((producto_id, cantidad, int(producto[4])))
+            if faltantes:
+                messagebox.showerror("Stock insuficiente", str(StockInsuficienteError(faltantes)))
+                return
             
-            if venta_id:
-                # Insertar detalles de venta
-                for detalle in detalles:
-                    query = """
-                        INSERT INTO detalles_venta (venta_id, producto_id, cantidad, precio_unitario, subtotal)
-                        VALUES (%s, %s, %s, %s, %s)
-                    """
-                    self.db_manager.ejecutar_query(query, (
-                        venta_id,
-                        detalle['producto_id'],
-                        detalle['cantidad'],
-                        detalle['precio'],
-                        detalle['subtotal']
-                    ))
-                    
-                    # Actualizar stock
-                    query = "UPDATE productos SET stock = stock - %s WHERE id = %s"
-                    self.db_manager.ejecutar_query(query, (detalle['cantidad'], detalle['producto_id']))
-                
-                # Registrar cliente si no existe y refrescar la tabla si está abierta
-                try:
-                    nombre_cliente = (cliente or "").strip()
-                    if nombre_cliente and nombre_cliente.lower() != "cliente general":
-                        existe = self.db_manager.ejecutar_query(
-                            "SELECT id FROM clientes WHERE nombre = %s LIMIT 1",
-                            (nombre_cliente,)
-                        )
-                        if existe is not None and len(existe) == 0:
-                            self.db_manager.ejecutar_query(
-                                "INSERT INTO clientes (nombre, email, telefono) VALUES (%s, %s, %s)",
-                                (nombre_cliente, None, None)
-                            )
-                        # Refrescar tabla de clientes si está visible
-                        if hasattr(self, 'tabla_clientes') and self.tabla_clientes.winfo_exists():
-                            try:
-                                for item in self.tabla_clientes.get_children():
-                                    self.tabla_clientes.delete(item)
-                                clientes_ref = self.models['cliente'].obtener_todos()
-                                if clientes_ref:
-                                    for c in clientes_ref:
-                                        self.tabla_clientes.insert("", "end", values=(
-                                            c[0],
-                                            c[1],
-                                            c[2] if c[2] else "",
-                                            c[3] if c[3] else ""
-                                        ))
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
-                
-                messagebox.showinfo("Éxito", "Venta guardada correctamente")
-                ventana.destroy()
-                self.mostrar_ventas()
-            else:
+            # El cobro se confirma en el diario local; el sincronizador registra venta, detalles
+            # y stock en MySQL (una transacción, con clave de idempotencia) en segundo plano
+            try:
+                self.diario.registrar(cliente, detalles, self.usuario_actual['id'], clave=clave)
+            except Exception as e:
+                print(f"Error registrando venta: {e}")
                 messagebox.showerror("Error", "No se pudo guardar la venta")
+                return
+            self.catalogo.descontar(pedidos)
+            if clave:
+                # Las reservas de la venta se mantienen hasta que el sincronizador la registre
+                # (ya no las renueva la ventana y MySQL puede tardar en recibirla)
+                self.tareas.enviar(lambda: self.reservas.retener(clave),
+                                   al_fallar=lambda e: print(f"No se pudo retener la reserva: {e}"),
+                                   grupo="reservas")
+            self.sincronizador.despertar()
+            
+            if self.sincronizador.en_linea is False:
+                messagebox.showinfo("Éxito", "Venta guardada en la caja. Se registrará en la base de datos "
+                                             "cuando vuelva la conexión.")
+            else:
+                messagebox.showinfo("Éxito", "Venta guardada correctamente")
+            ventana.destroy()
+            self.mostrar_ventas()
+            self._avisar_sincronizacion(self.diario.contar())
                 
         except Exception as e:
             messagebox.showerror("Error", f"Error al guardar venta: {str(e)}")
@@ -1118,47 +1431,11 @@ class NexusCafeApp:
     
     def exportar_ventas(self):
         """Exporta las ventas a un archivo"""
-        try:
-            # Obtener ventas
-            ventas = self.models['venta'].obtener_todas()
-            
-            if not ventas:
-                messagebox.showinfo("Información", "No hay ventas para exportar")
-                return
-            
-            # Seleccionar archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("All files", "*.*")],
-                title="Exportar Ventas"
-            )
-            
-            if not filename:
-                return
-            
-            # Exportar a CSV
-            import csv
-            
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Escribir encabezados
-                writer.writerow(['ID', 'Cliente', 'Total', 'Fecha'])
-                
-                # Escribir datos
-                for venta in ventas:
-                    fecha_formateada = venta[1].strftime("%Y-%m-%d %H:%M:%S") if isinstance(venta[1], datetime.datetime) else str(venta[1])
-                    writer.writerow([
-                        venta[0],  # ID
-                        venta[2],  # Cliente
-                        venta[3],  # Total
-                        fecha_formateada  # Fecha
-                    ])
-            
-            messagebox.showinfo("Éxito", f"Ventas exportadas correctamente a {filename}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar ventas: {str(e)}")
+        self.exportar_tabular(
+            "listado_ventas", self.models['venta'].iterar_todas, "Exportar Ventas",
+            mensaje_vacio="No hay ventas para exportar",
+            mensaje_exito="Ventas exportadas correctamente a {archivo}"
+        )
     
     def eliminar_venta(self):
         """Elimina una venta seleccionada"""
@@ -1179,13 +1456,9 @@ class NexusCafeApp:
         # Confirmar eliminación
         if messagebox.askyesno("Confirmar", "¿Está seguro que desea eliminar esta venta? Esta acción no se puede deshacer."):
             try:
-                # Eliminar detalles de venta
-                query = "DELETE FROM detalles_venta WHERE venta_id = %s"
-                self.db_manager.ejecutar_query(query, (venta_id,))
-                
-                # Eliminar venta
-                query = "DELETE FROM ventas WHERE id = %s"
-                self.db_manager.ejecutar_query(query, (venta_id,))
+                # Eliminar detalles, venta y su aporte al resumen diario en una sola transacción
+                self.venta_service.eliminar(int(venta_id))
+                self.dashboard_stats.invalidar()
                 
                 messagebox.showinfo("Éxito", "Venta eliminada correctamente")
                 self.mostrar_ventas()
@@ -1201,8 +1474,7 @@ class NexusCafeApp:
             return
             
         # Limpiar frame de contenido
-        for widget in self.contenido_frame.winfo_children():
-            widget.destroy()
+        self.limpiar_contenido()
         
         # Título
         titulo_frame = tk.Frame(self.contenido_frame, bg="#ECF0F1", padx=20, pady=10)
@@ -1233,6 +1505,7 @@ class NexusCafeApp:
         # Campo de búsqueda
         self.busqueda_producto_entry = tk.Entry(busqueda_frame, font=("Arial", 10), width=30)
         self.busqueda_producto_entry.pack(side="left", padx=5)
+        self.busqueda_producto_entry.bind("<Return>", lambda e: self.buscar_productos())
         
         # Botón de búsqueda
         btn_buscar = tk.Button(busqueda_frame, text="Buscar", font=("Arial", 10),
@@ -1244,16 +1517,17 @@ class NexusCafeApp:
         tk.Label(busqueda_frame, text="Categoría:", font=("Arial", 10, "bold"), 
                bg="white", fg="#2C3E50").pack(side="left", padx=(20, 5))
         
-        # Obtener categorías
-        query = "SELECT DISTINCT categoria FROM productos"
-        categorias_result = self.db_manager.ejecutar_query(query)
-        categorias = ["Todas"] + [cat[0] for cat in categorias_result] if categorias_result else ["Todas"]
-        
-        self.categoria_var = tk.StringVar(value=categorias[0])
-        categoria_menu = ttk.Combobox(busqueda_frame, textvariable=self.categoria_var, values=categorias, 
+        # Categorías: se completan cuando llega la consulta en segundo plano
+        self.categoria_var = tk.StringVar(value="Todas")
+        categoria_menu = ttk.Combobox(busqueda_frame, textvariable=self.categoria_var, values=["Todas"], 
                                     font=("Arial", 10), width=15, state="readonly")
         categoria_menu.pack(side="left", padx=5)
         
+        # Solo productos en alerta: usa el índice de bajo_stock
+        self.solo_bajo_stock_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(busqueda_frame, text="Solo bajo stock", variable=self.solo_bajo_stock_var,
+                       font=("Arial", 10), bg="white", command=self.filtrar_productos).pack(side="left", padx=5)
+        
         # Botón de filtrar
         btn_filtrar = tk.Button(busqueda_frame, text="Filtrar", font=("Arial", 10),
                               bg="#3498DB", fg="white", padx=10,
@@ -1264,57 +1538,51 @@ class NexusCafeApp:
         tabla_frame = tk.Frame(contenido, bg="white", padx=15, pady=15, relief="solid", bd=1)
         tabla_frame.pack(fill="both", expand=True, pady=10)
         
-        # Obtener productos
-        productos = self.models['producto'].obtener_todos()
-        
-        # Crear tabla con ordenación y multi-selección
-        self.tabla_productos = ttk.Treeview(
+        # Tabla paginada del inventario (keyset sobre nombre, id)
+        def formatear_producto(producto):
+            # Colorear según la columna generada bajo_stock (la calcula MySQL al cambiar el stock)
+            tags = ("stock_bajo",) if producto[6] else ()
+            return (
+                producto[0],  # ID
+                producto[1],  # Nombre
+                producto[2],  # Categoría
+                f"S/ {producto[3]:.2f}",  # Precio
+                producto[4],  # Stock
+                producto[5]   # Stock Mínimo
+            ), tags
+        
+        self.lista_productos = TablaPaginada(
             tabla_frame,
-            columns=("id", "nombre", "categoria", "precio", "stock", "stock_min"),
-            show="headings",
-            selectmode="extended",
+            [("id", "ID", 50), ("nombre", "Nombre", 200), ("categoria", "Categoría", 100),
+             ("precio", "Precio", 100), ("stock", "Stock", 80), ("stock_min", "Stock Mín.", 80)],
+            self.models['producto'].consulta_paginada(),
+            formatear_producto,
+            ejecutor=self.tareas,
+            orden_columnas={"id": "id", "nombre": "nombre", "categoria": "categoria", "precio": "precio",
+                            "stock": "stock", "stock_min": "stock_minimo"},
+        )
+        self.tabla_productos = self.lista_productos.tree
+        self.tabla_productos.tag_configure("stock_bajo", background="#FADBD8", foreground="#E74C3C")
+        
+        # Búsqueda mientras se escribe: sugerencias bajo el campo y la tabla filtrada
+        BusquedaIncremental(
+            self.busqueda_producto_entry, self.buscador_productos,
+            lambda texto, ids: self._filtrar_busqueda(self.lista_productos, texto, ids),
+            lambda producto_id: self._elegir_busqueda(self.lista_productos, self.busqueda_producto_entry,
+                                                      self.buscador_productos, producto_id),
+            ejecutor=self.tareas,
         )
-        self.tabla_productos.pack(fill="both", expand=True)
-        
-        # Configurar columnas con ordenación al hacer clic
-        self.tabla_productos.heading("id", text="ID", command=lambda: self.ordenar_columna(self.tabla_productos, "id", False))
-        self.tabla_productos.heading("nombre", text="Nombre", command=lambda: self.ordenar_columna(self.tabla_productos, "nombre", False))
-        self.tabla_productos.heading("categoria", text="Categoría", command=lambda: self.ordenar_columna(self.tabla_productos, "categoria", False))
-        self.tabla_productos.heading("precio", text="Precio", command=lambda: self.ordenar_columna(self.tabla_productos, "precio", False))
-        self.tabla_productos.heading("stock", text="Stock", command=lambda: self.ordenar_columna(self.tabla_productos, "stock", False))
-        self.tabla_productos.heading("stock_min", text="Stock Mín.", command=lambda: self.ordenar_columna(self.tabla_productos, "stock_min", False))
-        
-        self.tabla_productos.column("id", width=50)
-        self.tabla_productos.column("nombre", width=200)
-        self.tabla_productos.column("categoria", width=100)
-        self.tabla_productos.column("precio", width=100)
-        self.tabla_productos.column("stock", width=80)
-        self.tabla_productos.column("stock_min", width=80)
         
-        # Insertar datos
-        if productos:
-            for producto in productos:
-                # Colorear según stock
-                tags = ("stock_bajo",) if producto[4] <= producto[5] else ("",)
-                
-                self.tabla_productos.insert("", "end", values=(
-                    producto[0],  # ID
-                    producto[1],  # Nombre
-                    producto[2],  # Categoría
-                    f"S/ {producto[3]:.2f}",  # Precio
-                    producto[4],  # Stock
-                    producto[5]   # Stock Mínimo
-                ), tags=tags)
-            
-            # Configurar colores
-            self.tabla_productos.tag_configure("stock_bajo", background="#FADBD8", foreground="#E74C3C")
+        # Categorías del catálogo en memoria (en segundo plano solo si hay que recargarlo);
+        # los productos los pide la tabla página a página
+        def pintar_categorias(categorias):
+            categoria_menu.configure(values=["Todas"] + categorias)
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=self.tabla_productos.yview)
-        scrollbar_x = ttk.Scrollbar(tabla_frame, orient="horizontal", command=self.tabla_productos.xview)
-        self.tabla_productos.configure(yscrollcommand=scrollbar.set, xscrollcommand=scrollbar_x.set)
-        scrollbar.pack(side="right", fill="y")
-        scrollbar_x.pack(side="bottom", fill="x")
+        if self.catalogo.vigente():
+            pintar_categorias(self.catalogo.categorias())
+        else:
+            self.tareas.enviar(self.catalogo.categorias, pintar_categorias)
+        self.lista_productos.recargar()
         
         # Frame de botones de acción con control de permisos
         acciones_frame = tk.Frame(contenido, bg="#ECF0F1")
@@ -1337,6 +1605,11 @@ class NexusCafeApp:
                                   bg="#2C3E50", fg="white", padx=10, pady=5,
                                   command=self.ajustar_stock)
             btn_ajustar.pack(side="left", padx=5)
+            
+            btn_importar = tk.Button(acciones_frame, text="Importar / Ajuste Masivo", font=("Arial", 10),
+                                   bg="#2C3E50", fg="white", padx=10, pady=5,
+                                   command=self.importar_productos)
+            btn_importar.pack(side="left", padx=5)
         
         btn_exportar = tk.Button(acciones_frame, text="Exportar", font=("Arial", 10),
                                bg="#2C3E50", fg="white", padx=10, pady=5,
@@ -1352,7 +1625,7 @@ class NexusCafeApp:
         # Crear ventana para nuevo producto
         producto_window = tk.Toplevel(self.root)
         producto_window.title("Nuevo Producto")
-        producto_window.geometry("500x500")
+        producto_window.geometry("500x580")
         producto_window.configure(bg="#ECF0F1")
         
         # Frame principal
@@ -1366,6 +1639,7 @@ class NexusCafeApp:
             ("Precio (S/):", "entry_precio"),
             ("Stock:", "entry_stock"),
             ("Stock Mínimo:", "entry_stock_minimo"),
+            ("Código de barras:", "entry_codigo_barras"),
             ("Descripción:", "entry_descripcion")
         ]
         
@@ -1375,10 +1649,8 @@ class NexusCafeApp:
             tk.Label(main_frame, text=label, bg="#ECF0F1", font=("Arial", 12)).pack(pady=(10, 5), anchor="w")
             
             if nombre == "entry_categoria":
-                # Obtener categorías existentes
-                query = "SELECT DISTINCT categoria FROM productos"
-                categorias_result = self.db_manager.ejecutar_query(query)
-                categorias = [cat[0] for cat in categorias_result] if categorias_result else []
+                # Categorías existentes (catálogo en memoria)
+                categorias = self.catalogo.categorias()
                 
                 entry = ttk.Combobox(main_frame, values=categorias, font=("Arial", 12))
                 entry.pack(pady=(0, 10), padx=20, fill="x")
@@ -1403,6 +1675,8 @@ class NexusCafeApp:
                 precio = float(entries["entry_precio"].get())
                 stock = int(entries["entry_stock"].get())
                 stock_minimo = int(entries["entry_stock_minimo"].get())
+                # Opcional: sin código queda NULL (el índice único admite varios NULL)
+                codigo_barras = entries["entry_codigo_barras"].get().strip() or None
                 descripcion = entries["entry_descripcion"].get("1.0", tk.END).strip()
                 
                 if not all([nombre, categoria, precio, stock]):
@@ -1410,13 +1684,17 @@ class NexusCafeApp:
                     return
                 
                 query = """
-                    INSERT INTO productos (nombre, categoria, precio, stock, stock_minimo, descripcion)
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    INSERT INTO productos (nombre, categoria, precio, stock, stock_minimo, codigo_barras, descripcion)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
                 """
-                resultado = self.db_manager.ejecutar_query(query, (nombre, categoria, precio, stock, stock_minimo, descripcion))
+                resultado = self.db_manager.ejecutar_query(
+                    query, (nombre, categoria, precio, stock, stock_minimo, codigo_barras, descripcion)
+                )
                 if not resultado:
-                    messagebox.showerror("Error", "No se pudo guardar el producto en la base de datos")
+                    messagebox.showerror("Error", "No se pudo guardar el producto en la base de datos"
+                                         + (" (¿código de barras repetido?)" if codigo_barras else ""))
                     return
+                self.dashboard_stats.invalidar()
                 messagebox.showinfo("Éxito", "Producto agregado correctamente")
                 producto_window.destroy()
                 self.mostrar_inventario()
@@ -1456,7 +1734,7 @@ class NexusCafeApp:
         # Crear ventana para editar producto
         producto_window = tk.Toplevel(self.root)
         producto_window.title("Editar Producto")
-        producto_window.geometry("500x500")
+        producto_window.geometry("500x580")
         producto_window.configure(bg="#ECF0F1")
         
         # Frame principal
@@ -1470,6 +1748,7 @@ class NexusCafeApp:
             ("Precio (S/):", "entry_precio"),
             ("Stock:", "entry_stock"),
             ("Stock Mínimo:", "entry_stock_minimo"),
+            ("Código de barras:", "entry_codigo_barras"),
             ("Descripción:", "entry_descripcion")
         ]
         
@@ -1479,10 +1758,8 @@ class NexusCafeApp:
             tk.Label(main_frame, text=label, bg="#ECF0F1", font=("Arial", 12)).pack(pady=(10, 5), anchor="w")
             
             if nombre == "entry_categoria":
-                # Obtener categorías existentes
-                query = "SELECT DISTINCT categoria FROM productos"
-                categorias_result = self.db_manager.ejecutar_query(query)
-                categorias = [cat[0] for cat in categorias_result] if categorias_result else []
+                # Categorías existentes (catálogo en memoria)
+                categorias = self.catalogo.categorias()
                 
                 entry = ttk.Combobox(main_frame, values=categorias, font=("Arial", 12))
                 entry.pack(pady=(0, 10), padx=20, fill="x")
@@ -1502,11 +1779,13 @@ class NexusCafeApp:
         entries["entry_stock"].insert(0, str(producto_data[4]))
         entries["entry_stock_minimo"].insert(0, str(producto_data[5]))
         
-        # Obtener descripción actual
-        query = "SELECT descripcion FROM productos WHERE id = %s"
+        # Obtener descripción y código de barras actuales
+        query = "SELECT descripcion, codigo_barras FROM productos WHERE id = %s"
         resultado = self.db_manager.ejecutar_query(query, (producto_data[0],))
         if resultado and resultado[0][0]:
             entries["entry_descripcion"].insert("1.0", resultado[0][0])
+        if resultado and resultado[0][1]:
+            entries["entry_codigo_barras"].insert(0, resultado[0][1])
         
         # Frame de botones
         botones_frame = tk.Frame(producto_window, bg="#ECF0F1")
@@ -1520,6 +1799,8 @@ class NexusCafeApp:
                 precio = float(entries["entry_precio"].get())
                 stock = int(entries["entry_stock"].get())
                 stock_minimo = int(entries["entry_stock_minimo"].get())
+                # Opcional: sin código queda NULL (el índice único admite varios NULL)
+                codigo_barras = entries["entry_codigo_barras"].get().strip() or None
                 descripcion = entries["entry_descripcion"].get("1.0", tk.END).strip()
                 
                 if not all([nombre, categoria, precio, stock]):
@@ -1528,10 +1809,17 @@ class NexusCafeApp:
                 
                 query = """
                     UPDATE productos 
-                    SET nombre=%s, categoria=%s, precio=%s, stock=%s, stock_minimo=%s, descripcion=%s
+                    SET nombre=%s, categoria=%s, precio=%s, stock=%s, stock_minimo=%s, codigo_barras=%s, descripcion=%s
                     WHERE id=%s
                 """
-                self.db_manager.ejecutar_query(query, (nombre, categoria, precio, stock, stock_minimo, descripcion, producto_data[0]))
+                resultado = self.db_manager.ejecutar_query(
+                    query, (nombre, categoria, precio, stock, stock_minimo, codigo_barras, descripcion, producto_data[0])
+                )
+                if resultado is None:
+                    messagebox.showerror("Error", "No se pudo actualizar el producto"
+                                         + (" (¿código de barras repetido?)" if codigo_barras else ""))
+                    return
+                self.dashboard_stats.invalidar()
                 
                 messagebox.showinfo("Éxito", "Producto actualizado correctamente")
                 producto_window.destroy()
@@ -1574,6 +1862,7 @@ class NexusCafeApp:
             try:
                 query = "DELETE FROM productos WHERE id=%s"
                 self.db_manager.ejecutar_query(query, (producto_data[0],))
+                self.dashboard_stats.invalidar()
                 
                 messagebox.showinfo("Éxito", "Producto eliminado correctamente")
                 self.mostrar_inventario()
@@ -1636,6 +1925,7 @@ class NexusCafeApp:
                 
                 query = "UPDATE productos SET stock=%s WHERE id=%s"
                 self.db_manager.ejecutar_query(query, (nuevo_stock, producto_data[0]))
+                self.dashboard_stats.invalidar()
                 
                 messagebox.showinfo("Éxito", "Stock actualizado correctamente")
                 stock_window.destroy()
@@ -1657,6 +1947,182 @@ class NexusCafeApp:
                                height=2, cursor="hand2")
         btn_cancelar.pack(side="left", padx=5, pady=5, expand=True, fill="x")
     
+    def importar_productos(self):
+        """Importa productos o ajusta el stock de muchos a la vez desde un CSV o Excel
+        
+        El archivo se lee y se compara con el catálogo en segundo plano; la vista
+        previa muestra qué se crea, qué cambia y qué filas tienen errores, y al
+        confirmar todo se aplica en una sola transacción.
+        """
+        if not self.verificar_permiso_accion('editar_producto'):
+            messagebox.showerror("Acceso Denegado", "No tiene permisos para ajustar stock")
+            return
+        
+        ventana = tk.Toplevel(self.root)
+        ventana.title("Importar Productos / Ajuste Masivo de Stock")
+        ventana.geometry("900x560")
+        ventana.configure(bg="#ECF0F1")
+        
+        # Archivo y modo
+        opciones_frame = tk.Frame(ventana, bg="white", padx=15, pady=10, relief="solid", bd=1)
+        opciones_frame.pack(fill="x", padx=10, pady=10)
+        
+        modo_var = tk.StringVar(value="entrada")
+        for modo, texto in importacion.MODOS.items():
+            tk.Radiobutton(opciones_frame, text=texto, variable=modo_var, value=modo, bg="white",
+                           font=("Arial", 10), command=lambda: _cargar_vista()).pack(anchor="w")
+        
+        archivo_var = tk.StringVar(value="")
+        archivo_frame = tk.Frame(opciones_frame, bg="white")
+        archivo_frame.pack(fill="x", pady=(8, 0))
+        tk.Label(archivo_frame, textvariable=archivo_var, font=("Arial", 9), bg="white",
+                 fg="#7F8C8D", anchor="w").pack(side="left", fill="x", expand=True)
+        
+        tk.Label(opciones_frame, text="Columnas: codigo y/o nombre, categoria, precio, cantidad, "
+                                      "stock_minimo, costo, descripcion",
+                 font=("Arial", 9, "italic"), bg="white", fg="#7F8C8D").pack(anchor="w", pady=(5, 0))
+        
+        # Vista previa
+        tabla_frame = tk.Frame(ventana, bg="white", padx=10, pady=10, relief="solid", bd=1)
+        tabla_frame.pack(fill="both", expand=True, padx=10)
+        columnas = [("linea", "Línea", 50), ("accion", "Acción", 80), ("codigo", "Código", 110),
+                    ("nombre", "Nombre", 200), ("stock", "Stock", 100), ("precio", "Precio", 80),
+                    ("obs", "Observación", 220)]
+        tabla = ttk.Treeview(tabla_frame, columns=[c[0] for c in columnas], show="headings")
+        for columna, titulo, ancho in columnas:
+            tabla.heading(columna, text=titulo)
+            tabla.column(columna, width=ancho)
+        scroll = ttk.Scrollbar(tabla_frame, orient="vertical", command=tabla.yview)
+        tabla.configure(yscrollcommand=scroll.set)
+        scroll.pack(side="right", fill="y")
+        tabla.pack(fill="both", expand=True)
+        tabla.tag_configure("error", background="#FADBD8", foreground="#E74C3C")
+        tabla.tag_configure("nuevo", background="#D5F5E3")
+        
+        resumen_label = tk.Label(ventana, text="Elija un archivo para ver la vista previa",
+                                 font=("Arial", 10), bg="#ECF0F1", fg="#2C3E50", anchor="w")
+        resumen_label.pack(fill="x", padx=10, pady=5)
+        
+        botones_frame = tk.Frame(ventana, bg="#ECF0F1")
+        botones_frame.pack(side="bottom", fill="x", pady=10, padx=10)
+        
+        estado = {"archivo": None, "vista": None}
+        
+        def pintar(vista):
+            if not ventana.winfo_exists():
+                return
+            estado["vista"] = vista
+            hijos = tabla.get_children()
+            if hijos:
+                tabla.delete(*hijos)
+            for fila in vista.filas[:importacion.MAX_FILAS_VISTA]:
+                stock = "" if fila.stock_despues is None else f"{fila.stock_antes} → {fila.stock_despues}"
+                precio = "" if fila.precio is None else f"S/ {fila.precio:.2f}"
+                tabla.insert("", "end", values=(
+                    fila.linea, fila.accion.capitalize(), fila.codigo or "", fila.nombre or "",
+                    stock, precio, "; ".join(fila.errores)
+                ), tags=(fila.accion,))
+            texto = vista.resumen()
+            if len(vista.filas) > importacion.MAX_FILAS_VISTA:
+                texto += f" — se muestran las primeras {importacion.MAX_FILAS_VISTA}"
+            resumen_label.config(text=texto, fg="#2C3E50")
+            btn_confirmar.config(state="normal" if vista.validas() else "disabled")
+        
+        def fallar(error):
+            if ventana.winfo_exists():
+                resumen_label.config(text=f"No se pudo leer el archivo: {error}", fg="#E74C3C")
+                btn_confirmar.config(state="disabled")
+        
+        def _cargar_vista():
+            archivo = estado["archivo"]
+            if not archivo:
+                return
+            modo = modo_var.get()
+            btn_confirmar.config(state="disabled")
+            resumen_label.config(text="Leyendo archivo...", fg="#7F8C8D")
+            self.tareas.enviar(lambda: importacion.preparar(archivo, modo, self.catalogo),
+                               pintar, fallar, grupo="importacion")
+        
+        def elegir_archivo():
+            archivo = filedialog.askopenfilename(
+                parent=ventana, title="Archivo de productos",
+                filetypes=[("CSV o Excel", "*.csv *.xlsx"), ("CSV files", "*.csv"),
+                           ("Excel files", "*.xlsx"), ("All files", "*.*")]
+            )
+            if archivo:
+                estado["archivo"] = archivo
+                archivo_var.set(archivo)
+                _cargar_vista()
+        
+        def confirmar():
+            vista = estado["vista"]
+            if not vista or not vista.validas():
+                return
+            if not messagebox.askyesno("Confirmar", f"¿Aplicar la importación?\n\n{vista.resumen()}",
+                                       parent=ventana):
+                return
+            filas = [f.tupla() for f in vista.validas()]
+            usuario_id = self.usuario_actual['id'] if self.usuario_actual else None
+            btn_confirmar.config(state="disabled")
+            btn_archivo.config(state="disabled")
+            resumen_label.config(text=f"Importando {len(filas)} filas...", fg="#7F8C8D")
+            inicio = datetime.datetime.now()
+            
+            def terminado(resultado):
+                creados, actualizados = resultado
+                segundos = (datetime.datetime.now() - inicio).total_seconds()
+                self.dashboard_stats.invalidar()
+                messagebox.showinfo("Éxito", f"Importación completada en {segundos:.1f} s\n\n"
+                                             f"Productos nuevos: {creados}\nActualizados: {actualizados}")
+                if ventana.winfo_exists():
+                    ventana.destroy()
+                self.mostrar_inventario()
+            
+            def fallido(error):
+                messagebox.showerror("Error", f"No se aplicó ningún cambio: {error}")
+                if ventana.winfo_exists():
+                    btn_confirmar.config(state="normal")
+                    btn_archivo.config(state="normal")
+                    resumen_label.config(text=vista.resumen(), fg="#2C3E50")
+            
+            self.tareas.enviar(
+                lambda: self.producto_service.importar_masivo(filas, vista.modo, usuario_id),
+                terminado, fallido, grupo="importacion_guardar"
+            )
+        
+        btn_archivo = tk.Button(archivo_frame, text="Elegir archivo...", font=("Arial", 10),
+                                bg="#3498DB", fg="white", padx=10, command=elegir_archivo)
+        btn_archivo.pack(side="right", padx=5)
+        
+        btn_confirmar = tk.Button(botones_frame, text="✓ CONFIRMAR IMPORTACIÓN", command=confirmar,
+                                  bg="#27AE60", fg="white", font=("Arial", 12, "bold"),
+                                  height=2, cursor="hand2", state="disabled")
+        btn_confirmar.pack(side="left", padx=5, pady=5, expand=True, fill="x")
+        
+        btn_cancelar = tk.Button(botones_frame, text="✗ CERRAR", command=ventana.destroy,
+                                 bg="#E74C3C", fg="white", font=("Arial", 12, "bold"),
+                                 height=2, cursor="hand2")
+        btn_cancelar.pack(side="left", padx=5, pady=5, expand=True, fill="x")
+    
+    def _filtrar_busqueda(self, lista, texto, ids, al_terminar=None):
+        """Filtrar una tabla paginada por los ids del índice de búsqueda (LIKE si no hay índice)"""
+        if not texto:
+            filtros = []
+        elif ids is None:
+            filtros = [("nombre LIKE %s", (f"%{texto}%",))]
+        elif ids:
+            filtros = [(f"id IN ({', '.join(['%s'] * len(ids))})", tuple(ids))]
+        else:
+            filtros = [("1 = 0", ())]
+        lista.fuente.establecer_filtros(filtros)
+        lista.recargar(al_terminar)
+    
+    def _elegir_busqueda(self, lista, entry, buscador, id_elegido):
+        """Mostrar solo la fila elegida entre las sugerencias de búsqueda"""
+        entry.delete(0, tk.END)
+        entry.insert(0, buscador.nombre(id_elegido))
+        self._filtrar_busqueda(lista, entry.get(), [id_elegido])
+    
     def buscar_productos(self):
         """Busca productos por nombre"""
         texto_busqueda = self.busqueda_producto_entry.get().strip()
@@ -1665,120 +2131,39 @@ class NexusCafeApp:
             self.mostrar_inventario()
             return
         
-        # Limpiar tabla
-        for item in self.tabla_productos.get_children():
-            self.tabla_productos.delete(item)
-        
-        try:
-            query = "SELECT id, nombre, categoria, precio, stock, stock_minimo FROM productos WHERE nombre LIKE %s ORDER BY nombre"
-            productos = self.db_manager.ejecutar_query(query, (f"%{texto_busqueda}%",))
-            
-            if productos:
-                # Agregar productos a la tabla
-                for producto in productos:
-                    # Colorear según stock
-                    tags = ("stock_bajo",) if producto[4] <= producto[5] else ("",)
-                    
-                    self.tabla_productos.insert("", "end", values=(
-                        producto[0],  # ID
-                        producto[1],  # Nombre
-                        producto[2],  # Categoría
-                        f"S/ {producto[3]:.2f}",  # Precio
-                        producto[4],  # Stock
-                        producto[5]   # Stock Mínimo
-                    ), tags=tags)
-                
-                # Configurar colores
-                self.tabla_productos.tag_configure("stock_bajo", background="#FADBD8", foreground="#E74C3C")
-            else:
+        def al_terminar(cantidad):
+            if cantidad == 0:
                 messagebox.showinfo("Información", "No se encontraron productos con ese nombre")
         
-        except Exception as e:
-            print(f"Error buscando productos: {e}")
+        self._filtrar_busqueda(self.lista_productos, texto_busqueda,
+                               self.buscador_productos.ids_filtro(texto_busqueda), al_terminar)
     
     def filtrar_productos(self):
-        """Filtra productos por categoría"""
+        """Filtra productos por categoría y, si se marcó, solo los de bajo stock"""
         categoria = self.categoria_var.get()
         
-        # Limpiar tabla
-        for item in self.tabla_productos.get_children():
-            self.tabla_productos.delete(item)
-        
-        try:
-            if categoria == "Todas":
-                query = "SELECT id, nombre, categoria, precio, stock, stock_minimo FROM productos ORDER BY nombre"
-                productos = self.db_manager.ejecutar_query(query)
-            else:
-                query = "SELECT id, nombre, categoria, precio, stock, stock_minimo FROM productos WHERE categoria = %s ORDER BY nombre"
-                productos = self.db_manager.ejecutar_query(query, (categoria,))
-            
-            if productos:
-                # Agregar productos a la tabla
-                for producto in productos:
-                    # Colorear según stock
-                    tags = ("stock_bajo",) if producto[4] <= producto[5] else ("",)
-                    
-                    self.tabla_productos.insert("", "end", values=(
-                        producto[0],  # ID
-                        producto[1],  # Nombre
-                        producto[2],  # Categoría
-                        f"S/ {producto[3]:.2f}",  # Precio
-                        producto[4],  # Stock
-                        producto[5]   # Stock Mínimo
-                    ), tags=tags)
-                
-                # Configurar colores
-                self.tabla_productos.tag_configure("stock_bajo", background="#FADBD8", foreground="#E74C3C")
-            else:
+        filtros = []
+        if categoria != "Todas":
+            filtros.append(("categoria = %s", (categoria,)))
+        if self.solo_bajo_stock_var.get():
+            filtros.append(("bajo_stock = 1", ()))
+        self.lista_productos.fuente.establecer_filtros(filtros)
+        
+        def al_terminar(cantidad):
+            if cantidad == 0 and self.solo_bajo_stock_var.get():
+                messagebox.showinfo("Información", "No hay productos con bajo stock en la selección")
+            elif cantidad == 0:
                 messagebox.showinfo("Información", f"No se encontraron productos en la categoría {categoria}")
         
-        except Exception as e:
-            print(f"Error filtrando productos: {e}")
+        self.lista_productos.recargar(al_terminar)
     
     def exportar_productos(self):
         """Exporta los productos a un archivo"""
-        try:
-            # Obtener productos
-            productos = self.models['producto'].obtener_todos()
-            
-            if not productos:
-                messagebox.showinfo("Información", "No hay productos para exportar")
-                return
-            
-            # Seleccionar archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("All files", "*.*")],
-                title="Exportar Productos"
-            )
-            
-            if not filename:
-                return
-            
-            # Exportar a CSV
-            import csv
-            
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Escribir encabezados
-                writer.writerow(['ID', 'Nombre', 'Categoría', 'Precio', 'Stock', 'Stock Mínimo'])
-                
-                # Escribir datos
-                for producto in productos:
-                    writer.writerow([
-                        producto[0],  # ID
-                        producto[1],  # Nombre
-                        producto[2],  # Categoría
-                        producto[3],  # Precio
-                        producto[4],  # Stock
-                        producto[5]   # Stock Mínimo
-                    ])
-            
-            messagebox.showinfo("Éxito", f"Productos exportados correctamente a {filename}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar productos: {str(e)}")
+        self.exportar_tabular(
+            "listado_productos", self.models['producto'].iterar_todos, "Exportar Productos",
+            mensaje_vacio="No hay productos para exportar",
+            mensaje_exito="Productos exportados correctamente a {archivo}"
+        )
     
     def mostrar_clientes(self):
         """Muestra la pantalla de clientes"""
@@ -1788,8 +2173,7 @@ class NexusCafeApp:
             return
             
         # Limpiar frame de contenido
-        for widget in self.contenido_frame.winfo_children():
-            widget.destroy()
+        self.limpiar_contenido()
         
         # Título
         titulo_frame = tk.Frame(self.contenido_frame, bg="#ECF0F1", padx=20, pady=10)
@@ -1820,6 +2204,7 @@ class NexusCafeApp:
         # Campo de búsqueda
         self.busqueda_cliente_entry = tk.Entry(busqueda_frame, font=("Arial", 10), width=30)
         self.busqueda_cliente_entry.pack(side="left", padx=5)
+        self.busqueda_cliente_entry.bind("<Return>", lambda e: self.buscar_clientes())
         
         # Botón de búsqueda
         btn_buscar = tk.Button(busqueda_frame, text="Buscar", font=("Arial", 10),
@@ -1831,45 +2216,35 @@ class NexusCafeApp:
         tabla_frame = tk.Frame(contenido, bg="white", padx=15, pady=15, relief="solid", bd=1)
         tabla_frame.pack(fill="both", expand=True, pady=10)
         
-        # Obtener clientes
-        clientes = self.models['cliente'].obtener_todos()
+        # Tabla paginada de clientes (keyset sobre nombre, id)
+        def formatear_cliente(cliente):
+            return (
+                cliente[0],  # ID
+                cliente[1],  # Nombre
+                cliente[2] if cliente[2] else "",  # Email
+                cliente[3] if cliente[3] else ""   # Teléfono
+            ), ()
         
-        # Crear tabla con ordenación y multi-selección
-        self.tabla_clientes = ttk.Treeview(
+        self.lista_clientes = TablaPaginada(
             tabla_frame,
-            columns=("id", "nombre", "email", "telefono"),
-            show="headings",
-            selectmode="extended",
+            [("id", "ID", 50), ("nombre", "Nombre", 200), ("email", "Email", 200), ("telefono", "Teléfono", 100)],
+            self.models['cliente'].consulta_paginada(),
+            formatear_cliente,
+            ejecutor=self.tareas,
+            orden_columnas={"id": "id", "nombre": "nombre", "email": "email", "telefono": "telefono"},
+        )
+        self.tabla_clientes = self.lista_clientes.tree
+        
+        # Búsqueda mientras se escribe: sugerencias bajo el campo y la tabla filtrada
+        BusquedaIncremental(
+            self.busqueda_cliente_entry, self.buscador_clientes,
+            lambda texto, ids: self._filtrar_busqueda(self.lista_clientes, texto, ids),
+            lambda cliente_id: self._elegir_busqueda(self.lista_clientes, self.busqueda_cliente_entry,
+                                                     self.buscador_clientes, cliente_id),
+            ejecutor=self.tareas,
         )
-        self.tabla_clientes.pack(fill="both", expand=True)
-        
-        # Configurar columnas con ordenación al hacer clic
-        self.tabla_clientes.heading("id", text="ID", command=lambda: self.ordenar_columna(self.tabla_clientes, "id", False))
-        self.tabla_clientes.heading("nombre", text="Nombre", command=lambda: self.ordenar_columna(self.tabla_clientes, "nombre", False))
-        self.tabla_clientes.heading("email", text="Email", command=lambda: self.ordenar_columna(self.tabla_clientes, "email", False))
-        self.tabla_clientes.heading("telefono", text="Teléfono", command=lambda: self.ordenar_columna(self.tabla_clientes, "telefono", False))
-        
-        self.tabla_clientes.column("id", width=50)
-        self.tabla_clientes.column("nombre", width=200)
-        self.tabla_clientes.column("email", width=200)
-        self.tabla_clientes.column("telefono", width=100)
-        
-        # Insertar datos
-        if clientes:
-            for cliente in clientes:
-                self.tabla_clientes.insert("", "end", values=(
-                    cliente[0],  # ID
-                    cliente[1],  # Nombre
-                    cliente[2] if cliente[2] else "",  # Email
-                    cliente[3] if cliente[3] else ""   # Teléfono
-                ))
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=self.tabla_clientes.yview)
-        scrollbar_x = ttk.Scrollbar(tabla_frame, orient="horizontal", command=self.tabla_clientes.xview)
-        self.tabla_clientes.configure(yscrollcommand=scrollbar.set, xscrollcommand=scrollbar_x.set)
-        scrollbar.pack(side="right", fill="y")
-        scrollbar_x.pack(side="bottom", fill="x")
+        self.lista_clientes.recargar()
         
         # Frame de botones de acción
         acciones_frame = tk.Frame(contenido, bg="#ECF0F1")
@@ -1946,6 +2321,7 @@ class NexusCafeApp:
                     VALUES (%s, %s, %s)
                 """
                 self.db_manager.ejecutar_query(query, (nombre, email, telefono))
+                self.dashboard_stats.invalidar()
                 
                 messagebox.showinfo("Éxito", "Cliente agregado correctamente")
                 cliente_window.destroy()
@@ -2070,7 +2446,12 @@ class NexusCafeApp:
         if messagebox.askyesno("Confirmar", f"¿Está seguro que desea eliminar al cliente {cliente_data[1]}?"):
             try:
                 query = "DELETE FROM clientes WHERE id=%s"
-                self.db_manager.ejecutar_query(query, (cliente_data[0],))
+                resultado = self.db_manager.ejecutar_query(query, (cliente_data[0],))
+                if not resultado:
+                    # None: la base rechazó el borrado; 0: el cliente ya no existía
+                    messagebox.showerror("Error", "No se pudo eliminar el cliente")
+                    return
+                self.dashboard_stats.invalidar()
                 
                 messagebox.showinfo("Éxito", "Cliente eliminado correctamente")
                 self.mostrar_clientes()
@@ -2086,82 +2467,30 @@ class NexusCafeApp:
             self.mostrar_clientes()
             return
         
-        # Limpiar tabla
-        for item in self.tabla_clientes.get_children():
-            self.tabla_clientes.delete(item)
-        
-        try:
-            query = "SELECT id, nombre, email, telefono FROM clientes WHERE nombre LIKE %s ORDER BY nombre"
-            clientes = self.db_manager.ejecutar_query(query, (f"%{texto_busqueda}%",))
-            
-            if clientes:
-                # Agregar clientes a la tabla
-                for cliente in clientes:
-                    self.tabla_clientes.insert("", "end", values=(
-                        cliente[0],  # ID
-                        cliente[1],  # Nombre
-                        cliente[2] if cliente[2] else "",  # Email
-                        cliente[3] if cliente[3] else ""   # Teléfono
-                    ))
-            else:
+        def al_terminar(cantidad):
+            if cantidad == 0:
                 messagebox.showinfo("Información", "No se encontraron clientes con ese nombre")
         
-        except Exception as e:
-            print(f"Error buscando clientes: {e}")
+        self._filtrar_busqueda(self.lista_clientes, texto_busqueda,
+                               self.buscador_clientes.ids_filtro(texto_busqueda), al_terminar)
     
     def exportar_clientes(self):
         """Exporta los clientes a un archivo"""
-        try:
-            # Obtener clientes
-            clientes = self.models['cliente'].obtener_todos()
-            
-            if not clientes:
-                messagebox.showinfo("Información", "No hay clientes para exportar")
-                return
-            
-            # Seleccionar archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("All files", "*.*")],
-                title="Exportar Clientes"
-            )
-            
-            if not filename:
-                return
-            
-            # Exportar a CSV
-            import csv
-            
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Escribir encabezados
-                writer.writerow(['ID', 'Nombre', 'Email', 'Teléfono'])
-                
-                # Escribir datos
-                for cliente in clientes:
-                    writer.writerow([
-                        cliente[0],  # ID
-                        cliente[1],  # Nombre
-                        cliente[2] if cliente[2] else "",  # Email
-                        cliente[3] if cliente[3] else ""   # Teléfono
-                    ])
-            
-            messagebox.showinfo("Éxito", f"Clientes exportados correctamente a {filename}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar clientes: {str(e)}")
-    
-    def mostrar_reportes(self):
-        """Muestra la pantalla de reportes"""
-        # Verificar permisos de acceso
-        if not self.verificar_permiso('reportes'):
-            messagebox.showerror("Acceso Denegado", "No tiene permisos para acceder a los reportes")
-            return
+        self.exportar_tabular(
+            "listado_clientes", self.models['cliente'].iterar_todos, "Exportar Clientes",
+            mensaje_vacio="No hay clientes para exportar",
+            mensaje_exito="Clientes exportados correctamente a {archivo}"
+        )
+    
+    def mostrar_reportes(self):
+        """Muestra la pantalla de reportes"""
+        # Verificar permisos de acceso
+        if not self.verificar_permiso('reportes'):
+            messagebox.showerror("Acceso Denegado", "No tiene permisos para acceder a los reportes")
+            return
             
         # Limpiar frame de contenido
-        for widget in self.contenido_frame.winfo_children():
-            widget.destroy()
+        self.limpiar_contenido()
         
         # Título
         titulo_frame = tk.Frame(self.contenido_frame, bg="#ECF0F1", padx=20, pady=10)
@@ -2245,6 +2574,11 @@ class NexusCafeApp:
                                 command=self.generar_reporte)
         btn_generar.pack(side="left", expand=True, fill="x", padx=(5,0))
         
+        # Cola de reportes en generación
+        tk.Button(control_frame, text="Trabajos en curso", font=("Arial", 10),
+                  bg="#7F8C8D", fg="white", padx=12, pady=4,
+                  command=self.mostrar_trabajos).pack(fill="x", pady=(0, 5))
+        
         # Contenedor de vista previa con scroll
         preview_outer = tk.Frame(contenido, bg="white", padx=15, pady=15, relief="solid", bd=1)
         preview_outer.pack(side="left", fill="both", expand=True, pady=10, padx=10)
@@ -2278,8 +2612,7 @@ class NexusCafeApp:
             return
             
         # Limpiar frame de contenido
-        for widget in self.contenido_frame.winfo_children():
-            widget.destroy()
+        self.limpiar_contenido()
         
         # Título
         titulo_frame = tk.Frame(self.contenido_frame, bg="#ECF0F1", padx=20, pady=10)
@@ -2414,15 +2747,48 @@ class NexusCafeApp:
         acciones_frame = tk.Frame(contenido, bg="#ECF0F1")
         acciones_frame.pack(fill="x", pady=10)
         
+        def guardar_configuracion():
+            igv = igv_entry.get().strip()
+            try:
+                float(igv)
+            except ValueError:
+                messagebox.showerror("Error", "El IGV debe ser un número")
+                return
+            valores = {
+                'cafeteria_nombre': nombre_entry.get().strip(),
+                'cafeteria_direccion': direccion_entry.get().strip(),
+                'cafeteria_telefono': telefono_entry.get().strip(),
+                'cafeteria_email': email_entry.get().strip(),
+                'igv': igv,
+                'ruta_backup': ruta_entry.get().strip(),
+            }
+            # Solo las claves que cambiaron, en una sola sentencia
+            cambios = {clave: valor for clave, valor in valores.items() if config.get(clave) != valor}
+            if not cambios:
+                messagebox.showinfo("Información", "No hay cambios para guardar")
+                return
+            if self.models['configuracion'].guardar_configuracion(cambios):
+                config.update(cambios)
+                messagebox.showinfo("Éxito", "Configuración guardada correctamente")
+            else:
+                messagebox.showerror("Error", "No se pudo guardar la configuración")
+        
         # Solo mostrar botón guardar si tiene permisos
         if self.verificar_permiso_accion('configurar_sistema'):
             btn_guardar = tk.Button(acciones_frame, text="Guardar Configuración", font=("Arial", 10, "bold"),
-                                  bg="#27AE60", fg="white", padx=15, pady=5)
+                                  bg="#27AE60", fg="white", padx=15, pady=5,
+                                  command=guardar_configuracion)
             btn_guardar.pack(side="right", padx=5)
         
         btn_cancelar = tk.Button(acciones_frame, text="Cancelar", font=("Arial", 10),
                                bg="#7F8C8D", fg="white", padx=15, pady=5)
         btn_cancelar.pack(side="right", padx=5)
+        
+        if self.verificar_permiso_accion('ver_rendimiento'):
+            btn_rendimiento = tk.Button(acciones_frame, text="Rendimiento", font=("Arial", 10),
+                                      bg="#8E44AD", fg="white", padx=15, pady=5,
+                                      command=self.mostrar_rendimiento)
+            btn_rendimiento.pack(side="left", padx=5)
     
     def mostrar_acerca_de(self):
         """Muestra la pantalla de acerca de"""
@@ -2432,8 +2798,7 @@ class NexusCafeApp:
             return
             
         # Limpiar frame de contenido
-        for widget in self.contenido_frame.winfo_children():
-            widget.destroy()
+        self.limpiar_contenido()
         
         # Título
         titulo_frame = tk.Frame(self.contenido_frame, bg="#ECF0F1", padx=20, pady=10)
@@ -2489,6 +2854,11 @@ class NexusCafeApp:
     def cerrar_sesion(self):
         """Cierra la sesión actual y muestra el login"""
         self.usuario_actual = None
+        self.tareas.cancelar("vista")
+        self.tareas.cancelar("alertas")
+        if self._vigilancia_stock is not None:
+            self.root.after_cancel(self._vigilancia_stock)
+            self._vigilancia_stock = None
         self.mostrar_login()
     
     def seleccionar_tipo_reporte(self, tipo):
@@ -2532,9 +2902,12 @@ class NexusCafeApp:
             messagebox.showinfo("Información", "Por favor seleccione un tipo de reporte primero")
             return
         
-        # Limpiar el frame de vista previa
+        # Limpiar el frame de vista previa (y descartar una vista previa anterior aún en curso);
+        # el frame de gráficos se conserva para reutilizar los canvas de matplotlib
+        self.tareas.cancelar("vista")
         for widget in self.preview_frame.winfo_children():
-            widget.destroy()
+            if widget is not self.graficos_frame:
+                widget.destroy()
         
         # La vista previa se muestra dentro del Canvas con scroll; no requiere pack explícito
         
@@ -2542,77 +2915,85 @@ class NexusCafeApp:
         tabla_frame = tk.Frame(self.preview_frame, bg="white")
         tabla_frame.pack(fill="both", expand=True, pady=5)
         
-        # Crear un frame para los gráficos (se empaqueta solo si se muestran)
-        self.graficos_frame = tk.Frame(self.preview_frame, bg="white")
-        # Reiniciar lista de canvases de gráficos
+        # Frame de los gráficos (se empaqueta solo si se muestran, debajo de la tabla)
+        if not self.graficos_frame.winfo_exists():
+            self.graficos_frame = tk.Frame(self.preview_frame, bg="white")
+        self.graficos_frame.pack_forget()
         self._graficos_canvases = []
         
-        try:
-            # Obtener datos según el tipo de reporte
-            if self.tipo_reporte_actual in ["diario", "mensual"]:
-                desde = self.desde_entry.get()
-                hasta = self.hasta_entry.get()
-                datos = self.models['venta'].obtener_ventas_por_periodo(desde, hasta)
-                
-                if not datos:
-                    tk.Label(tabla_frame, text="No hay datos para mostrar en el período seleccionado", 
-                           font=("Arial", 12), bg="white", fg="#E74C3C").pack(pady=20)
-                    return
-                
-                # Crear tabla de ventas
-                self.crear_tabla_ventas(tabla_frame, datos)
-                
-                # Crear gráfico de ventas (opcional)
-                if hasattr(self, 'mostrar_graficos_var') and self.mostrar_graficos_var.get():
-                    self.crear_grafico_ventas(datos)
-                
-            elif self.tipo_reporte_actual == "productos":
-                datos = self.models['venta'].obtener_productos_mas_vendidos()
-                
-                if not datos:
-                    tk.Label(tabla_frame, text="No hay datos de productos vendidos", 
-                           font=("Arial", 12), bg="white", fg="#E74C3C").pack(pady=20)
-                    return
-                
-                # Crear tabla de productos más vendidos
-                self.crear_tabla_productos(tabla_frame, datos)
-                
-                # Crear gráfico de productos más vendidos (opcional)
-                if hasattr(self, 'mostrar_graficos_var') and self.mostrar_graficos_var.get():
-                    self.crear_grafico_productos(datos)
-                
-            elif self.tipo_reporte_actual == "inventario":
-                datos = self.models['producto'].obtener_todos()
-                
-                if not datos:
-                    tk.Label(tabla_frame, text="No hay productos en el inventario", 
-                           font=("Arial", 12), bg="white", fg="#E74C3C").pack(pady=20)
-                    return
-                
-                # Crear tabla de inventario
-                self.crear_tabla_inventario(tabla_frame, datos)
-                
-                # Crear gráfico de inventario (opcional)
-                if hasattr(self, 'mostrar_graficos_var') and self.mostrar_graficos_var.get():
-                    self.crear_grafico_inventario(datos)
-                
-            elif self.tipo_reporte_actual == "clientes":
-                datos = self.models['cliente'].obtener_clientes_frecuentes()
-                
-                if not datos:
-                    tk.Label(tabla_frame, text="No hay datos de clientes frecuentes", 
-                           font=("Arial", 12), bg="white", fg="#E74C3C").pack(pady=20)
-                    return
-                
-                # Crear tabla de clientes
-                self.crear_tabla_clientes(tabla_frame, datos)
-                
-                # Crear gráfico de clientes (opcional)
-                if hasattr(self, 'mostrar_graficos_var') and self.mostrar_graficos_var.get():
-                    self.crear_grafico_clientes(datos)
+        tipo = self.tipo_reporte_actual
+        desde = self.desde_entry.get()
+        hasta = self.hasta_entry.get()
+        mostrar_graficos = hasattr(self, 'mostrar_graficos_var') and self.mostrar_graficos_var.get()
+        # Clave del gráfico: la versión se toma antes de consultar, así un cambio
+        # ocurrido durante la carga invalida la próxima vista previa
+        tablas = {"productos": ("ventas",), "inventario": ("productos",), "clientes": ("ventas", "clientes")}
+        rango = (desde, hasta) if tipo in ["diario", "mensual"] else None
+        clave = (tipo, rango, versiones.version(*tablas.get(tipo, ("ventas",))))
+        
+        # Obtener datos según el tipo de reporte (fuera del hilo de la interfaz);
+        # el gráfico de ventas usa totales agrupados por la base de datos, no una barra por venta
+        def cargar():
+            if tipo in ["diario", "mensual"]:
+                agrupadas = self.models['venta'].obtener_ventas_agrupadas(desde, hasta) if mostrar_graficos else None
+                return self.models['venta'].obtener_ventas_por_periodo(desde, hasta), agrupadas
+            elif tipo == "productos":
+                return self.models['venta'].obtener_productos_mas_vendidos(), None
+            elif tipo == "inventario":
+                return self.models['producto'].obtener_todos(), None
+            elif tipo == "clientes":
+                return self.models['cliente'].obtener_clientes_frecuentes(), None
+            return None, None
+        
+        def pintar(resultado):
+            cargando.destroy()
+            datos, datos_grafico = resultado
+            try:
+                self._pintar_vista_previa(tipo, tabla_frame, datos, mostrar_graficos, clave, datos_grafico)
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al generar vista previa: {str(e)}")
         
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al generar vista previa: {str(e)}")
+        def fallar(error):
+            cargando.destroy()
+            messagebox.showerror("Error", f"Error al generar vista previa: {str(error)}")
+        
+        cargando = self.mostrar_cargando(tabla_frame)
+        self.tareas.enviar(cargar, pintar, fallar)
+    
+    def _pintar_vista_previa(self, tipo, tabla_frame, datos, mostrar_graficos, clave=None, datos_grafico=None):
+        """Dibuja la tabla y el gráfico de la vista previa con los datos ya cargados"""
+        mensajes_vacio = {
+            "diario": "No hay datos para mostrar en el período seleccionado",
+            "mensual": "No hay datos para mostrar en el período seleccionado",
+            "productos": "No hay datos de productos vendidos",
+            "inventario": "No hay productos en el inventario",
+            "clientes": "No hay datos de clientes frecuentes",
+        }
+        if not datos:
+            tk.Label(tabla_frame, text=mensajes_vacio.get(tipo, "No hay datos para mostrar"), 
+                   font=("Arial", 12), bg="white", fg="#E74C3C").pack(pady=20)
+            return
+        
+        if tipo in ["diario", "mensual"]:
+            # Crear tabla y gráfico de ventas
+            self.crear_tabla_ventas(tabla_frame, datos)
+            if mostrar_graficos:
+                self.crear_grafico("ventas", datos_grafico, clave)
+        elif tipo == "productos":
+            # Crear tabla y gráfico de productos más vendidos
+            self.crear_tabla_productos(tabla_frame, datos)
+            if mostrar_graficos:
+                self.crear_grafico("productos", datos, clave)
+        elif tipo == "inventario":
+            # Crear tabla y gráfico de inventario
+            self.crear_tabla_inventario(tabla_frame, datos)
+            if mostrar_graficos:
+                self.crear_grafico("inventario", datos, clave)
+        elif tipo == "clientes":
+            # Crear tabla y gráfico de clientes
+            self.crear_tabla_clientes(tabla_frame, datos)
+            if mostrar_graficos:
+                self.crear_grafico("clientes", datos, clave)
     
     def generar_reporte(self):
         """Genera un reporte según el tipo seleccionado y el formato elegido"""
@@ -2625,70 +3006,130 @@ class NexusCafeApp:
             messagebox.showinfo("Información", "Por favor seleccione un tipo de reporte primero")
             return
         
-        formato = self.formato_var.get()
+        self.encolar_reporte(self.formato_var.get())
+    
+    def encolar_reporte(self, formato):
+        """Agrega a la cola de trabajos el reporte seleccionado en PDF, Excel o CSV"""
+        tipo = self.tipo_reporte_actual
+        if tipo in ["diario", "mensual"]:
+            desde = self.desde_entry.get()
+            hasta = self.hasta_entry.get()
+            filas = lambda: self.models['venta'].iterar_ventas_por_periodo(desde, hasta)
+            clave, nombre, vacio = "ventas", "ventas", "No hay ventas en el período seleccionado"
+            generar_pdf = "generar_reporte_ventas"
+        elif tipo == "productos":
+            filas = lambda: self.models['venta'].obtener_productos_mas_vendidos() or []
+            clave, nombre, vacio = "productos", "productos", "No hay datos de productos vendidos"
+            generar_pdf = "generar_reporte_productos"
+        elif tipo == "inventario":
+            filas = lambda: self.models['producto'].iterar_todos()
+            clave, nombre, vacio = "inventario", "inventario", "No hay productos en el inventario"
+            generar_pdf = "generar_reporte_inventario"
+        elif tipo == "clientes":
+            filas = lambda: self.models['cliente'].obtener_clientes_frecuentes() or []
+            clave, nombre, vacio = "clientes", "clientes", "No hay datos de clientes frecuentes"
+            generar_pdf = "generar_reporte_clientes"
+        else:
+            return
         
-        try:
-            # Obtener datos según el tipo de reporte
-            if self.tipo_reporte_actual in ["diario", "mensual"]:
-                desde = self.desde_entry.get()
-                hasta = self.hasta_entry.get()
-                datos = self.models['venta'].obtener_ventas_por_periodo(desde, hasta)
-                
-                if not datos:
-                    messagebox.showinfo("Información", "No hay ventas en el período seleccionado")
-                    return
-                
-                if formato == "PDF":
-                    self.exportar_pdf_ventas(datos)
-                elif formato == "Excel":
-                    self.exportar_excel_ventas(datos)
-                elif formato == "CSV":
-                    self.exportar_csv_ventas(datos)
-                
-            elif self.tipo_reporte_actual == "productos":
-                datos = self.models['venta'].obtener_productos_mas_vendidos()
-                
-                if not datos:
-                    messagebox.showinfo("Información", "No hay datos de productos vendidos")
-                    return
-                
-                if formato == "PDF":
-                    self.exportar_pdf_productos(datos)
-                elif formato == "Excel":
-                    self.exportar_excel_productos(datos)
-                elif formato == "CSV":
-                    self.exportar_csv_productos(datos)
-                
-            elif self.tipo_reporte_actual == "inventario":
-                datos = self.models['producto'].obtener_todos()
-                
-                if not datos:
-                    messagebox.showinfo("Información", "No hay productos en el inventario")
-                    return
-                
-                if formato == "PDF":
-                    self.exportar_pdf_inventario(datos)
-                elif formato == "Excel":
-                    self.exportar_excel_inventario(datos)
-                elif formato == "CSV":
-                    self.exportar_csv_inventario(datos)
-                
-            elif self.tipo_reporte_actual == "clientes":
-                datos = self.models['cliente'].obtener_clientes_frecuentes()
-                
-                if not datos:
-                    messagebox.showinfo("Información", "No hay datos de clientes frecuentes")
-                    return
-                
-                if formato == "PDF":
-                    self.exportar_pdf_clientes(datos)
-                elif formato == "Excel":
-                    self.exportar_excel_clientes(datos)
-                elif formato == "CSV":
-                    self.exportar_csv_clientes(datos)
+        titulo = f"Guardar reporte de {nombre} como"
+        if formato == "PDF":
+            def trabajo_pdf(trabajo, archivo):
+                # Las filas llegan por lotes desde un cursor sin búfer (iterar_query) y el
+                # generador las recorre una sola vez; el avance se informa por página
+                trabajo.avanzar(texto="Consultando datos")
+                datos = iter(filas())
+                primera = next(datos, None)
+                if primera is None:
+                    return 0
+                trabajo.avanzar(texto="Generando PDF")
+                generador = getattr(self.pdf_generator, generar_pdf)
+                if not generador(itertools.chain([primera], datos), archivo,
+                                 al_avanzar=lambda pagina: trabajo.avanzar(paginas=pagina)):
+                    raise RuntimeError("No se pudo generar el PDF")
+                rendimiento = self.pdf_generator.ultimo_rendimiento
+                trabajo.avanzar(filas=rendimiento.filas, paginas=rendimiento.paginas, texto=rendimiento.texto())
+                return rendimiento.filas
+            
+            self.encolar_exportacion(titulo, ".pdf", [("PDF files", "*.pdf"), ("All files", "*.*")],
+                                     trabajo_pdf, vacio)
+        else:
+            extension = ".xlsx" if formato == "Excel" else ".csv"
+            self.exportar_tabular(clave, filas, titulo, extension, vacio)
+    
+    def exportar_tabular(self, formato, fuente, titulo, extension=".csv",
+                         mensaje_vacio="No hay datos para exportar", mensaje_exito=None):
+        """Exporta las filas de ``fuente()`` a CSV o Excel (según la extensión elegida)
         
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al generar reporte: {str(e)}")
+        Las columnas salen de ``modules.exportacion.FORMATOS[formato]``.
+        """
+        if extension == ".xlsx":
+            tipos_archivo = [("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("All files", "*.*")]
+        else:
+            tipos_archivo = [("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("All files", "*.*")]
+        
+        def trabajo_tabular(trabajo, archivo):
+            return exportacion.exportar(fuente(), archivo, formato,
+                                        al_avanzar=lambda n: trabajo.avanzar(filas=n))
+        
+        self.encolar_exportacion(titulo, extension, tipos_archivo, trabajo_tabular,
+                                 mensaje_vacio, mensaje_exito)
+    
+    def encolar_exportacion(self, titulo, extension, tipos_archivo, generar,
+                            mensaje_vacio="No hay datos para exportar", mensaje_exito=None):
+        """Pide el archivo de destino y agrega ``generar(trabajo, archivo)`` a la cola de trabajos
+        
+        ``generar`` corre en segundo plano y devuelve la cantidad de filas exportadas.
+        """
+        filename = filedialog.asksaveasfilename(
+            defaultextension=extension,
+            filetypes=tipos_archivo,
+            title=titulo
+        )
+        if not filename:
+            return
+        
+        def terminar(cantidad):
+            if not cantidad:
+                messagebox.showinfo("Información", mensaje_vacio)
+            elif mensaje_exito:
+                messagebox.showinfo("Éxito", mensaje_exito.format(archivo=filename, filas=cantidad))
+            elif messagebox.askyesno("Éxito", f"Reporte generado con éxito ({cantidad} filas). ¿Desea abrirlo ahora?"):
+                try:
+                    os.startfile(filename)
+                except Exception as e:
+                    messagebox.showerror("Error", f"No se pudo abrir el archivo: {str(e)}")
+        
+        def fallar(error):
+            messagebox.showerror("Error", f"Error al generar reporte: {str(error)}")
+        
+        self.trabajos.encolar(
+            f"{titulo.replace(' como', '')}: {os.path.basename(filename)}",
+            lambda trabajo: generar(trabajo, filename),
+            terminar, fallar
+        )
+        self.mostrar_trabajos()
+    
+    def mostrar_trabajos(self):
+        """Abre (o trae al frente) la ventana con la cola de trabajos de reportes"""
+        if self.panel_trabajos is not None and self.panel_trabajos.existe():
+            self.panel_trabajos.mostrar()
+        else:
+            self.panel_trabajos = PanelTrabajos(self.root, self.trabajos)
+    
+    def mostrar_rendimiento(self):
+        """Abre (o trae al frente) el panel con las consultas más costosas"""
+        if not self.verificar_permiso_accion('ver_rendimiento'):
+            messagebox.showerror("Acceso Denegado", "No tiene permisos para ver el rendimiento")
+            return
+        if self.panel_rendimiento is not None and self.panel_rendimiento.existe():
+            self.panel_rendimiento.mostrar()
+        else:
+            self.panel_rendimiento = PanelRendimiento(self.root, obtener_instrumentacion())
+    
+    def _trabajo_actualizado(self, trabajo):
+        if self.panel_trabajos is not None:
+            self.panel_trabajos.actualizar(trabajo)
     
     def generar_reporte_ventas(self, tipo):
         """Método legacy para mantener compatibilidad"""
@@ -2710,45 +3151,6 @@ class NexusCafeApp:
         self.seleccionar_tipo_reporte("clientes")
         self.generar_reporte()
         
-    def ordenar_columna(self, treeview, col, reverse):
-        """Función para ordenar una columna del Treeview al hacer clic en el encabezado."""
-        try:
-            # Extraer datos para la ordenación, manejando formatos de moneda, fechas y números
-            def get_key(item):
-                value = treeview.set(item, col)
-                # Primero, intentar convertir a número (incluye enteros y flotantes)
-                try:
-                    # Limpiar el valor de cualquier formato de moneda
-                    cleaned_value = str(value).replace('S/', '').replace(',', '').strip()
-                    return float(cleaned_value)
-                except (ValueError, TypeError):
-                    # Si falla, intentar convertir a fecha
-                    try:
-                        return datetime.datetime.strptime(str(value), "%Y-%m-%d %H:%M")
-                    except (ValueError, TypeError):
-                        # Si falla, tratar como texto
-                        return str(value).lower()
-
-            l = [(get_key(k), k) for k in treeview.get_children('')]
-            l.sort(key=lambda t: t[0], reverse=reverse)
-
-            # Reorganizar los items en el treeview
-            for index, (val, k) in enumerate(l):
-                treeview.move(k, '', index)
-
-            # Actualizar el comando del encabezado para el próximo clic (invertir orden)
-            treeview.heading(col, command=lambda: self.ordenar_columna(treeview, col, not reverse))
-        except Exception as e:
-            # Fallback a ordenación de texto simple si todo falla
-            try:
-                l = [(treeview.set(k, col), k) for k in treeview.get_children('')]
-                l.sort(reverse=reverse)
-                for index, (val, k) in enumerate(l):
-                    treeview.move(k, '', index)
-                treeview.heading(col, command=lambda: self.ordenar_columna(treeview, col, not reverse))
-            except Exception as final_e:
-                print(f"Error fatal al ordenar columna {col}: {final_e}")
-
     def crear_tabla_ventas(self, parent_frame, datos):
         """Crea una tabla interactiva con los datos de ventas usando Treeview."""
         tabla_container = tk.Frame(parent_frame, bg="white")
@@ -2760,7 +3162,8 @@ class NexusCafeApp:
         # Encabezados y configuración de ordenamiento
         encabezados = {"id": "ID", "fecha": "Fecha", "cliente": "Cliente", "total": "Total", "estado": "Estado"}
         for col, texto in encabezados.items():
-            tabla.heading(col, text=texto, command=lambda c=col: self.ordenar_columna(tabla, c, False))
+            tabla.heading(col, text=texto)
+        ordenador = OrdenadorTabla(tabla)
             
         # Ancho de columnas
         tabla.column("id", width=50, anchor="center")
@@ -2774,7 +3177,7 @@ class NexusCafeApp:
             fecha_txt = venta[3].strftime("%Y-%m-%d %H:%M") if hasattr(venta[3], 'strftime') else str(venta[3])
             total_txt = f"S/ {float(venta[2]):.2f}"
             fila = (venta[0], fecha_txt, venta[1], total_txt, "Completada")
-            tabla.insert("", "end", values=fila)
+            ordenador.insertar(fila, (venta[0], venta[3], venta[1], float(venta[2]), "Completada"))
             
         # Scrollbar
         scrollbar = ttk.Scrollbar(tabla_container, orient="vertical", command=tabla.yview)
@@ -2797,7 +3200,8 @@ class NexusCafeApp:
 
         encabezados = {"nombre": "Producto", "cantidad": "Cantidad Vendida", "total": "Total Ventas"}
         for col, texto in encabezados.items():
-            tabla.heading(col, text=texto, command=lambda c=col: self.ordenar_columna(tabla, c, False))
+            tabla.heading(col, text=texto)
+        ordenador = OrdenadorTabla(tabla)
 
         tabla.column("nombre", width=200, anchor="w")
         tabla.column("cantidad", width=120, anchor="center")
@@ -2806,7 +3210,7 @@ class NexusCafeApp:
         for producto in datos:
             total_txt = f"S/ {float(producto[2]):.2f}"
             fila = (producto[0], int(producto[1]), total_txt)
-            tabla.insert("", "end", values=fila)
+            ordenador.insertar(fila, (producto[0], int(producto[1]), float(producto[2])))
             
         scrollbar = ttk.Scrollbar(tabla_container, orient="vertical", command=tabla.yview)
         scrollbar_x = ttk.Scrollbar(tabla_container, orient="horizontal", command=tabla.xview)
@@ -2828,7 +3232,8 @@ class NexusCafeApp:
 
         encabezados = {"id": "ID", "nombre": "Producto", "categoria": "Categoría", "precio": "Precio", "stock": "Stock", "stock_min": "Stock Mínimo"}
         for col, texto in encabezados.items():
-            tabla.heading(col, text=texto, command=lambda c=col: self.ordenar_columna(tabla, c, False))
+            tabla.heading(col, text=texto)
+        ordenador = OrdenadorTabla(tabla)
 
         tabla.column("id", width=50, anchor="center")
         tabla.column("nombre", width=200, anchor="w")
@@ -2843,7 +3248,7 @@ class NexusCafeApp:
             tags = ("stock_bajo",) if p[4] <= p[5] else ()
             precio_txt = f"S/ {float(p[3]):.2f}"
             fila = (p[0], p[1], p[2], precio_txt, p[4], p[5])
-            tabla.insert("", "end", values=fila, tags=tags)
+            ordenador.insertar(fila, (p[0], p[1], p[2], float(p[3]), p[4], p[5]), tags)
             
         scrollbar = ttk.Scrollbar(tabla_container, orient="vertical", command=tabla.yview)
         scrollbar_x = ttk.Scrollbar(tabla_container, orient="horizontal", command=tabla.xview)
@@ -2865,7 +3270,8 @@ class NexusCafeApp:
 
         encabezados = {"id": "ID", "nombre": "Cliente", "compras": "Compras", "total": "Total Gastado"}
         for col, texto in encabezados.items():
-            tabla.heading(col, text=texto, command=lambda c=col: self.ordenar_columna(tabla, c, False))
+            tabla.heading(col, text=texto)
+        ordenador = OrdenadorTabla(tabla)
 
         tabla.column("id", width=50, anchor="center")
         tabla.column("nombre", width=200, anchor="w")
@@ -2876,7 +3282,7 @@ class NexusCafeApp:
             total_txt = f"S/ {float(cliente[5]):.2f}"
             # (id, nombre, email, telefono, compras, total) -> cliente[0], cliente[1], cliente[4], cliente[5]
             fila = (cliente[0], cliente[1], cliente[4], total_txt)
-            tabla.insert("", "end", values=fila)
+            ordenador.insertar(fila, (cliente[0], cliente[1], int(cliente[4]), float(cliente[5])))
 
         scrollbar = ttk.Scrollbar(tabla_container, orient="vertical", command=tabla.yview)
         scrollbar_x = ttk.Scrollbar(tabla_container, orient="horizontal", command=tabla.xview)
@@ -2897,7 +3303,10 @@ class NexusCafeApp:
                 fig = canvas.figure
                 dpi = fig.get_dpi() if hasattr(fig, "get_dpi") else 100
                 new_w_in = max(6, (width_px - 60) / float(dpi))
-                current_h_in = fig.get_size_inches()[1]
+                current_w_in, current_h_in = fig.get_size_inches()
+                if abs(new_w_in - current_w_in) < 0.01:
+                    # Mismo ancho: no rehacer el layout ni redibujar una figura reutilizada
+                    continue
                 fig.set_size_inches(new_w_in, current_h_in, forward=True)
                 fig.tight_layout()
                 try:
@@ -2907,1042 +3316,26 @@ class NexusCafeApp:
         except Exception:
             pass
 
-    def crear_grafico_ventas(self, datos):
-        """Crea un gráfico de ventas por período"""
+    def crear_grafico(self, tipo, datos, clave=None):
+        """Muestra el gráfico del reporte reutilizando su figura (ver modules/graficos_reportes.py)"""
         try:
-            # Limpiar frame de gráficos
-            for widget in self.graficos_frame.winfo_children():
-                widget.destroy()
-                
-            # Mostrar el frame de gráficos
             self.graficos_frame.pack(fill="both", expand=True, padx=10, pady=10)
-            
-            # Preparar datos para el gráfico
-            fechas = []
-            totales = []
-            
-            for venta in datos:
-                try:
-                    # Manejar fecha de forma robusta
-                    fecha = venta[3] if len(venta) > 3 else venta[0]
-                    if hasattr(fecha, 'strftime'):
-                        fechas.append(fecha.strftime("%Y-%m-%d"))
-                    else:
-                        fechas.append(str(fecha))
-                    
-                    # Manejar total de forma robusta
-                    total = venta[2] if len(venta) > 2 else 0
-                    if isinstance(total, (int, float, Decimal)):
-                        totales.append(float(total))
-                    elif isinstance(total, str):
-                        try:
-                            totales.append(float(total.replace(',', '.')))
-                        except ValueError:
-                            totales.append(0.0)
-                    else:
-                        totales.append(0.0)
-                except (IndexError, AttributeError, TypeError):
-                    # Si hay error con algún registro, usar valores por defecto
-                    fechas.append("Sin fecha")
-                    totales.append(0.0)
-            
-            # Verificar que hay datos para mostrar
-            if not fechas or not totales or all(t == 0 for t in totales):
-                # Mostrar mensaje de no datos
-                fig = Figure(figsize=(8, 4), dpi=100)
-                ax = fig.add_subplot(111)
-                ax.text(0.5, 0.5, 'No hay datos de ventas para mostrar', 
-                       horizontalalignment='center', verticalalignment='center',
-                       transform=ax.transAxes, fontsize=14, color='#7F8C8D')
-                ax.set_xlim(0, 1)
-                ax.set_ylim(0, 1)
-                ax.axis('off')
-            else:
-                # Crear figura y ejes
-                fig = Figure(figsize=(8, 4), dpi=100)
-                ax = fig.add_subplot(111)
-                
-                # Crear gráfico de barras
-                bars = ax.bar(range(len(fechas)), totales, color='#3498DB')
-            
-                # Configurar ejes
-                ax.set_title('Ventas por Período')
-                ax.set_xlabel('Fecha')
-                ax.set_ylabel('Total (S/)')
-                
-                # Limitar etiquetas en el eje x si hay muchas fechas
-                if len(fechas) > 10:
-                    ax.set_xticks(range(0, len(fechas), len(fechas)//10))
-                    ax.set_xticklabels([fechas[i] for i in range(0, len(fechas), len(fechas)//10)], rotation=45)
-                else:
-                    ax.set_xticks(range(len(fechas)))
-                    ax.set_xticklabels(fechas, rotation=45)
-                
-                # Añadir valores sobre las barras
-                for bar in bars:
-                    height = bar.get_height()
-                    try:
-                        val = float(height)
-                    except Exception:
-                        val = 0.0
-                    ax.text(bar.get_x() + bar.get_width()/2., height,
-                            f'S/{val:.2f}', ha='center', va='bottom', rotation=0)
-            
-            fig.tight_layout()
-            
-            # Crear canvas para mostrar el gráfico
-            canvas = FigureCanvasTkAgg(fig, master=self.graficos_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-            # Registrar canvas para ajuste dinámico
-            if hasattr(self, "_graficos_canvases"):
-                self._graficos_canvases.append(canvas)
-            
-            # Añadir barra de herramientas de navegación
-            toolbar = NavigationToolbar2Tk(canvas, self.graficos_frame)
-            toolbar.update()
-            # Ajustar ancho inicial según el canvas actual
-            try:
-                ancho = self.preview_canvas.winfo_width()
-                if ancho > 0:
-                    self._ajustar_graficos_ancho(ancho)
-            except Exception:
-                pass
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al crear gráfico de ventas: {str(e)}")
-    
-    def crear_grafico_productos(self, datos):
-        """Crea un gráfico de productos más vendidos"""
-        try:
-            # Limpiar frame de gráficos
-            for widget in self.graficos_frame.winfo_children():
-                widget.destroy()
-                
-            # Mostrar el frame de gráficos
-            self.graficos_frame.pack(fill="both", expand=True, padx=10, pady=10)
-            
-            # Preparar datos para el gráfico
-            productos = []
-            cantidades = []
-            
-            for producto in datos:
-                try:
-                    # Estructura esperada: (nombre, cantidad, total)
-                    nombre = producto[0] if len(producto) > 0 else "Sin nombre"
-                    productos.append(str(nombre))
-                    
-                    # Cantidad vendida
-                    cantidad = producto[1] if len(producto) > 1 else 0
-                    if isinstance(cantidad, (int, float, Decimal)):
-                        cantidades.append(int(float(cantidad)))
-                    elif isinstance(cantidad, str):
-                        try:
-                            cantidades.append(int(float(cantidad.replace(',', '.'))))
-                        except ValueError:
-                            cantidades.append(0)
-                    else:
-                        cantidades.append(0)
-                except (IndexError, AttributeError, TypeError):
-                    productos.append("Producto desconocido")
-                    cantidades.append(0)
-            
-            # Verificar que hay datos para mostrar
-            if not productos or not cantidades or all(c == 0 for c in cantidades):
-                # Mostrar mensaje de no datos
-                fig = Figure(figsize=(8, 4), dpi=100)
-                ax = fig.add_subplot(111)
-                ax.text(0.5, 0.5, 'No hay datos de productos para mostrar', 
-                       horizontalalignment='center', verticalalignment='center',
-                       transform=ax.transAxes, fontsize=14, color='#7F8C8D')
-                ax.set_xlim(0, 1)
-                ax.set_ylim(0, 1)
-                ax.axis('off')
-            else:
-                # Crear figura y ejes
-                fig = Figure(figsize=(8, 4), dpi=100)
-                ax = fig.add_subplot(111)
-                
-                # Crear gráfico de barras horizontales
-                bars = ax.barh(range(len(productos)), cantidades, color='#2ECC71')
-            
-                # Configurar ejes
-                ax.set_title('Productos Más Vendidos')
-                ax.set_xlabel('Cantidad Vendida')
-                ax.set_ylabel('Producto')
-                
-                # Configurar etiquetas en el eje y
-                ax.set_yticks(range(len(productos)))
-                ax.set_yticklabels(productos)
-                
-                # Añadir valores al final de las barras
-                for i, bar in enumerate(bars):
-                    width = bar.get_width()
-                    ax.text(width, bar.get_y() + bar.get_height()/2.,
-                            f'{width}', ha='left', va='center')
-            
-            fig.tight_layout()
-            
-            # Crear canvas para mostrar el gráfico
-            canvas = FigureCanvasTkAgg(fig, master=self.graficos_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
+            canvas = self.graficos.mostrar(tipo, self.graficos_frame, datos, clave)
             # Registrar canvas para ajuste dinámico
-            if hasattr(self, "_graficos_canvases"):
-                self._graficos_canvases.append(canvas)
-            
-            # Añadir barra de herramientas de navegación
-            toolbar = NavigationToolbar2Tk(canvas, self.graficos_frame)
-            toolbar.update()
-            # Ajustar ancho inicial según el canvas actual
+            self._graficos_canvases = [canvas]
             try:
                 ancho = self.preview_canvas.winfo_width()
                 if ancho > 0:
                     self._ajustar_graficos_ancho(ancho)
             except Exception:
                 pass
-            
         except Exception as e:
-            messagebox.showerror("Error", f"Error al crear gráfico de productos: {str(e)}")
-    
-    def crear_grafico_inventario(self, datos):
-        """Crea un gráfico de inventario"""
-        try:
-            # Limpiar frame de gráficos
-            for widget in self.graficos_frame.winfo_children():
-                widget.destroy()
-                
-            # Mostrar el frame de gráficos
-            self.graficos_frame.pack(fill="both", expand=True, padx=10, pady=10)
-            
-            # Preparar datos para el gráfico
-            productos = []
-            stock = []
-            colores = []
-            
-            for producto in datos:
-                try:
-                    # Manejar nombre del producto de forma robusta
-                    nombre = producto[1] if len(producto) > 1 else "Sin nombre"
-                    productos.append(str(nombre))
-                    
-                    # Manejar stock de forma robusta
-                    stock_actual = producto[4] if len(producto) > 4 else 0
-                    if isinstance(stock_actual, (int, float)):
-                        stock_actual = int(stock_actual)
-                    elif isinstance(stock_actual, str):
-                        try:
-                            stock_actual = int(float(stock_actual.replace(',', '.')))
-                        except ValueError:
-                            stock_actual = 0
-                    else:
-                        stock_actual = 0
-                    
-                    stock.append(stock_actual)
-                    
-                    # Asignar color según el nivel de stock en relación al mínimo
-                    minimo = producto[5] if len(producto) > 5 else 0
-                    try:
-                        if isinstance(minimo, str):
-                            minimo = int(float(minimo.replace(',', '.')))
-                        elif isinstance(minimo, (float, Decimal)):
-                            minimo = int(float(minimo))
-                    except Exception:
-                        minimo = 0
+            messagebox.showerror("Error", f"Error al crear gráfico de {tipo}: {str(e)}")
 
-                    if stock_actual <= max(minimo, 0):
-                        colores.append('#E74C3C')  # Rojo: por debajo o igual al mínimo
-                    elif stock_actual <= max(minimo * 2, minimo + 5):
-                        colores.append('#F39C12')  # Naranja: cercano al mínimo
-                    else:
-                        colores.append('#2ECC71')  # Verde: saludable
-                        
-                except (IndexError, AttributeError, TypeError):
-                    # Si hay error con algún registro, usar valores por defecto
-                    productos.append("Producto desconocido")
-                    stock.append(0)
-                    colores.append('#E74C3C')
-            
-            # Limitar a los 15 productos con menos stock para mejor visualización
-            if len(productos) > 15:
-                # Ordenar por stock ascendente
-                productos_ordenados = [(productos[i], stock[i], colores[i]) for i in range(len(productos))]
-                productos_ordenados.sort(key=lambda x: x[1])
-                
-                # Tomar los 15 con menos stock
-                productos = [p[0] for p in productos_ordenados[:15]]
-                stock = [p[1] for p in productos_ordenados[:15]]
-                colores = [p[2] for p in productos_ordenados[:15]]
-            
-            # Crear figura y ejes
-            fig = Figure(figsize=(8, 4), dpi=100)
-            ax = fig.add_subplot(111)
-            
-            # Crear gráfico de barras horizontales
-            bars = ax.barh(range(len(productos)), stock, color=colores)
-            
-            # Configurar ejes
-            ax.set_title('Nivel de Stock por Producto')
-            ax.set_xlabel('Cantidad en Stock')
-            ax.set_ylabel('Producto')
-            
-            # Configurar etiquetas en el eje y
-            ax.set_yticks(range(len(productos)))
-            ax.set_yticklabels(productos)
-            
-            # Añadir valores al final de las barras
-            for i, bar in enumerate(bars):
-                width = bar.get_width()
-                try:
-                    wv = int(width)
-                except Exception:
-                    wv = 0
-                ax.text(width, bar.get_y() + bar.get_height()/2.,
-                        f'{wv}', ha='left', va='center')
-            
-            fig.tight_layout()
-            
-            # Crear canvas para mostrar el gráfico
-            canvas = FigureCanvasTkAgg(fig, master=self.graficos_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-            # Registrar canvas para ajuste dinámico
-            if hasattr(self, "_graficos_canvases"):
-                self._graficos_canvases.append(canvas)
-            
-            # Añadir barra de herramientas de navegación
-            toolbar = NavigationToolbar2Tk(canvas, self.graficos_frame)
-            toolbar.update()
-            # Ajustar ancho inicial según el canvas actual
-            try:
-                ancho = self.preview_canvas.winfo_width()
-                if ancho > 0:
-                    self._ajustar_graficos_ancho(ancho)
-            except Exception:
-                pass
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al crear gráfico de inventario: {str(e)}")
-    
-    def crear_grafico_clientes(self, datos):
-        """Crea un gráfico de clientes frecuentes"""
-        try:
-            # Limpiar frame de gráficos
-            for widget in self.graficos_frame.winfo_children():
-                widget.destroy()
-                
-            # Mostrar el frame de gráficos
-            self.graficos_frame.pack(fill="both", expand=True, padx=10, pady=10)
-            
-            # Preparar datos para el gráfico
-            clientes = []
-            compras = []
-            totales = []
-            
-            for cliente in datos:
-                try:
-                    # Estructura esperada: (id, nombre, email, telefono, compras, total_gastado)
-                    nombre = cliente[1] if len(cliente) > 1 else "Sin nombre"
-                    clientes.append(str(nombre))
-                    
-                    # Número de compras
-                    num_compras = cliente[4] if len(cliente) > 4 else 0
-                    if isinstance(num_compras, (int, float, Decimal)):
-                        compras.append(int(float(num_compras)))
-                    elif isinstance(num_compras, str):
-                        try:
-                            compras.append(int(float(num_compras.replace(',', '.'))))
-                        except ValueError:
-                            compras.append(0)
-                    else:
-                        compras.append(0)
-                    
-                    # Total gastado
-                    total_gastado = cliente[5] if len(cliente) > 5 else 0
-                    if isinstance(total_gastado, (int, float, Decimal)):
-                        totales.append(float(total_gastado))
-                    elif isinstance(total_gastado, str):
-                        try:
-                            totales.append(float(total_gastado.replace(',', '.')))
-                        except ValueError:
-                            totales.append(0.0)
-                    else:
-                        totales.append(0.0)
-                        
-                except (IndexError, AttributeError, TypeError):
-                    clientes.append("Cliente desconocido")
-                    compras.append(0)
-                    totales.append(0.0)
-            
-            # Limitar a los 10 mejores clientes para mejor visualización
-            if len(clientes) > 10:
-                # Ordenar por total gastado descendente
-                clientes_ordenados = [(clientes[i], compras[i], totales[i]) for i in range(len(clientes))]
-                clientes_ordenados.sort(key=lambda x: x[2], reverse=True)
-                
-                # Tomar los 10 mejores
-                clientes = [c[0] for c in clientes_ordenados[:10]]
-                compras = [c[1] for c in clientes_ordenados[:10]]
-                totales = [c[2] for c in clientes_ordenados[:10]]
-            
-            # Crear figura y ejes
-            fig = Figure(figsize=(8, 6), dpi=100)
-            
-            # Gráfico 1: Número de compras
-            ax1 = fig.add_subplot(211)
-            bars1 = ax1.bar(range(len(clientes)), compras, color='#3498DB')
-            
-            ax1.set_title('Número de Compras por Cliente')
-            ax1.set_ylabel('Compras')
-            
-            # Configurar etiquetas en el eje x
-            ax1.set_xticks(range(len(clientes)))
-            ax1.set_xticklabels(clientes, rotation=45)
-            
-            # Añadir valores sobre las barras
-            for bar in bars1:
-                height = bar.get_height()
-                ax1.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height)}', ha='center', va='bottom')
-            
-            # Gráfico 2: Total gastado
-            ax2 = fig.add_subplot(212)
-            bars2 = ax2.bar(range(len(clientes)), totales, color='#2ECC71')
-            
-            ax2.set_title('Total Gastado por Cliente')
-            ax2.set_ylabel('Total (S/)')
-            
-            # Configurar etiquetas en el eje x
-            ax2.set_xticks(range(len(clientes)))
-            ax2.set_xticklabels(clientes, rotation=45)
-            
-            # Añadir valores sobre las barras
-            for bar in bars2:
-                height = bar.get_height()
-                try:
-                    val = float(height)
-                except Exception:
-                    val = 0.0
-                ax2.text(bar.get_x() + bar.get_width()/2., height,
-                        f'S/{val:.2f}', ha='center', va='bottom')
-            
-            fig.tight_layout()
-            
-            # Crear canvas para mostrar el gráfico
-            canvas = FigureCanvasTkAgg(fig, master=self.graficos_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-            # Registrar canvas para ajuste dinámico
-            if hasattr(self, "_graficos_canvases"):
-                self._graficos_canvases.append(canvas)
-            
-            # Añadir barra de herramientas de navegación
-            toolbar = NavigationToolbar2Tk(canvas, self.graficos_frame)
-            toolbar.update()
-            # Ajustar ancho inicial según el canvas actual
-            try:
-                ancho = self.preview_canvas.winfo_width()
-                if ancho > 0:
-                    self._ajustar_graficos_ancho(ancho)
-            except Exception:
-                pass
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al crear gráfico de clientes: {str(e)}")
-            
-    # Funciones de exportación
-    def exportar_pdf_ventas(self, datos):
-        """Exporta un reporte de ventas a PDF"""
-        try:
-            # Solicitar ubicación para guardar el archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".pdf",
-                filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
-                title="Guardar reporte de ventas como"
-            )
-            
-            if not filename:
-                return
-                
-            # Generar PDF con el generador de PDF
-            self.pdf_generator.generar_reporte_ventas(datos, filename)
-            
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a PDF: {str(e)}")
-            
-    def exportar_excel_ventas(self, datos):
-        """Exporta un reporte de ventas a Excel"""
-        try:
-            # Solicitar ubicación para guardar el archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
-                title="Guardar reporte de ventas como"
-            )
-            
-            if not filename:
-                return
-                
-            # Normalizar y reordenar columnas -> (ID, Fecha, Cliente, Total, Estado)
-            filas = []
-            try:
-                iterable = datos if isinstance(datos, list) else []
-                for v in iterable:
-                    try:
-                        id_v = v[0] if len(v) > 0 else ""
-                        cliente = v[1] if len(v) > 1 else ""
-                        total = v[2] if len(v) > 2 else 0
-                        fecha = v[3] if len(v) > 3 else ""
-                        estado = v[4] if len(v) > 4 else "Completada"
-
-                        if isinstance(total, str):
-                            try:
-                                total = float(total.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.'))
-                            except Exception:
-                                total = 0.0
-                        elif isinstance(total, Decimal):
-                            total = float(total)
-                        elif not isinstance(total, (int, float)):
-                            total = 0.0
-
-                        filas.append([id_v, fecha, cliente, total, estado])
-                    except Exception:
-                        filas.append(["", "", "", 0.0, ""])            
-            except Exception:
-                pass
-
-            df = pd.DataFrame(filas, columns=["ID", "Fecha", "Cliente", "Total", "Estado"]) if filas else pd.DataFrame(columns=["ID","Fecha","Cliente","Total","Estado"])            
-            
-            # Exportar a Excel
-            df.to_excel(filename, index=False, sheet_name="Ventas")
-            
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a Excel: {str(e)}")
-            
-    def exportar_csv_ventas(self, datos):
-        """Exporta un reporte de ventas a CSV"""
-        try:
-            # Solicitar ubicación para guardar el archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-                title="Guardar reporte de ventas como"
-            )
-            
-            if not filename:
-                return
-                
-            # Normalizar y reordenar columnas -> (ID, Fecha, Cliente, Total, Estado)
-            filas = []
-            try:
-                iterable = datos if isinstance(datos, list) else []
-                for v in iterable:
-                    try:
-                        id_v = v[0] if len(v) > 0 else ""
-                        cliente = v[1] if len(v) > 1 else ""
-                        total = v[2] if len(v) > 2 else 0
-                        fecha = v[3] if len(v) > 3 else ""
-                        estado = v[4] if len(v) > 4 else "Completada"
-
-                        if isinstance(total, str):
-                            try:
-                                total = float(total.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.'))
-                            except Exception:
-                                total = 0.0
-                        elif isinstance(total, Decimal):
-                            total = float(total)
-                        elif not isinstance(total, (int, float)):
-                            total = 0.0
-
-                        filas.append([id_v, fecha, cliente, total, estado])
-                    except Exception:
-                        filas.append(["", "", "", 0.0, ""])            
-            except Exception:
-                pass
-
-            df = pd.DataFrame(filas, columns=["ID", "Fecha", "Cliente", "Total", "Estado"]) if filas else pd.DataFrame(columns=["ID","Fecha","Cliente","Total","Estado"])            
-            
-            # Exportar a CSV
-            df.to_csv(filename, index=False)
-            
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a CSV: {str(e)}")
-            
-    def exportar_pdf_productos(self, datos):
-        """Exporta un reporte de productos más vendidos a PDF"""
-        try:
-            # Solicitar ubicación para guardar el archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".pdf",
-                filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
-                title="Guardar reporte de productos como"
-            )
-            
-            if not filename:
-                return
-                
-            # Generar PDF con el generador de PDF
-            self.pdf_generator.generar_reporte_productos(datos, filename)
-            
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a PDF: {str(e)}")
-            
-    def exportar_excel_productos(self, datos):
-        """Exporta un reporte de productos más vendidos a Excel"""
-        try:
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
-                title="Guardar reporte de productos como"
-            )
-            if not filename:
-                return
-
-            # Normalizar datos -> (Producto, Cantidad Vendida, Total Ventas)
-            filas = []
-            iterable = datos if isinstance(datos, list) else []
-            for p in iterable:
-                try:
-                    nombre = p[0] if len(p) > 0 else ""
-                    cantidad = p[1] if len(p) > 1 else 0
-                    total = p[2] if len(p) > 2 else 0
-
-                    # Casts robustos
-                    try:
-                        if isinstance(cantidad, str):
-                            cantidad = int(float(cantidad.replace(',', '.')))
-                        elif isinstance(cantidad, (int, float, Decimal)):
-                            cantidad = int(float(cantidad))
-                        else:
-                            cantidad = 0
-                    except Exception:
-                        cantidad = 0
-
-                    if isinstance(total, str):
-                        try:
-                            total = float(total.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.'))
-                        except Exception:
-                            total = 0.0
-                    elif isinstance(total, Decimal):
-                        total = float(total)
-                    elif not isinstance(total, (int, float)):
-                        total = 0.0
-
-                    filas.append([nombre, cantidad, total])
-                except Exception:
-                    filas.append(["", 0, 0.0])
-
-            df = pd.DataFrame(filas, columns=["Producto", "Cantidad Vendida", "Total Ventas"]) if filas else pd.DataFrame(columns=["Producto","Cantidad Vendida","Total Ventas"])            
-            df.to_excel(filename, index=False, sheet_name="Productos")
-
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a Excel: {str(e)}")
-            
-    def exportar_csv_productos(self, datos):
-        """Exporta un reporte de productos más vendidos a CSV"""
-        try:
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-                title="Guardar reporte de productos como"
-            )
-            if not filename:
-                return
-
-            # Normalizar datos -> (Producto, Cantidad Vendida, Total Ventas)
-            filas = []
-            iterable = datos if isinstance(datos, list) else []
-            for p in iterable:
-                try:
-                    nombre = p[0] if len(p) > 0 else ""
-                    cantidad = p[1] if len(p) > 1 else 0
-                    total = p[2] if len(p) > 2 else 0
-
-                    try:
-                        if isinstance(cantidad, str):
-                            cantidad = int(float(cantidad.replace(',', '.')))
-                        elif isinstance(cantidad, (int, float, Decimal)):
-                            cantidad = int(float(cantidad))
-                        else:
-                            cantidad = 0
-                    except Exception:
-                        cantidad = 0
-
-                    if isinstance(total, str):
-                        try:
-                            total = float(total.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.'))
-                        except Exception:
-                            total = 0.0
-                    elif isinstance(total, Decimal):
-                        total = float(total)
-                    elif not isinstance(total, (int, float)):
-                        total = 0.0
-
-                    filas.append([nombre, cantidad, total])
-                except Exception:
-                    filas.append(["", 0, 0.0])
-
-            df = pd.DataFrame(filas, columns=["Producto", "Cantidad Vendida", "Total Ventas"]) if filas else pd.DataFrame(columns=["Producto","Cantidad Vendida","Total Ventas"]) 
-            df.to_csv(filename, index=False, sep=';', encoding='utf-8-sig')
-
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a CSV: {str(e)}")
-            
-    def exportar_pdf_inventario(self, datos):
-        """Exporta un reporte de inventario a PDF"""
-        try:
-            # Solicitar ubicación para guardar el archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".pdf",
-                filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
-                title="Guardar reporte de inventario como"
-            )
-            
-            if not filename:
-                return
-                
-            # Generar PDF con el generador de PDF
-            self.pdf_generator.generar_reporte_inventario(datos, filename)
-            
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a PDF: {str(e)}")
-            
-    def exportar_excel_inventario(self, datos):
-        """Exporta un reporte de inventario a Excel"""
-        try:
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
-                title="Guardar reporte de inventario como"
-            )
-            if not filename:
-                return
-
-            # Normalizar datos -> (ID, Producto, Categoría, Precio, Stock, Stock Mínimo)
-            filas = []
-            iterable = datos if isinstance(datos, list) else []
-            for p in iterable:
-                try:
-                    if isinstance(p, dict):
-                        pid = p.get('id', p.get('ID', p.get('producto_id', '')))
-                        nombre = p.get('nombre', p.get('producto', ''))
-                        categoria = p.get('categoria', '')
-                        precio = p.get('precio', 0)
-                        stock = p.get('stock', p.get('cantidad', 0))
-                        minimo = p.get('stock_minimo', p.get('minimo', 0))
-                    else:
-                        pid = p[0] if len(p) > 0 else ''
-                        nombre = p[1] if len(p) > 1 else ''
-                        categoria = p[2] if len(p) > 2 else ''
-                        precio = p[3] if len(p) > 3 else 0
-                        stock = p[4] if len(p) > 4 else 0
-                        minimo = p[5] if len(p) > 5 else 0
-
-                    # Casts
-                    if isinstance(precio, str):
-                        try:
-                            precio = float(precio.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.'))
-                        except Exception:
-                            precio = 0.0
-                    elif isinstance(precio, Decimal):
-                        precio = float(precio)
-                    elif not isinstance(precio, (int, float)):
-                        precio = 0.0
-
-                    try:
-                        if isinstance(stock, str):
-                            stock = int(float(stock.replace(',', '.')))
-                        elif isinstance(stock, (int, float, Decimal)):
-                            stock = int(float(stock))
-                        else:
-                            stock = 0
-                    except Exception:
-                        stock = 0
-
-                    try:
-                        if isinstance(minimo, str):
-                            minimo = int(float(minimo.replace(',', '.')))
-                        elif isinstance(minimo, (int, float, Decimal)):
-                            minimo = int(float(minimo))
-                        else:
-                            minimo = 0
-                    except Exception:
-                        minimo = 0
-
-                    filas.append([pid, nombre, categoria, precio, stock, minimo])
-                except Exception:
-                    filas.append(['', '', '', 0.0, 0, 0])
-
-            columnas = ["ID", "Producto", "Categoría", "Precio", "Stock", "Stock Mínimo"]
-            df = pd.DataFrame(filas, columns=columnas) if filas else pd.DataFrame(columns=columnas)
-            df.to_excel(filename, index=False, sheet_name="Inventario")
-
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a Excel: {str(e)}")
-            
-    def exportar_csv_inventario(self, datos):
-        """Exporta un reporte de inventario a CSV"""
-        try:
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-                title="Guardar reporte de inventario como"
-            )
-            if not filename:
-                return
-
-            # Normalizar datos -> (ID, Producto, Categoría, Precio, Stock, Stock Mínimo)
-            filas = []
-            iterable = datos if isinstance(datos, list) else []
-            for p in iterable:
-                try:
-                    if isinstance(p, dict):
-                        pid = p.get('id', p.get('ID', p.get('producto_id', '')))
-                        nombre = p.get('nombre', p.get('producto', ''))
-                        categoria = p.get('categoria', '')
-                        precio = p.get('precio', 0)
-                        stock = p.get('stock', p.get('cantidad', 0))
-                        minimo = p.get('stock_minimo', p.get('minimo', 0))
-                    else:
-                        pid = p[0] if len(p) > 0 else ''
-                        nombre = p[1] if len(p) > 1 else ''
-                        categoria = p[2] if len(p) > 2 else ''
-                        precio = p[3] if len(p) > 3 else 0
-                        stock = p[4] if len(p) > 4 else 0
-                        minimo = p[5] if len(p) > 5 else 0
-
-                    if isinstance(precio, str):
-                        try:
-                            precio = float(precio.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.'))
-                        except Exception:
-                            precio = 0.0
-                    elif isinstance(precio, Decimal):
-                        precio = float(precio)
-                    elif not isinstance(precio, (int, float)):
-                        precio = 0.0
-
-                    try:
-                        if isinstance(stock, str):
-                            stock = int(float(stock.replace(',', '.')))
-                        elif isinstance(stock, (int, float, Decimal)):
-                            stock = int(float(stock))
-                        else:
-                            stock = 0
-                    except Exception:
-                        stock = 0
-
-                    try:
-                        if isinstance(minimo, str):
-                            minimo = int(float(minimo.replace(',', '.')))
-                        elif isinstance(minimo, (int, float, Decimal)):
-                            minimo = int(float(minimo))
-                        else:
-                            minimo = 0
-                    except Exception:
-                        minimo = 0
-
-                    filas.append([pid, nombre, categoria, precio, stock, minimo])
-                except Exception:
-                    filas.append(['', '', '', 0.0, 0, 0])
-
-            columnas = ["ID", "Producto", "Categoría", "Precio", "Stock", "Stock Mínimo"]
-            df = pd.DataFrame(filas, columns=columnas) if filas else pd.DataFrame(columns=columnas)
-            df.to_csv(filename, index=False, sep=';', encoding='utf-8-sig')
-
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a CSV: {str(e)}")
-            
-    def exportar_pdf_clientes(self, datos):
-        """Exporta un reporte de clientes frecuentes a PDF"""
-        try:
-            # Solicitar ubicación para guardar el archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".pdf",
-                filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
-                title="Guardar reporte de clientes como"
-            )
-            
-            if not filename:
-                return
-                
-            # Generar PDF con el generador de PDF
-            self.pdf_generator.generar_reporte_clientes(datos, filename)
-            
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a PDF: {str(e)}")
-            
-    def exportar_excel_clientes(self, datos):
-        """Exporta un reporte de clientes frecuentes a Excel"""
-        try:
-            # Solicitar ubicación para guardar el archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
-                title="Guardar reporte de clientes como"
-            )
-            
-            if not filename:
-                return
-                
-            # Normalizar datos -> (ID, Cliente, Compras, Total Gastado)
-            filas = []
-            try:
-                iterable = datos if isinstance(datos, list) else []
-                for c in iterable:
-                    try:
-                        if isinstance(c, dict):
-                            cid = c.get('id', c.get('ID', 0))
-                            nombre = c.get('nombre', c.get('cliente', ''))
-                            compras = c.get('compras', c.get('cantidad', c.get('n_compras', 0)))
-                            total = c.get('total_gastado', c.get('total', 0))
-                        else:
-                            cid = c[0] if len(c) > 0 else 0
-                            nombre = c[1] if len(c) > 1 else ''
-                            compras = c[4] if len(c) > 4 else 0
-                            total = c[5] if len(c) > 5 else 0
-
-                        try:
-                            if isinstance(compras, str):
-                                compras = int(float(compras.replace(',', '.')))
-                            elif isinstance(compras, (int, float, Decimal)):
-                                compras = int(float(compras))
-                            else:
-                                compras = 0
-                        except Exception:
-                            compras = 0
-
-                        if isinstance(total, str):
-                            try:
-                                total = float(total.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.'))
-                            except Exception:
-                                total = 0.0
-                        elif isinstance(total, Decimal):
-                            total = float(total)
-                        elif not isinstance(total, (int, float)):
-                            total = 0.0
-
-                        filas.append([cid, nombre, compras, total])
-                    except Exception:
-                        filas.append([0, '', 0, 0.0])
-            except Exception:
-                pass
-
-            df = pd.DataFrame(filas, columns=["ID", "Cliente", "Compras", "Total Gastado"]) if filas else pd.DataFrame(columns=["ID","Cliente","Compras","Total Gastado"]) 
-            
-            # Exportar a Excel
-            df.to_excel(filename, index=False, sheet_name="Clientes")
-            
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a Excel: {str(e)}")
-            
-    def exportar_csv_clientes(self, datos):
-        """Exporta un reporte de clientes frecuentes a CSV"""
-        try:
-            # Solicitar ubicación para guardar el archivo
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-                title="Guardar reporte de clientes como"
-            )
-            
-            if not filename:
-                return
-                
-            # Normalizar datos -> (ID, Cliente, Compras, Total Gastado)
-            filas = []
-            try:
-                iterable = datos if isinstance(datos, list) else []
-                for c in iterable:
-                    try:
-                        if isinstance(c, dict):
-                            cid = c.get('id', c.get('ID', 0))
-                            nombre = c.get('nombre', c.get('cliente', ''))
-                            compras = c.get('compras', c.get('cantidad', c.get('n_compras', 0)))
-                            total = c.get('total_gastado', c.get('total', 0))
-                        else:
-                            cid = c[0] if len(c) > 0 else 0
-                            nombre = c[1] if len(c) > 1 else ''
-                            compras = c[4] if len(c) > 4 else 0
-                            total = c[5] if len(c) > 5 else 0
-
-                        try:
-                            if isinstance(compras, str):
-                                compras = int(float(compras.replace(',', '.')))
-                            elif isinstance(compras, (int, float, Decimal)):
-                                compras = int(float(compras))
-                            else:
-                                compras = 0
-                        except Exception:
-                            compras = 0
-
-                        if isinstance(total, str):
-                            try:
-                                total = float(total.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.'))
-                            except Exception:
-                                total = 0.0
-                        elif isinstance(total, Decimal):
-                            total = float(total)
-                        elif not isinstance(total, (int, float)):
-                            total = 0.0
-
-                        filas.append([cid, nombre, compras, total])
-                    except Exception:
-                        filas.append([0, '', 0, 0.0])
-            except Exception:
-                pass
-
-            df = pd.DataFrame(filas, columns=["ID", "Cliente", "Compras", "Total Gastado"]) if filas else pd.DataFrame(columns=["ID","Cliente","Compras","Total Gastado"]) 
-            
-            # Exportar a CSV
-            df.to_csv(filename, index=False, sep=';', encoding='utf-8-sig')
-            
-            # Mostrar mensaje de éxito y preguntar si desea abrir el archivo
-            if messagebox.askyesno("Éxito", "Reporte generado con éxito. ¿Desea abrirlo ahora?"):
-                os.startfile(filename)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar a CSV: {str(e)}")
-    
 
 # Iniciar la aplicación
 if __name__ == "__main__":
+    # Necesario en Windows (y en ejecutables empaquetados) para los procesos de los PDF grandes
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = NexusCafeApp(root)
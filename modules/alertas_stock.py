@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Alertas de stock bajo: productos con ``bajo_stock = 1`` y los que entran o salen de la lista
+"""
+
+import threading
+import time
+
+from nexus_core import versiones
+
+
+class AlertasStock:
+    """Productos con stock bajo, leídos por el índice ``idx_bajo_stock``.
+
+    ``productos.bajo_stock`` es una columna generada (``stock <= stock_minimo``)
+    que MySQL mantiene en cada cambio de stock, venga del cobro, de un ajuste o
+    de una entrada de mercadería. Leer las alertas cuesta lo que mide la lista de
+    alertas, no el catálogo entero, y solo se relee cuando cambia la versión de
+    ``productos`` o pasaron ``max_edad`` segundos (cambios desde otras cajas).
+
+    Cada relectura compara con la anterior y acumula los productos que pasaron a
+    stock bajo y los que se repusieron; ``cambios()`` los entrega (una sola vez)
+    para avisar en la interfaz sin volver a consultar.
+
+    Las filas tienen la forma de ``Producto.obtener_todos``:
+    (id, nombre, categoria, precio, stock, stock_minimo).
+    """
+
+    CONSULTA = ("SELECT id, nombre, categoria, precio, stock, stock_minimo "
+                "FROM productos WHERE bajo_stock = 1 ORDER BY nombre")
+    # Bases en las que todavía no se aplicó la migración de la columna generada
+    CONSULTA_SIN_COLUMNA = ("SELECT id, nombre, categoria, precio, stock, stock_minimo "
+                            "FROM productos WHERE stock <= stock_minimo ORDER BY nombre")
+
+    def __init__(self, db_manager, max_edad=60.0):
+        self.db_manager = db_manager
+        self.max_edad = max_edad
+        self._lock = threading.Lock()
+        self._version = None
+        self._cargado = 0.0
+        self._productos = []
+        self._nuevos = {}
+        self._repuestos = {}
+
+    def vigente(self):
+        return (self._version is not None
+                and self._version == versiones.version("productos")
+                and time.monotonic() - self._cargado < self.max_edad)
+
+    def actualizar(self, forzar=False):
+        """Releer las alertas si cambiaron los productos (o si ``forzar``); devuelve la lista vigente"""
+        with self._lock:
+            if not forzar and self.vigente():
+                return list(self._productos)
+            version = versiones.version("productos")
+            filas = self.db_manager.ejecutar_query(self.CONSULTA)
+            if filas is None:
+                filas = self.db_manager.ejecutar_query(self.CONSULTA_SIN_COLUMNA)
+            if filas is None:
+                return list(self._productos)
+
+            productos = [tuple(fila) for fila in filas]
+            # En la primera carga no hay cambios que avisar: la lista completa ya sale en el resumen
+            if self._version is not None:
+                anteriores = {p[0]: p for p in self._productos}
+                actuales = {p[0]: p for p in productos}
+                for pid, producto in actuales.items():
+                    if pid not in anteriores:
+                        self._repuestos.pop(pid, None)
+                        self._nuevos[pid] = producto
+                for pid, producto in anteriores.items():
+                    if pid not in actuales:
+                        self._nuevos.pop(pid, None)
+                        self._repuestos[pid] = producto
+
+            self._productos = productos
+            self._version = version
+            self._cargado = time.monotonic()
+            return list(productos)
+
+    def cambios(self):
+        """(nuevos, repuestos) desde la última llamada: productos que entraron y salieron de stock bajo"""
+        self.actualizar()
+        with self._lock:
+            nuevos, repuestos = list(self._nuevos.values()), list(self._repuestos.values())
+            self._nuevos, self._repuestos = {}, {}
+        return nuevos, repuestos
+
+    def productos(self):
+        if not self.vigente():
+            return self.actualizar()
+        return list(self._productos)
+
+    def cantidad(self):
+        return len(self.productos())
+
+
+_alertas = {}
+_alertas_lock = threading.Lock()
+
+
+def obtener_alertas(db_manager):
+    """Alertas compartidas para una conexión: todas las ventanas usan la misma instancia"""
+    with _alertas_lock:
+        alertas = _alertas.get(id(db_manager))
+        if alertas is None or alertas.db_manager is not db_manager:
+            alertas = AlertasStock(db_manager)
+            _alertas[id(db_manager)] = alertas
+        return alertas
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Búsqueda incremental (mientras se escribe) con un índice de trigramas en memoria
+"""
+
+import bisect
+import threading
+import time
+import tkinter as tk
+
+from core.utils import normalizar_texto as normalizar
+from nexus_core import versiones
+
+# Espera tras la última tecla antes de buscar: no se busca por cada letra de una palabra tecleada rápido
+ESPERA_MS = 150
+# Sugerencias visibles bajo el campo de búsqueda
+MAX_SUGERENCIAS = 8
+# Con más coincidencias que esto la tabla se filtra con LIKE en lugar de ``id IN (...)``
+MAX_IDS_FILTRO = 500
+
+_VACIO = frozenset()
+
+
+def trigramas(palabra):
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+
+class IndiceBusqueda:
+    """Índice de subcadenas sobre (id, texto principal, texto secundario)
+
+    Las palabras de 3 letras o más se buscan intersectando los conjuntos de
+    posiciones de sus trigramas; las más cortas, por prefijo de palabra con
+    ``bisect`` sobre una lista ordenada. Las coincidencias se verifican y se
+    ordenan por relevancia: texto igual, empieza con la búsqueda, alguna
+    palabra empieza con ella, la contiene, y por último las que coinciden
+    por palabras sueltas o solo en el texto secundario (categoría, email...).
+    Dentro de cada grupo el orden es alfabético.
+    """
+
+    def __init__(self, filas):
+        # Texto original de cada id, para mostrar las sugerencias
+        self.etiquetas = {id_: (principal, secundario) for id_, principal, secundario in filas}
+        elementos = sorted(
+            ((normalizar(principal), normalizar(secundario), id_) for id_, principal, secundario in filas),
+            key=lambda e: (e[0], e[2]),
+        )
+        self._ids = [e[2] for e in elementos]
+        self._textos = [e[0] for e in elementos]
+        self._completos = [f"{e[0]} {e[1]}" if e[1] else e[0] for e in elementos]
+        self._trigramas = {}
+        palabras = []
+        for posicion, completo in enumerate(self._completos):
+            for palabra in set(completo.split()):
+                palabras.append((palabra, posicion))
+                for trigrama in trigramas(palabra):
+                    self._trigramas.setdefault(trigrama, set()).add(posicion)
+        palabras.sort()
+        self._palabras_clave = [p[0] for p in palabras]
+        self._palabras_pos = [p[1] for p in palabras]
+        # Última búsqueda: al seguir escribiendo solo se revisan sus coincidencias
+        self._ultima = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _con_prefijo(self, prefijo):
+        inicio = bisect.bisect_left(self._palabras_clave, prefijo)
+        fin = bisect.bisect_left(self._palabras_clave, prefijo + "\uffff", inicio)
+        return set(self._palabras_pos[inicio:fin])
+
+    def _candidatos(self, palabras):
+        largas = [p for p in palabras if len(p) >= 3]
+        if not largas:
+            return self._con_prefijo(max(palabras, key=len))
+        conjuntos = sorted((self._trigramas.get(t, _VACIO) for p in largas for t in trigramas(p)), key=len)
+        if not conjuntos[0]:
+            return _VACIO
+        return conjuntos[0].intersection(*conjuntos[1:]) if len(conjuntos) > 1 else conjuntos[0]
+
+    def coincidencias(self, texto):
+        """Posiciones de todos los elementos que contienen cada palabra de ``texto``"""
+        consulta = normalizar(texto)
+        if not consulta:
+            return consulta, _VACIO
+        palabras = consulta.split()
+        ultima = self._ultima
+        if ultima is not None and consulta.startswith(ultima[0]) and min(map(len, ultima[0].split())) >= 3:
+            # Agregar letras solo puede quitar coincidencias (las palabras cortas se buscan
+            # por prefijo, así que con ellas no vale)
+            candidatos = ultima[1]
+        else:
+            candidatos = self._candidatos(palabras)
+        if len(palabras) > 1 or len(consulta) > 3:
+            # Una sola palabra de hasta 3 letras ya coincide exactamente con su trigrama o prefijo
+            completos = self._completos
+            for palabra in palabras:
+                candidatos = [p for p in candidatos if palabra in completos[p]]
+            candidatos = frozenset(candidatos)
+        self._ultima = (consulta, candidatos)
+        return consulta, candidatos
+
+    def buscar(self, texto, limite=MAX_SUGERENCIAS):
+        """Devuelve (ids de las ``limite`` mejores coincidencias en orden, total de coincidencias)"""
+        consulta, posiciones = self.coincidencias(texto)
+        if not posiciones:
+            return [], 0
+        textos = self._textos
+        # Los textos que empiezan con la búsqueda forman un tramo contiguo (el igual va primero)
+        inicio = bisect.bisect_left(textos, consulta)
+        fin = bisect.bisect_left(textos, consulta + "\uffff", inicio)
+        mejores = list(range(inicio, min(fin, inicio + limite)))
+        if len(mejores) < limite:
+            # El resto se recorre en orden alfabético, un grupo de relevancia por pasada,
+            # hasta completar el límite
+            resto = sorted(p for p in posiciones if p < inicio or p >= fin)
+            inicio_palabra = " " + consulta
+            grupos = (
+                lambda t: inicio_palabra in t,
+                lambda t: consulta in t and inicio_palabra not in t,
+                lambda t: consulta not in t,
+            )
+            for en_grupo in grupos:
+                for p in resto:
+                    if en_grupo(textos[p]):
+                        mejores.append(p)
+                        if len(mejores) == limite:
+                            break
+                if len(mejores) == limite:
+                    break
+        return [self._ids[p] for p in mejores], len(posiciones)
+
+
+class BuscadorTabla:
+    """Índice de búsqueda de una tabla; se reconstruye cuando cambia la versión de sus datos
+
+    ``buscar`` nunca consulta la base: devuelve None si el índice todavía no se
+    cargó (quien llama usa entonces ``LIKE``). Un índice desactualizado se sigue
+    usando mientras ``cargar`` arma el nuevo en segundo plano.
+    """
+
+    CONSULTAS = {
+        "productos": [
+            "SELECT id, nombre, CONCAT_WS(' ', categoria, codigo_barras) FROM productos",
+            # Sin la migración del código de barras
+            "SELECT id, nombre, categoria FROM productos",
+        ],
+        "clientes": ["SELECT id, nombre, CONCAT_WS(' ', email, telefono) FROM clientes"],
+    }
+
+    def __init__(self, db_manager, tabla, max_edad=300.0):
+        self.db_manager = db_manager
+        self.tabla = tabla
+        self.max_edad = max_edad
+        self._indice = None
+        self._version = None
+        self._cargado = 0.0
+        self._lock = threading.Lock()
+
+    def vigente(self):
+        return (self._indice is not None
+                and self._version == versiones.version(self.tabla)
+                and time.monotonic() - self._cargado < self.max_edad)
+
+    def cargar(self):
+        """Leer la tabla y armar el índice; si ya se está cargando en otro hilo no hace nada"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            version = versiones.version(self.tabla)
+            filas = None
+            for consulta in self.CONSULTAS[self.tabla]:
+                filas = self.db_manager.ejecutar_query(consulta)
+                if filas is not None:
+                    break
+            if filas is None:
+                return False
+            indice = IndiceBusqueda(filas)
+            self._indice = indice
+            self._version = version
+            self._cargado = time.monotonic()
+            return True
+        finally:
+            self._lock.release()
+
+    def buscar(self, texto, limite=MAX_SUGERENCIAS):
+        indice = self._indice
+        if indice is None:
+            return None
+        return indice.buscar(texto, limite)
+
+    def ids_filtro(self, texto):
+        """Ids para filtrar una tabla con ``id IN (...)``, o None si hay que usar LIKE"""
+        # Un índice viejo puede no tener altas ni cambios recientes: mejor LIKE que omitirlos
+        if not self.vigente():
+            return None
+        resultado = self.buscar(texto, MAX_IDS_FILTRO)
+        if resultado is None or resultado[1] > MAX_IDS_FILTRO:
+            return None
+        return resultado[0]
+
+    def nombre(self, id_):
+        indice = self._indice
+        return indice.etiquetas.get(id_, ("", ""))[0] if indice else ""
+
+    def etiqueta(self, id_):
+        indice = self._indice
+        principal, secundario = indice.etiquetas.get(id_, ("", "")) if indice else ("", "")
+        return f"{principal} — {secundario}" if secundario else str(principal)
+
+
+_buscadores = {}
+_buscadores_lock = threading.Lock()
+
+
+def obtener_buscador(db_manager, tabla):
+    """Buscador compartido por tabla para una conexión"""
+    with _buscadores_lock:
+        clave = (id(db_manager), tabla)
+        buscador = _buscadores.get(clave)
+        if buscador is None or buscador.db_manager is not db_manager:
+            buscador = BuscadorTabla(db_manager, tabla)
+            _buscadores[clave] = buscador
+        return buscador
+
+
+class BusquedaIncremental:
+    """Conecta un ``Entry`` con un ``BuscadorTabla``: busca al dejar de escribir y sugiere resultados
+
+    ``al_buscar(texto, ids)`` recibe los ids de hasta ``MAX_IDS_FILTRO``
+    coincidencias ordenadas por relevancia (``ids`` es None si no hay índice
+    vigente o hay demasiadas coincidencias). ``al_elegir(id)`` se llama al elegir una
+    sugerencia con Enter o clic.
+    """
+
+    def __init__(self, entry, buscador, al_buscar, al_elegir, ejecutor=None, espera_ms=ESPERA_MS):
+        self.entry = entry
+        self.buscador = buscador
+        self.al_buscar = al_buscar
+        self.al_elegir = al_elegir
+        self.ejecutor = ejecutor
+        self.espera_ms = espera_ms
+        self._pendiente = None
+        self._ids = []
+        self._texto = None
+        self.ultima_latencia_ms = 0.0
+
+        self.popup = tk.Toplevel(entry)
+        self.popup.withdraw()
+        self.popup.overrideredirect(True)
+        self.lista = tk.Listbox(self.popup, font=("Arial", 10), height=MAX_SUGERENCIAS,
+                                activestyle="dotbox", exportselection=False)
+        self.lista.pack(fill="both", expand=True)
+
+        entry.bind("<KeyRelease>", self._al_escribir, add="+")
+        entry.bind("<Down>", self._bajar, add="+")
+        entry.bind("<Escape>", lambda e: self.ocultar(), add="+")
+        entry.bind("<FocusOut>", lambda e: entry.after(150, self.ocultar), add="+")
+        entry.bind("<Destroy>", self._al_destruir, add="+")
+        self.lista.bind("<ButtonRelease-1>", self._elegir)
+        self.lista.bind("<Return>", self._elegir)
+        self.lista.bind("<Escape>", lambda e: (self.ocultar(), self.entry.focus_set()))
+        self._actualizar_indice()
+
+    def _actualizar_indice(self):
+        if self.buscador.vigente():
+            return
+        if self.ejecutor:
+            self.ejecutor.enviar(self.buscador.cargar, grupo=f"busqueda_{self.buscador.tabla}")
+        else:
+            self.buscador.cargar()
+
+    def _al_escribir(self, event):
+        if event.keysym in ("Down", "Up", "Escape", "Return", "Tab"):
+            return
+        if self._pendiente is not None:
+            self.entry.after_cancel(self._pendiente)
+        self._pendiente = self.entry.after(self.espera_ms, self.buscar)
+
+    def buscar(self):
+        self._pendiente = None
+        texto = self.entry.get().strip()
+        if texto == self._texto:
+            return
+        self._texto = texto
+        self._actualizar_indice()
+        if not texto:
+            self.ocultar()
+            self.al_buscar(texto, None)
+            return
+
+        inicio = time.perf_counter()
+        # Mientras el índice se recarga en segundo plano, la tabla filtra con LIKE
+        resultado = self.buscador.buscar(texto, MAX_IDS_FILTRO) if self.buscador.vigente() else None
+        self.ultima_latencia_ms = (time.perf_counter() - inicio) * 1000
+        if resultado is None:
+            self.ocultar()
+            self.al_buscar(texto, None)
+            return
+
+        ids, total = resultado
+        self._ids = ids[:MAX_SUGERENCIAS]
+        self._mostrar()
+        self.al_buscar(texto, ids if total <= MAX_IDS_FILTRO else None)
+
+    def _mostrar(self):
+        self.lista.delete(0, tk.END)
+        if not self._ids:
+            self.ocultar()
+            return
+        for id_ in self._ids:
+            self.lista.insert(tk.END, self.buscador.etiqueta(id_))
+        self.lista.configure(height=len(self._ids))
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.popup.geometry(f"{max(self.entry.winfo_width(), 250)}x{len(self._ids) * 20 + 4}+{x}+{y}")
+        self.popup.deiconify()
+        self.popup.lift()
+
+    def ocultar(self):
+        if self.popup.winfo_exists():
+            self.popup.withdraw()
+
+    def _bajar(self, event):
+        if self._ids and self.popup.winfo_viewable():
+            self.lista.focus_set()
+            self.lista.selection_clear(0, tk.END)
+            self.lista.selection_set(0)
+            self.lista.activate(0)
+        return "break"
+
+    def _elegir(self, event=None):
+        seleccion = self.lista.curselection()
+        if not seleccion:
+            return
+        id_ = self._ids[seleccion[0]]
+        self.ocultar()
+        self.entry.focus_set()
+        self.al_elegir(id_)
+        # El texto que haya dejado al_elegir en el campo no dispara otra búsqueda
+        self._texto = self.entry.get().strip()
+
+    def _al_destruir(self, event):
+        if event.widget is not self.entry:
+            return
+        if self._pendiente is not None:
+            self.entry.after_cancel(self._pendiente)
+            self._pendiente = None
+        if self.popup.winfo_exists():
+            self.popup.destroy()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Importación diferida de bibliotecas pesadas (matplotlib, pandas, reportlab, PIL)
+"""
+
+import importlib
+import threading
+import time
+
+
+def importar(nombre):
+    """Importar un módulo; si otro hilo ya lo está importando, espera a que termine"""
+    return importlib.import_module(nombre)
+
+
+class ModuloDiferido:
+    """Ocupa el lugar de un módulo y lo importa en el primer acceso a un atributo.
+
+    ``pd = ModuloDiferido("pandas")`` se usa igual que ``import pandas as pd``,
+    pero pandas no se carga hasta la primera llamada a ``pd.DataFrame``; así la
+    ventana de login no espera por bibliotecas que solo usan los reportes.
+    """
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def cargar(self):
+        if self._modulo is None:
+            self._modulo = importar(self._nombre)
+        return self._modulo
+
+    @property
+    def cargado(self):
+        return self._modulo is not None
+
+    def __getattr__(self, atributo):
+        return getattr(self.cargar(), atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self.cargado else "pendiente"
+        return f"<ModuloDiferido {self._nombre} ({estado})>"
+
+
+class ObjetoDiferido:
+    """Ocupa el lugar de ``from modulo import nombre`` (clases o funciones)"""
+
+    def __init__(self, modulo, nombre):
+        self._modulo = ModuloDiferido(modulo) if isinstance(modulo, str) else modulo
+        self._nombre = nombre
+
+    def cargar(self):
+        return getattr(self._modulo.cargar(), self._nombre)
+
+    def __call__(self, *args, **kwargs):
+        return self.cargar()(*args, **kwargs)
+
+    def __getattr__(self, atributo):
+        return getattr(self.cargar(), atributo)
+
+
+def precargar(nombres, al_terminar=None):
+    """Importar en un hilo de fondo los módulos indicados (p. ej. después del login)
+
+    ``al_terminar(tiempos)`` recibe {modulo: segundos} y se llama desde ese hilo.
+    """
+    def trabajar():
+        tiempos = {}
+        for nombre in nombres:
+            inicio = time.perf_counter()
+            try:
+                importar(nombre)
+            except Exception as e:
+                # Una biblioteca opcional ausente no debe impedir usar el resto de la aplicación
+                print(f"No se pudo precargar {nombre}: {e}")
+                continue
+            tiempos[nombre] = time.perf_counter() - inicio
+        if al_terminar:
+            al_terminar(tiempos)
+
+    hilo = threading.Thread(target=trabajar, name="nexus-precarga", daemon=True)
+    hilo.start()
+    return hilo
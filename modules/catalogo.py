@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Catálogo de productos en memoria, compartido por toda la aplicación
+"""
+
+import threading
+import time
+
+from nexus_core import versiones
+
+
+class CatalogCache:
+    """Productos indexados por id, nombre, categoría y código de barras.
+
+    Se carga con una sola consulta y se vuelve a cargar, en el siguiente acceso,
+    cuando cambia la versión de la tabla ``productos`` (cualquier INSERT, UPDATE o
+    DELETE confirmado por la aplicación y cada venta registrada) o cuando pasaron
+    ``max_edad`` segundos, por los cambios hechos desde otras cajas.
+
+    Las filas tienen la forma de ``Producto.obtener_todos``:
+    (id, nombre, categoria, precio, stock, stock_minimo).
+
+    Con un ``respaldo`` (``DiarioVentas``) el stock descuenta las ventas cobradas
+    que MySQL todavía no registró, cada carga guarda (como mucho cada
+    ``ESPERA_RESPALDO`` segundos) una copia local del catálogo, y si MySQL no
+    responde se usa esa copia y se reintenta a los ``REINTENTO`` segundos.
+    """
+
+    CONSULTA = "SELECT id, nombre, categoria, precio, stock, stock_minimo, codigo_barras FROM productos ORDER BY nombre"
+    # Bases en las que todavía no se aplicó la migración del código de barras
+    CONSULTA_SIN_CODIGO = "SELECT id, nombre, categoria, precio, stock, stock_minimo, NULL FROM productos ORDER BY nombre"
+
+    ESPERA_RESPALDO = 300.0
+    REINTENTO = 30.0
+
+    def __init__(self, db_manager, max_edad=300.0):
+        self.db_manager = db_manager
+        self.max_edad = max_edad
+        self.respaldo = None
+        self._respaldado = None
+        self._lock = threading.Lock()
+        self._version = None
+        self._cargado = 0.0
+        self._productos = []
+        self._por_id = {}
+        self._por_nombre = {}
+        self._por_codigo = {}
+        self._por_categoria = {}
+
+    @property
+    def version(self):
+        """Versión de ``productos`` con la que se armaron los índices (None si no está cargado)"""
+        return self._version
+
+    def vigente(self):
+        return (self._version is not None
+                and self._version == versiones.version("productos")
+                and time.monotonic() - self._cargado < self.max_edad)
+
+    def invalidar(self):
+        self._version = None
+
+    def cargar(self):
+        """Leer todos los productos y rearmar los índices; devuelve False si la consulta falló"""
+        with self._lock:
+            # La versión se toma antes de consultar: un cambio durante la carga fuerza otra
+            version = versiones.version("productos")
+            filas = self.db_manager.ejecutar_query(self.CONSULTA)
+            if filas is None:
+                filas = self.db_manager.ejecutar_query(self.CONSULTA_SIN_CODIGO)
+            if filas is None:
+                return self._cargar_respaldo(version)
+            if self.respaldo is not None and (self._respaldado is None
+                                              or time.monotonic() - self._respaldado >= self.ESPERA_RESPALDO):
+                try:
+                    self.respaldo.guardar_productos(filas)
+                    self._respaldado = time.monotonic()
+                except Exception as e:
+                    print(f"Error guardando la copia local del catálogo: {e}")
+            self._indexar(filas, version)
+            return True
+
+    def _cargar_respaldo(self, version):
+        # Sin MySQL: se siguen usando los índices actuales, o la copia local si todavía no hay
+        if self.respaldo is None:
+            return False
+        if self._productos:
+            self._version = version
+        else:
+            filas = self.respaldo.productos()
+            if not filas:
+                return False
+            self._indexar(filas, version)
+        # Vigente por REINTENTO segundos: no consultar a MySQL en cada acceso mientras no responde
+        self._cargado = time.monotonic() - self.max_edad + self.REINTENTO
+        return True
+
+    def _indexar(self, filas, version):
+        # Ventas del diario local que MySQL todavía no descontó
+        descuentos = self.respaldo.descuentos_pendientes() if self.respaldo is not None else {}
+        productos, por_id, por_nombre, por_codigo, por_categoria = [], {}, {}, {}, {}
+        for fila in filas:
+            producto = tuple(fila[:6])
+            if descuentos.get(int(producto[0])):
+                producto = producto[:4] + (int(producto[4]) - descuentos[int(producto[0])],) + producto[5:]
+            productos.append(producto)
+            por_id[int(producto[0])] = producto
+            # Nombres repetidos: gana el primero en orden alfabético, como el combo del POS
+            por_nombre.setdefault(str(producto[1]), producto)
+            por_categoria.setdefault(producto[2] or "", []).append(producto)
+            if fila[6]:
+                por_codigo[str(fila[6]).strip()] = producto
+
+        # Se reemplazan las referencias de una vez: los lectores nunca ven índices a medio armar
+        self._productos = productos
+        self._por_id = por_id
+        self._por_nombre = por_nombre
+        self._por_codigo = por_codigo
+        self._por_categoria = por_categoria
+        self._version = version
+        self._cargado = time.monotonic()
+
+    def descontar(self, pedidos):
+        """Restar del stock en memoria una venta cobrada en caja ({producto_id: cantidad}), sin releer"""
+        with self._lock:
+            cambios = {}
+            for producto_id, cantidad in pedidos.items():
+                anterior = self._por_id.get(int(producto_id))
+                if anterior is not None:
+                    cambios[id(anterior)] = anterior[:4] + (int(anterior[4]) - int(cantidad),) + anterior[5:]
+            if not cambios:
+                return
+
+            def nuevo(producto):
+                return cambios.get(id(producto), producto)
+
+            self._productos = [nuevo(p) for p in self._productos]
+            self._por_id = {k: nuevo(p) for k, p in self._por_id.items()}
+            self._por_nombre = {k: nuevo(p) for k, p in self._por_nombre.items()}
+            self._por_codigo = {k: nuevo(p) for k, p in self._por_codigo.items()}
+            self._por_categoria = {k: [nuevo(p) for p in lista] for k, lista in self._por_categoria.items()}
+
+    def _asegurar(self):
+        if not self.vigente():
+            self.cargar()
+
+    def todos(self):
+        self._asegurar()
+        return list(self._productos)
+
+    def por_id(self, producto_id):
+        self._asegurar()
+        try:
+            return self._por_id.get(int(producto_id))
+        except (TypeError, ValueError):
+            return None
+
+    def por_nombre(self, nombre):
+        self._asegurar()
+        return self._por_nombre.get(str(nombre))
+
+    def por_codigo(self, codigo):
+        self._asegurar()
+        return self._por_codigo.get(str(codigo).strip())
+
+    def de_categoria(self, categoria):
+        self._asegurar()
+        return list(self._por_categoria.get(categoria or "", []))
+
+    def nombres(self):
+        self._asegurar()
+        return [p[1] for p in self._productos]
+
+    def categorias(self):
+        self._asegurar()
+        return sorted(c for c in self._por_categoria if c)
+
+
+_catalogos = {}
+_catalogos_lock = threading.Lock()
+
+
+def obtener_catalogo(db_manager):
+    """Catálogo compartido para una conexión: todas las ventanas usan la misma instancia"""
+    with _catalogos_lock:
+        catalogo = _catalogos.get(id(db_manager))
+        if catalogo is None or catalogo.db_manager is not db_manager:
+            catalogo = CatalogCache(db_manager)
+            _catalogos[id(db_manager)] = catalogo
+        return catalogo
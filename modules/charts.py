@@ -5,14 +5,39 @@ Módulo para generar gráficos para Nexus Café
 
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import pandas as pd
 import datetime
 
+from core.utils import reducir_puntos, etiqueta_periodo
+
+# Puntos como máximo por gráfico: los días consecutivos se suman hasta entrar
+MAX_PUNTOS = 60
+# Solo se rotulan los puntos de mayor valor
+MAX_ETIQUETAS = 15
+
 class ChartGenerator:
     def __init__(self):
         pass
     
-    def crear_grafico_ventas_bar(self, parent, ventas_data, title="Ventas"):
+    def _preparar_ventas(self, ventas_data, granularidad=None):
+        """Reducir la serie (fecha, ..., monto) a MAX_PUNTOS y devolver etiquetas y montos"""
+        serie = reducir_puntos([(venta[0], 0, float(venta[-1])) for venta in ventas_data], MAX_PUNTOS)
+        if granularidad:
+            fechas = [etiqueta_periodo(p[0], granularidad) for p in serie]
+        else:
+            fechas = [p[0].strftime("%d/%m") for p in serie]
+        return fechas, [p[2] for p in serie]
+    
+    def _a_rotular(self, montos):
+        return sorted(range(len(montos)), key=lambda i: montos[i], reverse=True)[:MAX_ETIQUETAS]
+    
+    def crear_grafico_ventas_periodo(self, parent, modelo_venta, desde, hasta, title="Ventas"):
+        """Gráfico de un período con los totales agrupados en la base de datos (hora, día, semana o mes)"""
+        granularidad, serie = modelo_venta.obtener_ventas_agrupadas(desde, hasta)
+        if len(serie) > MAX_PUNTOS:
+            return self.crear_grafico_ventas_line(parent, serie, title, granularidad)
+        return self.crear_grafico_ventas_bar(parent, serie, title, granularidad)
+    
+    def crear_grafico_ventas_bar(self, parent, ventas_data, title="Ventas", granularidad=None):
         """Crea un gráfico de barras para las ventas"""
         try:
             # Limpiar frame
@@ -23,9 +48,8 @@ class ChartGenerator:
             fig, ax = plt.subplots(figsize=(8, 4))
             fig.patch.set_facecolor('white')
             
-            # Preparar datos
-            fechas = [venta[0].strftime("%d/%m") for venta in ventas_data]
-            montos = [float(venta[1]) for venta in ventas_data]
+            # Preparar datos (como mucho MAX_PUNTOS puntos)
+            fechas, montos = self._preparar_ventas(ventas_data, granularidad)
             
             # Crear gráfico de barras
             bars = ax.bar(fechas, montos, color='#3498DB')
@@ -37,8 +61,9 @@ class ChartGenerator:
             # Rotar etiquetas del eje x
             plt.xticks(rotation=45)
             
-            # Añadir valores sobre las barras
-            for bar in bars:
+            # Añadir valores sobre las barras más altas
+            for i in self._a_rotular(montos):
+                bar = bars[i]
                 height = bar.get_height()
                 ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
                        f'S/{height:.1f}', ha='center', va='bottom', rotation=0)
@@ -57,7 +82,7 @@ class ChartGenerator:
             print(f"Error al crear gráfico de barras: {e}")
             return False
     
-    def crear_grafico_ventas_line(self, parent, ventas_data, title="Ventas"):
+    def crear_grafico_ventas_line(self, parent, ventas_data, title="Ventas", granularidad=None):
         """Crea un gráfico de líneas para las ventas"""
         try:
             # Limpiar frame
@@ -68,9 +93,8 @@ class ChartGenerator:
             fig, ax = plt.subplots(figsize=(8, 4))
             fig.patch.set_facecolor('white')
             
-            # Preparar datos
-            fechas = [venta[0].strftime("%d/%m") for venta in ventas_data]
-            montos = [float(venta[1]) for venta in ventas_data]
+            # Preparar datos (como mucho MAX_PUNTOS puntos)
+            fechas, montos = self._preparar_ventas(ventas_data, granularidad)
             
             # Crear gráfico de líneas
             ax.plot(fechas, montos, marker='o', color='#E74C3C', linewidth=2, markersize=8)
@@ -82,9 +106,9 @@ class ChartGenerator:
             # Rotar etiquetas del eje x
             plt.xticks(rotation=45)
             
-            # Añadir valores sobre los puntos
-            for i, (fecha, monto) in enumerate(zip(fechas, montos)):
-                ax.annotate(f'S/{monto:.1f}', (i, monto), textcoords="offset points", 
+            # Añadir valores sobre los puntos más altos
+            for i in self._a_rotular(montos):
+                ax.annotate(f'S/{montos[i]:.1f}', (i, montos[i]), textcoords="offset points", 
                            xytext=(0,10), ha='center')
             
             # Ajustar layout
@@ -7,10 +7,112 @@ import mysql.connector
 from mysql.connector import Error
 import hashlib
 
+from nexus_core import versiones
+from nexus_core.configuracion import sembrar_predeterminados
+from nexus_core.instrumentacion import Medicion
+from nexus_core.pool import obtener_pool, es_error_conexion
+
 class DatabaseManager:
+    # Migraciones versionadas: (version, descripcion, [sentencias]). Se aplican una sola vez,
+    # en orden, y quedan registradas en schema_migraciones. Nunca modificar una ya publicada:
+    # agregar una nueva versión al final.
+    MIGRACIONES = [
+        (1, "Índices cubrientes para consultas por rango de fechas", [
+            "ALTER TABLE ventas ADD INDEX idx_fecha_total (fecha, total)",
+            "ALTER TABLE detalles_venta ADD INDEX idx_venta_producto_cubriente (venta_id, producto_id, cantidad, subtotal)",
+        ]),
+        (2, "Resumen diario de ventas (ventas_diarias, ventas_diarias_productos)", [
+            '''
+            CREATE TABLE IF NOT EXISTS ventas_diarias (
+                dia DATE PRIMARY KEY,
+                num_ventas INT NOT NULL DEFAULT 0,
+                total DECIMAL(14,2) NOT NULL DEFAULT 0
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS ventas_diarias_productos (
+                dia DATE NOT NULL,
+                producto_id INT NOT NULL,
+                cantidad INT NOT NULL DEFAULT 0,
+                total DECIMAL(14,2) NOT NULL DEFAULT 0,
+                PRIMARY KEY (dia, producto_id),
+                INDEX idx_producto_dia (producto_id, dia)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            ''',
+            # Carga inicial con el histórico existente; luego se mantiene venta a venta
+            "DELETE FROM ventas_diarias",
+            "DELETE FROM ventas_diarias_productos",
+            '''
+            INSERT INTO ventas_diarias (dia, num_ventas, total)
+            SELECT DATE(fecha), COUNT(*), SUM(total) FROM ventas GROUP BY DATE(fecha)
+            ''',
+            '''
+            INSERT INTO ventas_diarias_productos (dia, producto_id, cantidad, total)
+            SELECT DATE(v.fecha), dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal)
+            FROM detalles_venta dv
+            JOIN ventas v ON dv.venta_id = v.id
+            GROUP BY DATE(v.fecha), dv.producto_id
+            ''',
+        ]),
+        (3, "Código de barras de productos (búsqueda del POS)", [
+            "ALTER TABLE productos ADD COLUMN codigo_barras VARCHAR(64) NULL",
+            "ALTER TABLE productos ADD UNIQUE INDEX idx_codigo_barras (codigo_barras)",
+        ]),
+        (4, "Índices FULLTEXT para búsquedas por palabras", [
+            "ALTER TABLE productos ADD FULLTEXT INDEX ft_productos_nombre (nombre, categoria)",
+            "ALTER TABLE clientes ADD FULLTEXT INDEX ft_clientes_nombre (nombre)",
+            "ALTER TABLE ventas ADD FULLTEXT INDEX ft_ventas_cliente (cliente)",
+        ]),
+        (5, "Entradas de inventario (importación masiva de stock)", [
+            '''
+            CREATE TABLE IF NOT EXISTS entradas_inventario (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                producto_id INT NOT NULL,
+                proveedor_id INT,
+                cantidad INT NOT NULL CHECK (cantidad > 0),
+                costo DECIMAL(10,2) NOT NULL DEFAULT 0 CHECK (costo >= 0),
+                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                usuario_id INT,
+                FOREIGN KEY (producto_id) REFERENCES productos(id) ON DELETE RESTRICT,
+                FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE SET NULL,
+                INDEX idx_producto (producto_id),
+                INDEX idx_fecha (fecha)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            ''',
+        ]),
+        (6, "Columna generada bajo_stock con índice (alertas de stock sin recorrer productos)", [
+            # MySQL la recalcula en cada cambio de stock o stock_minimo, venga de donde venga
+            "ALTER TABLE productos ADD COLUMN bajo_stock TINYINT(1) AS (IFNULL(stock <= stock_minimo, 0)) STORED",
+            "ALTER TABLE productos ADD INDEX idx_bajo_stock (bajo_stock, nombre)",
+        ]),
+        (7, "Clave de idempotencia de ventas (sincronización del diario local de caja)", [
+            "ALTER TABLE ventas ADD COLUMN clave_idempotencia CHAR(36) NULL",
+            "ALTER TABLE ventas ADD UNIQUE INDEX idx_clave_idempotencia (clave_idempotencia)",
+        ]),
+        (8, "Reservas de stock de las ventas en curso (varias cajas a la vez)", [
+            '''
+            CREATE TABLE IF NOT EXISTS reservas_stock (
+                clave CHAR(36) NOT NULL,
+                producto_id INT NOT NULL,
+                cantidad INT NOT NULL,
+                expira DATETIME NOT NULL,
+                PRIMARY KEY (clave, producto_id),
+                FOREIGN KEY (producto_id) REFERENCES productos(id) ON DELETE CASCADE,
+                INDEX idx_producto_expira (producto_id, expira),
+                INDEX idx_expira (expira)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            ''',
+        ]),
+    ]
+
+    # Errores de DDL que indican que el cambio ya estaba aplicado (índice o columna duplicados)
+    ERRORES_YA_APLICADO = (1060, 1061)
+
     def __init__(self, db_config):
         """Inicializa el gestor de base de datos con la configuración proporcionada"""
         self.db_config = db_config
+        # Pool compartido: las conexiones se crean bajo demanda, no al construir el gestor
+        self.pool = obtener_pool(db_config)
         
     def verificar_conexion(self):
         """Verificar conexión a MySQL"""
@@ -38,9 +140,10 @@ class DatabaseManager:
             )
             cursor = conn.cursor()
             
-            # Crear base de datos si no existe
-            cursor.execute("CREATE DATABASE IF NOT EXISTS nexus_coffee")
-            conn.database = 'nexus_coffee'
+            # Crear base de datos si no existe (la de la configuración; nexus_coffee por defecto)
+            base = self.db_config.get('database') or 'nexus_coffee'
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{base}`")
+            conn.database = base
             
             # Crear tablas
             self.crear_tablas(cursor)
@@ -48,6 +151,7 @@ class DatabaseManager:
             self.ajustar_schema_ventas(cursor)
             self.ajustar_schema_configuracion(cursor)
             self.ajustar_triggers(cursor)
+            self.aplicar_migraciones(cursor)
             
             # Insertar configuración por defecto si no existe
             self.insertar_configuracion_default(cursor)
@@ -61,95 +165,10 @@ class DatabaseManager:
             return False
             
     def insertar_configuracion_default(self, cursor):
-        """Insertar configuración por defecto"""
+        """Insertar configuración por defecto (las claves que falten, en una sola sentencia)"""
         cursor.execute("DESCRIBE configuracion")
         columnas = [c[0] for c in cursor.fetchall()]
-        tiene_descripcion = 'descripcion' in columnas
-        # Configuración de tema
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'tema_actual'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('tema_actual', 'claro', 'Tema actual de la aplicación'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('tema_actual', 'claro'))
-        
-        # Configuración de moneda (cambiado a Soles peruanos)
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'moneda'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('moneda', 'S/', 'Símbolo de moneda (Soles peruanos)'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('moneda', 'S/'))
-        
-        # Configuración de stock mínimo
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'stock_minimo_predeterminado'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('stock_minimo_predeterminado', '10', 'Stock mínimo predeterminado'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('stock_minimo_predeterminado', '10'))
-        
-        # Configuración de respaldo automático
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'respaldo_automatico'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('respaldo_automatico', 'diario', 'Frecuencia de respaldo automático'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('respaldo_automatico', 'diario'))
-        
-        # Configuración de información de la cafetería
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'cafeteria_nombre'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('cafeteria_nombre', 'Nexus Coffee', 'Nombre de la cafetería'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('cafeteria_nombre', 'Nexus Coffee'))
-        
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'cafeteria_direccion'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('cafeteria_direccion', 'Av. Principal 123, Lima, Perú', 'Dirección de la cafetería'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('cafeteria_direccion', 'Av. Principal 123, Lima, Perú'))
-        
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'cafeteria_telefono'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('cafeteria_telefono', '01-2345678', 'Teléfono de la cafetería'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('cafeteria_telefono', '01-2345678'))
-        
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'cafeteria_email'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('cafeteria_email', 'info@nexuscafe.com', 'Email de la cafetería'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('cafeteria_email', 'info@nexuscafe.com'))
-        
-        cursor.execute("SELECT * FROM configuracion WHERE clave = 'cafeteria_ruc'")
-        if not cursor.fetchone():
-            if tiene_descripcion:
-                cursor.execute("INSERT INTO configuracion (clave, valor, descripcion) VALUES (%s, %s, %s)", 
-                              ('cafeteria_ruc', '12345678901', 'RUC de la cafetería'))
-            else:
-                cursor.execute("INSERT INTO configuracion (clave, valor) VALUES (%s, %s)", 
-                              ('cafeteria_ruc', '12345678901'))
+        sembrar_predeterminados(cursor, con_descripcion='descripcion' in columnas)
         
     def crear_tablas(self, cursor):
         """Crear tablas en MySQL"""
@@ -255,40 +274,75 @@ class DatabaseManager:
     def ajustar_schema_ventas(self, cursor):
         try:
             cursor.execute("""
-                SELECT COLUMN_NAME 
+                SELECT COLUMN_NAME, IS_NULLABLE
                 FROM INFORMATION_SCHEMA.COLUMNS 
                 WHERE TABLE_SCHEMA = DATABASE() 
                 AND TABLE_NAME = 'ventas' 
-                AND COLUMN_NAME = 'cliente'
+                AND COLUMN_NAME IN ('cliente', 'cliente_id')
             """)
-            tiene_cliente = cursor.fetchone() is not None
-            cursor.execute("""
-                SELECT COLUMN_NAME 
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_SCHEMA = DATABASE() 
-                AND TABLE_NAME = 'ventas' 
-                AND COLUMN_NAME = 'cliente_id'
-            """)
-            tiene_cliente_id = cursor.fetchone() is not None
+            columnas = dict(cursor.fetchall())
+            tiene_cliente = 'cliente' in columnas
+            tiene_cliente_id = 'cliente_id' in columnas
             if tiene_cliente_id and not tiene_cliente:
+                # Esquema antiguo: solo cliente_id. Se agrega el nombre como copia para el historial
                 cursor.execute("ALTER TABLE ventas ADD COLUMN cliente VARCHAR(255) NULL")
                 cursor.execute("""
                     UPDATE ventas v 
                     LEFT JOIN clientes c ON v.cliente_id = c.id 
                     SET v.cliente = COALESCE(c.nombre, 'Cliente General')
                 """)
-                try:
-                    cursor.execute("ALTER TABLE ventas DROP FOREIGN KEY ventas_ibfk_1")
-                except Error:
-                    pass
-                cursor.execute("ALTER TABLE ventas DROP COLUMN cliente_id")
                 cursor.execute("ALTER TABLE ventas ADD INDEX idx_cliente (cliente)")
-            elif tiene_cliente and tiene_cliente_id:
-                try:
-                    cursor.execute("ALTER TABLE ventas DROP FOREIGN KEY ventas_ibfk_1")
-                except Error:
-                    pass
-                cursor.execute("ALTER TABLE ventas DROP COLUMN cliente_id")
+            if tiene_cliente_id:
+                # Esquema antiguo (N_COFFEE.sql): la clave foránea impide borrar clientes con ventas.
+                # Se reemplaza por fk_ventas_cliente, que deja la venta con cliente_id NULL
+                cursor.execute("""
+                    SELECT rc.CONSTRAINT_NAME, rc.DELETE_RULE
+                    FROM INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS rc
+                    JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE k
+                      ON k.CONSTRAINT_SCHEMA = rc.CONSTRAINT_SCHEMA
+                     AND k.CONSTRAINT_NAME = rc.CONSTRAINT_NAME
+                     AND k.TABLE_NAME = rc.TABLE_NAME
+                    WHERE rc.CONSTRAINT_SCHEMA = DATABASE()
+                      AND rc.TABLE_NAME = 'ventas'
+                      AND k.COLUMN_NAME = 'cliente_id'
+                """)
+                claves_foraneas = cursor.fetchall()
+                a_reemplazar = [nombre for nombre, regla in claves_foraneas if regla != 'SET NULL']
+                for nombre in a_reemplazar:
+                    cursor.execute(f"ALTER TABLE ventas DROP FOREIGN KEY `{nombre}`")
+                if columnas['cliente_id'] == 'NO':
+                    # Las ventas a "Cliente General" no tienen cliente registrado
+                    cursor.execute("ALTER TABLE ventas MODIFY cliente_id INT NULL")
+                if a_reemplazar or not claves_foraneas:
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+                        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ventas'
+                          AND COLUMN_NAME = 'cliente_id' AND SEQ_IN_INDEX = 1
+                    """)
+                    if not cursor.fetchone()[0]:
+                        cursor.execute("ALTER TABLE ventas ADD INDEX idx_cliente_id (cliente_id)")
+                    cursor.execute("""
+                        ALTER TABLE ventas
+                        ADD CONSTRAINT fk_ventas_cliente FOREIGN KEY (cliente_id)
+                            REFERENCES clientes(id) ON DELETE SET NULL
+                    """)
+            if not tiene_cliente_id:
+                # cliente_id es la referencia exacta al cliente; "cliente" queda como nombre mostrado
+                cursor.execute("""
+                    ALTER TABLE ventas
+                    ADD COLUMN cliente_id INT NULL,
+                    ADD INDEX idx_cliente_id (cliente_id),
+                    ADD CONSTRAINT fk_ventas_cliente FOREIGN KEY (cliente_id)
+                        REFERENCES clientes(id) ON DELETE SET NULL
+                """)
+                # Completar las ventas existentes con el cliente del mismo nombre (el más antiguo si se repite)
+                cursor.execute("""
+                    UPDATE ventas v
+                    JOIN (SELECT nombre, MIN(id) AS id FROM clientes GROUP BY nombre) c
+                      ON c.nombre = v.cliente
+                    SET v.cliente_id = c.id
+                    WHERE v.cliente_id IS NULL
+                """)
         except Error as e:
             print(f"Error ajustando schema de ventas: {e}")
 
@@ -319,6 +373,42 @@ class DatabaseManager:
             )
         except Error as e:
             print(f"Error ajustando triggers: {e}")
+
+    def aplicar_migraciones(self, cursor):
+        """Aplicar en orden las migraciones versionadas que aún no figuran en schema_migraciones"""
+        try:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migraciones (
+                    version INT PRIMARY KEY,
+                    descripcion VARCHAR(255) NOT NULL,
+                    aplicada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            ''')
+            cursor.execute("SELECT version FROM schema_migraciones")
+            aplicadas = {fila[0] for fila in cursor.fetchall()}
+        except Error as e:
+            print(f"Error preparando migraciones: {e}")
+            return
+
+        for version, descripcion, sentencias in self.MIGRACIONES:
+            if version in aplicadas:
+                continue
+            try:
+                for sentencia in sentencias:
+                    try:
+                        cursor.execute(sentencia)
+                    except Error as e:
+                        # Bases creadas a mano pueden tener ya el índice o la columna
+                        if getattr(e, 'errno', None) not in self.ERRORES_YA_APLICADO:
+                            raise
+                cursor.execute(
+                    "INSERT INTO schema_migraciones (version, descripcion) VALUES (%s, %s)",
+                    (version, descripcion)
+                )
+            except Error as e:
+                # Las siguientes pueden depender de esta: detenerse y reintentar en el próximo inicio
+                print(f"Error aplicando migración {version} ({descripcion}): {e}")
+                break
         
     def crear_admin_default(self):
         """Crear usuario admin por defecto en MySQL"""
@@ -342,33 +432,98 @@ class DatabaseManager:
             return False
             
     def ejecutar_query(self, query, params=None):
-        """Ejecutar una consulta en la base de datos MySQL"""
-        conn = None
+        """Ejecutar una consulta en la base de datos MySQL usando el pool de conexiones"""
+        es_escritura = query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+        for intento in range(2):
+            conn = None
+            cursor = None
+            descartar = False
+            confirmando = False
+            # Latencia, filas, espera del pool y origen quedan en la instrumentación (panel Rendimiento)
+            medicion = Medicion(query)
+            try:
+                conn = self.pool.obtener()
+                medicion.conexion_lista()
+                cursor = conn.cursor()
+
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+                if es_escritura:
+                    confirmando = True
+                    conn.commit()
+                    medicion.terminar(cursor.rowcount)
+                    versiones.registrar_escritura(query)
+                    result = cursor.lastrowid if query.strip().upper().startswith("INSERT") else cursor.rowcount
+                else:
+                    result = cursor.fetchall()
+                    medicion.terminar(len(result))
+
+                return result
+
+            except Error as e:
+                medicion.terminar(error=e)
+                if conn is not None and es_error_conexion(e):
+                    # Conexión caída: se descarta y se reintenta una vez si el COMMIT no llegó a enviarse
+                    descartar = True
+                    if intento == 0 and not confirmando:
+                        continue
+                elif conn:
+                    conn.rollback()
+                print(f"Error ejecutando query: {e}")
+                return None
+            finally:
+                if cursor:
+                    try:
+                        cursor.close()
+                    except Error:
+                        descartar = True
+                self.pool.liberar(conn, descartar=descartar)
+
+    def iterar_query(self, query, params=None, tamano_lote=1000):
+        """Recorrer el resultado de una consulta por lotes (``fetchmany``) sin cargarlo entero en memoria
+
+        Usa un cursor sin búfer: MySQL envía las filas a medida que se leen. La
+        conexión queda ocupada hasta terminar de recorrer (o cerrar) el generador;
+        si se abandona a medias se descarta en lugar de devolverla al pool.
+        """
+        medicion = Medicion(query)
+        conn = self.pool.obtener()
+        medicion.conexion_lista()
         cursor = None
+        completo = False
+        filas = 0
+        error = None
         try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            
+            cursor = conn.cursor(buffered=False)
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-                
-            if query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
-                conn.commit()
-                result = cursor.lastrowid if query.strip().upper().startswith("INSERT") else cursor.rowcount
-            else:
-                result = cursor.fetchall()
-                
-            return result
-            
+            while True:
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    break
+                filas += len(lote)
+                # El tiempo que el consumidor dedica a cada lote no cuenta como tiempo de la consulta
+                medicion.pausar()
+                for fila in lote:
+                    yield fila
+                medicion.reanudar()
+            completo = True
         except Error as e:
-            print(f"Error ejecutando query: {e}")
-            if conn:
-                conn.rollback()
-            return None
+            error = e
+            print(f"Error recorriendo query: {e}")
+            raise
         finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+            medicion.terminar(filas, error=error, pausada=not completo and error is None)
+            if cursor and completo:
+                try:
+                    cursor.close()
+                except Error:
+                    completo = False
+            # Con filas sin leer la conexión no puede reutilizarse
+            self.pool.liberar(conn, descartar=not completo)
+
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Exportación de reportes a CSV y Excel fila por fila, sin materializar los datos
+"""
+
+import csv
+import datetime
+import os
+
+from modules.carga_diferida import ModuloDiferido
+
+openpyxl = ModuloDiferido("openpyxl")
+
+
+class Columna:
+    """Columna de un reporte: título, posición en la fila de origen y tipo de dato"""
+
+    TIPOS = ("texto", "entero", "decimal", "fecha")
+
+    def __init__(self, titulo, indice, tipo="texto", defecto=None):
+        if tipo not in self.TIPOS:
+            raise ValueError(f"Tipo de columna desconocido: {tipo}")
+        self.titulo = titulo
+        self.indice = indice
+        self.tipo = tipo
+        if defecto is None:
+            defecto = {"entero": 0, "decimal": 0.0}.get(tipo, "")
+        self.defecto = defecto
+
+    def valor(self, fila):
+        try:
+            valor = fila[self.indice]
+        except (IndexError, KeyError, TypeError):
+            return self.defecto
+        if valor is None:
+            return self.defecto
+        try:
+            if self.tipo == "entero":
+                if isinstance(valor, str):
+                    valor = valor.replace(',', '.')
+                return int(float(valor))
+            if self.tipo == "decimal":
+                if isinstance(valor, str):
+                    valor = valor.strip().replace('S/', '').replace('$', '').replace(' ', '').replace(',', '.')
+                return float(valor)
+        except (TypeError, ValueError):
+            return self.defecto
+        return valor
+
+
+class FormatoExportacion:
+    """Columnas y nombre de hoja de un tipo de reporte, declarados una sola vez"""
+
+    def __init__(self, hoja, columnas):
+        self.hoja = hoja
+        self.columnas = list(columnas)
+        self.titulos = [c.titulo for c in self.columnas]
+
+    def normalizar(self, fila):
+        return [c.valor(fila) for c in self.columnas]
+
+
+FORMATOS = {
+    # Venta.iterar_ventas_por_periodo: (id, cliente, total, fecha)
+    "ventas": FormatoExportacion("Ventas", [
+        Columna("ID", 0),
+        Columna("Fecha", 3, "fecha"),
+        Columna("Cliente", 1),
+        Columna("Total", 2, "decimal"),
+        Columna("Estado", 4, defecto="Completada"),
+    ]),
+    # Venta.obtener_productos_mas_vendidos: (nombre, cantidad, total)
+    "productos": FormatoExportacion("Productos", [
+        Columna("Producto", 0),
+        Columna("Cantidad Vendida", 1, "entero"),
+        Columna("Total Ventas", 2, "decimal"),
+    ]),
+    # Producto.iterar_todos: (id, nombre, categoria, precio, stock, stock_minimo)
+    "inventario": FormatoExportacion("Inventario", [
+        Columna("ID", 0),
+        Columna("Producto", 1),
+        Columna("Categoría", 2),
+        Columna("Precio", 3, "decimal"),
+        Columna("Stock", 4, "entero"),
+        Columna("Stock Mínimo", 5, "entero"),
+    ]),
+    # Cliente.obtener_clientes_frecuentes: (id, nombre, email, telefono, compras, total_gastado)
+    "clientes": FormatoExportacion("Clientes", [
+        Columna("ID", 0),
+        Columna("Cliente", 1),
+        Columna("Compras", 4, "entero"),
+        Columna("Total Gastado", 5, "decimal"),
+    ]),
+    # Listados de las vistas de ventas, inventario y clientes
+    "listado_ventas": FormatoExportacion("Ventas", [
+        Columna("ID", 0),
+        Columna("Cliente", 1),
+        Columna("Total", 2, "decimal"),
+        Columna("Fecha", 3, "fecha"),
+    ]),
+    "listado_productos": FormatoExportacion("Productos", [
+        Columna("ID", 0),
+        Columna("Nombre", 1),
+        Columna("Categoría", 2),
+        Columna("Precio", 3, "decimal"),
+        Columna("Stock", 4, "entero"),
+        Columna("Stock Mínimo", 5, "entero"),
+    ]),
+    "listado_clientes": FormatoExportacion("Clientes", [
+        Columna("ID", 0),
+        Columna("Nombre", 1),
+        Columna("Email", 2),
+        Columna("Teléfono", 3),
+    ]),
+}
+
+
+def _texto_csv(valor):
+    if isinstance(valor, datetime.datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    return valor
+
+
+def _con_avance(filas, al_avanzar, cada):
+    # Informar el avance cada ``cada`` filas; al_avanzar puede lanzar una excepción para cortar
+    cantidad = 0
+    try:
+        for fila in filas:
+            yield fila
+            cantidad += 1
+            if al_avanzar and cantidad % cada == 0:
+                al_avanzar(cantidad)
+        if al_avanzar:
+            al_avanzar(cantidad)
+    finally:
+        # Liberar enseguida la conexión de un recorrido que quedó a medias
+        cerrar = getattr(filas, 'close', None)
+        if cerrar:
+            cerrar()
+
+
+def escribir_csv(filas, archivo, formato, separador=';', codificacion='utf-8-sig'):
+    """Escribir las filas a medida que llegan; devuelve la cantidad escrita"""
+    cantidad = 0
+    with open(archivo, 'w', newline='', encoding=codificacion) as f:
+        escritor = csv.writer(f, delimiter=separador)
+        escritor.writerow(formato.titulos)
+        for fila in filas:
+            escritor.writerow([_texto_csv(v) for v in formato.normalizar(fila)])
+            cantidad += 1
+    return cantidad
+
+
+def escribir_excel(filas, archivo, formato):
+    """Escribir un .xlsx con el modo de solo escritura de openpyxl (memoria constante)"""
+    libro = openpyxl.Workbook(write_only=True)
+    hoja = libro.create_sheet(formato.hoja)
+    hoja.append(formato.titulos)
+    cantidad = 0
+    for fila in filas:
+        hoja.append(formato.normalizar(fila))
+        cantidad += 1
+    libro.save(archivo)
+    return cantidad
+
+
+def exportar(filas, archivo, formato, al_avanzar=None, cada=500):
+    """Exportar según la extensión del archivo (.xlsx o CSV); devuelve la cantidad de filas
+
+    ``al_avanzar(filas_escritas)`` se llama cada ``cada`` filas. Si no hubo filas,
+    o la exportación se interrumpe, se elimina el archivo para no dejar reportes
+    vacíos o incompletos.
+    """
+    if isinstance(formato, str):
+        formato = FORMATOS[formato]
+    filas = _con_avance(filas, al_avanzar, cada)
+    completo = False
+    try:
+        if os.path.splitext(archivo)[1].lower() in ('.xlsx', '.xlsm'):
+            cantidad = escribir_excel(filas, archivo, formato)
+        else:
+            cantidad = escribir_csv(filas, archivo, formato)
+        completo = cantidad > 0
+    finally:
+        filas.close()
+        if not completo:
+            try:
+                os.remove(archivo)
+            except OSError:
+                pass
+    return cantidad
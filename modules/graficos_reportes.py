@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Gráficos de la vista previa de reportes: figuras persistentes que se actualizan en el lugar
+"""
+
+import tkinter as tk
+from decimal import Decimal
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+from core.utils import reducir_puntos, etiqueta_periodo
+
+# Se rotulan como máximo tantas barras (las de mayor valor); con más el texto se encima
+MAX_ETIQUETAS = 15
+# Con más puntos que esto las ventas se dibujan como línea en lugar de barras
+MAX_BARRAS = 60
+# Puntos como máximo de la serie de ventas: los intervalos consecutivos se suman hasta entrar
+MAX_PUNTOS = 120
+
+
+def _numero(valor, entero=False):
+    try:
+        if isinstance(valor, str):
+            valor = valor.replace(',', '.')
+        numero = float(valor) if isinstance(valor, (int, float, Decimal, str)) else 0.0
+    except ValueError:
+        numero = 0.0
+    return int(numero) if entero else numero
+
+
+def _serie_ventas(datos):
+    # (granularidad, [(inicio del intervalo, num_ventas, total)]) de Venta.obtener_ventas_agrupadas
+    granularidad, serie = datos
+    serie = reducir_puntos(serie, MAX_PUNTOS)
+    if not any(p[2] for p in serie):
+        return None
+    return [([etiqueta_periodo(p[0], granularidad) for p in serie], [float(p[2]) for p in serie], None)]
+
+
+def _serie_productos(datos):
+    # (nombre, cantidad, total)
+    productos, cantidades = [], []
+    for producto in datos:
+        try:
+            productos.append(str(producto[0] if len(producto) > 0 else "Sin nombre"))
+            cantidades.append(_numero(producto[1] if len(producto) > 1 else 0, entero=True))
+        except (IndexError, AttributeError, TypeError):
+            productos.append("Producto desconocido")
+            cantidades.append(0)
+    if not any(cantidades):
+        return None
+    return [(productos, cantidades, None)]
+
+
+def _serie_inventario(datos):
+    # (id, nombre, categoria, precio, stock, stock_minimo): los 15 productos con menos stock
+    filas = []
+    for producto in datos:
+        try:
+            nombre = str(producto[1] if len(producto) > 1 else "Sin nombre")
+            stock = _numero(producto[4] if len(producto) > 4 else 0, entero=True)
+            minimo = _numero(producto[5] if len(producto) > 5 else 0, entero=True)
+            if stock <= max(minimo, 0):
+                color = '#E74C3C'  # Rojo: por debajo o igual al mínimo
+            elif stock <= max(minimo * 2, minimo + 5):
+                color = '#F39C12'  # Naranja: cercano al mínimo
+            else:
+                color = '#2ECC71'  # Verde: saludable
+            filas.append((nombre, stock, color))
+        except (IndexError, AttributeError, TypeError):
+            filas.append(("Producto desconocido", 0, '#E74C3C'))
+    if not filas:
+        return None
+    if len(filas) > 15:
+        filas = sorted(filas, key=lambda f: f[1])[:15]
+    return [([f[0] for f in filas], [f[1] for f in filas], [f[2] for f in filas])]
+
+
+def _serie_clientes(datos):
+    # (id, nombre, email, telefono, compras, total_gastado): los 10 que más gastaron
+    filas = []
+    for cliente in datos:
+        try:
+            filas.append((
+                str(cliente[1] if len(cliente) > 1 else "Sin nombre"),
+                _numero(cliente[4] if len(cliente) > 4 else 0, entero=True),
+                _numero(cliente[5] if len(cliente) > 5 else 0),
+            ))
+        except (IndexError, AttributeError, TypeError):
+            filas.append(("Cliente desconocido", 0, 0.0))
+    if not filas:
+        return None
+    if len(filas) > 10:
+        filas = sorted(filas, key=lambda f: f[2], reverse=True)[:10]
+    nombres = [f[0] for f in filas]
+    return [(nombres, [f[1] for f in filas], None), (nombres, [f[2] for f in filas], None)]
+
+
+class PanelBarras:
+    """Un eje con barras (o una línea) cuyos artistas se reutilizan entre actualizaciones"""
+
+    def __init__(self, ax, titulo, eje_x, eje_y, color, formato="{:.0f}", horizontal=False):
+        self.ax = ax
+        self.color = color
+        self.formato = formato
+        self.horizontal = horizontal
+        self.barras = None
+        self.linea = None
+        self.etiquetas = []
+        ax.set_title(titulo)
+        ax.set_xlabel(eje_x)
+        ax.set_ylabel(eje_y)
+
+    def actualizar(self, categorias, valores, colores=None):
+        n = len(valores)
+        como_linea = not self.horizontal and n > MAX_BARRAS
+        posiciones = range(n)
+
+        if como_linea:
+            if self.barras is not None:
+                self.barras.remove()
+                self.barras = None
+            if self.linea is None:
+                self.linea, = self.ax.plot([], [], color=self.color, linewidth=1.5)
+            self.linea.set_data(list(posiciones), valores)
+            self.linea.set_visible(True)
+        else:
+            if self.linea is not None:
+                self.linea.set_visible(False)
+            if self.barras is None or len(self.barras) != n:
+                # Cambió la cantidad de barras: se reemplazan solo las barras, no la figura
+                if self.barras is not None:
+                    self.barras.remove()
+                dibujar = self.ax.barh if self.horizontal else self.ax.bar
+                self.barras = dibujar(posiciones, valores, color=colores or self.color)
+            else:
+                for i, barra in enumerate(self.barras):
+                    if self.horizontal:
+                        barra.set_width(valores[i])
+                    else:
+                        barra.set_height(valores[i])
+                    barra.set_color(colores[i] if colores else self.color)
+
+        if self.horizontal:
+            self.ax.set_yticks(list(posiciones))
+            self.ax.set_yticklabels(categorias)
+        else:
+            paso = max(1, n // 10)
+            self.ax.set_xticks(list(range(0, n, paso)))
+            self.ax.set_xticklabels([categorias[i] for i in range(0, n, paso)], rotation=45)
+
+        self._rotular(valores)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+    def _rotular(self, valores):
+        # Solo las barras más altas llevan su valor; los textos se crean una vez y se reubican
+        mayores = sorted(range(len(valores)), key=lambda i: valores[i], reverse=True)[:MAX_ETIQUETAS]
+        while len(self.etiquetas) < len(mayores):
+            if self.horizontal:
+                texto = self.ax.text(0, 0, "", ha='left', va='center')
+            else:
+                texto = self.ax.text(0, 0, "", ha='center', va='bottom')
+            self.etiquetas.append(texto)
+        for texto, i in zip(self.etiquetas, mayores):
+            texto.set_position((valores[i], i) if self.horizontal else (i, valores[i]))
+            texto.set_text(self.formato.format(valores[i]))
+            texto.set_visible(True)
+        for texto in self.etiquetas[len(mayores):]:
+            texto.set_visible(False)
+
+
+class GraficoReporte:
+    """Figura de un tipo de reporte; se crea una sola vez y se reutiliza en cada vista previa"""
+
+    def __init__(self, tamano, paneles, mensaje_vacio):
+        self.figura = Figure(figsize=tamano, dpi=100)
+        self.paneles = [
+            PanelBarras(self.figura.add_subplot(len(paneles), 1, i + 1), **panel)
+            for i, panel in enumerate(paneles)
+        ]
+        self.vacio = self.figura.text(0.5, 0.5, mensaje_vacio, ha='center', va='center',
+                                      fontsize=14, color='#7F8C8D', visible=False)
+        self.marco = None
+        self.canvas = None
+        self.clave = None
+        self.serie = None
+
+    def montar(self, contenedor):
+        """Ubicar el canvas en ``contenedor``; devuelve True si hubo que crearlo"""
+        nuevo = False
+        if self.marco is None or not self.marco.winfo_exists() or self.marco.master is not contenedor:
+            self.marco = tk.Frame(contenedor, bg="white")
+            self.canvas = FigureCanvasTkAgg(self.figura, master=self.marco)
+            self.canvas.get_tk_widget().pack(fill="both", expand=True)
+            barra = NavigationToolbar2Tk(self.canvas, self.marco)
+            barra.update()
+            nuevo = True
+        # En el contenedor se ve solo el gráfico del reporte actual
+        for hijo in contenedor.winfo_children():
+            if hijo is not self.marco:
+                hijo.pack_forget()
+        self.marco.pack(fill="both", expand=True)
+        return nuevo
+
+    def actualizar(self, serie):
+        hay_datos = serie is not None
+        self.vacio.set_visible(not hay_datos)
+        for i, panel in enumerate(self.paneles):
+            panel.ax.set_visible(hay_datos)
+            if hay_datos:
+                panel.actualizar(*serie[i])
+        self.figura.tight_layout()
+
+
+class GraficosReportes:
+    """Gráficos de la vista previa, con caché por (reporte, rango de fechas, versión de datos)
+
+    Cada tipo de reporte conserva su ``Figure`` y su canvas; una vista previa nueva
+    solo cambia los datos de los artistas existentes. Si la clave y los valores son
+    los mismos que los del último dibujo, no se vuelve a dibujar nada.
+    """
+
+    TIPOS = {
+        "ventas": (_serie_ventas, (8, 4), "No hay datos de ventas para mostrar", [
+            dict(titulo='Ventas por Período', eje_x='Fecha', eje_y='Total (S/)',
+                 color='#3498DB', formato="S/{:.2f}"),
+        ]),
+        "productos": (_serie_productos, (8, 4), "No hay datos de productos para mostrar", [
+            dict(titulo='Productos Más Vendidos', eje_x='Cantidad Vendida', eje_y='Producto',
+                 color='#2ECC71', horizontal=True),
+        ]),
+        "inventario": (_serie_inventario, (8, 4), "No hay productos para mostrar", [
+            dict(titulo='Nivel de Stock por Producto', eje_x='Cantidad en Stock', eje_y='Producto',
+                 color='#2ECC71', horizontal=True),
+        ]),
+        "clientes": (_serie_clientes, (8, 6), "No hay datos de clientes para mostrar", [
+            dict(titulo='Número de Compras por Cliente', eje_x='', eje_y='Compras', color='#3498DB'),
+            dict(titulo='Total Gastado por Cliente', eje_x='', eje_y='Total (S/)',
+                 color='#2ECC71', formato="S/{:.2f}"),
+        ]),
+    }
+
+    def __init__(self):
+        self._graficos = {}
+        self.dibujados = 0
+        self.reutilizados = 0
+
+    def _grafico(self, tipo):
+        if tipo not in self._graficos:
+            _, tamano, mensaje, paneles = self.TIPOS[tipo]
+            self._graficos[tipo] = GraficoReporte(tamano, paneles, mensaje)
+        return self._graficos[tipo]
+
+    def mostrar(self, tipo, contenedor, datos, clave=None):
+        """Mostrar el gráfico de ``tipo`` con ``datos`` dentro de ``contenedor``; devuelve el canvas"""
+        grafico = self._grafico(tipo)
+        nuevo = grafico.montar(contenedor)
+        serie = self.TIPOS[tipo][0](datos)
+        if clave is not None and clave == grafico.clave and serie == grafico.serie:
+            self.reutilizados += 1
+            if nuevo:
+                grafico.canvas.draw()
+            return grafico.canvas
+        grafico.actualizar(serie)
+        grafico.clave = clave
+        grafico.serie = serie
+        self.dibujados += 1
+        if nuevo:
+            grafico.canvas.draw()
+        else:
+            grafico.canvas.draw_idle()
+        return grafico.canvas
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Importación masiva de productos y ajustes de stock desde CSV o Excel
+"""
+
+import csv
+import os
+
+from core.utils import normalizar_texto
+from modules.carga_diferida import ModuloDiferido
+
+openpyxl = ModuloDiferido("openpyxl")
+
+MODOS = {
+    "entrada": "Entrada de mercadería (suma al stock)",
+    "conteo": "Conteo físico (reemplaza el stock)",
+}
+
+# Encabezados aceptados (normalizados, sin tildes ni mayúsculas) y el campo al que corresponden
+ENCABEZADOS = {
+    "codigo": "codigo", "codigo barras": "codigo", "codigo de barras": "codigo", "sku": "codigo", "ean": "codigo",
+    "nombre": "nombre", "producto": "nombre",
+    "categoria": "categoria",
+    "precio": "precio", "precio venta": "precio",
+    "cantidad": "cantidad", "stock": "cantidad", "unidades": "cantidad",
+    "stock minimo": "stock_minimo", "minimo": "stock_minimo",
+    "costo": "costo", "costo unitario": "costo",
+    "descripcion": "descripcion",
+}
+
+# Filas de la vista previa que se muestran en la tabla (el resto se importa igual)
+MAX_FILAS_VISTA = 1000
+
+
+class FilaImportacion:
+    """Una fila del archivo ya interpretada; ``errores`` vacío si se puede importar"""
+
+    def __init__(self, linea):
+        self.linea = linea
+        self.codigo = None
+        self.nombre = None
+        self.categoria = None
+        self.precio = None
+        self.cantidad = None
+        self.stock_minimo = None
+        self.costo = None
+        self.descripcion = None
+        self.errores = []
+        # Se completan al comparar con el catálogo
+        self.accion = "error"
+        self.stock_antes = None
+        self.stock_despues = None
+
+    def tupla(self):
+        """Fila en el formato de ``ProductoService.importar_masivo``"""
+        return (self.codigo, self.nombre, self.categoria, self.precio, self.cantidad,
+                self.stock_minimo, self.costo, self.descripcion)
+
+
+class VistaPrevia:
+    def __init__(self, archivo, modo, filas):
+        self.archivo = archivo
+        self.modo = modo
+        self.filas = filas
+        self.nuevas = sum(1 for f in filas if f.accion == "nuevo")
+        self.actualizadas = sum(1 for f in filas if f.accion == "actualizar")
+        self.errores = sum(1 for f in filas if f.accion == "error")
+
+    def validas(self):
+        return [f for f in self.filas if f.accion != "error"]
+
+    def resumen(self):
+        return (f"{len(self.filas)} filas: {self.nuevas} productos nuevos, "
+                f"{self.actualizadas} actualizados, {self.errores} con errores (se omiten)")
+
+
+def _numero(valor, entero=False):
+    # Acepta "S/ 1.234,50", "1,234.50", "12,5" y celdas numéricas de Excel; None si está vacío
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float)):
+        numero = float(valor)
+    else:
+        texto = str(valor).strip().replace("S/", "").replace("$", "").replace(" ", "")
+        if not texto:
+            return None
+        if "," in texto and "." in texto:
+            # El separador que aparece último es el decimal
+            if texto.rfind(",") > texto.rfind("."):
+                texto = texto.replace(".", "").replace(",", ".")
+            else:
+                texto = texto.replace(",", "")
+        else:
+            texto = texto.replace(",", ".")
+        numero = float(texto)
+    if entero:
+        if numero != int(numero):
+            raise ValueError("debe ser un número entero")
+        return int(numero)
+    return round(numero, 2)
+
+
+def leer_archivo(archivo):
+    """Filas del archivo (CSV o Excel) como listas de valores; la primera es el encabezado"""
+    if os.path.splitext(archivo)[1].lower() in (".xlsx", ".xlsm"):
+        libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            for fila in libro.active.iter_rows(values_only=True):
+                yield list(fila)
+        finally:
+            libro.close()
+        return
+    with open(archivo, newline="", encoding="utf-8-sig") as f:
+        muestra = f.read(4096)
+        f.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=";,\t")
+        except csv.Error:
+            dialecto = csv.excel
+        for fila in csv.reader(f, dialecto):
+            yield fila
+
+
+def _columnas(encabezado):
+    columnas = {}
+    for i, titulo in enumerate(encabezado):
+        campo = ENCABEZADOS.get(normalizar_texto(str(titulo or "")).replace("_", " "))
+        if campo and campo not in columnas:
+            columnas[campo] = i
+    if "codigo" not in columnas and "nombre" not in columnas:
+        raise ValueError("El archivo necesita una columna 'codigo' o 'nombre'")
+    return columnas
+
+
+def _interpretar(linea, valores, columnas, modo):
+    fila = FilaImportacion(linea)
+
+    def celda(campo):
+        i = columnas.get(campo)
+        if i is None or i >= len(valores) or valores[i] is None:
+            return None
+        return valores[i]
+
+    def texto(campo):
+        valor = celda(campo)
+        valor = str(valor).strip() if valor is not None else ""
+        return valor or None
+
+    codigo = celda("codigo")
+    # Excel guarda los códigos de barras como número: 7750000000011.0 -> "7750000000011"
+    if isinstance(codigo, float) and codigo.is_integer():
+        codigo = int(codigo)
+    fila.codigo = str(codigo).strip() if codigo is not None and str(codigo).strip() else None
+    fila.nombre = texto("nombre")
+    fila.categoria = texto("categoria")
+    fila.descripcion = texto("descripcion")
+    for campo, entero in (("precio", False), ("cantidad", True), ("stock_minimo", True), ("costo", False)):
+        try:
+            valor = _numero(celda(campo), entero)
+        except ValueError:
+            fila.errores.append(f"{campo} inválido: {celda(campo)}")
+            continue
+        if valor is not None and valor < 0:
+            fila.errores.append(f"{campo} no puede ser negativo")
+            continue
+        setattr(fila, campo, valor)
+
+    if not fila.codigo and not fila.nombre:
+        fila.errores.append("sin código ni nombre")
+    if modo == "conteo" and fila.cantidad is None:
+        fila.errores.append("falta la cantidad contada")
+    return fila
+
+
+def preparar(archivo, modo, catalogo):
+    """Leer ``archivo`` y compararlo con el catálogo: qué productos se crean, cuáles cambian y qué filas fallan"""
+    if modo not in MODOS:
+        raise ValueError(f"Modo de importación desconocido: {modo}")
+    filas_archivo = leer_archivo(archivo)
+    encabezado = next(filas_archivo, None)
+    if not encabezado:
+        raise ValueError("El archivo está vacío")
+    columnas = _columnas(encabezado)
+
+    # Mismo criterio de coincidencia que ProductoService.importar_masivo: código, luego nombre normalizado
+    por_nombre = {}
+    for producto in catalogo.todos():
+        por_nombre.setdefault(normalizar_texto(producto[1]), producto)
+    vistas = {}
+
+    filas = []
+    for linea, valores in enumerate(filas_archivo, start=2):
+        if not any(v not in (None, "") for v in valores):
+            continue
+        fila = _interpretar(linea, valores, columnas, modo)
+        filas.append(fila)
+        if fila.errores:
+            continue
+
+        clave = fila.codigo or normalizar_texto(fila.nombre)
+        if clave in vistas and modo == "conteo":
+            fila.errores.append(f"repetido (línea {vistas[clave].linea})")
+            continue
+        producto = catalogo.por_codigo(fila.codigo) if fila.codigo else None
+        if producto is None and fila.nombre:
+            producto = por_nombre.get(normalizar_texto(fila.nombre))
+
+        anterior = vistas.get(clave)
+        if producto is None:
+            if anterior is None and (not fila.nombre or not fila.categoria or fila.precio is None):
+                fila.errores.append("producto nuevo: faltan nombre, categoría o precio")
+                continue
+            fila.accion = "nuevo" if anterior is None else "actualizar"
+            fila.stock_antes = anterior.stock_despues if anterior else 0
+        else:
+            fila.accion = "actualizar"
+            fila.stock_antes = anterior.stock_despues if anterior else int(producto[4])
+        if modo == "entrada":
+            fila.stock_despues = fila.stock_antes + (fila.cantidad or 0)
+        else:
+            fila.stock_despues = fila.cantidad
+        vistas[clave] = fila
+
+    return VistaPrevia(archivo, modo, filas)
@@ -3,8 +3,14 @@
 Módulo de modelos de datos para Nexus Café
 """
 
+import datetime
 import hashlib
 
+from core.utils import rango_fechas, elegir_granularidad, completar_periodos
+from modules.alertas_stock import obtener_alertas
+from modules.paginacion import ConsultaPaginada
+from nexus_core.configuracion import ConfigStore
+
 class Usuario:
     def __init__(self, db_manager):
         self.db_manager = db_manager
@@ -45,19 +51,41 @@ class Producto:
             print(f"Error obteniendo productos: {e}")
             return []
     
+    def iterar_todos(self):
+        """Recorrer todos los productos por lotes (exportaciones)"""
+        query = "SELECT id, nombre, categoria, precio, stock, stock_minimo FROM productos ORDER BY nombre"
+        return self.db_manager.iterar_query(query)
+    
     def obtener_stock_bajo(self):
-        """Obtener productos con stock bajo"""
+        """Obtener productos con stock bajo (por el índice de bajo_stock, en memoria hasta que cambie la tabla)"""
         try:
-            query = "SELECT id, nombre, categoria, precio, stock, stock_minimo FROM productos WHERE stock <= stock_minimo ORDER BY nombre"
-            return self.db_manager.ejecutar_query(query)
+            return obtener_alertas(self.db_manager).productos()
         except Exception as e:
             print(f"Error obteniendo productos con stock bajo: {e}")
             return []
+    
+    def consulta_paginada(self):
+        """Fuente paginada del inventario, ordenada por nombre"""
+        return ConsultaPaginada(
+            self.db_manager, "productos",
+            [("id", "id"), ("nombre", "nombre"), ("categoria", "COALESCE(categoria, '')"),
+             ("precio", "precio"), ("stock", "stock"), ("stock_minimo", "COALESCE(stock_minimo, 0)"),
+             ("bajo_stock", "bajo_stock")],
+            orden="nombre", descendente=False
+        )
 
 class Venta:
     def __init__(self, db_manager):
         self.db_manager = db_manager
     
+    def consulta_paginada(self):
+        """Fuente paginada de ventas, de la más reciente a la más antigua"""
+        return ConsultaPaginada(
+            self.db_manager, "ventas",
+            [("id", "id"), ("cliente", "COALESCE(cliente, '')"), ("total", "total"), ("fecha", "fecha")],
+            descendente=True
+        )
+    
     def obtener_todas(self):
         """Obtener todas las ventas"""
         try:
@@ -67,23 +95,86 @@ class Venta:
             print(f"Error obteniendo ventas: {e}")
             return []
     
+    def iterar_todas(self):
+        """Recorrer todas las ventas por lotes (exportaciones)"""
+        query = "SELECT id, cliente, total, fecha FROM ventas ORDER BY fecha DESC"
+        return self.db_manager.iterar_query(query)
+    
+    def iterar_ventas_por_periodo(self, fecha_inicio, fecha_fin):
+        """Recorrer por lotes las ventas de un período (exportaciones)"""
+        inicio, fin = rango_fechas(fecha_inicio, fecha_fin)
+        query = "SELECT id, cliente, total, fecha FROM ventas WHERE fecha >= %s AND fecha < %s ORDER BY fecha"
+        return self.db_manager.iterar_query(query, (inicio, fin))
+    
     def obtener_ventas_por_periodo(self, fecha_inicio, fecha_fin):
         """Obtener ventas en un período de tiempo"""
         try:
-            query = "SELECT id, cliente, total, fecha FROM ventas WHERE DATE(fecha) BETWEEN %s AND %s ORDER BY fecha"
-            return self.db_manager.ejecutar_query(query, (fecha_inicio, fecha_fin))
+            inicio, fin = rango_fechas(fecha_inicio, fecha_fin)
+            query = "SELECT id, cliente, total, fecha FROM ventas WHERE fecha >= %s AND fecha < %s ORDER BY fecha"
+            return self.db_manager.ejecutar_query(query, (inicio, fin))
         except Exception as e:
             print(f"Error obteniendo ventas por período: {e}")
             return []
     
+    def obtener_ventas_agrupadas(self, fecha_inicio, fecha_fin, granularidad=None):
+        """Ventas de un período agrupadas por hora, día, semana o mes (en la base de datos)
+        
+        Devuelve (granularidad, [(inicio_del_intervalo, num_ventas, total)]) con los
+        intervalos sin ventas en cero. Si no se indica, la granularidad se elige por
+        el ancho del rango. Días, semanas y meses se leen del resumen ventas_diarias.
+        """
+        inicio, fin = rango_fechas(fecha_inicio, fecha_fin)
+        granularidad = granularidad or elegir_granularidad(inicio, fin)
+        try:
+            columna = "fecha" if granularidad == "hora" else "dia"
+            condiciones, params = [], []
+            if inicio is not None:
+                condiciones.append(f"{columna} >= %s")
+                params.append(inicio)
+            if fin is not None:
+                condiciones.append(f"{columna} < %s")
+                params.append(fin)
+            where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+            
+            if granularidad == "hora":
+                query = f"""
+                    SELECT DATE(fecha) AS dia, HOUR(fecha) AS hora, COUNT(*), COALESCE(SUM(total), 0)
+                    FROM ventas
+                    {where}
+                    GROUP BY dia, hora
+                    ORDER BY dia, hora
+                """
+                filas = [
+                    (datetime.datetime.combine(dia, datetime.time(hora)), num, total)
+                    for dia, hora, num, total in self.db_manager.ejecutar_query(query, tuple(params)) or []
+                ]
+            else:
+                periodo = {
+                    "dia": "dia",
+                    "semana": "DATE_SUB(dia, INTERVAL WEEKDAY(dia) DAY)",
+                    "mes": "DATE_SUB(dia, INTERVAL DAYOFMONTH(dia) - 1 DAY)",
+                }[granularidad]
+                query = f"""
+                    SELECT {periodo} AS periodo, SUM(num_ventas), SUM(total)
+                    FROM ventas_diarias
+                    {where}
+                    GROUP BY periodo
+                    ORDER BY periodo
+                """
+                filas = self.db_manager.ejecutar_query(query, tuple(params)) or []
+            return granularidad, completar_periodos(filas, inicio, fin, granularidad)
+        except Exception as e:
+            print(f"Error obteniendo ventas agrupadas: {e}")
+            return granularidad, []
+    
     def obtener_total_ventas_por_dia(self, dias):
         """Obtener el total de ventas por día para los últimos N días"""
         try:
+            # Lee el resumen precalculado: una fila por día en lugar de recorrer todas las ventas
             query = """
-                SELECT DATE(fecha) as dia, SUM(total) as total
-                FROM ventas
-                WHERE fecha >= DATE_SUB(CURRENT_DATE(), INTERVAL %s DAY)
-                GROUP BY DATE(fecha)
+                SELECT dia, total
+                FROM ventas_diarias
+                WHERE dia >= DATE_SUB(CURRENT_DATE(), INTERVAL %s DAY)
                 ORDER BY dia
             """
             return self.db_manager.ejecutar_query(query, (dias,))
@@ -95,9 +186,9 @@ class Venta:
         """Obtener los productos más vendidos"""
         try:
             query = """
-                SELECT p.nombre, SUM(dv.cantidad) as cantidad, SUM(dv.subtotal) as total
-                FROM detalles_venta dv
-                JOIN productos p ON dv.producto_id = p.id
+                SELECT p.nombre, SUM(r.cantidad) as cantidad, SUM(r.total) as total
+                FROM ventas_diarias_productos r
+                JOIN productos p ON r.producto_id = p.id
                 GROUP BY p.id, p.nombre
                 ORDER BY cantidad DESC
                 LIMIT %s
@@ -119,35 +210,58 @@ class Cliente:
         except Exception as e:
             print(f"Error obteniendo clientes: {e}")
             return []
+    
+    def iterar_todos(self):
+        """Recorrer todos los clientes por lotes (exportaciones)"""
+        query = "SELECT id, nombre, email, telefono FROM clientes ORDER BY nombre"
+        return self.db_manager.iterar_query(query)
+    
+    def consulta_paginada(self):
+        """Fuente paginada de clientes, ordenada por nombre"""
+        return ConsultaPaginada(
+            self.db_manager, "clientes",
+            [("id", "id"), ("nombre", "nombre"),
+             ("email", "COALESCE(email, '')"), ("telefono", "COALESCE(telefono, '')")],
+            orden="nombre", descendente=False
+        )
 
     def obtener_clientes_frecuentes(self, limite=10, desde=None, hasta=None):
         """Obtener clientes frecuentes por número de compras en un periodo opcional"""
         try:
+            # Agrupar por la clave entera y unir con clientes solo las filas del ranking.
+            # Las ventas sin cliente_id (nombres antiguos que no coincidieron con ningún
+            # cliente, o de clientes eliminados) no pertenecen a nadie y quedan fuera
             base_query = """
-                SELECT COALESCE(c.id, 0) AS id,
-                       v.cliente AS nombre,
+                SELECT c.id,
+                       c.nombre,
                        c.email,
                        c.telefono,
-                       COUNT(v.id) AS compras,
-                       SUM(v.total) AS total_gastado
-                FROM ventas v
-                LEFT JOIN clientes c ON c.nombre = v.cliente
-                {filtro_fecha}
-                GROUP BY v.cliente, c.id, c.email, c.telefono
-                ORDER BY compras DESC, total_gastado DESC
-                LIMIT %s
+                       f.compras,
+                       f.total_gastado
+                FROM (
+                    SELECT v.cliente_id,
+                           COUNT(*) AS compras,
+                           SUM(v.total) AS total_gastado
+                    FROM ventas v
+                    {filtro_fecha}
+                    GROUP BY v.cliente_id
+                    ORDER BY compras DESC, total_gastado DESC
+                    LIMIT %s
+                ) f
+                JOIN clientes c ON c.id = f.cliente_id
+                ORDER BY f.compras DESC, f.total_gastado DESC
             """
-            filtro_fecha = ""
+            # Rango semiabierto sobre la columna sin DATE() para poder usar idx_fecha_total
+            inicio, fin = rango_fechas(desde, hasta)
+            condiciones = ["v.cliente_id IS NOT NULL"]
             params = []
-            if desde and hasta:
-                filtro_fecha = "WHERE DATE(v.fecha) BETWEEN %s AND %s"
-                params = [desde, hasta]
-            elif desde:
-                filtro_fecha = "WHERE DATE(v.fecha) >= %s"
-                params = [desde]
-            elif hasta:
-                filtro_fecha = "WHERE DATE(v.fecha) <= %s"
-                params = [hasta]
+            if inicio:
+                condiciones.append("v.fecha >= %s")
+                params.append(inicio)
+            if fin:
+                condiciones.append("v.fecha < %s")
+                params.append(fin)
+            filtro_fecha = f"WHERE {' AND '.join(condiciones)}"
             query = base_query.format(filtro_fecha=filtro_fecha)
             return self.db_manager.ejecutar_query(query, tuple(params + [limite]))
         except Exception as e:
@@ -157,18 +271,17 @@ class Cliente:
 class Configuracion:
     def __init__(self, db_manager):
         self.db_manager = db_manager
+        # Todas las claves en memoria: una sola consulta, releída solo si la tabla cambia
+        self.store = ConfigStore(db_manager.ejecutar_query)
     
     def obtener_configuracion(self):
         """Obtener toda la configuración"""
-        try:
-            query = "SELECT clave, valor FROM configuracion"
-            resultados = self.db_manager.ejecutar_query(query)
-            
-            config = {}
-            for clave, valor in resultados:
-                config[clave] = valor
-                
-            return config
-        except Exception as e:
-            print(f"Error obteniendo configuración: {e}")
-            return {}
\ No newline at end of file
+        return self.store.todas()
+    
+    def obtener_moneda(self):
+        """Símbolo de moneda configurado (para ``PdfService(obtener_moneda)``)"""
+        return self.store.moneda()
+    
+    def guardar_configuracion(self, valores):
+        """Guardar varias claves de una vez; devuelve False si falló la escritura"""
+        return self.store.actualizar(valores)
\ No newline at end of file
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Ordenamiento de tablas Treeview con claves tipadas
+"""
+
+
+def _clave_segura(valor):
+    # Los valores nulos van al final sin comparar tipos distintos
+    if isinstance(valor, str):
+        return (False, valor.lower())
+    return (valor is None, valor if valor is not None else 0)
+
+
+class OrdenadorTabla:
+    """Mantiene junto a cada fila los valores originales (int, float, datetime, str).
+
+    Al hacer clic en un encabezado se ordena con esos valores ya tipados, sin
+    volver a leer ni interpretar el texto de las celdas, y el nuevo orden se
+    aplica con una sola llamada a ``set_children`` en lugar de un ``move`` por
+    fila.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.columnas = list(tree["columns"])
+        self._claves = {}
+        self._descendente = {}
+        self._titulos = {c: tree.heading(c, "text") for c in self.columnas}
+        for columna in self.columnas:
+            tree.heading(columna, command=lambda c=columna: self.alternar(c))
+
+    def insertar(self, valores, claves, tags=()):
+        """Insertar una fila mostrando ``valores`` y ordenando por ``claves`` (misma longitud)"""
+        iid = self.tree.insert("", "end", values=valores, tags=tags)
+        self._claves[iid] = tuple(claves)
+        return iid
+
+    def ordenar(self, columna, descendente=False):
+        indice = self.columnas.index(columna)
+        claves = self._claves
+        iids = sorted(claves, key=lambda iid: _clave_segura(claves[iid][indice]), reverse=descendente)
+        self.tree.set_children("", *iids)
+        self._descendente = {columna: descendente}
+        for c in self.columnas:
+            flecha = (" ▼" if descendente else " ▲") if c == columna else ""
+            self.tree.heading(c, text=self._titulos[c] + flecha)
+
+    def alternar(self, columna):
+        """Ordenar ascendente en el primer clic e invertir en los siguientes"""
+        descendente = not self._descendente.get(columna, True)
+        self.ordenar(columna, descendente)
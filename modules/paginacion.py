@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Consultas paginadas por clave (keyset) para las tablas de la interfaz
+"""
+
+
+class ConsultaPaginada:
+    """Fuente de filas paginada con ``WHERE clave < ultima ORDER BY clave DESC LIMIT n``.
+
+    A diferencia de ``LIMIT/OFFSET``, el costo de cada página no crece con la
+    profundidad del desplazamiento: MySQL entra por el índice justo después de
+    la última fila mostrada. Cuando el orden es por una columna distinta de la
+    clave se usa el par (columna, clave) para que el orden sea total.
+    """
+
+    def __init__(self, db_manager, tabla, columnas, clave="id", orden=None, descendente=True):
+        # columnas = [(nombre, expresion_sql)]; la clave y el orden se indican por nombre
+        self.db_manager = db_manager
+        self.tabla = tabla
+        self.columnas = list(columnas)
+        self.nombres = [nombre for nombre, _ in self.columnas]
+        self.expresiones = dict(self.columnas)
+        self.clave = clave
+        self.orden = orden or clave
+        self.descendente = descendente
+        self.filtros = []
+
+    def establecer_filtros(self, filtros):
+        """Reemplazar los filtros activos: lista de (condicion_sql, parametros)"""
+        self.filtros = list(filtros or [])
+
+    def ordenar_por(self, nombre, descendente=False):
+        """Cambiar la columna de orden; el desempate siempre es la clave"""
+        self.orden = nombre
+        self.descendente = descendente
+
+    def clave_de(self, fila):
+        """Posición de una fila dentro del orden: (valor de la columna de orden, clave)"""
+        return (fila[self.nombres.index(self.orden)], fila[self.nombres.index(self.clave)])
+
+    def pagina(self, desde=None, hacia_atras=False, limite=200):
+        """Obtener la página que sigue (o precede, si ``hacia_atras``) a la posición ``desde``"""
+        descendente = self.descendente != hacia_atras
+        operador = "<" if descendente else ">"
+        direccion = "DESC" if descendente else "ASC"
+        expr_clave = self.expresiones[self.clave]
+        expr_orden = self.expresiones[self.orden]
+
+        condiciones = [condicion for condicion, _ in self.filtros]
+        params = [p for _, parametros in self.filtros for p in parametros]
+
+        if desde is not None:
+            valor, clave = desde
+            if self.orden == self.clave:
+                condiciones.append(f"{expr_clave} {operador} %s")
+                params.append(clave)
+            else:
+                condiciones.append(
+                    f"({expr_orden} {operador} %s OR ({expr_orden} = %s AND {expr_clave} {operador} %s))"
+                )
+                params.extend([valor, valor, clave])
+
+        if self.orden == self.clave:
+            orden_sql = f"{expr_clave} {direccion}"
+        else:
+            orden_sql = f"{expr_orden} {direccion}, {expr_clave} {direccion}"
+
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        columnas_sql = ", ".join(expresion for _, expresion in self.columnas)
+        query = f"SELECT {columnas_sql} FROM {self.tabla} {where} ORDER BY {orden_sql} LIMIT %s"
+        params.append(int(limite))
+
+        filas = self.db_manager.ejecutar_query(query, tuple(params)) or []
+        filas = list(filas)
+        if hacia_atras:
+            filas.reverse()
+        return filas
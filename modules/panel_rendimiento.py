@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Ventana "Rendimiento": consultas que más tiempo consumen según la instrumentación de la capa de datos
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from nexus_core.instrumentacion import LIMITES_MS
+
+
+class PanelRendimiento:
+    """Ventana secundaria (solo administradores) con las consultas más costosas.
+
+    Lee una ``Instrumentacion`` y se refresca sola cada ``INTERVALO_MS`` mientras
+    está abierta. Al seleccionar una fila muestra la consulta completa, desde
+    dónde se llamó y su histograma de latencias.
+    """
+
+    INTERVALO_MS = 2000
+    CANTIDAD = 50
+
+    ORDENES = {
+        "Tiempo total": "total",
+        "Promedio": "promedio",
+        "p95": "p95",
+        "Máximo": "maximo",
+        "Llamadas": "llamadas",
+        "Filas": "filas",
+        "Espera de conexión": "espera",
+    }
+
+    def __init__(self, root, instrumentacion):
+        self.instrumentacion = instrumentacion
+        self.estadisticas = {}
+        self.ventana = tk.Toplevel(root)
+        self.ventana.title("Rendimiento de consultas")
+        self.ventana.geometry("1000x560")
+        self.ventana.configure(bg="#ECF0F1")
+
+        marco = tk.Frame(self.ventana, bg="#ECF0F1", padx=10, pady=10)
+        marco.pack(fill="both", expand=True)
+
+        barra = tk.Frame(marco, bg="#ECF0F1")
+        barra.pack(fill="x", pady=(0, 8))
+        tk.Label(barra, text="Ordenar por:", bg="#ECF0F1", font=("Arial", 10)).pack(side="left")
+        self.orden_var = tk.StringVar(value="Tiempo total")
+        orden = ttk.Combobox(barra, textvariable=self.orden_var, values=list(self.ORDENES),
+                             state="readonly", width=20)
+        orden.pack(side="left", padx=5)
+        orden.bind("<<ComboboxSelected>>", lambda e: self.actualizar())
+        self.resumen_var = tk.StringVar()
+        tk.Label(barra, textvariable=self.resumen_var, bg="#ECF0F1", fg="#7F8C8D",
+                 font=("Arial", 9)).pack(side="left", padx=10)
+
+        columnas = [("consulta", "Consulta", 330), ("llamadas", "Llamadas", 70), ("promedio", "Prom. ms", 70),
+                    ("p95", "p95 ms", 70), ("maximo", "Máx. ms", 70), ("total", "Total ms", 80),
+                    ("filas", "Filas", 70), ("espera", "Espera ms", 70), ("errores", "Errores", 60),
+                    ("origen", "Origen principal", 220)]
+        self.tree = ttk.Treeview(marco, columns=[c[0] for c in columnas], show="headings", height=14)
+        for columna, titulo, ancho in columnas:
+            self.tree.heading(columna, text=titulo)
+            self.tree.column(columna, width=ancho, anchor="w" if columna in ("consulta", "origen") else "e")
+        self.tree.pack(fill="both", expand=True)
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self.mostrar_detalle())
+
+        self.detalle = tk.Text(marco, height=8, font=("Consolas", 9), wrap="word", state="disabled")
+        self.detalle.pack(fill="x", pady=(8, 0))
+
+        botones = tk.Frame(marco, bg="#ECF0F1")
+        botones.pack(fill="x", pady=(8, 0))
+        estilo = {"font": ("Arial", 10), "bd": 0, "padx": 10, "pady": 4, "cursor": "hand2"}
+        tk.Button(botones, text="Actualizar", bg="#3498DB", fg="white",
+                  command=self.actualizar, **estilo).pack(side="left", padx=(0, 5))
+        tk.Button(botones, text="Reiniciar estadísticas", bg="#E67E22", fg="white",
+                  command=self.reiniciar, **estilo).pack(side="left", padx=5)
+        tk.Button(botones, text="Cerrar", bg="#7F8C8D", fg="white",
+                  command=self.ventana.destroy, **estilo).pack(side="right")
+
+        self.actualizar()
+        self._programar()
+
+    def existe(self):
+        try:
+            return bool(self.ventana.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def mostrar(self):
+        self.ventana.deiconify()
+        self.ventana.lift()
+
+    def _programar(self):
+        if self.existe():
+            self.ventana.after(self.INTERVALO_MS, self._refrescar)
+
+    def _refrescar(self):
+        if not self.existe():
+            return
+        self.actualizar()
+        self._programar()
+
+    def actualizar(self):
+        if not self.existe():
+            return
+        criterio = self.ORDENES.get(self.orden_var.get(), "total")
+        principales = self.instrumentacion.principales(self.CANTIDAD, criterio)
+        self.estadisticas = {str(i): e for i, e in enumerate(principales)}
+        seleccion = [self.estadisticas[iid].consulta for iid in self.tree.selection() if iid in self.estadisticas]
+
+        self.tree.delete(*self.tree.get_children())
+        for iid, e in self.estadisticas.items():
+            origen = e.origenes.most_common(1)[0][0] if e.origenes else ""
+            self.tree.insert("", "end", iid=iid, values=(
+                e.consulta[:120], e.llamadas, f"{e.promedio_ms():.1f}", f"{e.percentil_ms(0.95):.1f}",
+                f"{e.max_s * 1000:.1f}", f"{e.total_s * 1000:.0f}", e.filas,
+                f"{e.espera_s * 1000:.0f}", e.errores, origen,
+            ))
+            if e.consulta in seleccion:
+                self.tree.selection_add(iid)
+        self.resumen_var.set(self.instrumentacion.resumen())
+
+    def mostrar_detalle(self):
+        seleccion = self.tree.selection()
+        e = self.estadisticas.get(seleccion[0]) if seleccion else None
+        if e is None:
+            return
+        limites = [f"<= {limite:g} ms" for limite in LIMITES_MS] + [f"> {LIMITES_MS[-1]:g} ms"]
+        histograma = ", ".join(f"{limite}: {n}" for limite, n in zip(limites, e.cubetas) if n)
+        origenes = "\n".join(f"  {n:>6}  {origen}" for origen, n in e.origenes.most_common(10))
+        texto = f"{e.consulta}\n\nHistograma: {histograma}\nOrígenes:\n{origenes}"
+        self.detalle.configure(state="normal")
+        self.detalle.delete("1.0", "end")
+        self.detalle.insert("1.0", texto)
+        self.detalle.configure(state="disabled")
+
+    def reiniciar(self):
+        self.instrumentacion.reiniciar()
+        self.actualizar()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Ventana con la cola de trabajos de reportes: estado, progreso y cancelación
+"""
+
+import time
+import tkinter as tk
+from tkinter import ttk
+
+
+class PanelTrabajos:
+    """Ventana secundaria que lista los trabajos de una ``ColaTrabajos``.
+
+    Se puede cerrar y volver a abrir sin afectar a los trabajos: la cola sigue
+    trabajando y el panel se actualiza desde ``actualizar(trabajo)``, que la
+    aplicación llama en el hilo de Tk cada vez que un trabajo cambia.
+    """
+
+    ESTADOS = {
+        "pendiente": "En cola",
+        "ejecutando": "Generando",
+        "completado": "Completado",
+        "cancelado": "Cancelado",
+        "error": "Error",
+    }
+
+    def __init__(self, root, cola):
+        self.cola = cola
+        self.ventana = tk.Toplevel(root)
+        self.ventana.title("Trabajos de reportes")
+        self.ventana.geometry("720x300")
+        self.ventana.configure(bg="#ECF0F1")
+
+        marco = tk.Frame(self.ventana, bg="#ECF0F1", padx=10, pady=10)
+        marco.pack(fill="both", expand=True)
+
+        columnas = [("id", "#", 40), ("reporte", "Reporte", 300), ("estado", "Estado", 100),
+                    ("progreso", "Progreso", 160), ("tiempo", "Tiempo", 70)]
+        self.tree = ttk.Treeview(marco, columns=[c[0] for c in columnas], show="headings", height=8)
+        for columna, titulo, ancho in columnas:
+            self.tree.heading(columna, text=titulo)
+            self.tree.column(columna, width=ancho)
+        self.tree.pack(fill="both", expand=True)
+
+        botones = tk.Frame(marco, bg="#ECF0F1")
+        botones.pack(fill="x", pady=(8, 0))
+        estilo = {"font": ("Arial", 10), "bd": 0, "padx": 10, "pady": 4, "cursor": "hand2"}
+        tk.Button(botones, text="Cancelar", bg="#E74C3C", fg="white",
+                  command=self.cancelar_seleccion, **estilo).pack(side="left", padx=(0, 5))
+        tk.Button(botones, text="Cancelar todos", bg="#C0392B", fg="white",
+                  command=self.cola.cancelar_todos, **estilo).pack(side="left", padx=5)
+        tk.Button(botones, text="Limpiar terminados", bg="#95A5A6", fg="white",
+                  command=self.limpiar, **estilo).pack(side="left", padx=5)
+        tk.Button(botones, text="Cerrar", bg="#7F8C8D", fg="white",
+                  command=self.ventana.destroy, **estilo).pack(side="right")
+
+        for trabajo in self.cola.trabajos():
+            self.actualizar(trabajo)
+
+    def existe(self):
+        try:
+            return bool(self.ventana.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def mostrar(self):
+        self.ventana.deiconify()
+        self.ventana.lift()
+
+    def actualizar(self, trabajo):
+        if not self.existe():
+            return
+        estado = self.ESTADOS.get(trabajo.estado, trabajo.estado)
+        if trabajo.activo and trabajo.cancelado:
+            estado = "Cancelando..."
+        elif trabajo.estado == "error" and trabajo.error is not None:
+            estado = f"Error: {trabajo.error}"
+        tiempo = ""
+        if trabajo.inicio is not None:
+            tiempo = f"{(trabajo.fin or time.monotonic()) - trabajo.inicio:.1f} s"
+        valores = (trabajo.id, trabajo.descripcion, estado, trabajo.texto_progreso(), tiempo)
+        iid = str(trabajo.id)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=valores)
+        else:
+            self.tree.insert("", "end", iid=iid, values=valores)
+
+    def cancelar_seleccion(self):
+        for iid in self.tree.selection():
+            self.cola.cancelar(int(iid))
+
+    def limpiar(self):
+        self.cola.limpiar_terminados()
+        vigentes = {str(t.id) for t in self.cola.trabajos()}
+        for iid in self.tree.get_children():
+            if iid not in vigentes:
+                self.tree.delete(iid)
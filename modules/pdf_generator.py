@@ -4,38 +4,35 @@ Módulo para generar PDFs para Nexus Café
 """
 
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
 from reportlab.lib.units import inch
 import datetime
 
+from modules.pdf_grande import renderizar_reporte
+from modules.trabajos import TrabajoCancelado
+
 class PDFGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, procesos=None):
+        # procesos=None: modo paralelo automático para reportes grandes; 1 lo desactiva
+        self.procesos = procesos
+        self.ultimo_rendimiento = None
+    
+    def _renderizar(self, filename, titulo, data, pie, al_avanzar=None):
+        """Armar el reporte con la tabla por tramos (y en paralelo si es grande)"""
+        fecha = f"Fecha del reporte: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
+        self.ultimo_rendimiento = renderizar_reporte(
+            filename, titulo, [(fecha, 'Normal')], data, pie,
+            procesos=self.procesos, al_avanzar=al_avanzar
+        )
+        return self.ultimo_rendimiento
     
-    def generar_pdf_ventas(self, ventas, filename, titulo="REPORTE DE VENTAS"):
+    def generar_pdf_ventas(self, ventas, filename, titulo="REPORTE DE VENTAS", al_avanzar=None):
         """Generar un PDF con el reporte de ventas"""
         try:
-            # Crear documento
-            doc = SimpleDocTemplate(filename, pagesize=letter)
-            elements = []
-            
-            # Estilos
-            styles = getSampleStyleSheet()
-            title_style = styles['Heading1']
-            normal_style = styles['Normal']
-            
-            # Título
-            elements.append(Paragraph(titulo, title_style))
-            elements.append(Spacer(1, 12))
-            
-            # Fecha del reporte
-            elements.append(Paragraph(f"Fecha del reporte: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style))
-            elements.append(Spacer(1, 12))
-            
-            # Tabla de ventas
+            # Tabla de ventas (una sola pasada: ventas puede ser un generador)
             data = [["ID", "Cliente", "Total", "Fecha"]]
+            total_ventas = 0
             for venta in ventas:
                 data.append([
                     str(venta[0]),
@@ -43,57 +40,28 @@ class PDFGenerator:
                     f"S/ {venta[2]:.2f}",
                     venta[3].strftime("%Y-%m-%d %H:%M") if isinstance(venta[3], datetime.datetime) else str(venta[3])
                 ])
-            
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(table)
+                total_ventas += venta[2]
             
             # Total de ventas
-            total_ventas = sum(venta[2] for venta in ventas)
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph(f"TOTAL DE VENTAS: S/ {total_ventas:.2f}", styles['Heading2']))
+            pie = [(f"TOTAL DE VENTAS: S/ {total_ventas:.2f}", 'Heading2')]
             
             # Generar PDF
-            doc.build(elements)
+            self._renderizar(filename, titulo, data, pie, al_avanzar)
             
             return True
             
+        except TrabajoCancelado:
+            raise
         except Exception as e:
             print(f"Error generando PDF de ventas: {e}")
             return False
     
-    def generar_pdf_inventario(self, productos, filename, titulo="REPORTE DE INVENTARIO"):
+    def generar_pdf_inventario(self, productos, filename, titulo="REPORTE DE INVENTARIO", al_avanzar=None):
         """Generar un PDF con el reporte de inventario"""
         try:
-            # Crear documento
-            doc = SimpleDocTemplate(filename, pagesize=letter)
-            elements = []
-            
-            # Estilos
-            styles = getSampleStyleSheet()
-            title_style = styles['Heading1']
-            normal_style = styles['Normal']
-            
-            # Título
-            elements.append(Paragraph(titulo, title_style))
-            elements.append(Spacer(1, 12))
-            
-            # Fecha del reporte
-            elements.append(Paragraph(f"Fecha del reporte: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style))
-            elements.append(Spacer(1, 12))
-            
-            # Tabla de productos
+            # Tabla de productos (una sola pasada: productos puede ser un generador)
             data = [["ID", "Nombre", "Categoría", "Precio", "Stock", "Stock Mínimo"]]
+            elementos_stock_bajo = 0
             for producto in productos:
                 data.append([
                     str(producto[0]),
@@ -103,66 +71,38 @@ class PDFGenerator:
                     str(producto[4]),
                     str(producto[5])
                 ])
-            
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(table)
+                elementos_stock_bajo += producto[4] <= producto[5]
             
             # Total de productos
-            total_productos = len(productos)
-            elementos_stock_bajo = sum(1 for p in productos if p[4] <= p[5])
+            total_productos = len(data) - 1
             
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph(f"TOTAL DE PRODUCTOS: {total_productos}", styles['Heading2']))
-            elements.append(Paragraph(f"PRODUCTOS CON STOCK BAJO: {elementos_stock_bajo}", styles['Heading3']))
+            pie = [
+                (f"TOTAL DE PRODUCTOS: {total_productos}", 'Heading2'),
+                (f"PRODUCTOS CON STOCK BAJO: {elementos_stock_bajo}", 'Heading3'),
+            ]
             
             # Generar PDF
-            doc.build(elements)
+            self._renderizar(filename, titulo, data, pie, al_avanzar)
             
             return True
             
+        except TrabajoCancelado:
+            raise
         except Exception as e:
             print(f"Error generando PDF de inventario: {e}")
             return False
     
-    def generar_reporte_ventas(self, ventas, filename):
+    def generar_reporte_ventas(self, ventas, filename, al_avanzar=None):
         """Método wrapper para compatibilidad con main_modular.py"""
-        return self.generar_pdf_ventas(ventas, filename)
+        return self.generar_pdf_ventas(ventas, filename, al_avanzar=al_avanzar)
     
-    def generar_reporte_inventario(self, productos, filename):
+    def generar_reporte_inventario(self, productos, filename, al_avanzar=None):
         """Método wrapper para compatibilidad con main_modular.py"""
-        return self.generar_pdf_inventario(productos, filename)
+        return self.generar_pdf_inventario(productos, filename, al_avanzar=al_avanzar)
     
-    def generar_reporte_productos(self, productos, filename):
+    def generar_reporte_productos(self, productos, filename, al_avanzar=None):
         """Generar un PDF con el reporte de productos más vendidos"""
         try:
-            # Crear documento
-            doc = SimpleDocTemplate(filename, pagesize=letter)
-            elements = []
-            
-            # Estilos
-            styles = getSampleStyleSheet()
-            title_style = styles['Heading1']
-            normal_style = styles['Normal']
-            
-            # Título
-            elements.append(Paragraph("REPORTE DE PRODUCTOS MÁS VENDIDOS", title_style))
-            elements.append(Spacer(1, 12))
-            
-            # Fecha del reporte
-            elements.append(Paragraph(f"Fecha del reporte: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style))
-            elements.append(Spacer(1, 12))
-            
             # Tabla de productos
             data = [["Producto", "Cantidad Vendida", "Total Ventas"]]
             total_general = 0
@@ -186,54 +126,26 @@ class PDFGenerator:
                     f"S/ {total:.2f}"
                 ])
             
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(table)
-            
             # Resumen
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph(f"TOTAL DE PRODUCTOS: {len(productos)}", styles['Heading2']))
-            elements.append(Paragraph(f"TOTAL EN VENTAS: S/ {total_general:.2f}", styles['Heading2']))
+            pie = [
+                (f"TOTAL DE PRODUCTOS: {len(data) - 1}", 'Heading2'),
+                (f"TOTAL EN VENTAS: S/ {total_general:.2f}", 'Heading2'),
+            ]
             
             # Generar PDF
-            doc.build(elements)
+            self._renderizar(filename, "REPORTE DE PRODUCTOS MÁS VENDIDOS", data, pie, al_avanzar)
             
             return True
             
+        except TrabajoCancelado:
+            raise
         except Exception as e:
             print(f"Error generando PDF de productos: {e}")
             return False
     
-    def generar_reporte_clientes(self, clientes, filename):
+    def generar_reporte_clientes(self, clientes, filename, al_avanzar=None):
         """Generar un PDF con el reporte de clientes frecuentes"""
         try:
-            # Crear documento
-            doc = SimpleDocTemplate(filename, pagesize=letter)
-            elements = []
-            
-            # Estilos
-            styles = getSampleStyleSheet()
-            title_style = styles['Heading1']
-            normal_style = styles['Normal']
-            
-            # Título
-            elements.append(Paragraph("REPORTE DE CLIENTES FRECUENTES", title_style))
-            elements.append(Spacer(1, 12))
-            
-            # Fecha del reporte
-            elements.append(Paragraph(f"Fecha del reporte: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style))
-            elements.append(Spacer(1, 12))
-            
             # Tabla de clientes
             data = [["ID", "Cliente", "Compras", "Total Gastado"]]
             total_compras = 0
@@ -298,31 +210,20 @@ class PDFGenerator:
                     f"S/ {total_val:.2f}"
                 ])
             
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(table)
-            
             # Resumen
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph(f"TOTAL DE CLIENTES: {len(clientes)}", styles['Heading2']))
-            elements.append(Paragraph(f"TOTAL DE COMPRAS: {total_compras}", styles['Heading2']))
-            elements.append(Paragraph(f"TOTAL GASTADO: S/ {total_gastado:.2f}", styles['Heading2']))
+            pie = [
+                (f"TOTAL DE CLIENTES: {len(data) - 1}", 'Heading2'),
+                (f"TOTAL DE COMPRAS: {total_compras}", 'Heading2'),
+                (f"TOTAL GASTADO: S/ {total_gastado:.2f}", 'Heading2'),
+            ]
             
             # Generar PDF
-            doc.build(elements)
+            self._renderizar(filename, "REPORTE DE CLIENTES FRECUENTES", data, pie, al_avanzar)
             
             return True
             
+        except TrabajoCancelado:
+            raise
         except Exception as e:
             print(f"Error generando PDF de clientes: {e}")
             return False
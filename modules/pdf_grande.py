@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Reportes PDF grandes: tablas por tramos y renderizado en paralelo por rangos de filas
+"""
+
+import importlib.util
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from modules.carga_diferida import importar
+
+# Filas por tabla: reportlab calcula el alto y el corte de página de cada Table
+# completa, así que una sola tabla de 50.000 filas se vuelve muy lenta
+FILAS_POR_TRAMO = 500
+# Filas que arma cada proceso en el modo paralelo
+FILAS_POR_PARTE = 10000
+# A partir de esta cantidad de filas se usa el modo paralelo (si está pypdf)
+UMBRAL_PARALELO = 20000
+
+ESTILO_TABLA = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+]
+
+
+def anchos_columnas(data, tamano=10, relleno=12):
+    """Ancho de cada columna según su texto más largo (encabezado en negrita)
+
+    Medir los textos es mucho más barato que dejar que reportlab ajuste cada
+    tabla, y permite que todos los tramos y partes queden alineados.
+    """
+    anchos = [stringWidth(str(c), 'Helvetica-Bold', tamano) for c in data[0]]
+    for fila in data[1:]:
+        for i, celda in enumerate(fila[:len(anchos)]):
+            ancho = stringWidth(str(celda), 'Helvetica', tamano)
+            if ancho > anchos[i]:
+                anchos[i] = ancho
+    return [a + relleno for a in anchos]
+
+
+def tablas_por_tramos(data, filas_por_tramo=FILAS_POR_TRAMO, estilo=None, col_widths=None):
+    """Dividir ``data`` (encabezado + filas) en tablas de tamaño fijo
+
+    Cada tramo repite el encabezado y lo vuelve a dibujar si cruza un salto de
+    página (``repeatRows=1``). Si no se indican anchos, se calculan una vez para
+    todos los tramos con ``anchos_columnas``.
+    """
+    encabezado, filas = data[0], data[1:]
+    if col_widths is None and len(filas) > filas_por_tramo:
+        col_widths = anchos_columnas(data)
+    estilo = TableStyle(estilo or ESTILO_TABLA)
+    tablas = []
+    for inicio in range(0, max(len(filas), 1), filas_por_tramo):
+        tabla = Table([encabezado] + filas[inicio:inicio + filas_por_tramo],
+                      colWidths=col_widths, repeatRows=1)
+        tabla.setStyle(estilo)
+        tablas.append(tabla)
+    return tablas
+
+
+def pypdf_disponible():
+    return importlib.util.find_spec("pypdf") is not None
+
+
+class Rendimiento:
+    """Filas, páginas y tiempo de un reporte generado"""
+
+    def __init__(self, filas=0, paginas=0, segundos=0.0, procesos=1):
+        self.filas = filas
+        self.paginas = paginas
+        self.segundos = segundos
+        self.procesos = procesos
+
+    @property
+    def filas_por_segundo(self):
+        return self.filas / self.segundos if self.segundos > 0 else 0.0
+
+    @property
+    def paginas_por_segundo(self):
+        return self.paginas / self.segundos if self.segundos > 0 else 0.0
+
+    def texto(self):
+        modo = f"{self.procesos} procesos" if self.procesos > 1 else "1 proceso"
+        return (f"{self.filas_por_segundo:.0f} filas/s, {self.paginas_por_segundo:.1f} pág/s "
+                f"({self.segundos:.1f} s, {modo})")
+
+    def __repr__(self):
+        return f"<Rendimiento {self.filas} filas, {self.paginas} páginas, {self.texto()}>"
+
+
+def _elementos(titulo, subtitulos, data, pie, col_widths, filas_por_tramo):
+    # subtitulos y pie son listas de (texto, nombre de estilo) para poder enviarlos a otro proceso
+    styles = getSampleStyleSheet()
+    elements = []
+    if titulo:
+        elements.append(Paragraph(titulo, styles['Heading1']))
+        elements.append(Spacer(1, 12))
+    for texto, estilo in subtitulos or []:
+        elements.append(Paragraph(texto, styles[estilo]))
+        elements.append(Spacer(1, 12))
+    elements.extend(tablas_por_tramos(data, filas_por_tramo, col_widths=col_widths))
+    if pie:
+        elements.append(Spacer(1, 12))
+        for texto, estilo in pie:
+            elements.append(Paragraph(texto, styles[estilo]))
+    return elements
+
+
+def _construir(archivo, elements, pagesize, al_avanzar=None):
+    # Devuelve la cantidad de páginas; al_avanzar(pagina) puede lanzar una excepción para cortar
+    paginas = [0]
+
+    def pagina_terminada(canvas, documento):
+        paginas[0] = canvas.getPageNumber()
+        if al_avanzar:
+            al_avanzar(paginas[0])
+
+    doc = SimpleDocTemplate(archivo, pagesize=pagesize)
+    doc.build(elements, onFirstPage=pagina_terminada, onLaterPages=pagina_terminada)
+    return paginas[0]
+
+
+def _renderizar_parte(tarea):
+    # Se ejecuta en un proceso aparte: solo recibe datos simples (textos, números, tuplas)
+    elements = _elementos(tarea['titulo'], tarea['subtitulos'], tarea['data'], tarea['pie'],
+                          tarea['col_widths'], tarea['filas_por_tramo'])
+    return _construir(tarea['archivo'], elements, tarea['pagesize'])
+
+
+def _unir(partes, archivo):
+    pypdf = importar("pypdf")
+    escritor = pypdf.PdfWriter()
+    for parte in partes:
+        escritor.append(parte)
+    with open(archivo, 'wb') as f:
+        escritor.write(f)
+
+
+def _renderizar_en_paralelo(archivo, titulo, subtitulos, data, pie, pagesize, col_widths,
+                            procesos, filas_por_parte, filas_por_tramo, al_avanzar):
+    encabezado, filas = data[0], data[1:]
+    rangos = list(range(0, len(filas), filas_por_parte))
+    carpeta = tempfile.mkdtemp(prefix="nexus_pdf_")
+    partes = [os.path.join(carpeta, f"parte_{i:04d}.pdf") for i in range(len(rangos))]
+    tareas = []
+    for i, inicio in enumerate(rangos):
+        primera, ultima = i == 0, i == len(rangos) - 1
+        tareas.append({
+            'archivo': partes[i],
+            'titulo': titulo if primera else None,
+            'subtitulos': subtitulos if primera else None,
+            'data': [encabezado] + filas[inicio:inicio + filas_por_parte],
+            'pie': pie if ultima else None,
+            'pagesize': pagesize,
+            'col_widths': col_widths,
+            'filas_por_tramo': filas_por_tramo,
+        })
+
+    # "spawn" en todos los sistemas: hacer fork de una aplicación Tk con hilos no es seguro
+    ejecutor = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn"))
+    pendientes = set()
+    try:
+        pendientes = {ejecutor.submit(_renderizar_parte, tarea) for tarea in tareas}
+        paginas = 0
+        while pendientes:
+            listos, pendientes = wait(pendientes, timeout=0.5, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                paginas += futuro.result()
+            # Informar también sin partes nuevas, para poder cancelar mientras se espera
+            if al_avanzar:
+                al_avanzar(paginas)
+        _unir(partes, archivo)
+        return paginas
+    finally:
+        for futuro in pendientes:
+            futuro.cancel()
+        ejecutor.shutdown(wait=not pendientes)
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def renderizar_reporte(archivo, titulo, subtitulos, data, pie=None, pagesize=letter, col_widths=None,
+                       procesos=None, filas_por_parte=FILAS_POR_PARTE, filas_por_tramo=FILAS_POR_TRAMO,
+                       al_avanzar=None):
+    """Generar un reporte de título, subtítulos, una tabla grande y un pie; devuelve un ``Rendimiento``
+
+    ``procesos=None`` elige solo: con ``UMBRAL_PARALELO`` filas o más, pypdf instalado
+    y más de un núcleo, reparte las filas en partes de ``filas_por_parte`` que se
+    arman en procesos separados y se unen al final (cada parte empieza en una página
+    nueva). ``procesos=1`` fuerza el modo secuencial. ``al_avanzar(paginas)`` informa
+    el avance y puede lanzar una excepción para cancelar.
+    """
+    inicio = time.perf_counter()
+    cantidad = len(data) - 1
+    if col_widths is None and cantidad > filas_por_tramo:
+        col_widths = anchos_columnas(data)
+    if procesos is None:
+        procesos = min(os.cpu_count() or 1, 4) if cantidad >= UMBRAL_PARALELO else 1
+    procesos = max(1, min(procesos, -(-cantidad // filas_por_parte) or 1))
+    if procesos > 1 and not pypdf_disponible():
+        logging.getLogger("nexus.pdf").info("pypdf no está instalado: el reporte se genera en un solo proceso")
+        procesos = 1
+
+    if procesos > 1:
+        paginas = _renderizar_en_paralelo(archivo, titulo, subtitulos, data, pie, pagesize, col_widths,
+                                          procesos, filas_por_parte, filas_por_tramo, al_avanzar)
+    else:
+        elements = _elementos(titulo, subtitulos, data, pie, col_widths, filas_por_tramo)
+        paginas = _construir(archivo, elements, pagesize, al_avanzar)
+    return Rendimiento(cantidad, paginas, time.perf_counter() - inicio, procesos)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Tabla Treeview virtual con carga por páginas para listados grandes
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+
+class TablaPaginada:
+    """Treeview que pide páginas a una ``ConsultaPaginada`` a medida que el usuario se desplaza.
+
+    Solo se mantienen en el widget ``max_paginas`` páginas: al bajar se
+    descartan las de arriba y al volver a subir se piden de nuevo, de modo que
+    la memoria y la cantidad de ítems de Tk quedan acotadas aunque la tabla
+    de MySQL tenga cientos de miles de filas.
+    """
+
+    def __init__(self, parent, columnas, fuente, formatear_fila, ejecutor=None,
+                 tamano_pagina=200, max_paginas=5, selectmode="extended", orden_columnas=None):
+        # columnas = [(id_columna, titulo, ancho)]; formatear_fila(fila) -> (valores, tags)
+        # orden_columnas = {id_columna: columna de la fuente} para ordenar en el servidor
+        self.fuente = fuente
+        self.orden_columnas = orden_columnas or {}
+        self._titulos = {c[0]: c[1] for c in columnas}
+        self.formatear_fila = formatear_fila
+        self.ejecutor = ejecutor
+        self.tamano_pagina = tamano_pagina
+        self.max_paginas = max(2, max_paginas)
+        self._grupo = f"tabla_{id(self)}"
+
+        self.tree = ttk.Treeview(
+            parent,
+            columns=[c[0] for c in columnas],
+            show="headings",
+            selectmode=selectmode,
+        )
+        self.tree.pack(fill="both", expand=True)
+        for columna, titulo, ancho in columnas:
+            self.tree.heading(columna, text=titulo)
+            self.tree.column(columna, width=ancho)
+            if columna in self.orden_columnas:
+                self.tree.heading(columna, command=lambda c=columna: self.ordenar(c))
+
+        self.scroll_y = ttk.Scrollbar(parent, orient="vertical", command=self.tree.yview)
+        self.scroll_x = ttk.Scrollbar(parent, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(yscrollcommand=self._al_desplazar, xscrollcommand=self.scroll_x.set)
+        self.scroll_y.pack(side="right", fill="y")
+        self.scroll_x.pack(side="bottom", fill="x")
+
+        self.estado = tk.Label(parent, text="", font=("Arial", 9, "italic"),
+                               bg=parent.cget("bg"), fg="#7F8C8D", anchor="w")
+        self.estado.pack(side="bottom", fill="x")
+
+        self._paginas = []
+        self._fin = False
+        self._hay_anteriores = False
+        self._cargando = False
+        self._generacion = 0
+        self._al_terminar = None
+
+    def recargar(self, al_terminar=None):
+        """Vaciar la tabla y volver a cargar desde la primera página
+
+        ``al_terminar(cantidad)`` se llama al recibir la primera página.
+        """
+        self._generacion += 1
+        if self.ejecutor:
+            self.ejecutor.cancelar(self._grupo)
+        hijos = self.tree.get_children()
+        if hijos:
+            self.tree.delete(*hijos)
+        self._paginas = []
+        self._fin = False
+        self._hay_anteriores = False
+        self._cargando = False
+        self._al_terminar = al_terminar
+        self._cargar()
+
+    def ordenar(self, columna):
+        """Ordenar por una columna con ORDER BY en el servidor (el segundo clic invierte el orden)"""
+        nombre = self.orden_columnas[columna]
+        if self.fuente.orden == nombre:
+            descendente = not self.fuente.descendente
+        else:
+            descendente = False
+        self.fuente.ordenar_por(nombre, descendente)
+        for c, titulo in self._titulos.items():
+            flecha = (" ▼" if descendente else " ▲") if c == columna else ""
+            self.tree.heading(c, text=titulo + flecha)
+        self.recargar()
+
+    def _cargar(self, hacia_atras=False):
+        if self._cargando:
+            return
+        if hacia_atras:
+            if not self._hay_anteriores or not self._paginas:
+                return
+            desde = self._paginas[0]['primera']
+        else:
+            if self._fin:
+                return
+            desde = self._paginas[-1]['ultima'] if self._paginas else None
+
+        self._cargando = True
+        self.estado.config(text="Cargando...")
+        generacion = self._generacion
+
+        def consultar():
+            return self.fuente.pagina(desde, hacia_atras, self.tamano_pagina)
+
+        def recibir(filas):
+            if generacion != self._generacion or not self.tree.winfo_exists():
+                return
+            self._cargando = False
+            self._agregar_pagina(filas, hacia_atras)
+
+        def fallar(error):
+            if generacion != self._generacion or not self.tree.winfo_exists():
+                return
+            self._cargando = False
+            self.estado.config(text=f"Error al cargar datos: {error}")
+
+        if self.ejecutor:
+            self.ejecutor.enviar(consultar, recibir, fallar, grupo=self._grupo)
+        else:
+            try:
+                recibir(consultar())
+            except Exception as e:
+                fallar(e)
+
+    def _insertar(self, fila, posicion):
+        valores, tags = self.formatear_fila(fila)
+        return self.tree.insert("", posicion, values=valores, tags=tags)
+
+    def _agregar_pagina(self, filas, hacia_atras):
+        completa = len(filas) >= self.tamano_pagina
+        if filas:
+            ancla = self._fila_visible()
+            if hacia_atras:
+                iids = [self._insertar(fila, i) for i, fila in enumerate(filas)]
+                self._paginas.insert(0, self._pagina(filas, iids))
+                self._hay_anteriores = completa
+                if len(self._paginas) > self.max_paginas:
+                    descartada = self._paginas.pop()
+                    self.tree.delete(*descartada['iids'])
+                    self._fin = False
+            else:
+                iids = [self._insertar(fila, "end") for fila in filas]
+                self._paginas.append(self._pagina(filas, iids))
+                self._fin = not completa
+                if len(self._paginas) > self.max_paginas:
+                    descartada = self._paginas.pop(0)
+                    self.tree.delete(*descartada['iids'])
+                    self._hay_anteriores = True
+            # Mantener en pantalla la misma fila tras agregar o descartar páginas
+            if ancla and self.tree.exists(ancla):
+                hijos = self.tree.get_children()
+                self.tree.yview_moveto(hijos.index(ancla) / max(1, len(hijos)))
+        elif hacia_atras:
+            self._hay_anteriores = False
+        else:
+            self._fin = True
+
+        cantidad = len(self.tree.get_children())
+        self.estado.config(text=f"{cantidad} filas cargadas" + ("" if self._fin else " (desplácese para ver más)"))
+
+        if self._al_terminar:
+            al_terminar, self._al_terminar = self._al_terminar, None
+            al_terminar(len(filas))
+
+    def _pagina(self, filas, iids):
+        return {
+            'iids': iids,
+            'primera': self.fuente.clave_de(filas[0]),
+            'ultima': self.fuente.clave_de(filas[-1]),
+        }
+
+    def _fila_visible(self):
+        hijos = self.tree.get_children()
+        if not hijos:
+            return None
+        inicio = float(self.tree.yview()[0])
+        return hijos[min(len(hijos) - 1, int(inicio * len(hijos)))]
+
+    def _al_desplazar(self, inicio, fin):
+        self.scroll_y.set(inicio, fin)
+        if self._cargando:
+            return
+        # Pedir más filas al acercarse a cualquiera de los dos extremos de la ventana cargada
+        if float(fin) >= 0.95 and not self._fin:
+            self.tree.after_idle(self._cargar)
+        elif float(inicio) <= 0.05 and self._hay_anteriores:
+            self.tree.after_idle(lambda: self._cargar(True))
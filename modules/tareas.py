@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Ejecución de consultas en segundo plano para la interfaz Tkinter
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class EjecutorTareas:
+    """Ejecuta funciones de acceso a datos fuera del hilo de Tk.
+
+    Los resultados se depositan en una cola que el hilo principal vacía con
+    ``root.after``; así los callbacks siempre corren en el hilo de Tk. Cada
+    tarea pertenece a un grupo (por ejemplo ``"vista"``): al cancelar un grupo
+    se descartan los resultados pendientes de ese grupo, de modo que una
+    consulta lenta de una vista anterior no pinta sobre la vista actual.
+    """
+
+    def __init__(self, root, max_workers=4, intervalo_ms=30):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nexus-db")
+        self._resultados = queue.Queue()
+        self._generaciones = {}
+        self._futuros = {}
+        self._pendientes = 0
+        self._sondeo_activo = False
+        self._lock = threading.Lock()
+
+    def enviar(self, funcion, al_terminar=None, al_fallar=None, grupo="vista"):
+        """Ejecutar ``funcion()`` en el pool y llamar ``al_terminar(resultado)`` en el hilo de Tk"""
+        generacion = self._generaciones.get(grupo, 0)
+        futuro = self._executor.submit(self._ejecutar, funcion, grupo, generacion, al_terminar, al_fallar)
+        with self._lock:
+            self._futuros.setdefault(grupo, set()).add(futuro)
+        futuro.add_done_callback(lambda f, g=grupo: self._olvidar(g, f))
+        self._pendientes += 1
+        self._programar_sondeo()
+        return futuro
+
+    def cancelar(self, grupo="vista"):
+        """Descartar todas las tareas en curso o pendientes de un grupo"""
+        self._generaciones[grupo] = self._generaciones.get(grupo, 0) + 1
+        with self._lock:
+            futuros = list(self._futuros.get(grupo, ()))
+        for futuro in futuros:
+            # Las que aún no empezaron no llegan a ejecutarse; las demás se ignoran al terminar
+            if futuro.cancel():
+                self._pendientes -= 1
+
+    def cerrar(self):
+        """Detener el pool sin esperar a las consultas en curso"""
+        for grupo in list(self._generaciones):
+            self._generaciones[grupo] += 1
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _olvidar(self, grupo, futuro):
+        with self._lock:
+            futuros = self._futuros.get(grupo)
+            if futuros is not None:
+                futuros.discard(futuro)
+
+    def _ejecutar(self, funcion, grupo, generacion, al_terminar, al_fallar):
+        try:
+            resultado = funcion()
+            self._resultados.put((grupo, generacion, al_terminar, resultado, None, al_fallar))
+        except Exception as e:
+            self._resultados.put((grupo, generacion, al_terminar, None, e, al_fallar))
+
+    def _programar_sondeo(self):
+        if not self._sondeo_activo:
+            try:
+                self.root.after(self.intervalo_ms, self._procesar)
+                self._sondeo_activo = True
+            except Exception:
+                # La ventana principal ya fue destruida
+                pass
+
+    def _procesar(self):
+        """Entregar en el hilo de Tk los resultados que ya estén listos"""
+        self._sondeo_activo = False
+        while True:
+            try:
+                grupo, generacion, al_terminar, resultado, error, al_fallar = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendientes -= 1
+            if generacion != self._generaciones.get(grupo, 0):
+                continue
+            try:
+                if error is not None:
+                    if al_fallar:
+                        al_fallar(error)
+                    else:
+                        print(f"Error en tarea de segundo plano: {error}")
+                elif al_terminar:
+                    al_terminar(resultado)
+            except Exception as e:
+                print(f"Error procesando resultado de tarea: {e}")
+        if self._pendientes > 0:
+            self._programar_sondeo()
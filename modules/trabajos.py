@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Cola de trabajos de reportes en segundo plano con progreso y cancelación
+"""
+
+import itertools
+import queue
+import threading
+import time
+
+
+class TrabajoCancelado(Exception):
+    """Se lanza dentro de un trabajo cuando el usuario lo cancela"""
+
+
+class Trabajo:
+    """Un reporte en la cola: estado, progreso y resultado.
+
+    La función del trabajo recibe este objeto y llama ``avanzar(filas=..., paginas=...)``
+    a medida que produce salida; esa misma llamada lanza ``TrabajoCancelado`` si el
+    usuario pidió cancelar, de modo que el trabajo se detiene en el siguiente lote.
+    """
+
+    PENDIENTE = "pendiente"
+    EJECUTANDO = "ejecutando"
+    COMPLETADO = "completado"
+    CANCELADO = "cancelado"
+    ERROR = "error"
+
+    _ids = itertools.count(1)
+
+    def __init__(self, cola, descripcion, funcion, al_terminar=None, al_fallar=None):
+        self.id = next(self._ids)
+        self.descripcion = descripcion
+        self.funcion = funcion
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.estado = self.PENDIENTE
+        self.progreso = {}
+        self.resultado = None
+        self.error = None
+        self.inicio = None
+        self.fin = None
+        self._cola = cola
+        self._cancelado = threading.Event()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    @property
+    def activo(self):
+        return self.estado in (self.PENDIENTE, self.EJECUTANDO)
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    def comprobar(self):
+        if self._cancelado.is_set():
+            raise TrabajoCancelado()
+
+    def avanzar(self, **progreso):
+        """Informar el avance (desde el hilo del trabajo) y cortar si fue cancelado"""
+        self.comprobar()
+        self._cola._notificar(self, progreso)
+
+    def texto_progreso(self):
+        partes = []
+        if 'filas' in self.progreso:
+            partes.append(f"{self.progreso['filas']} filas")
+        if 'paginas' in self.progreso:
+            partes.append(f"{self.progreso['paginas']} páginas")
+        if 'texto' in self.progreso:
+            partes.append(str(self.progreso['texto']))
+        return ", ".join(partes)
+
+
+class ColaTrabajos:
+    """Ejecuta los trabajos de reportes de a uno, en orden, en un hilo de fondo.
+
+    Igual que ``EjecutorTareas``, los cambios de estado y progreso se pasan al hilo
+    de Tk por una cola que se vacía con ``root.after``: ``al_cambiar(trabajo)`` y los
+    callbacks de cada trabajo siempre corren en el hilo de la interfaz.
+    """
+
+    def __init__(self, root, al_cambiar=None, intervalo_ms=100):
+        self.root = root
+        self.al_cambiar = al_cambiar
+        self.intervalo_ms = intervalo_ms
+        self._trabajos = []
+        self._pendientes = queue.Queue()
+        self._eventos = queue.Queue()
+        self._lock = threading.Lock()
+        self._sondeo_activo = False
+        self._cerrado = False
+        # Trabajos cuyo final todavía no se entregó en el hilo de Tk
+        self._sin_entregar = set()
+        self._hilo = threading.Thread(target=self._ejecutar, name="nexus-reportes", daemon=True)
+        self._hilo.start()
+
+    def encolar(self, descripcion, funcion, al_terminar=None, al_fallar=None):
+        """Agregar un trabajo; ``funcion(trabajo)`` corre en el hilo de fondo"""
+        trabajo = Trabajo(self, descripcion, funcion, al_terminar, al_fallar)
+        with self._lock:
+            self._trabajos.append(trabajo)
+        self._sin_entregar.add(trabajo.id)
+        self._pendientes.put(trabajo)
+        self._notificar(trabajo, None)
+        return trabajo
+
+    def trabajos(self):
+        with self._lock:
+            return list(self._trabajos)
+
+    def activos(self):
+        return [t for t in self.trabajos() if t.activo]
+
+    def cancelar(self, trabajo_id):
+        for trabajo in self.trabajos():
+            if trabajo.id == trabajo_id:
+                trabajo.cancelar()
+                self._notificar(trabajo, None)
+
+    def cancelar_todos(self):
+        for trabajo in self.activos():
+            trabajo.cancelar()
+
+    def limpiar_terminados(self):
+        with self._lock:
+            self._trabajos = [t for t in self._trabajos if t.activo]
+
+    def cerrar(self):
+        self._cerrado = True
+        self.cancelar_todos()
+        self._pendientes.put(None)
+
+    def _ejecutar(self):
+        while True:
+            trabajo = self._pendientes.get()
+            if trabajo is None:
+                return
+            if trabajo.cancelado:
+                trabajo.estado = Trabajo.CANCELADO
+                self._notificar(trabajo, None)
+                continue
+            trabajo.estado = Trabajo.EJECUTANDO
+            trabajo.inicio = time.monotonic()
+            self._notificar(trabajo, None)
+            try:
+                trabajo.resultado = trabajo.funcion(trabajo)
+                trabajo.estado = Trabajo.CANCELADO if trabajo.cancelado else Trabajo.COMPLETADO
+            except TrabajoCancelado:
+                trabajo.estado = Trabajo.CANCELADO
+            except Exception as e:
+                trabajo.error = e
+                trabajo.estado = Trabajo.ERROR
+            trabajo.fin = time.monotonic()
+            self._notificar(trabajo, None)
+
+    def _notificar(self, trabajo, progreso):
+        self._eventos.put((trabajo, progreso))
+        # Programar el sondeo desde el hilo de Tk; desde otros hilos basta con dejar el evento
+        if threading.current_thread() is threading.main_thread():
+            self._programar_sondeo()
+
+    def _programar_sondeo(self):
+        if not self._sondeo_activo and not self._cerrado:
+            try:
+                self.root.after(self.intervalo_ms, self._procesar)
+                self._sondeo_activo = True
+            except Exception:
+                # La ventana principal ya fue destruida
+                pass
+
+    def _procesar(self):
+        """Aplicar en el hilo de Tk los cambios de estado y progreso acumulados"""
+        self._sondeo_activo = False
+        cambiados = {}
+        terminados = []
+        while True:
+            try:
+                trabajo, progreso = self._eventos.get_nowait()
+            except queue.Empty:
+                break
+            if progreso:
+                trabajo.progreso.update(progreso)
+            cambiados[trabajo.id] = trabajo
+            if not trabajo.activo and trabajo.id in self._sin_entregar:
+                self._sin_entregar.discard(trabajo.id)
+                terminados.append(trabajo)
+
+        for trabajo in cambiados.values():
+            if self.al_cambiar:
+                try:
+                    self.al_cambiar(trabajo)
+                except Exception as e:
+                    print(f"Error actualizando el estado del trabajo: {e}")
+
+        for trabajo in terminados:
+            try:
+                if trabajo.estado == Trabajo.COMPLETADO and trabajo.al_terminar:
+                    trabajo.al_terminar(trabajo.resultado)
+                elif trabajo.estado == Trabajo.ERROR:
+                    if trabajo.al_fallar:
+                        trabajo.al_fallar(trabajo.error)
+                    else:
+                        print(f"Error en el trabajo {trabajo.descripcion}: {trabajo.error}")
+            except Exception as e:
+                print(f"Error procesando resultado del trabajo: {e}")
+
+        if self._sin_entregar or not self._eventos.empty():
+            self._programar_sondeo()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Configuración del sistema (tabla configuracion) leída una vez y servida desde memoria
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from nexus_core import versiones
+
+# (clave, valor, descripción) que se crean si faltan al inicializar la base
+PREDETERMINADOS: List[Tuple[str, str, str]] = [
+    ('tema_actual', 'claro', 'Tema actual de la aplicación'),
+    ('moneda', 'S/', 'Símbolo de moneda (Soles peruanos)'),
+    ('stock_minimo_predeterminado', '10', 'Stock mínimo predeterminado'),
+    ('respaldo_automatico', 'diario', 'Frecuencia de respaldo automático'),
+    ('cafeteria_nombre', 'Nexus Coffee', 'Nombre de la cafetería'),
+    ('cafeteria_direccion', 'Av. Principal 123, Lima, Perú', 'Dirección de la cafetería'),
+    ('cafeteria_telefono', '01-2345678', 'Teléfono de la cafetería'),
+    ('cafeteria_email', 'info@nexuscafe.com', 'Email de la cafetería'),
+    ('cafeteria_ruc', '12345678901', 'RUC de la cafetería'),
+]
+
+
+def sembrar_predeterminados(cursor, con_descripcion: bool = True) -> None:
+    # Un solo INSERT IGNORE de varias filas: las claves existentes (UNIQUE) no se tocan
+    if con_descripcion:
+        filas = PREDETERMINADOS
+        columnas, marcador = "clave, valor, descripcion", "(%s, %s, %s)"
+    else:
+        filas = [(clave, valor) for clave, valor, _ in PREDETERMINADOS]
+        columnas, marcador = "clave, valor", "(%s, %s)"
+    cursor.execute(
+        f"INSERT IGNORE INTO configuracion ({columnas}) VALUES {', '.join([marcador] * len(filas))}",
+        tuple(v for fila in filas for v in fila),
+    )
+
+
+class ConfigStore:
+    # Todas las claves se leen con una sola consulta y se sirven desde memoria. Se vuelven a
+    # leer solo si la tabla cambió por otro camino (versiones.version("configuracion")).
+    # ``ejecutar(query, params)`` es DatabaseManager.ejecutar_query o MySQLDatabase.execute.
+
+    def __init__(self, ejecutar: Callable[..., Any]):
+        self.ejecutar = ejecutar
+        self._valores: Optional[Dict[str, str]] = None
+        self._version: Optional[Tuple[int, ...]] = None
+        self._lock = threading.Lock()
+
+    def cargar(self) -> Dict[str, str]:
+        with self._lock:
+            version = versiones.version("configuracion")
+            try:
+                filas = self.ejecutar("SELECT clave, valor FROM configuracion")
+            except Exception as e:
+                print(f"Error cargando configuración: {e}")
+                filas = None
+            if filas is None:
+                # Sin base: valores predeterminados hasta el próximo intento
+                return {clave: valor for clave, valor, _ in PREDETERMINADOS}
+            self._valores = {clave: valor for clave, valor in filas}
+            self._version = version
+            return self._valores
+
+    def _actuales(self) -> Dict[str, str]:
+        valores = self._valores
+        if valores is None or self._version != versiones.version("configuracion"):
+            valores = self.cargar()
+        return valores
+
+    def todas(self) -> Dict[str, str]:
+        return dict(self._actuales())
+
+    def obtener(self, clave: str, defecto: Optional[str] = None) -> Optional[str]:
+        return self._actuales().get(clave, defecto)
+
+    def moneda(self) -> str:
+        return self.obtener('moneda') or "S/"
+
+    def actualizar(self, valores: Dict[str, Any]) -> bool:
+        # Escritura directa: un INSERT ... ON DUPLICATE KEY UPDATE de varias filas y luego la memoria
+        if not valores:
+            return True
+        filas = [(str(clave), "" if valor is None else str(valor)) for clave, valor in valores.items()]
+        with self._lock:
+            resultado = self.ejecutar(
+                f"""
+                INSERT INTO configuracion (clave, valor) VALUES {', '.join(['(%s, %s)'] * len(filas))}
+                ON DUPLICATE KEY UPDATE valor = VALUES(valor)
+                """,
+                tuple(v for fila in filas for v in fila),
+            )
+            if resultado is None:
+                return False
+            if self._valores is not None:
+                self._valores = {**self._valores, **dict(filas)}
+                # La escritura propia ya está en memoria: no hace falta releer la tabla
+                self._version = versiones.version("configuracion")
+            return True
@@ -3,14 +3,23 @@
 Módulo de acceso a datos MySQL centralizado
 """
 
+import time
+from contextlib import contextmanager
+
 import mysql.connector
 from mysql.connector import Error
-from typing import Any, Dict, Iterable, Optional, Tuple, Union, List
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union, List
+
+from nexus_core import versiones
+from nexus_core.instrumentacion import CursorMedido, Medicion, obtener_instrumentacion
+from nexus_core.pool import obtener_pool, es_error_conexion
 
 
 class MySQLDatabase:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        # Pool compartido con cualquier otra instancia que use la misma configuración
+        self.pool = obtener_pool(config)
 
     def check_connection(self) -> bool:
         try:
@@ -26,33 +35,120 @@ class MySQLDatabase:
             return False
 
     def execute(self, query: str, params: Optional[Union[Tuple[Any, ...], List[Any]]] = None):
-        conn = None
+        upper = query.strip().upper()
+        for intento in range(2):
+            conn = None
+            cursor = None
+            descartar = False
+            confirmando = False
+            medicion = Medicion(query)
+            try:
+                conn = self.pool.obtener()
+                medicion.conexion_lista()
+                cursor = conn.cursor()
+
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+                if upper.startswith("INSERT"):
+                    confirmando = True
+                    conn.commit()
+                    medicion.terminar(cursor.rowcount)
+                    versiones.registrar_escritura(query)
+                    return cursor.lastrowid
+                if upper.startswith("UPDATE") or upper.startswith("DELETE"):
+                    confirmando = True
+                    conn.commit()
+                    medicion.terminar(cursor.rowcount)
+                    versiones.registrar_escritura(query)
+                    return cursor.rowcount
+                filas = cursor.fetchall()
+                medicion.terminar(len(filas))
+                return filas
+            except Error as e:
+                medicion.terminar(error=e)
+                if conn is not None and es_error_conexion(e):
+                    descartar = True
+                    # Reintentar una vez con una conexión nueva salvo que el COMMIT
+                    # ya se hubiera enviado (podría haberse aplicado)
+                    if intento == 0 and not confirmando:
+                        continue
+                elif conn:
+                    conn.rollback()
+                raise e
+            finally:
+                if cursor:
+                    try:
+                        cursor.close()
+                    except Error:
+                        descartar = True
+                self.pool.liberar(conn, descartar=descartar)
+
+    def iter_query(self, query: str, params: Optional[Union[Tuple[Any, ...], List[Any]]] = None,
+                   batch: int = 1000) -> Iterator[Tuple[Any, ...]]:
+        # Cursor sin búfer + fetchmany: MySQL envía las filas a medida que se consumen y en
+        # memoria solo queda un lote. La conexión sigue prestada hasta agotar o cerrar el
+        # generador; si se abandona con filas sin leer se descarta en vez de volver al pool.
+        # Se mide solo el tiempo en execute y fetchmany, no el que el consumidor dedica a cada lote
+        medicion = Medicion(query)
+        conn = self.pool.obtener()
+        medicion.conexion_lista()
         cursor = None
+        completo = False
+        filas = 0
+        error = None
         try:
-            conn = mysql.connector.connect(**self.config)
-            cursor = conn.cursor()
-
+            cursor = conn.cursor(buffered=False)
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-
-            upper = query.strip().upper()
-            if upper.startswith("INSERT"):
-                conn.commit()
-                return cursor.lastrowid
-            if upper.startswith("UPDATE") or upper.startswith("DELETE"):
-                conn.commit()
-                return cursor.rowcount
-            return cursor.fetchall()
+            while True:
+                lote = cursor.fetchmany(batch)
+                if not lote:
+                    break
+                filas += len(lote)
+                medicion.pausar()
+                yield from lote
+                medicion.reanudar()
+            completo = True
         except Error as e:
-            if conn:
-                conn.rollback()
-            raise e
+            error = e
+            raise
         finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+            # Abandonado a medias: el cronómetro quedó pausado en el último lote entregado
+            medicion.terminar(filas, error=error, pausada=not completo and error is None)
+            if cursor is not None and completo:
+                try:
+                    cursor.close()
+                except Error:
+                    completo = False
+            self.pool.liberar(conn, descartar=not completo)
 
+    @contextmanager
+    def transaction(self):
+        """Cursor sobre una única conexión del pool: COMMIT al salir, ROLLBACK ante cualquier error"""
+        inicio = time.perf_counter()
+        with self.pool.conexion() as conn:
+            # Cada sentencia de la transacción queda registrada en la instrumentación
+            cursor = CursorMedido(conn.cursor(), espera=time.perf_counter() - inicio)
+            try:
+                conn.start_transaction()
+                yield cursor
+                inicio = time.perf_counter()
+                conn.commit()
+                obtener_instrumentacion().registrar("COMMIT", time.perf_counter() - inicio)
+            except Exception:
+                try:
+                    conn.rollback()
+                except Error:
+                    pass
+                raise
+            finally:
+                try:
+                    cursor.close()
+                except Error:
+                    pass
 
@@ -15,6 +15,14 @@ DEFAULT_CONFIG = {
 }
 
 
+DEFAULT_POOL_CONFIG = {
+    'size': 5,
+    'max_idle': 300.0,
+    'ping_on_borrow': True,
+    'timeout': 10.0,
+}
+
+
 def get_mysql_config() -> Dict[str, Any]:
     # 1) Intentar leer de variables de entorno
     cfg = {
@@ -47,3 +55,12 @@ def get_mysql_config() -> Dict[str, Any]:
     return cfg
 
 
+def get_pool_config() -> Dict[str, Any]:
+    # Parámetros del pool de conexiones (sobrescribibles por variables de entorno)
+    return {
+        'size': int(os.getenv('MYSQL_POOL_SIZE', DEFAULT_POOL_CONFIG['size'])),
+        'max_idle': float(os.getenv('MYSQL_POOL_MAX_IDLE', DEFAULT_POOL_CONFIG['max_idle'])),
+        'ping_on_borrow': os.getenv('MYSQL_POOL_PING', '1') not in ('0', 'false', 'False'),
+        'timeout': float(os.getenv('MYSQL_POOL_TIMEOUT', DEFAULT_POOL_CONFIG['timeout'])),
+    }
+
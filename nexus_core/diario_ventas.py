@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Diario local de ventas (SQLite en modo WAL): la caja cobra sin esperar a MySQL
+"""
+
+import datetime
+import json
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+# Estados de una venta del diario
+PENDIENTE = "pendiente"
+SINCRONIZADA = "sincronizada"
+ERROR = "error"
+# Registrada en MySQL, pero sin stock suficiente para alguna línea: queda a la vista hasta que se revise
+CONFLICTO = "conflicto"
+
+# Intentos fallidos (por errores de datos, no de conexión) antes de dejar la venta en ERROR
+MAX_INTENTOS = 5
+
+
+class DiarioVentas:
+    # Cada cobro se confirma primero aquí (un INSERT con fsync en un archivo local) y luego
+    # SincronizadorVentas lo registra en MySQL con su clave de idempotencia. También guarda
+    # una copia del catálogo y de los usuarios que iniciaron sesión, para poder abrir la
+    # caja sin conexión.
+
+    ESQUEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS ventas_pendientes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            clave TEXT NOT NULL UNIQUE,
+            cliente TEXT NOT NULL,
+            cliente_id INTEGER,
+            usuario_id INTEGER,
+            items TEXT NOT NULL,
+            total REAL NOT NULL,
+            fecha TEXT NOT NULL,
+            estado TEXT NOT NULL DEFAULT 'pendiente',
+            intentos INTEGER NOT NULL DEFAULT 0,
+            ultimo_error TEXT,
+            venta_id INTEGER,
+            sincronizada TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_pendientes_estado ON ventas_pendientes (estado, id)",
+        """
+        CREATE TABLE IF NOT EXISTS productos_locales (
+            id INTEGER PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            categoria TEXT,
+            precio REAL NOT NULL,
+            stock INTEGER NOT NULL,
+            stock_minimo INTEGER,
+            codigo_barras TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS usuarios_locales (
+            username TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            nombre TEXT,
+            rol TEXT
+        )
+        """,
+    ]
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        # WAL: los lectores (contadores de la interfaz) no bloquean al que escribe; FULL hace
+        # fsync en cada COMMIT, así una venta cobrada sobrevive a un corte de energía
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        with self._lock:
+            for sentencia in self.ESQUEMA:
+                self._conn.execute(sentencia)
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Ventas ---
+
+    def registrar(self, cliente: str, items: List[Tuple[int, int, float]], usuario_id: Optional[int],
+                  cliente_id: Optional[int] = None, clave: Optional[str] = None) -> str:
+        # items = [(producto_id, cantidad, precio_unitario)]; devuelve la clave de idempotencia
+        # (la de las reservas de stock de la venta, si se pasa)
+        lineas = [(int(pid), int(cant), float(precio)) for pid, cant, precio in items]
+        if not lineas:
+            raise ValueError("La venta no tiene productos")
+        clave = clave or str(uuid.uuid4())
+        total = round(sum(cant * precio for _, cant, precio in lineas), 2)
+        fecha = datetime.datetime.now().replace(microsecond=0).isoformat(sep=" ")
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO ventas_pendientes (clave, cliente, cliente_id, usuario_id, items, total, fecha)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (clave, cliente, cliente_id, usuario_id, json.dumps(lineas), total, fecha),
+            )
+        return clave
+
+    def pendientes(self, limite: int = 50) -> List[Tuple[str, str, Optional[int], Optional[int],
+                                                      List[Tuple[int, int, float]], datetime.datetime]]:
+        # En el formato de VentaService.registrar_ventas_diferidas, en el orden en que se cobraron
+        with self._lock:
+            filas = self._conn.execute(
+                """
+                SELECT clave, cliente, cliente_id, usuario_id, items, fecha
+                FROM ventas_pendientes WHERE estado = ? ORDER BY id LIMIT ?
+                """,
+                (PENDIENTE, limite),
+            ).fetchall()
+        return [
+            (clave, cliente, cliente_id, usuario_id, [tuple(l) for l in json.loads(items)],
+             datetime.datetime.fromisoformat(fecha))
+            for clave, cliente, cliente_id, usuario_id, items, fecha in filas
+        ]
+
+    def marcar_sincronizadas(self, resultados: Dict[str, Tuple[int, List[Tuple[int, int, int]]]]) -> None:
+        # resultados = {clave: (venta_id, faltantes)}; las ventas con faltantes quedan en CONFLICTO
+        # con el detalle en ultimo_error, para conciliarlas
+        ahora = datetime.datetime.now().replace(microsecond=0).isoformat(sep=" ")
+        filas = []
+        for clave, (venta_id, faltantes) in resultados.items():
+            if faltantes:
+                nota = "Stock insuficiente al sincronizar: " + ", ".join(
+                    f"producto {pid}: vendido {pedido}, había {disp}" for pid, pedido, disp in faltantes
+                )
+                filas.append((CONFLICTO, venta_id, ahora, nota, clave))
+            else:
+                filas.append((SINCRONIZADA, venta_id, ahora, None, clave))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE ventas_pendientes SET estado = ?, venta_id = ?, sincronizada = ?, ultimo_error = ? WHERE clave = ?",
+                filas,
+            )
+            self._conn.execute("COMMIT")
+
+    def marcar_error(self, clave: str, error: str) -> None:
+        # Error de datos: se reintenta hasta MAX_INTENTOS veces y luego queda para revisión manual
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE ventas_pendientes
+                SET intentos = intentos + 1, ultimo_error = ?,
+                    estado = CASE WHEN intentos + 1 >= ? THEN ? ELSE estado END
+                WHERE clave = ?
+                """,
+                (error, MAX_INTENTOS, ERROR, clave),
+            )
+
+    def reintentar_errores(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE ventas_pendientes SET estado = ?, intentos = 0 WHERE estado = ?", (PENDIENTE, ERROR)
+            ).rowcount
+
+    def contar(self) -> Dict[str, int]:
+        with self._lock:
+            filas = self._conn.execute(
+                "SELECT estado, COUNT(*) FROM ventas_pendientes WHERE estado != ? GROUP BY estado", (SINCRONIZADA,)
+            ).fetchall()
+        conteo = {PENDIENTE: 0, ERROR: 0, CONFLICTO: 0}
+        conteo.update(dict(filas))
+        return conteo
+
+    def errores(self) -> List[Tuple[str, str, Optional[str]]]:
+        # Ventas que agotaron los reintentos: (fecha, cliente, último error)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT fecha, cliente, ultimo_error FROM ventas_pendientes WHERE estado = ? ORDER BY id", (ERROR,)
+            ).fetchall()
+
+    def conflictos(self) -> List[Tuple[str, str, str, Optional[int], str]]:
+        # Ventas registradas con faltantes sin revisar: (clave, fecha, cliente, venta_id, detalle)
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT clave, fecha, cliente, venta_id, ultimo_error
+                FROM ventas_pendientes WHERE estado = ? ORDER BY id
+                """,
+                (CONFLICTO,),
+            ).fetchall()
+
+    def resolver_conflictos(self, claves: List[str]) -> int:
+        # Conflictos revisados: pasan a SINCRONIZADA (el detalle queda en ultimo_error)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            cambiadas = self._conn.executemany(
+                "UPDATE ventas_pendientes SET estado = ? WHERE clave = ? AND estado = ?",
+                [(SINCRONIZADA, clave, CONFLICTO) for clave in claves],
+            ).rowcount
+            self._conn.execute("COMMIT")
+        return cambiadas
+
+    def descuentos_pendientes(self) -> Dict[int, int]:
+        # Unidades vendidas en caja que MySQL todavía no descontó: {producto_id: cantidad}
+        # (las ventas en CONFLICTO ya se descontaron al registrarse)
+        with self._lock:
+            filas = self._conn.execute(
+                "SELECT items FROM ventas_pendientes WHERE estado IN (?, ?)", (PENDIENTE, ERROR)
+            ).fetchall()
+        pedidos: Dict[int, int] = {}
+        for (items,) in filas:
+            for pid, cant, _ in json.loads(items):
+                pedidos[int(pid)] = pedidos.get(int(pid), 0) + int(cant)
+        return pedidos
+
+    def purgar(self, dias: int = 30) -> int:
+        limite = (datetime.datetime.now() - datetime.timedelta(days=dias)).isoformat(sep=" ")
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM ventas_pendientes WHERE estado = ? AND sincronizada < ?", (SINCRONIZADA, limite)
+            ).rowcount
+
+    # --- Copias para trabajar sin conexión ---
+
+    def guardar_productos(self, filas: List[Tuple[Any, ...]]) -> None:
+        # filas = (id, nombre, categoria, precio, stock, stock_minimo, codigo_barras)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM productos_locales")
+            self._conn.executemany(
+                "INSERT INTO productos_locales VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(int(f[0]), f[1], f[2], float(f[3]), int(f[4]), f[5], f[6]) for f in filas],
+            )
+            self._conn.execute("COMMIT")
+
+    def productos(self) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT id, nombre, categoria, precio, stock, stock_minimo, codigo_barras
+                FROM productos_locales ORDER BY nombre
+                """
+            ).fetchall()
+
+    def recordar_usuario(self, usuario: Dict[str, Any], password_hash: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO usuarios_locales (username, password, id, nombre, rol) VALUES (?, ?, ?, ?, ?)",
+                (usuario['username'], password_hash, usuario['id'], usuario['nombre'], usuario['rol']),
+            )
+
+    def hay_usuarios(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM usuarios_locales LIMIT 1").fetchone() is not None
+
+    def autenticar(self, username: str, password_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT id, username, nombre, rol FROM usuarios_locales WHERE username = ? AND password = ?",
+                (username, password_hash),
+            ).fetchone()
+        if fila is None:
+            return None
+        return {'id': fila[0], 'username': fila[1], 'nombre': fila[2], 'rol': fila[3]}
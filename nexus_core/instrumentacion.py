@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Instrumentación de consultas: latencia, filas, espera de conexión y origen de cada sentencia
+"""
+
+import datetime
+import functools
+import logging
+import logging.handlers
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Límites superiores (ms) de las cubetas del histograma; la última cubeta recoge el resto
+LIMITES_MS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+UMBRAL_LENTA_MS = float(os.getenv('NEXUS_CONSULTA_LENTA_MS', '200'))
+ARCHIVO_LENTAS = os.getenv(
+    'NEXUS_LOG_CONSULTAS',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'consultas_lentas.log'),
+)
+MAX_BYTES_LOG = 1024 * 1024
+RESPALDOS_LOG = 5
+
+# Archivos de la capa de datos: el origen de una consulta es el primer marco fuera de ellos
+_ARCHIVOS_INTERNOS = {
+    os.path.normcase(os.path.abspath(__file__)),
+    os.path.normcase(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db.py')),
+    os.path.normcase(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pool.py')),
+    os.path.normcase(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'modules', 'database.py')),
+}
+
+_CADENA = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMERO = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LISTA = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)")
+_FILAS = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_ESPACIOS = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=2048)
+def normalizar_consulta(query: str) -> str:
+    # Misma forma para consultas que solo difieren en literales, marcadores o largo de IN (...)
+    texto = _ESPACIOS.sub(" ", query).strip()
+    texto = _CADENA.sub("?", texto)
+    texto = _NUMERO.sub("?", texto)
+    texto = texto.replace("%s", "?")
+    texto = _LISTA.sub("(...)", texto)
+    return _FILAS.sub(r"\1", texto)
+
+
+def origen_consulta() -> str:
+    # "modulo.Clase.metodo" del primer marco de la pila que no pertenece a la capa de datos
+    marco = sys._getframe(1)
+    while marco is not None:
+        codigo = marco.f_code
+        if (os.path.normcase(codigo.co_filename) not in _ARCHIVOS_INTERNOS
+                and not codigo.co_filename.endswith('contextlib.py')):
+            modulo = marco.f_globals.get('__name__', '?')
+            return f"{modulo}.{getattr(codigo, 'co_qualname', codigo.co_name)}"
+        marco = marco.f_back
+    return "?"
+
+
+class EstadisticaConsulta:
+    # Histograma y acumulados de una consulta normalizada
+
+    def __init__(self, consulta: str):
+        self.consulta = consulta
+        self.llamadas = 0
+        self.errores = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.filas = 0
+        self.espera_s = 0.0
+        self.cubetas = [0] * (len(LIMITES_MS) + 1)
+        self.origenes: Counter = Counter()
+        self.ultima: Optional[float] = None
+
+    def registrar(self, segundos: float, filas: Optional[int], espera: float, origen: str, error: bool) -> None:
+        self.llamadas += 1
+        self.errores += 1 if error else 0
+        self.total_s += segundos
+        self.max_s = max(self.max_s, segundos)
+        self.filas += filas if filas and filas > 0 else 0
+        self.espera_s += espera
+        ms = segundos * 1000
+        indice = next((i for i, limite in enumerate(LIMITES_MS) if ms <= limite), len(LIMITES_MS))
+        self.cubetas[indice] += 1
+        self.origenes[origen] += 1
+        self.ultima = time.time()
+
+    def promedio_ms(self) -> float:
+        return self.total_s * 1000 / self.llamadas if self.llamadas else 0.0
+
+    def percentil_ms(self, p: float) -> float:
+        # Cota superior de la cubeta que contiene el percentil (el máximo si cae en la última)
+        objetivo = p * self.llamadas
+        acumulado = 0
+        for i, cantidad in enumerate(self.cubetas):
+            acumulado += cantidad
+            if cantidad and acumulado >= objetivo:
+                return min(LIMITES_MS[i], self.max_s * 1000) if i < len(LIMITES_MS) else self.max_s * 1000
+        return 0.0
+
+    def copia(self) -> 'EstadisticaConsulta':
+        otra = EstadisticaConsulta(self.consulta)
+        otra.__dict__.update(self.__dict__)
+        otra.cubetas = list(self.cubetas)
+        otra.origenes = Counter(self.origenes)
+        return otra
+
+
+class Instrumentacion:
+    # Registro de todas las sentencias ejecutadas por DatabaseManager y MySQLDatabase.
+    # Las que superan ``umbral_lenta_ms`` (y las que fallan) se escriben en un log rotativo.
+
+    CRITERIOS = {
+        "total": lambda e: e.total_s,
+        "promedio": lambda e: e.promedio_ms(),
+        "p95": lambda e: e.percentil_ms(0.95),
+        "maximo": lambda e: e.max_s,
+        "llamadas": lambda e: e.llamadas,
+        "filas": lambda e: e.filas,
+        "espera": lambda e: e.espera_s,
+    }
+
+    def __init__(self, umbral_lenta_ms: float = UMBRAL_LENTA_MS, archivo: Optional[str] = ARCHIVO_LENTAS):
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self.archivo = archivo
+        self.activa = True
+        self.desde = time.time()
+        self._lock = threading.Lock()
+        self._consultas: Dict[str, EstadisticaConsulta] = {}
+        self._log: Optional[logging.Logger] = None
+
+    def _logger(self) -> Optional[logging.Logger]:
+        # El archivo se abre recién con la primera consulta lenta
+        if self._log is None and self.archivo:
+            try:
+                os.makedirs(os.path.dirname(self.archivo), exist_ok=True)
+                manejador = logging.handlers.RotatingFileHandler(
+                    self.archivo, maxBytes=MAX_BYTES_LOG, backupCount=RESPALDOS_LOG, encoding='utf-8'
+                )
+            except OSError as e:
+                print(f"No se pudo abrir el log de consultas lentas: {e}")
+                self.archivo = None
+                return None
+            manejador.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            log = logging.getLogger("nexus.consultas_lentas")
+            log.setLevel(logging.INFO)
+            log.propagate = False
+            log.addHandler(manejador)
+            self._log = log
+        return self._log
+
+    def registrar(self, query: str, segundos: float, filas: Optional[int] = None, espera: float = 0.0,
+                  error: Optional[BaseException] = None, origen: Optional[str] = None) -> None:
+        if not self.activa:
+            return
+        consulta = normalizar_consulta(query)
+        origen = origen or origen_consulta()
+        with self._lock:
+            estadistica = self._consultas.get(consulta)
+            if estadistica is None:
+                estadistica = self._consultas[consulta] = EstadisticaConsulta(consulta)
+            estadistica.registrar(segundos, filas, espera, origen, error is not None)
+
+        ms = segundos * 1000
+        if error is not None or ms >= self.umbral_lenta_ms:
+            log = self._logger()
+            if log is not None:
+                nivel = logging.WARNING if error is not None else logging.INFO
+                log.log(nivel, "%.1f ms espera=%.1f ms filas=%s origen=%s%s | %s",
+                        ms, espera * 1000, filas, origen,
+                        f" error={error}" if error is not None else "", consulta)
+
+    def estadisticas(self) -> List[EstadisticaConsulta]:
+        with self._lock:
+            return [e.copia() for e in self._consultas.values()]
+
+    def principales(self, cantidad: int = 20, criterio: str = "total") -> List[EstadisticaConsulta]:
+        clave = self.CRITERIOS[criterio]
+        return sorted(self.estadisticas(), key=clave, reverse=True)[:cantidad]
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._consultas.clear()
+            self.desde = time.time()
+
+    def resumen(self) -> str:
+        estadisticas = self.estadisticas()
+        llamadas = sum(e.llamadas for e in estadisticas)
+        total_ms = sum(e.total_s for e in estadisticas) * 1000
+        inicio = datetime.datetime.fromtimestamp(self.desde).strftime("%d/%m/%Y %H:%M:%S")
+        return (f"{llamadas} consultas ({len(estadisticas)} distintas) desde {inicio}; "
+                f"{total_ms:.0f} ms en total; log de lentas (>= {self.umbral_lenta_ms:.0f} ms): {self.archivo or 'desactivado'}")
+
+
+class Medicion:
+    # Cronómetro de una sentencia: desde pedir la conexión hasta leer el resultado
+
+    def __init__(self, query: str):
+        self.query = query
+        self.inicio = time.perf_counter()
+        self.espera = 0.0
+        self.acumulado = 0.0
+
+    def conexion_lista(self) -> None:
+        # Tiempo de espera del pool; la latencia de la sentencia se cuenta desde aquí
+        ahora = time.perf_counter()
+        self.espera = ahora - self.inicio
+        self.inicio = ahora
+
+    def pausar(self) -> None:
+        # Para cursores por lotes: no contar el tiempo en que el consumidor procesa las filas
+        self.acumulado += time.perf_counter() - self.inicio
+
+    def reanudar(self) -> None:
+        self.inicio = time.perf_counter()
+
+    def terminar(self, filas: Optional[int] = None, error: Optional[BaseException] = None,
+                 pausada: bool = False) -> None:
+        segundos = self.acumulado + (0.0 if pausada else time.perf_counter() - self.inicio)
+        _instrumentacion.registrar(self.query, segundos, filas, self.espera, error)
+
+
+class CursorMedido:
+    # Envoltorio del cursor de MySQLDatabase.transaction(): mide execute y executemany
+
+    def __init__(self, cursor: Any, espera: float = 0.0):
+        self._cursor = cursor
+        self._espera = espera
+
+    def _registrar(self, query: str, inicio: float, error: Optional[BaseException] = None) -> None:
+        filas = getattr(self._cursor, 'rowcount', None)
+        # La espera por la conexión se atribuye a la primera sentencia de la transacción
+        _instrumentacion.registrar(query, time.perf_counter() - inicio,
+                                   filas if filas is not None and filas >= 0 else None,
+                                   self._espera, error)
+        self._espera = 0.0
+
+    def execute(self, query: str, params: Any = None, *args: Any, **kwargs: Any) -> Any:
+        inicio = time.perf_counter()
+        try:
+            resultado = self._cursor.execute(query, params, *args, **kwargs)
+        except Exception as e:
+            self._registrar(query, inicio, e)
+            raise
+        self._registrar(query, inicio)
+        return resultado
+
+    def executemany(self, query: str, filas: Any) -> Any:
+        inicio = time.perf_counter()
+        try:
+            resultado = self._cursor.executemany(query, filas)
+        except Exception as e:
+            self._registrar(query, inicio, e)
+            raise
+        self._registrar(query, inicio)
+        return resultado
+
+    def __getattr__(self, nombre: str) -> Any:
+        return getattr(self._cursor, nombre)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+_instrumentacion = Instrumentacion()
+
+
+def obtener_instrumentacion() -> Instrumentacion:
+    """Registro compartido por todas las conexiones del proceso"""
+    return _instrumentacion
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Pool de conexiones MySQL compartido por DatabaseManager y MySQLDatabase
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+
+import mysql.connector
+from mysql.connector import Error, errorcode
+
+
+# Errores de cliente que indican que la conexión física se perdió
+ERRORES_CONEXION = {
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_CONN_HOST_ERROR,
+    errorcode.CR_CONNECTION_ERROR,
+    2055,  # CR_SERVER_LOST_EXTENDED
+}
+
+
+def es_error_conexion(error: Exception) -> bool:
+    """Indica si el error corresponde a una conexión caída (y no a un error de SQL)"""
+    if isinstance(error, mysql.connector.errors.InterfaceError):
+        return True
+    return getattr(error, 'errno', None) in ERRORES_CONEXION
+
+
+class ConnectionPool:
+    """Pool de conexiones con verificación al prestar, expulsión por inactividad y reconexión"""
+
+    def __init__(self, config: Dict[str, Any], size: int = 5, max_idle: float = 300.0,
+                 ping_on_borrow: bool = True, timeout: float = 10.0):
+        self.config = dict(config)
+        self.size = max(1, int(size))
+        self.max_idle = max_idle
+        self.ping_on_borrow = ping_on_borrow
+        self.timeout = timeout
+
+        self._lock = threading.Condition()
+        # Conexiones libres: (conexión, instante en que se devolvió)
+        self._libres: List[Tuple[Any, float]] = []
+        self._creadas = 0
+
+    def _crear(self):
+        return mysql.connector.connect(**self.config)
+
+    def _cerrar_silencioso(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _esta_viva(self, conn) -> bool:
+        try:
+            conn.ping(reconnect=True, attempts=1, delay=0)
+            return True
+        except Error:
+            return False
+
+    def purgar_inactivas(self) -> int:
+        """Cerrar conexiones libres que superaron el tiempo máximo de inactividad"""
+        ahora = time.monotonic()
+        expulsadas = []
+        with self._lock:
+            vigentes = []
+            for conn, devuelta in self._libres:
+                if self.max_idle and ahora - devuelta > self.max_idle:
+                    expulsadas.append(conn)
+                else:
+                    vigentes.append((conn, devuelta))
+            self._libres = vigentes
+            self._creadas -= len(expulsadas)
+            if expulsadas:
+                self._lock.notify_all()
+        for conn in expulsadas:
+            self._cerrar_silencioso(conn)
+        return len(expulsadas)
+
+    def obtener(self):
+        """Prestar una conexión del pool (crea una nueva si hay cupo)"""
+        self.purgar_inactivas()
+        limite = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            crear = False
+            with self._lock:
+                if self._libres:
+                    # LIFO: la conexión más reciente tiene más probabilidad de seguir viva
+                    conn, _ = self._libres.pop()
+                elif self._creadas < self.size:
+                    self._creadas += 1
+                    crear = True
+                else:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise mysql.connector.errors.PoolError(
+                            f"No hay conexiones disponibles en el pool (tamaño {self.size})"
+                        )
+                    self._lock.wait(restante)
+                    continue
+
+            if crear:
+                try:
+                    return self._crear()
+                except Exception:
+                    with self._lock:
+                        self._creadas -= 1
+                        self._lock.notify()
+                    raise
+
+            if not self.ping_on_borrow or self._esta_viva(conn):
+                return conn
+
+            # La conexión murió mientras estaba libre: se reemplaza por una nueva
+            self._cerrar_silencioso(conn)
+            try:
+                return self._crear()
+            except Exception:
+                with self._lock:
+                    self._creadas -= 1
+                    self._lock.notify()
+                raise
+
+    def liberar(self, conn, descartar: bool = False) -> None:
+        """Devolver una conexión al pool; si está rota o se pide descartar, se cierra"""
+        if conn is None:
+            return
+        if not descartar:
+            try:
+                # No dejar transacciones (ni snapshots de lectura) abiertos entre préstamos
+                if conn.in_transaction:
+                    conn.rollback()
+            except Error:
+                descartar = True
+        if descartar:
+            self._cerrar_silencioso(conn)
+            with self._lock:
+                self._creadas -= 1
+                self._lock.notify()
+            return
+        with self._lock:
+            self._libres.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    @contextmanager
+    def conexion(self):
+        """Context manager que presta una conexión y la devuelve al salir"""
+        conn = self.obtener()
+        descartar = False
+        try:
+            yield conn
+        except Exception as e:
+            descartar = es_error_conexion(e)
+            raise
+        finally:
+            self.liberar(conn, descartar=descartar)
+
+    def cerrar(self) -> None:
+        """Cerrar todas las conexiones libres del pool"""
+        with self._lock:
+            libres = [c for c, _ in self._libres]
+            self._libres = []
+            self._creadas -= len(libres)
+            self._lock.notify_all()
+        for conn in libres:
+            self._cerrar_silencioso(conn)
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _clave_config(config: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in config.items()))
+
+
+def obtener_pool(config: Dict[str, Any], **opciones) -> ConnectionPool:
+    """Obtener el pool compartido para una configuración de conexión
+
+    Todas las instancias creadas con la misma configuración reutilizan el
+    mismo pool. Las opciones solo se aplican al crear el pool; si no se
+    indican se toman de ``get_pool_config()``.
+    """
+    clave = _clave_config(config)
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None:
+            if not opciones:
+                from nexus_core.db_config import get_pool_config
+                opciones = get_pool_config()
+            pool = ConnectionPool(config, **opciones)
+            _pools[clave] = pool
+        return pool
+
+
+def cerrar_pools() -> None:
+    """Cerrar todas las conexiones libres de todos los pools"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.cerrar()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Versión de los datos por tabla: aumenta con cada escritura confirmada desde la aplicación
+"""
+
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+
+_TABLA_ESCRITA = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+`?(\w+)`?",
+    re.IGNORECASE,
+)
+
+_lock = threading.Lock()
+_versiones: Dict[str, int] = {}
+
+
+def incrementar(*tablas: str) -> None:
+    with _lock:
+        for tabla in tablas:
+            clave = tabla.lower()
+            _versiones[clave] = _versiones.get(clave, 0) + 1
+
+
+def version(*tablas: str) -> Tuple[int, ...]:
+    # Sirve como parte de una clave de caché: cambia si alguna de las tablas fue modificada
+    with _lock:
+        return tuple(_versiones.get(tabla.lower(), 0) for tabla in tablas)
+
+
+def tabla_escrita(query: str) -> Optional[str]:
+    coincidencia = _TABLA_ESCRITA.match(query)
+    return coincidencia.group(1).lower() if coincidencia else None
+
+
+def registrar_escritura(query: str) -> None:
+    tabla = tabla_escrita(query)
+    if tabla:
+        incrementar(tabla)
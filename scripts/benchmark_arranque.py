@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+import os
+import sys
+import csv
+import json
+import argparse
+import datetime
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Uso: python scripts/benchmark_arranque.py [--repeticiones 5] [--login] [--registro arranque.csv]
+#
+# Mide con `python -X importtime` cuánto tarda en importarse main_modular y qué
+# bibliotecas pesadas arrastra. Con --login (requiere pantalla y MySQL) además
+# abre la aplicación y mide el tiempo hasta que la ventana de login está dibujada.
+
+PESADOS = ('matplotlib', 'pandas', 'reportlab', 'PIL', 'numpy')
+
+CODIGO_IMPORTACION = r'''
+import sys, time, json
+inicio = time.perf_counter()
+import main_modular
+fin = time.perf_counter()
+print(json.dumps({
+    "importacion": fin - inicio,
+    "pesados": [m for m in %(pesados)r if m in sys.modules],
+}))
+'''
+
+CODIGO_LOGIN = r'''
+import sys, time, json
+inicio = time.perf_counter()
+import tkinter as tk
+import main_modular
+
+original = main_modular.NexusCafeApp.mostrar_login
+
+def mostrar_login(self):
+    original(self)
+    self.root.update_idletasks()
+    self.root.update()
+    print(json.dumps({
+        "login": time.perf_counter() - inicio,
+        "pesados": [m for m in %(pesados)r if m in sys.modules],
+    }))
+    sys.stdout.flush()
+    self.root.after(0, self.root.destroy)
+
+main_modular.NexusCafeApp.mostrar_login = mostrar_login
+root = tk.Tk()
+main_modular.NexusCafeApp(root)
+'''
+
+
+def ejecutar(codigo):
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo % {'pesados': PESADOS}],
+        cwd=BASE_DIR, capture_output=True, text=True, timeout=120,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else 'error')
+    resultado = {}
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith('{'):
+            resultado = json.loads(linea)
+    resultado['modulos'] = leer_importtime(proceso.stderr)
+    return resultado
+
+
+def leer_importtime(salida):
+    # Líneas: "import time: self [us] | cumulative | imported package"; la sangría indica el anidamiento
+    modulos = {}
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        sangria = len(nombre) - len(nombre.lstrip())
+        if sangria <= 3:
+            modulos[nombre.strip()] = int(acumulado) / 1e6
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de Nexus Coffee")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--login', action='store_true', help="medir también el tiempo hasta la ventana de login")
+    parser.add_argument('--registro', help="archivo CSV al que agregar el resultado")
+    args = parser.parse_args()
+
+    tiempos = []
+    ultimo = None
+    for _ in range(max(1, args.repeticiones)):
+        try:
+            ultimo = ejecutar(CODIGO_IMPORTACION)
+        except Exception as e:
+            print('IMPORT_FAIL', e)
+            return
+        tiempos.append(ultimo['importacion'])
+    importacion = statistics.median(tiempos)
+    print('IMPORTACION_MEDIANA %.3f s (%d repeticiones)' % (importacion, len(tiempos)))
+    print('PESADOS_CARGADOS', ', '.join(ultimo['pesados']) or 'ninguno')
+    print('MODULOS_MAS_LENTOS')
+    for nombre, segundos in sorted(ultimo['modulos'].items(), key=lambda m: m[1], reverse=True)[:10]:
+        print('  %-45s %.3f s' % (nombre, segundos))
+
+    login = None
+    if args.login:
+        if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+            print('LOGIN_OMITIDO sin DISPLAY')
+        else:
+            try:
+                login = statistics.median(
+                    ejecutar(CODIGO_LOGIN)['login'] for _ in range(max(1, args.repeticiones))
+                )
+                print('LOGIN_MEDIANA %.3f s' % login)
+            except Exception as e:
+                print('LOGIN_FAIL', e)
+
+    if args.registro:
+        nuevo = not os.path.exists(args.registro)
+        with open(args.registro, 'a', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            if nuevo:
+                escritor.writerow(['fecha', 'importacion_s', 'login_s', 'pesados'])
+            escritor.writerow([
+                datetime.datetime.now().isoformat(timespec='seconds'),
+                '%.4f' % importacion,
+                '%.4f' % login if login is not None else '',
+                ' '.join(ultimo['pesados']),
+            ])
+        print('REGISTRO', args.registro)
+
+
+if __name__ == '__main__':
+    main()
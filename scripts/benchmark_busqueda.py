@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import random
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Uso: python scripts/benchmark_busqueda.py [--filas 100000] [--limite-ms 50]
+#
+# Arma el índice de búsqueda con productos y clientes sintéticos y simula a un
+# usuario escribiendo letra por letra: mide cada búsqueda (la que se hace al
+# terminar la espera de ESPERA_MS) y falla si el percentil 95 supera --limite-ms.
+
+PALABRAS = ["café", "moca", "latte", "capuchino", "té", "verde", "chocolate", "torta", "pan",
+            "queso", "jamón", "leche", "azúcar", "vainilla", "caramelo", "americano", "expreso",
+            "frío", "grande", "mediano", "chico", "galleta", "avena", "miel", "canela"]
+CATEGORIAS = ["Bebidas", "Postres", "Panadería", "Snacks", "Granos"]
+NOMBRES = ["Ana", "Luis", "María", "Jorge", "Rosa", "Carlos", "Lucía", "Pedro", "Sofía", "Miguel"]
+APELLIDOS = ["Torres", "Rojas", "Quispe", "Salas", "Mendoza", "Flores", "Huamán", "Castro", "Vargas"]
+
+BUSQUEDAS = ["cafe moca", "vainilla grande", "choc", "te verde", "Bebidas", "12345",
+             "maria quispe", "luis", "rojas", "gmail", "zz"]
+
+
+def productos_sinteticos(cantidad):
+    random.seed(cantidad)
+    return [(i, " ".join(random.sample(PALABRAS, 3)) + f" {i}", random.choice(CATEGORIAS))
+            for i in range(1, cantidad + 1)]
+
+
+def clientes_sinteticos(cantidad):
+    random.seed(cantidad + 1)
+    filas = []
+    for i in range(1, cantidad + 1):
+        nombre = f"{random.choice(NOMBRES)} {random.choice(APELLIDOS)} {random.choice(APELLIDOS)}"
+        filas.append((i, nombre, f"cliente{i}@{random.choice(['gmail.com', 'hotmail.com'])} 9{i:08d}"))
+    return filas
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la búsqueda incremental")
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--limite-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    try:
+        from modules.busqueda import IndiceBusqueda, MAX_IDS_FILTRO
+    except ImportError as e:
+        print('IMPORT_FAIL', e)
+        return
+
+    aprobado = True
+    for tabla, filas in (("productos", productos_sinteticos(args.filas)),
+                         ("clientes", clientes_sinteticos(args.filas))):
+        inicio = time.perf_counter()
+        indice = IndiceBusqueda(filas)
+        armado = time.perf_counter() - inicio
+
+        tiempos = []
+        peor = ("", 0.0)
+        for busqueda in BUSQUEDAS:
+            # Cada letra nueva es una búsqueda, como al escribir despacio
+            for n in range(1, len(busqueda) + 1):
+                texto = busqueda[:n]
+                inicio = time.perf_counter()
+                indice.buscar(texto, MAX_IDS_FILTRO)
+                ms = (time.perf_counter() - inicio) * 1000
+                tiempos.append(ms)
+                if ms > peor[1]:
+                    peor = (texto, ms)
+
+        p50, p95 = percentil(tiempos, 0.5), percentil(tiempos, 0.95)
+        print('%-10s %7d filas  índice %5.2f s  %4d búsquedas  p50 %6.2f ms  p95 %6.2f ms  peor %6.2f ms (%r)' % (
+            tabla.upper(), len(filas), armado, len(tiempos), p50, p95, peor[1], peor[0]))
+        aprobado = aprobado and p95 <= args.limite_ms
+
+    print('BENCHMARK_OK' if aprobado else 'BENCHMARK_LENTO')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import datetime
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Uso: python scripts/benchmark_pdf.py [--filas 1000 10000 100000] [--procesos 4]
+#                                      [--max-tabla-unica 10000] [--registro pdf.csv]
+#
+# Genera un reporte de ventas sintético con cada cantidad de filas en tres modos:
+#   tabla_unica  una sola Table con todas las filas (cómo se armaban antes los reportes)
+#   tramos       tablas de FILAS_POR_TRAMO filas en un solo proceso
+#   paralelo     partes de FILAS_POR_PARTE filas en varios procesos, unidas con pypdf
+# La tabla única crece muy mal con las filas; por encima de --max-tabla-unica se omite.
+
+
+def ventas_sinteticas(cantidad):
+    random.seed(cantidad)
+    inicio = datetime.datetime(2025, 1, 1, 8, 0)
+    clientes = ["Cliente General", "Ana Torres", "Luis Rojas", "María Quispe", "Jorge Salas"]
+    return [
+        (i, random.choice(clientes), random.randint(300, 9000) / 100,
+         inicio + datetime.timedelta(minutes=i * 3))
+        for i in range(1, cantidad + 1)
+    ]
+
+
+def data_ventas(ventas):
+    data = [["ID", "Cliente", "Total", "Fecha"]]
+    for v in ventas:
+        data.append([str(v[0]), v[1], f"S/ {v[2]:.2f}", v[3].strftime("%Y-%m-%d %H:%M")])
+    return data
+
+
+def tabla_unica(archivo, data):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+    from modules.pdf_grande import ESTILO_TABLA, Rendimiento
+
+    inicio = time.perf_counter()
+    paginas = [0]
+
+    def pagina_terminada(canvas, documento):
+        paginas[0] = canvas.getPageNumber()
+
+    tabla = Table(data)
+    tabla.setStyle(TableStyle(ESTILO_TABLA))
+    SimpleDocTemplate(archivo, pagesize=letter).build(
+        [tabla], onFirstPage=pagina_terminada, onLaterPages=pagina_terminada
+    )
+    return Rendimiento(len(data) - 1, paginas[0], time.perf_counter() - inicio, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reportes PDF grandes")
+    parser.add_argument('--filas', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--procesos', type=int, default=min(os.cpu_count() or 1, 4))
+    parser.add_argument('--max-tabla-unica', type=int, default=10000)
+    parser.add_argument('--registro', help="archivo CSV al que agregar los resultados")
+    args = parser.parse_args()
+
+    try:
+        from modules.pdf_grande import renderizar_reporte, pypdf_disponible
+    except ImportError as e:
+        print('IMPORT_FAIL', e)
+        return
+
+    paralelo = args.procesos > 1 and pypdf_disponible()
+    if not paralelo:
+        print('PARALELO_OMITIDO', 'pypdf no está instalado' if args.procesos > 1 else 'un solo proceso')
+
+    resultados = []
+    carpeta = tempfile.mkdtemp(prefix="nexus_benchmark_pdf_")
+    for cantidad in args.filas:
+        data = data_ventas(ventas_sinteticas(cantidad))
+        modos = []
+        if cantidad <= args.max_tabla_unica:
+            modos.append(('tabla_unica', lambda archivo: tabla_unica(archivo, data)))
+        modos.append(('tramos', lambda archivo: renderizar_reporte(
+            archivo, "REPORTE DE VENTAS", [], data, procesos=1)))
+        if paralelo:
+            modos.append(('paralelo', lambda archivo: renderizar_reporte(
+                archivo, "REPORTE DE VENTAS", [], data, procesos=args.procesos)))
+
+        for modo, generar in modos:
+            archivo = os.path.join(carpeta, f"{modo}_{cantidad}.pdf")
+            try:
+                rendimiento = generar(archivo)
+            except Exception as e:
+                print('PDF_FAIL', modo, cantidad, e)
+                continue
+            tamano = os.path.getsize(archivo) / 1e6
+            print('%-12s %7d filas  %5d páginas  %7.2f s  %8.0f filas/s  %6.1f pág/s  %5.1f MB  %d proc.' % (
+                modo.upper(), cantidad, rendimiento.paginas, rendimiento.segundos,
+                rendimiento.filas_por_segundo, rendimiento.paginas_por_segundo, tamano, rendimiento.procesos))
+            resultados.append((modo, rendimiento, tamano))
+            os.remove(archivo)
+    os.rmdir(carpeta)
+    print('BENCHMARK_OK' if resultados else 'BENCHMARK_FAIL')
+
+    if args.registro and resultados:
+        nuevo = not os.path.exists(args.registro)
+        fecha = datetime.datetime.now().isoformat(timespec='seconds')
+        with open(args.registro, 'a', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            if nuevo:
+                escritor.writerow(['fecha', 'modo', 'filas', 'paginas', 'segundos', 'filas_s', 'procesos', 'mb'])
+            for modo, r, tamano in resultados:
+                escritor.writerow([fecha, modo, r.filas, r.paginas, '%.3f' % r.segundos,
+                                   '%.0f' % r.filas_por_segundo, r.procesos, '%.2f' % tamano])
+        print('REGISTRO', args.registro)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import random
+import datetime
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Uso: python scripts/benchmark_suite.py [--base nexus_benchmark] [--productos 5000]
+#          [--clientes 100000] [--ventas 2000000] [--semilla 42] [--regenerar]
+#          [--salida resultados.json] [--comparar anterior.json] [--tolerancia 20]
+#
+# Llena una base aparte (nunca la de config_mysql.json) con datos sintéticos
+# reproducibles y mide los caminos reales de la aplicación: el cobro en caja (la
+# escritura en el diario local, DiarioVentas.registrar) y su registro en MySQL
+# (SincronizadorVentas.sincronizar_lote, por venta), las consultas de ventas y rankings de
+# modules.models, cada exportación de modules.exportacion y cada reporte PDF de
+# PDFGenerator. Los resultados quedan en un JSON; con --comparar se contrastan las
+# medianas contra otra corrida y se informa cada caso más lento que --tolerancia %.
+#
+# Los datos se generan una sola vez por combinación de semilla y volúmenes (queda
+# anotada en configuracion.benchmark_datos); --regenerar borra la base y la rehace.
+
+CATEGORIAS = ["Bebidas", "Postres", "Panadería", "Snacks", "Granos", "Sándwiches"]
+PALABRAS = ["café", "moca", "latte", "capuchino", "té", "verde", "chocolate", "torta", "pan",
+            "queso", "jamón", "leche", "azúcar", "vainilla", "caramelo", "americano", "expreso",
+            "frío", "grande", "mediano", "chico", "galleta", "avena", "miel", "canela"]
+NOMBRES = ["Ana", "Luis", "María", "Jorge", "Rosa", "Carlos", "Lucía", "Pedro", "Sofía", "Miguel"]
+APELLIDOS = ["Torres", "Rojas", "Quispe", "Salas", "Mendoza", "Flores", "Huamán", "Castro", "Vargas"]
+
+LOTE = 5000
+# Diferencias menores a esto se consideran ruido aunque superen la tolerancia relativa
+RUIDO_S = 0.005
+
+# Reportes de main_modular.encolar_reporte: (caso, formato de exportación, fuente, método de PDFGenerator)
+REPORTES = [
+    ("ventas", "ventas", lambda m, d, h: m['venta'].iterar_ventas_por_periodo(d, h), "generar_reporte_ventas"),
+    ("productos", "productos", lambda m, d, h: m['venta'].obtener_productos_mas_vendidos() or [], "generar_reporte_productos"),
+    ("inventario", "inventario", lambda m, d, h: m['producto'].iterar_todos(), "generar_reporte_inventario"),
+    ("clientes", "clientes", lambda m, d, h: m['cliente'].obtener_clientes_frecuentes() or [], "generar_reporte_clientes"),
+]
+# Exportaciones de los listados (exportar_ventas, exportar_productos, exportar_clientes)
+LISTADOS = [
+    ("listado_ventas", lambda m: m['venta'].iterar_todas()),
+    ("listado_productos", lambda m: m['producto'].iterar_todos()),
+    ("listado_clientes", lambda m: m['cliente'].iterar_todos()),
+]
+
+
+def marca_datos(args):
+    return f"semilla={args.semilla} productos={args.productos} clientes={args.clientes} ventas={args.ventas} dias={args.dias}"
+
+
+def insertar_lotes(db, query, filas):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= LOTE:
+            with db.transaction() as cursor:
+                cursor.executemany(query, lote)
+            lote = []
+    if lote:
+        with db.transaction() as cursor:
+            cursor.executemany(query, lote)
+
+
+def generar_datos(db, args, usuario_id):
+    """Productos, clientes, ventas y detalles sintéticos; misma semilla, mismos datos"""
+    azar = random.Random(args.semilla)
+
+    precios = {}
+    def productos():
+        for i in range(1, args.productos + 1):
+            precio = round(azar.uniform(2, 60), 1)
+            precios[i] = precio
+            # Stock amplio: el cobro en caja no debe quedarse sin unidades durante la medición
+            yield (i, " ".join(azar.sample(PALABRAS, 3)) + f" {i}", azar.choice(CATEGORIAS),
+                   precio, azar.randint(10000, 100000), azar.randint(5, 50), f"7750{i:09d}")
+    insertar_lotes(db, """
+        INSERT INTO productos (id, nombre, categoria, precio, stock, stock_minimo, codigo_barras)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, productos())
+
+    nombres = {}
+    def clientes():
+        for i in range(1, args.clientes + 1):
+            nombre = f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}"
+            nombres[i] = nombre
+            yield (i, nombre, f"cliente{i}@correo.com", f"9{i:08d}")
+    insertar_lotes(db, "INSERT INTO clientes (id, nombre, email, telefono) VALUES (%s, %s, %s, %s)", clientes())
+
+    # Ventas repartidas en los últimos --dias días, en orden de id como en producción;
+    # los clientes frecuentes siguen una distribución sesgada (pocos compran mucho)
+    fin = datetime.datetime.now().replace(microsecond=0)
+    inicio = fin - datetime.timedelta(days=args.dias)
+    paso = (fin - inicio).total_seconds() / max(1, args.ventas)
+    detalle_id = 0
+    for desde in range(1, args.ventas + 1, LOTE):
+        ventas, detalles = [], []
+        for venta_id in range(desde, min(desde + LOTE, args.ventas + 1)):
+            fecha = inicio + datetime.timedelta(seconds=int(venta_id * paso))
+            cliente_id = None if azar.random() < 0.3 else min(args.clientes, int(azar.paretovariate(1.2)) or 1)
+            total = 0.0
+            for producto_id in azar.sample(range(1, args.productos + 1), azar.randint(1, 4)):
+                cantidad = azar.randint(1, 3)
+                subtotal = round(cantidad * precios[producto_id], 2)
+                detalle_id += 1
+                detalles.append((detalle_id, venta_id, producto_id, cantidad, precios[producto_id], subtotal))
+                total += subtotal
+            nombre = nombres[cliente_id] if cliente_id else "Cliente General"
+            ventas.append((venta_id, nombre, cliente_id, round(total, 2), fecha, usuario_id))
+        with db.transaction() as cursor:
+            cursor.executemany(
+                "INSERT INTO ventas (id, cliente, cliente_id, total, fecha, usuario_id) VALUES (%s, %s, %s, %s, %s, %s)",
+                ventas,
+            )
+            cursor.executemany(
+                """
+                INSERT INTO detalles_venta (id, venta_id, producto_id, cantidad, precio_unitario, subtotal)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                detalles,
+            )
+        if venta_id % 100000 < LOTE:
+            print('GENERANDO ventas %d/%d' % (venta_id, args.ventas))
+
+
+def medir(funcion, repeticiones):
+    """Ejecutar ``funcion()`` varias veces; devuelve tiempos en segundos y las filas de la última"""
+    tiempos, filas = [], None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        "mediana_s": round(statistics.median(tiempos), 6),
+        "min_s": round(min(tiempos), 6),
+        "max_s": round(max(tiempos), 6),
+        "repeticiones": repeticiones,
+        "filas": filas,
+    }
+
+
+def resumen_tiempos(tiempos):
+    """Mediana, p95 y máximo de una lista de tiempos en segundos"""
+    tiempos = sorted(tiempos)
+    return {
+        "mediana_s": round(statistics.median(tiempos), 6),
+        "p95_s": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 6),
+        "max_s": round(tiempos[-1], 6),
+        "repeticiones": len(tiempos),
+    }
+
+
+def contar(filas):
+    if filas is None:
+        raise RuntimeError("la consulta falló")
+    return sum(1 for _ in filas)
+
+
+def version_codigo():
+    try:
+        return subprocess.run(["git", "-C", BASE_DIR, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def comparar(actual, anterior, tolerancia):
+    """Casos cuya mediana empeoró más que ``tolerancia`` %; imprime la tabla comparativa"""
+    regresiones = []
+    print('%-34s %12s %12s %9s' % ('CASO', 'ANTERIOR', 'ACTUAL', 'CAMBIO'))
+    for caso, resultado in actual["resultados"].items():
+        previo = anterior.get("resultados", {}).get(caso)
+        if not previo or "mediana_s" not in previo or "mediana_s" not in resultado:
+            continue
+        antes, ahora = previo["mediana_s"], resultado["mediana_s"]
+        cambio = (ahora - antes) / antes * 100 if antes else 0.0
+        lento = cambio > tolerancia and ahora - antes > RUIDO_S
+        print('%-34s %10.4f s %10.4f s %+8.1f%%%s' % (caso, antes, ahora, cambio, '  REGRESION' if lento else ''))
+        if lento:
+            regresiones.append(caso)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ventas, inventario y reportes con datos sintéticos")
+    parser.add_argument('--base', default='nexus_benchmark', help="base de datos de pruebas (se llena y modifica)")
+    parser.add_argument('--productos', type=int, default=5000)
+    parser.add_argument('--clientes', type=int, default=100000)
+    parser.add_argument('--ventas', type=int, default=2000000)
+    parser.add_argument('--dias', type=int, default=730, help="días de historial que cubren las ventas")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--regenerar', action='store_true', help="borrar la base de pruebas y generar los datos de nuevo")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--cobros', type=int, default=200, help="ventas registradas para medir el cobro en caja")
+    parser.add_argument('--periodo', type=int, default=30, help="días del período de ventas consultado y reportado")
+    parser.add_argument('--sin-pdf', action='store_true', help="omitir los reportes PDF")
+    parser.add_argument('--salida', default=os.path.join(BASE_DIR, 'benchmark_resultados.json'))
+    parser.add_argument('--comparar', help="JSON de una corrida anterior")
+    parser.add_argument('--tolerancia', type=float, default=20.0, help="%% de empeoramiento aceptado por caso")
+    args = parser.parse_args()
+
+    try:
+        import mysql.connector
+        from modules.database import DatabaseManager
+        from modules.models import Producto, Venta, Cliente
+        from modules import exportacion
+        from nexus_core.db import MySQLDatabase
+        from nexus_core.diario_ventas import DiarioVentas, ERROR
+        from services.venta_service import VentaService
+        from services.ventas_diarias_service import VentasDiariasService
+        from services.sincronizador_ventas import SincronizadorVentas
+    except ImportError as e:
+        print('IMPORT_FAIL', e)
+        return
+
+    with open(os.path.join(BASE_DIR, 'config_mysql.json'), 'r', encoding='utf-8') as f:
+        cfg = json.load(f)
+    if args.base == cfg.get('database', 'nexus_coffee'):
+        print('BASE_INVALIDA', 'el benchmark modifica datos: use una base distinta de', args.base)
+        return
+    cfg = dict(cfg, database=args.base)
+
+    db_manager = DatabaseManager(cfg)
+    if not db_manager.verificar_conexion():
+        print('CONEXION_FAIL')
+        return
+    if args.regenerar:
+        conn = mysql.connector.connect(host=cfg['host'], user=cfg['user'], password=cfg['password'], port=cfg['port'])
+        conn.cursor().execute(f"DROP DATABASE IF EXISTS `{args.base}`")
+        conn.close()
+    if not db_manager.inicializar_bd():
+        print('CONEXION_FAIL')
+        return
+
+    db = MySQLDatabase(cfg)
+    usuario = db.execute("SELECT id FROM usuarios ORDER BY id LIMIT 1")
+    usuario_id = usuario[0][0] if usuario else None
+    marca = db.execute("SELECT valor FROM configuracion WHERE clave = 'benchmark_datos'")
+    if not marca or marca[0][0] != marca_datos(args):
+        if db.execute("SELECT COUNT(*) FROM ventas")[0][0]:
+            print('DATOS_DISTINTOS', 'la base tiene otros datos; use --regenerar')
+            return
+        inicio = time.perf_counter()
+        generar_datos(db, args, usuario_id)
+        VentasDiariasService(db).reconstruir()
+        db.execute(
+            "INSERT INTO configuracion (clave, valor) VALUES ('benchmark_datos', %s) ON DUPLICATE KEY UPDATE valor = VALUES(valor)",
+            (marca_datos(args),),
+        )
+        print('DATOS_GENERADOS %.1f s' % (time.perf_counter() - inicio))
+
+    models = {'producto': Producto(db_manager), 'venta': Venta(db_manager), 'cliente': Cliente(db_manager)}
+    hasta = datetime.date.today()
+    desde = hasta - datetime.timedelta(days=args.periodo)
+    resultados = {}
+
+    def caso(nombre, funcion):
+        try:
+            resultados[nombre] = medir(funcion, args.repeticiones)
+            r = resultados[nombre]
+            print('%-34s mediana %9.4f s  min %9.4f s  filas %s' % (nombre, r["mediana_s"], r["min_s"], r["filas"]))
+        except Exception as e:
+            resultados[nombre] = {"error": str(e)}
+            print('%-34s ERROR %s' % (nombre, e))
+
+    # Cobro en caja: cada venta de 1 a 4 productos, como en el POS. El cajero solo espera la
+    # escritura en el diario local; después el sincronizador las registra en MySQL por lotes
+    azar = random.Random(args.semilla + 1)
+    with tempfile.TemporaryDirectory() as carpeta:
+        diario = DiarioVentas(os.path.join(carpeta, "diario.db"))
+        cobros = []
+        for _ in range(args.cobros):
+            items = [(pid, azar.randint(1, 3), 10.0) for pid in azar.sample(range(1, args.productos + 1), azar.randint(1, 4))]
+            cliente_id = azar.randint(1, args.clientes)
+            inicio = time.perf_counter()
+            diario.registrar("Cliente Benchmark", items, usuario_id, cliente_id)
+            cobros.append(time.perf_counter() - inicio)
+        resultados["cobro_venta"] = resumen_tiempos(cobros)
+        print('%-34s mediana %9.4f s  p95 %9.4f s' % ("cobro_venta", resultados["cobro_venta"]["mediana_s"],
+                                                      resultados["cobro_venta"]["p95_s"]))
+
+        # Sincronización: tiempo de cada lote repartido entre sus ventas
+        sincronizador = SincronizadorVentas(diario, VentaService(db))
+        sincronizadas = []
+        try:
+            while True:
+                cantidad = len(diario.pendientes(sincronizador.lote))
+                if not cantidad:
+                    break
+                inicio = time.perf_counter()
+                sincronizador.sincronizar_lote()
+                sincronizadas.extend([(time.perf_counter() - inicio) / cantidad] * cantidad)
+            conteo = diario.contar()
+            if conteo[ERROR]:
+                raise RuntimeError(f"{conteo[ERROR]} ventas con error: {diario.errores()[0][2]}")
+            resultados["sincronizacion_venta"] = resumen_tiempos(sincronizadas)
+            print('%-34s mediana %9.4f s  p95 %9.4f s' % ("sincronizacion_venta",
+                                                          resultados["sincronizacion_venta"]["mediana_s"],
+                                                          resultados["sincronizacion_venta"]["p95_s"]))
+        except Exception as e:
+            resultados["sincronizacion_venta"] = {"error": str(e)}
+            print('%-34s ERROR %s' % ("sincronizacion_venta", e))
+        finally:
+            diario.cerrar()
+
+    caso("obtener_ventas_por_periodo", lambda: contar(models['venta'].obtener_ventas_por_periodo(desde, hasta)))
+    caso("obtener_productos_mas_vendidos", lambda: contar(models['venta'].obtener_productos_mas_vendidos()))
+    caso("obtener_clientes_frecuentes", lambda: contar(models['cliente'].obtener_clientes_frecuentes()))
+    caso("obtener_clientes_frecuentes_periodo",
+         lambda: contar(models['cliente'].obtener_clientes_frecuentes(10, desde, hasta)))
+
+    pdf_generator = None
+    if not args.sin_pdf:
+        try:
+            from modules.pdf_generator import PDFGenerator
+            pdf_generator = PDFGenerator()
+        except ImportError as e:
+            print('PDF_OMITIDO', e)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        for formato, fuente in LISTADOS:
+            caso(f"exportar_{formato}", lambda: exportacion.exportar(
+                fuente(models), os.path.join(carpeta, f"{formato}.csv"), formato))
+        for nombre, formato, fuente, metodo in REPORTES:
+            caso(f"exportar_{nombre}", lambda: exportacion.exportar(
+                fuente(models, desde, hasta), os.path.join(carpeta, f"{nombre}.csv"), formato))
+            if pdf_generator is not None:
+                def pdf():
+                    if not getattr(pdf_generator, metodo)(fuente(models, desde, hasta), os.path.join(carpeta, f"{nombre}.pdf")):
+                        raise RuntimeError("no se pudo generar el PDF")
+                    return pdf_generator.ultimo_rendimiento.filas
+                caso(f"pdf_{nombre}", pdf)
+
+    salida = {
+        "version": version_codigo(),
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "datos": marca_datos(args),
+        "parametros": {"repeticiones": args.repeticiones, "cobros": args.cobros, "periodo": args.periodo},
+        "resultados": resultados,
+    }
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(salida, f, indent=2, ensure_ascii=False)
+    print('RESULTADOS', args.salida)
+
+    errores = [nombre for nombre, r in resultados.items() if "error" in r]
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        if anterior.get("datos") != salida["datos"]:
+            print('AVISO datos distintos a los de la corrida anterior:', anterior.get("datos"))
+        regresiones = comparar(salida, anterior, args.tolerancia)
+
+    if errores:
+        print('BENCHMARK_FAIL', ", ".join(errores))
+    elif regresiones:
+        print('BENCHMARK_REGRESION', ", ".join(regresiones))
+    else:
+        print('BENCHMARK_OK')
+
+
+if __name__ == '__main__':
+    main()
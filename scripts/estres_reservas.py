@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import datetime
+import statistics
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Uso: python scripts/estres_reservas.py [--base nexus_estres] [--cajas 8] [--operaciones 150]
+#          [--productos 4] [--stock 60] [--duracion-reserva 5] [--semilla 7]
+#
+# Simula varias cajas cobrando a la vez los mismos pocos productos (con poco stock,
+# para forzar conflictos) sobre una base aparte. Cada caja es un hilo que arma ventas
+# reservando stock línea por línea (ReservaStockService) y luego la cobra directo
+# (registrar_venta_completa), por el camino del diario local (retiene las reservas y
+# registra con registrar_ventas_diferidas), la cancela, o la abandona para que sus
+# reservas venzan. Algunas ventas se cobran sin reservar, como una caja que trabajó
+# sin conexión.
+#
+# Al final verifica que:
+#   - ningún producto quedó con stock negativo (solo lo deja así una venta diferida sin
+#     reserva que encuentra faltantes, y aquí esas se cobran directo),
+#   - stock inicial - stock final = unidades en detalles_venta (ningún descuento perdido),
+#   - las ventas cobradas con reserva nunca encontraron faltantes,
+#   - no quedan reservas vigentes (vendidas, canceladas o vencidas),
+#   - reintentar una venta con la misma clave no la duplica,
+#   - no hubo interbloqueos ni errores inesperados.
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+class Caja(threading.Thread):
+    def __init__(self, numero, args, ventas, reservas, productos, usuario_id, inicio):
+        super().__init__(name=f"caja-{numero}")
+        self.numero = numero
+        self.args = args
+        self.ventas = ventas
+        self.reservas = reservas
+        self.productos = productos
+        self.usuario_id = usuario_id
+        self.inicio = inicio
+        self.azar = random.Random(args.semilla * 1000 + numero)
+        self.conteo = {"reservas": 0, "cobradas": 0, "diferidas": 0, "sin_reserva": 0, "canceladas": 0, "abandonadas": 0,
+                       "conflictos_reserva": 0, "conflictos_cobro": 0, "faltantes_con_reserva": 0}
+        self.latencias_reserva = []
+        self.latencias_cobro = []
+        self.errores = []
+        self.claves = []
+
+    def run(self):
+        from services.venta_service import StockInsuficienteError
+        self.inicio.wait()
+        for _ in range(self.args.operaciones):
+            clave = str(uuid.uuid4())
+            lineas = {}
+            for _ in range(self.azar.randint(1, 3)):
+                producto_id, precio = self.azar.choice(self.productos)
+                cantidad = self.azar.randint(1, 3)
+                if self.azar.random() < 0.1:
+                    # Caja sin conexión: vende sin reservar y el cobro decide
+                    lineas[producto_id] = (lineas.get(producto_id, (0, precio))[0] + cantidad, precio)
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    self.reservas.reservar(clave, producto_id, cantidad)
+                    lineas[producto_id] = (lineas.get(producto_id, (0, precio))[0] + cantidad, precio)
+                    self.conteo["reservas"] += 1
+                except StockInsuficienteError:
+                    self.conteo["conflictos_reserva"] += 1
+                except Exception as e:
+                    self.errores.append(f"reservar: {e}")
+                finally:
+                    self.latencias_reserva.append(time.perf_counter() - t0)
+            if not lineas:
+                continue
+
+            reservadas = self.reservas.reservas(clave)
+            sin_reserva = any(reservadas.get(pid, 0) < cant for pid, (cant, _) in lineas.items())
+            items = [(pid, cant, precio) for pid, (cant, precio) in lineas.items()]
+            destino = self.azar.random()
+            t0 = time.perf_counter()
+            try:
+                if destino < 0.1:
+                    self.reservas.liberar(clave)
+                    self.conteo["canceladas"] += 1
+                elif destino < 0.15:
+                    self.conteo["abandonadas"] += 1
+                elif destino < 0.55 and not sin_reserva:
+                    self.reservas.retener(clave)
+                    resultado = self.ventas.registrar_ventas_diferidas(
+                        [(clave, f"Caja {self.numero}", None, self.usuario_id, items, datetime.datetime.now())]
+                    )
+                    if resultado[clave][1]:
+                        self.conteo["faltantes_con_reserva"] += 1
+                    self.conteo["diferidas"] += 1
+                    self.claves.append(clave)
+                else:
+                    try:
+                        self.ventas.registrar_venta_completa(f"Caja {self.numero}", items, self.usuario_id, clave=clave)
+                        self.conteo["sin_reserva" if sin_reserva else "cobradas"] += 1
+                        self.claves.append(clave)
+                    except StockInsuficienteError:
+                        self.conteo["conflictos_cobro"] += 1
+                        if not sin_reserva:
+                            self.conteo["faltantes_con_reserva"] += 1
+                        self.reservas.liberar(clave)
+            except Exception as e:
+                self.errores.append(f"cobrar: {e}")
+            finally:
+                self.latencias_cobro.append(time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de concurrencia de reservas de stock entre varias cajas")
+    parser.add_argument('--base', default='nexus_estres', help="base de datos de pruebas (se modifica)")
+    parser.add_argument('--cajas', type=int, default=8)
+    parser.add_argument('--operaciones', type=int, default=150, help="ventas que intenta cada caja")
+    parser.add_argument('--productos', type=int, default=4, help="productos disputados")
+    parser.add_argument('--stock', type=int, default=60, help="stock inicial de cada producto")
+    parser.add_argument('--duracion-reserva', type=int, default=5, help="segundos de vida de una reserva")
+    parser.add_argument('--semilla', type=int, default=7)
+    args = parser.parse_args()
+    if args.cajas < 2:
+        print('ARGUMENTO_INVALIDO', '--cajas debe ser al menos 2')
+        return
+
+    try:
+        from modules.database import DatabaseManager
+        from nexus_core.db import MySQLDatabase
+        from nexus_core.pool import obtener_pool
+        from services.venta_service import VentaService
+        from services.reserva_service import ReservaStockService
+    except ImportError as e:
+        print('IMPORT_FAIL', e)
+        return
+
+    with open(os.path.join(BASE_DIR, 'config_mysql.json'), 'r', encoding='utf-8') as f:
+        cfg = json.load(f)
+    if args.base == cfg.get('database', 'nexus_coffee'):
+        print('BASE_INVALIDA', 'la prueba modifica datos: use una base distinta de', args.base)
+        return
+    cfg = dict(cfg, database=args.base)
+
+    # Una conexión por caja y algo de margen, como si cada caja fuera su propio proceso
+    # (antes de crear el gestor: el pool compartido toma el tamaño al crearse)
+    obtener_pool(cfg, size=args.cajas + 2)
+    db_manager = DatabaseManager(cfg)
+    if not db_manager.verificar_conexion() or not db_manager.inicializar_bd():
+        print('CONEXION_FAIL')
+        return
+    db = MySQLDatabase(cfg)
+
+    usuario = db.execute("SELECT id FROM usuarios ORDER BY id LIMIT 1")
+    usuario_id = usuario[0][0] if usuario else None
+    corrida = uuid.uuid4().hex[:8]
+    productos = []
+    for i in range(args.productos):
+        producto_id = db.execute(
+            "INSERT INTO productos (nombre, categoria, precio, stock, stock_minimo) VALUES (%s, %s, %s, %s, %s)",
+            (f"Estrés {corrida} {i + 1}", "Estrés", 5.0 + i, args.stock, 0),
+        )
+        productos.append((int(producto_id), 5.0 + i))
+    ids = [p[0] for p in productos]
+    marcadores = ", ".join(["%s"] * len(ids))
+
+    ventas = VentaService(db)
+    reservas = ReservaStockService(db, duracion=args.duracion_reserva)
+    inicio = threading.Event()
+    cajas = [Caja(n + 1, args, ventas, reservas, productos, usuario_id, inicio) for n in range(args.cajas)]
+    for caja in cajas:
+        caja.start()
+    t0 = time.perf_counter()
+    inicio.set()
+    for caja in cajas:
+        caja.join()
+    segundos = time.perf_counter() - t0
+
+    conteo = {}
+    for caja in cajas:
+        for clave, valor in caja.conteo.items():
+            conteo[clave] = conteo.get(clave, 0) + valor
+    latencias_reserva = [l for caja in cajas for l in caja.latencias_reserva]
+    latencias_cobro = [l for caja in cajas for l in caja.latencias_cobro]
+    errores = [e for caja in cajas for e in caja.errores]
+    operaciones = len(latencias_reserva) + len(latencias_cobro)
+
+    print('CAJAS %d  OPERACIONES %d  %.1f s  %.0f op/s' % (args.cajas, operaciones, segundos, operaciones / segundos))
+    print('RESERVA mediana %.1f ms  p95 %.1f ms' % (statistics.median(latencias_reserva or [0]) * 1000,
+                                                    percentil(latencias_reserva, 0.95) * 1000))
+    print('COBRO   mediana %.1f ms  p95 %.1f ms' % (statistics.median(latencias_cobro or [0]) * 1000,
+                                                    percentil(latencias_cobro, 0.95) * 1000))
+    for clave in sorted(conteo):
+        print('%-22s %d' % (clave.upper(), conteo[clave]))
+
+    fallas = []
+    if errores:
+        fallas.append(f"{len(errores)} errores (primero: {errores[0]})")
+    if conteo["faltantes_con_reserva"]:
+        fallas.append(f"{conteo['faltantes_con_reserva']} ventas con reserva encontraron faltantes")
+
+    stock = {row[0]: int(row[1]) for row in db.execute(f"SELECT id, stock FROM productos WHERE id IN ({marcadores})", tuple(ids))}
+    vendido = {row[0]: int(row[1]) for row in db.execute(
+        f"SELECT producto_id, SUM(cantidad) FROM detalles_venta WHERE producto_id IN ({marcadores}) GROUP BY producto_id",
+        tuple(ids),
+    )}
+    for producto_id in ids:
+        final, unidades = stock.get(producto_id, 0), vendido.get(producto_id, 0)
+        print('PRODUCTO %d stock %d -> %d, vendido %d' % (producto_id, args.stock, final, unidades))
+        if final < 0:
+            fallas.append(f"producto {producto_id} con stock negativo ({final})")
+        if args.stock - final != unidades:
+            fallas.append(f"producto {producto_id}: se descontaron {args.stock - final} y se vendieron {unidades}")
+
+    # Reservas: las abandonadas vencen solas; no debe quedar ninguna vigente
+    time.sleep(args.duracion_reserva + 1)
+    vigentes = db.execute(
+        f"SELECT COUNT(*) FROM reservas_stock WHERE producto_id IN ({marcadores}) AND expira > NOW()", tuple(ids)
+    )[0][0]
+    if vigentes:
+        fallas.append(f"{vigentes} reservas vigentes después de vencer")
+    print('RESERVAS_VENCIDAS_PURGADAS', reservas.purgar_vencidas())
+
+    # Idempotencia: reintentar una venta ya registrada devuelve la misma y no toca el stock
+    claves = [clave for caja in cajas for clave in caja.claves]
+    if claves:
+        existente = db.execute("SELECT id FROM ventas WHERE clave_idempotencia = %s", (claves[0],))[0][0]
+        antes = db.execute(f"SELECT SUM(stock) FROM productos WHERE id IN ({marcadores})", tuple(ids))[0][0]
+        repetida = ventas.registrar_venta_completa("Reintento", [(ids[0], 1, 1.0)], usuario_id, clave=claves[0])
+        despues = db.execute(f"SELECT SUM(stock) FROM productos WHERE id IN ({marcadores})", tuple(ids))[0][0]
+        if repetida != existente or antes != despues:
+            fallas.append("reintentar una venta con la misma clave la duplicó")
+
+    if fallas:
+        print('ESTRES_FAIL', "; ".join(fallas))
+    else:
+        print('ESTRES_OK')
+
+
+if __name__ == '__main__':
+    main()
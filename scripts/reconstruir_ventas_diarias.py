@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from modules.database import DatabaseManager
+from nexus_core.db import MySQLDatabase
+from services.ventas_diarias_service import VentasDiariasService
+
+# Uso: python scripts/reconstruir_ventas_diarias.py [AAAA-MM-DD]
+# Sin fecha recalcula todo el resumen; con fecha, solo desde ese día en adelante.
+
+def main():
+    desde = None
+    if len(sys.argv) > 1:
+        try:
+            desde = datetime.datetime.strptime(sys.argv[1], "%Y-%m-%d").date()
+        except ValueError:
+            print('FECHA_INVALIDA', sys.argv[1])
+            return
+
+    with open(os.path.join(BASE_DIR, 'config_mysql.json'), 'r', encoding='utf-8') as f:
+        cfg = json.load(f)
+    db_manager = DatabaseManager(cfg)
+    if not db_manager.verificar_conexion():
+        print('CONEXION_FAIL')
+        return
+    # Asegura que las tablas del resumen existan (migraciones)
+    db_manager.inicializar_bd()
+
+    dias = VentasDiariasService(MySQLDatabase(cfg)).reconstruir(desde)
+    print('DIAS_RECONSTRUIDOS', dias)
+
+    # Comprobación: el resumen debe coincidir con las ventas originales
+    filtro = "WHERE fecha >= %s" if desde else ""
+    params = (desde,) if desde else None
+    original = db_manager.ejecutar_query(f"SELECT COUNT(*), COALESCE(SUM(total), 0) FROM ventas {filtro}", params)
+    filtro = "WHERE dia >= %s" if desde else ""
+    resumen = db_manager.ejecutar_query(
+        f"SELECT COALESCE(SUM(num_ventas), 0), COALESCE(SUM(total), 0) FROM ventas_diarias {filtro}", params
+    )
+    print('VENTAS', original, 'RESUMEN', resumen)
+    print('RESUMEN_OK' if original and resumen and tuple(original[0]) == tuple(resumen[0]) else 'RESUMEN_FAIL')
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@ if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
 from modules.database import DatabaseManager
+from nexus_core.db import MySQLDatabase
+from services.venta_service import VentaService, StockInsuficienteError
 
 def main():
     with open(os.path.join(BASE_DIR, 'config_mysql.json'), 'r', encoding='utf-8') as f:
@@ -29,29 +31,20 @@ def main():
         return
     producto_id, precio = int(prod[0][0]), float(prod[0][1])
 
-    # Insert venta
-    venta_id = db.ejecutar_query(
-        "INSERT INTO ventas (cliente, total, usuario_id) VALUES (%s, %s, %s)",
-        ('Cliente Prueba', precio, user_id)
-    )
-    print('VENTA_ID', venta_id)
-    if not venta_id:
-        print('VENTA_FAIL')
+    # Venta, detalle, stock y resumen diario (ventas_diarias) en una sola transacción,
+    # por el mismo servicio que usa la caja
+    servicio = VentaService(MySQLDatabase(cfg))
+    try:
+        venta_id = servicio.registrar_venta_completa('Cliente Prueba', [(producto_id, 1, precio)], user_id)
+    except StockInsuficienteError as e:
+        print('STOCK_INSUFICIENTE', e)
         return
+    print('VENTA_ID', venta_id)
 
-    # Insert detalle
-    det_res = db.ejecutar_query(
-        """
-        INSERT INTO detalles_venta (venta_id, producto_id, cantidad, precio_unitario, subtotal)
-        VALUES (%s, %s, %s, %s, %s)
-        """,
-        (int(venta_id), producto_id, 1, precio, precio)
-    )
-    print('DETALLE_RES', det_res)
-
-    # Actualizar stock
-    upd_res = db.ejecutar_query("UPDATE productos SET stock = stock - %s WHERE id = %s", (1, producto_id))
-    print('UPD_RES', upd_res)
+    detalle = db.ejecutar_query("SELECT producto_id, cantidad, subtotal FROM detalles_venta WHERE venta_id=%s", (venta_id,))
+    print('DETALLE_RES', detalle)
+    resumen = db.ejecutar_query("SELECT dia, num_ventas, total FROM ventas_diarias WHERE dia = CURDATE()")
+    print('RESUMEN_DIA', resumen)
 
     # Verificar venta
     rows = db.ejecutar_query("SELECT id, total FROM ventas WHERE id=%s", (venta_id,))
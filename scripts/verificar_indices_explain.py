@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core.utils import rango_fechas
+from modules.database import DatabaseManager
+
+# (nombre, consulta, tabla, indice esperado, debe ser cubriente)
+CONSULTAS = [
+    (
+        'ventas_por_periodo',
+        "SELECT id, cliente, total, fecha FROM ventas WHERE fecha >= %s AND fecha < %s ORDER BY fecha",
+        'ventas', 'idx_fecha_total', False,
+    ),
+    (
+        'total_por_rango',
+        "SELECT COUNT(*), SUM(total) FROM ventas WHERE fecha >= %s AND fecha < %s",
+        'ventas', 'idx_fecha_total', True,
+    ),
+    (
+        'detalle_por_rango',
+        """
+        SELECT d.producto_id, SUM(d.cantidad), SUM(d.subtotal)
+        FROM ventas v
+        JOIN detalles_venta d ON d.venta_id = v.id
+        WHERE v.fecha >= %s AND v.fecha < %s
+        GROUP BY d.producto_id
+        """,
+        'd', 'idx_venta_producto_cubriente', True,
+    ),
+]
+
+
+def main():
+    with open(os.path.join(BASE_DIR, 'config_mysql.json'), 'r', encoding='utf-8') as f:
+        cfg = json.load(f)
+    db = DatabaseManager(cfg)
+    if not db.verificar_conexion():
+        print('CONEXION_FAIL')
+        return
+    db.inicializar_bd()
+
+    version = db.ejecutar_query("SELECT MAX(version) FROM schema_migraciones") or [(None,)]
+    print('MIGRACION_VERSION', version[0][0])
+
+    hoy = datetime.date.today()
+    params = rango_fechas(hoy - datetime.timedelta(days=30), hoy)
+
+    # Con tablas casi vacías el optimizador puede preferir un recorrido completo;
+    # los resultados son significativos con un volumen de ventas realista.
+    fallos = 0
+    for nombre, consulta, tabla, indice, cubriente in CONSULTAS:
+        filas = db.ejecutar_query("EXPLAIN " + consulta, params) or []
+        # Columnas de EXPLAIN: id, select_type, table, partitions, type, possible_keys, key, key_len, ref, rows, filtered, Extra
+        fila = next((f for f in filas if f[2] == tabla), None)
+        if fila is None:
+            print('FAIL', nombre, 'sin fila para', tabla)
+            fallos += 1
+            continue
+        clave, extra = fila[6], fila[11] or ''
+        ok = clave == indice and (not cubriente or 'Using index' in extra)
+        print('OK' if ok else 'FAIL', nombre, 'type=%s key=%s rows=%s extra=%s' % (fila[4], clave, fila[9], extra))
+        fallos += 0 if ok else 1
+
+    print('EXPLAIN_OK' if fallos == 0 else 'EXPLAIN_FAIL')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional, Tuple
+
+from nexus_core.db import MySQLDatabase
+
+
+@dataclass
+class DashboardStats:
+    productos: int = 0
+    productos_stock_bajo: int = 0
+    clientes: int = 0
+    ventas_hoy: int = 0
+    total_hoy: float = 0.0
+    # serie = [(dia, numero_ventas, total)]
+    serie_7_dias: List[Tuple[date, int, float]] = field(default_factory=list)
+
+
+class DashboardStatsService:
+    # Todas las cifras de las tarjetas del resumen en una sola ida y vuelta al servidor
+    CONSULTA = """
+        SELECT 'kpi' AS tipo, NULL AS dia,
+               (SELECT COUNT(*) FROM productos) AS a,
+               (SELECT COUNT(*) FROM productos WHERE bajo_stock = 1) AS b,
+               (SELECT COUNT(*) FROM clientes) AS c,
+               (SELECT COALESCE(SUM(num_ventas), 0) FROM ventas_diarias WHERE dia = CURDATE()) AS d,
+               (SELECT COALESCE(SUM(total), 0) FROM ventas_diarias WHERE dia = CURDATE()) AS e
+        UNION ALL
+        SELECT 'dia', dia, num_ventas, total, NULL, NULL, NULL
+        FROM ventas_diarias
+        WHERE dia >= CURDATE() - INTERVAL 6 DAY
+        ORDER BY tipo DESC, dia
+    """
+
+    def __init__(self, db: MySQLDatabase, ttl: float = 30.0):
+        self.db = db
+        self.ttl = ttl
+        self._cache: Optional[DashboardStats] = None
+        self._cache_hasta = 0.0
+        self._lock = threading.Lock()
+
+    def obtener(self, forzar: bool = False) -> DashboardStats:
+        with self._lock:
+            if not forzar and self._cache is not None and time.monotonic() < self._cache_hasta:
+                return self._cache
+
+        stats = DashboardStats()
+        for row in self.db.execute(self.CONSULTA) or []:
+            if row[0] == 'kpi':
+                stats.productos = int(row[2] or 0)
+                stats.productos_stock_bajo = int(row[3] or 0)
+                stats.clientes = int(row[4] or 0)
+                stats.ventas_hoy = int(row[5] or 0)
+                stats.total_hoy = float(row[6] or 0)
+            else:
+                stats.serie_7_dias.append((row[1], int(row[2] or 0), float(row[3] or 0)))
+
+        with self._lock:
+            self._cache = stats
+            self._cache_hasta = time.monotonic() + self.ttl
+        return stats
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._cache = None
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from typing import List, Tuple, Callable
+from typing import Iterable, List, Tuple, Callable
 import os
 import datetime
 from reportlab.lib import colors
@@ -8,12 +8,13 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 
+from modules.pdf_grande import tablas_por_tramos
 
 class PdfService:
     def __init__(self, obtener_moneda: Callable[[], str]):
         self.obtener_moneda = obtener_moneda
 
-    def generar_reporte_inventario(self, filename: str, productos: List[Tuple]) -> None:
+    def generar_reporte_inventario(self, filename: str, productos: Iterable[Tuple]) -> None:
         doc = SimpleDocTemplate(filename, pagesize=A4)
         elements = []
 
@@ -25,12 +26,21 @@ class PdfService:
         info_style = ParagraphStyle('Info', parent=styles['Normal'], fontSize=10, spaceAfter=20)
         elements.append(Paragraph(f"Fecha de generación: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", info_style))
 
-        # Resumen
-        total_productos = len(productos)
-        stock_bajo = sum(1 for p in productos if p[4] <= p[5])
-        stock_agotado = sum(1 for p in productos if p[4] == 0)
-        valor_total = sum((p[4] * float(p[3])) for p in productos)
+        # Tabla y resumen en una sola pasada: productos puede ser un generador (ReportService.iterar_inventario)
         moneda = self.obtener_moneda()
+        productos_data = [['ID', 'Nombre', 'Categoría', 'Precio', 'Stock', 'Stock Mínimo', 'Valor Total']]
+        total_productos = stock_bajo = stock_agotado = 0
+        valor_total = 0.0
+        for p in productos:
+            precio = f"{moneda}{float(p[3]):.2f}"
+            valor_p = float(p[3]) * int(p[4])
+            productos_data.append([
+                str(p[0]), p[1], p[2], precio, str(p[4]), str(p[5]), f"{moneda}{valor_p:.2f}"
+            ])
+            total_productos += 1
+            stock_bajo += p[4] <= p[5]
+            stock_agotado += p[4] == 0
+            valor_total += valor_p
 
         resumen_data = [
             ['Total de Productos', str(total_productos)],
@@ -53,15 +63,7 @@ class PdfService:
         elements.append(Spacer(1, 20))
 
         # Tabla productos
-        productos_data = [['ID', 'Nombre', 'Categoría', 'Precio', 'Stock', 'Stock Mínimo', 'Valor Total']]
-        for p in productos:
-            precio = f"{moneda}{float(p[3]):.2f}"
-            valor_p = float(p[3]) * int(p[4])
-            productos_data.append([
-                str(p[0]), p[1], p[2], precio, str(p[4]), str(p[5]), f"{moneda}{valor_p:.2f}"
-            ])
-        productos_table = Table(productos_data, colWidths=[0.5*inch, 2*inch, 1*inch, 1*inch, 0.8*inch, 1*inch, 1*inch])
-        productos_table.setStyle(TableStyle([
+        productos_estilo = [
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -71,12 +73,13 @@ class PdfService:
             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('GRID', (0, 0), (-1, -1), 1, colors.black),
             ('ALIGN', (3, 1), (6, -1), 'RIGHT'),
-        ]))
-        elements.append(productos_table)
+        ]
+        elements.extend(tablas_por_tramos(productos_data, estilo=productos_estilo,
+                                          col_widths=[0.5*inch, 2*inch, 1*inch, 1*inch, 0.8*inch, 1*inch, 1*inch]))
 
         doc.build(elements)
 
-    def generar_reporte_ventas(self, filename: str, ventas: List[Tuple]) -> None:
+    def generar_reporte_ventas(self, filename: str, ventas: Iterable[Tuple]) -> None:
         doc = SimpleDocTemplate(filename, pagesize=A4)
         elements = []
 
@@ -90,10 +93,19 @@ class PdfService:
         elements.append(Paragraph(f"Período: {fecha_inicio} a {fecha_fin}", info_style))
         elements.append(Paragraph(f"Fecha de generación: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", info_style))
 
-        total_ventas = len(ventas)
-        monto_total = sum(v[2] for v in ventas)
-        promedio = monto_total / total_ventas if total_ventas > 0 else 0
+        # Tabla y resumen en una sola pasada: ventas puede ser un generador (ReportService.iterar_ventas)
         moneda = self.obtener_moneda()
+        ventas_data = [['ID', 'Cliente', 'Total', 'Fecha', 'Usuario']]
+        total_ventas = 0
+        monto_total = 0
+        for v in ventas:
+            fecha = v[3].strftime("%Y-%m-%d %H:%M") if v[3] else ""
+            total = f"{moneda}{v[2]:.2f}"
+            usuario = v[4] if v[4] else "Sistema"
+            ventas_data.append([str(v[0]), v[1], total, fecha, usuario])
+            total_ventas += 1
+            monto_total += v[2]
+        promedio = monto_total / total_ventas if total_ventas > 0 else 0
 
         resumen_data = [
             ['Total de Ventas', str(total_ventas)],
@@ -114,14 +126,7 @@ class PdfService:
         elements.append(resumen_table)
         elements.append(Spacer(1, 20))
 
-        ventas_data = [['ID', 'Cliente', 'Total', 'Fecha', 'Usuario']]
-        for v in ventas:
-            fecha = v[3].strftime("%Y-%m-%d %H:%M") if v[3] else ""
-            total = f"{moneda}{v[2]:.2f}"
-            usuario = v[4] if v[4] else "Sistema"
-            ventas_data.append([str(v[0]), v[1], total, fecha, usuario])
-        ventas_table = Table(ventas_data, colWidths=[0.5*inch, 2*inch, 1*inch, 1.5*inch, 1.5*inch])
-        ventas_table.setStyle(TableStyle([
+        ventas_estilo = [
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -131,8 +136,9 @@ class PdfService:
             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('GRID', (0, 0), (-1, -1), 1, colors.black),
             ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-        ]))
-        elements.append(ventas_table)
+        ]
+        elements.extend(tablas_por_tramos(ventas_data, estilo=ventas_estilo,
+                                          col_widths=[0.5*inch, 2*inch, 1*inch, 1.5*inch, 1.5*inch]))
 
         doc.build(elements)
 
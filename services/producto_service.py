@@ -1,9 +1,21 @@
 #!/usr/bin/env python3
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from mysql.connector import Error, errorcode
+
+from core.utils import normalizar_texto, terminos_fulltext
 from models.producto import Producto
+from nexus_core import versiones
 from nexus_core.db import MySQLDatabase
 
+# Filas por sentencia en la importación masiva (executemany arma un INSERT de varias filas)
+LOTE_IMPORTACION = 1000
+
+# Fila de importación: (codigo_barras, nombre, categoria, precio, cantidad, stock_minimo, costo, descripcion);
+# None en un campo conserva el valor actual del producto
+FilaImportacion = Tuple[Optional[str], Optional[str], Optional[str], Optional[float],
+                        Optional[int], Optional[int], Optional[float], Optional[str]]
+
 
 class ProductoService:
     def __init__(self, db: MySQLDatabase):
@@ -16,6 +28,24 @@ class ProductoService:
         return [Producto.from_row(r) for r in rows] if rows else []
 
     def buscar(self, texto: str) -> List[Producto]:
+        # FULLTEXT (migración 4) ordenado por relevancia; LIKE con palabras cortas o sin el índice
+        terminos = terminos_fulltext(texto)
+        if terminos:
+            try:
+                rows = self.db.execute(
+                    """
+                    SELECT id, nombre, categoria, precio, stock, stock_minimo, descripcion
+                    FROM productos
+                    WHERE MATCH(nombre, categoria) AGAINST (%s IN BOOLEAN MODE)
+                    ORDER BY nombre = %s DESC, nombre LIKE %s DESC,
+                             MATCH(nombre, categoria) AGAINST (%s IN BOOLEAN MODE) DESC, nombre
+                    """,
+                    (terminos, texto, f"{texto}%", terminos),
+                )
+                return [Producto.from_row(r) for r in rows] if rows else []
+            except Error as e:
+                if getattr(e, 'errno', None) != errorcode.ER_FT_MATCHING_KEY_NOT_FOUND:
+                    raise
         rows = self.db.execute(
             """
             SELECT id, nombre, categoria, precio, stock, stock_minimo, descripcion
@@ -57,4 +87,119 @@ class ProductoService:
         rows = self.db.execute("SELECT stock FROM productos WHERE id = %s", (producto_id,))
         return int(rows[0][0]) if rows else None
 
+    def importar_masivo(self, filas: Iterable[FilaImportacion], modo: str,
+                        usuario_id: Optional[int], proveedor_id: Optional[int] = None) -> Tuple[int, int]:
+        # modo "entrada": la cantidad se suma al stock y se registra en entradas_inventario;
+        # modo "conteo": la cantidad reemplaza el stock. Todo en una sola transacción:
+        # si una fila falla no se aplica ninguna. Devuelve (creados, actualizados).
+        if modo not in ("entrada", "conteo"):
+            raise ValueError(f"Modo de importación desconocido: {modo}")
+
+        # Una fila por producto: en el archivo puede repetirse (dos entregas del mismo código)
+        pedidas: Dict[Tuple[str, str], list] = {}
+        for fila in filas:
+            codigo, nombre = (fila[0] or "").strip(), (fila[1] or "").strip()
+            clave = ("c", codigo) if codigo else ("n", normalizar_texto(nombre))
+            if not clave[1]:
+                raise ValueError("Hay filas sin código ni nombre")
+            previa = pedidas.get(clave)
+            if previa is None:
+                pedidas[clave] = [codigo or None, nombre or None] + list(fila[2:])
+            else:
+                cantidad = fila[4]
+                if modo == "entrada" and cantidad is not None and previa[4] is not None:
+                    cantidad = previa[4] + cantidad
+                nueva = [codigo or None, nombre or None] + list(fila[2:4]) + [cantidad] + list(fila[5:])
+                pedidas[clave] = [n if n is not None else p for n, p in zip(nueva, previa)]
+        if not pedidas:
+            return 0, 0
+
+        actualizar_stock = "stock + VALUES(stock)" if modo == "entrada" else "VALUES(stock)"
+        with self.db.transaction() as cursor:
+            existentes = self._bloquear_existentes(cursor, pedidas.values())
+            registros = []
+            creados = 0
+            for clave, (codigo, nombre, categoria, precio, cantidad, minimo, _, descripcion) in pedidas.items():
+                actual = existentes.get(("c", codigo)) if codigo else None
+                if actual is None and nombre:
+                    actual = existentes.get(("n", normalizar_texto(nombre)))
+                if actual is None:
+                    if not nombre or not categoria or precio is None:
+                        raise ValueError(f"Producto nuevo sin nombre, categoría o precio: {codigo or nombre}")
+                    creados += 1
+                    registros.append((None, nombre, categoria, precio, cantidad or 0,
+                                      minimo if minimo is not None else 10, codigo, descripcion))
+                else:
+                    # Los campos vacíos conservan el valor actual (el INSERT necesita la fila completa)
+                    pid, nombre_a, categoria_a, precio_a, stock_a, minimo_a, codigo_a, descripcion_a = actual
+                    if cantidad is None:
+                        cantidad = 0 if modo == "entrada" else stock_a
+                    registros.append((pid, nombre or nombre_a, categoria or categoria_a,
+                                      precio if precio is not None else precio_a, cantidad,
+                                      minimo if minimo is not None else minimo_a, codigo or codigo_a,
+                                      descripcion if descripcion is not None else descripcion_a))
+
+            # El id de los existentes hace que ON DUPLICATE KEY actualice; los nuevos (id NULL) se insertan
+            for inicio in range(0, len(registros), LOTE_IMPORTACION):
+                cursor.executemany(
+                    f"""
+                    INSERT INTO productos (id, nombre, categoria, precio, stock, stock_minimo, codigo_barras, descripcion)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE nombre = VALUES(nombre), categoria = VALUES(categoria),
+                                            precio = VALUES(precio), stock = {actualizar_stock},
+                                            stock_minimo = VALUES(stock_minimo),
+                                            codigo_barras = VALUES(codigo_barras),
+                                            descripcion = VALUES(descripcion)
+                    """,
+                    registros[inicio:inicio + LOTE_IMPORTACION],
+                )
+
+            if modo == "entrada":
+                # Los productos recién creados necesitan su id para la entrada
+                ids = self._bloquear_existentes(cursor, pedidas.values())
+                entradas = []
+                for codigo, nombre, _, _, cantidad, _, costo, _ in pedidas.values():
+                    if not cantidad or cantidad <= 0:
+                        continue
+                    producto = ids.get(("c", codigo)) if codigo else None
+                    if producto is None:
+                        producto = ids.get(("n", normalizar_texto(nombre)))
+                    entradas.append((producto[0], proveedor_id, cantidad, costo or 0, usuario_id))
+                for inicio in range(0, len(entradas), LOTE_IMPORTACION):
+                    cursor.executemany(
+                        """
+                        INSERT INTO entradas_inventario (producto_id, proveedor_id, cantidad, costo, usuario_id)
+                        VALUES (%s, %s, %s, %s, %s)
+                        """,
+                        entradas[inicio:inicio + LOTE_IMPORTACION],
+                    )
+
+        versiones.incrementar("productos", "entradas_inventario")
+        return creados, len({r[0] for r in registros if r[0] is not None})
 
+    @staticmethod
+    def _bloquear_existentes(cursor, filas: Iterable[list]) -> Dict[Tuple[str, str], Tuple]:
+        # Productos que coinciden por código o por nombre, bloqueados hasta el COMMIT.
+        # Los nombres se comparan normalizados, como lo hace la collation de la tabla.
+        codigos = sorted({f[0] for f in filas if f[0]})
+        nombres = sorted({f[1] for f in filas if f[1]})
+        existentes: Dict[Tuple[str, str], Tuple] = {}
+        for columna, valores in (("codigo_barras", codigos), ("nombre", nombres)):
+            for inicio in range(0, len(valores), LOTE_IMPORTACION):
+                lote = valores[inicio:inicio + LOTE_IMPORTACION]
+                cursor.execute(
+                    f"""
+                    SELECT id, nombre, categoria, precio, stock, stock_minimo, codigo_barras, descripcion
+                    FROM productos
+                    WHERE {columna} IN ({", ".join(["%s"] * len(lote))})
+                    ORDER BY id
+                    FOR UPDATE
+                    """,
+                    tuple(lote),
+                )
+                for row in cursor.fetchall():
+                    if row[6]:
+                        existentes.setdefault(("c", row[6]), row)
+                    # Con nombres repetidos se toma el de menor id
+                    existentes.setdefault(("n", normalizar_texto(row[1])), row)
+        return existentes
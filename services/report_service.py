@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+from core.utils import rango_fechas
 from nexus_core.db import MySQLDatabase
 
 
@@ -10,10 +12,9 @@ class ReportService:
     def ventas_por_dia(self) -> List[Tuple[str, float]]:
         rows = self.db.execute(
             """
-            SELECT DATE(fecha) as dia, SUM(total) as total_ventas
-            FROM ventas
-            WHERE fecha >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-            GROUP BY DATE(fecha)
+            SELECT dia, total AS total_ventas
+            FROM ventas_diarias
+            WHERE dia >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
             ORDER BY dia
             """
         )
@@ -22,11 +23,10 @@ class ReportService:
     def ventas_por_producto(self) -> List[Tuple[str, int]]:
         rows = self.db.execute(
             """
-            SELECT p.nombre, SUM(dv.cantidad) as total_vendido
-            FROM detalles_venta dv
-            JOIN productos p ON dv.producto_id = p.id
-            JOIN ventas v ON dv.venta_id = v.id
-            WHERE v.fecha >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+            SELECT p.nombre, SUM(r.cantidad) as total_vendido
+            FROM ventas_diarias_productos r
+            JOIN productos p ON r.producto_id = p.id
+            WHERE r.dia >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
             GROUP BY p.id
             ORDER BY total_vendido DESC
             LIMIT 10
@@ -34,6 +34,25 @@ class ReportService:
         )
         return rows or []
 
+    def iterar_ventas(self, desde: str, hasta: str) -> Iterator[Tuple]:
+        # Detalle para PdfService.generar_reporte_ventas, por lotes: el período puede tener cientos de miles de ventas
+        return self.db.iter_query(
+            """
+            SELECT v.id, v.cliente, v.total, v.fecha, u.nombre
+            FROM ventas v
+            LEFT JOIN usuarios u ON v.usuario_id = u.id
+            WHERE v.fecha >= %s AND v.fecha < %s
+            ORDER BY v.fecha
+            """,
+            rango_fechas(desde, hasta),
+        )
+
+    def iterar_inventario(self) -> Iterator[Tuple]:
+        # Filas para PdfService.generar_reporte_inventario, por lotes
+        return self.db.iter_query(
+            "SELECT id, nombre, categoria, precio, stock, stock_minimo FROM productos ORDER BY nombre"
+        )
+
     def productos_por_categoria(self) -> List[Tuple[str, int]]:
         rows = self.db.execute(
             """
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+from typing import Dict, Optional
+
+from nexus_core.db import MySQLDatabase
+from services.venta_service import StockInsuficienteError
+
+# Segundos que dura una reserva sin renovar (la ventana de venta la renueva mientras está abierta)
+DURACION_RESERVA = 600
+# Cada cuánto la ventana de venta renueva sus reservas
+RENOVACION_RESERVA = DURACION_RESERVA // 3
+# Segundos que se retiene una venta ya cobrada en caja hasta que el sincronizador la registra
+RETENCION_RESERVA = 24 * 3600
+
+
+class ReservaStockService:
+    # Reservas de stock de corta duración (tabla reservas_stock, migración 8), por venta en curso.
+    # La clave de la reserva es la misma clave de idempotencia con que se registra la venta: al
+    # confirmarse en MySQL, VentaService borra sus reservas en la misma transacción que descuenta
+    # el stock, así cada unidad está siempre reservada o descontada, nunca las dos ni ninguna.
+    # Las reservas vencidas no cuentan y se borran al reservar el mismo producto.
+
+    def __init__(self, db: MySQLDatabase, duracion: int = DURACION_RESERVA):
+        self.db = db
+        self.duracion = duracion
+
+    def reservar(self, clave: str, producto_id: int, cantidad: int) -> int:
+        # Suma ``cantidad`` a la reserva de la venta; devuelve las unidades que quedan libres.
+        # Sin stock suficiente (descontando lo reservado por otras ventas) lanza StockInsuficienteError.
+        producto_id, cantidad = int(producto_id), int(cantidad)
+        if cantidad <= 0:
+            raise ValueError("La cantidad a reservar debe ser mayor a 0")
+        with self.db.transaction() as cursor:
+            # El bloqueo de la fila del producto ordena a todas las cajas que reservan lo mismo
+            cursor.execute("SELECT stock FROM productos WHERE id = %s FOR UPDATE", (producto_id,))
+            fila = cursor.fetchone()
+            if fila is None:
+                raise ValueError(f"El producto {producto_id} no existe")
+            stock = int(fila[0])
+            cursor.execute("DELETE FROM reservas_stock WHERE producto_id = %s AND expira <= NOW()", (producto_id,))
+            cursor.execute(
+                "SELECT COALESCE(SUM(cantidad), 0) FROM reservas_stock WHERE producto_id = %s",
+                (producto_id,),
+            )
+            reservado = int(cursor.fetchone()[0])
+            if reservado + cantidad > stock:
+                raise StockInsuficienteError([(producto_id, cantidad, max(stock - reservado, 0))])
+            cursor.execute(
+                """
+                INSERT INTO reservas_stock (clave, producto_id, cantidad, expira)
+                VALUES (%s, %s, %s, NOW() + INTERVAL %s SECOND)
+                ON DUPLICATE KEY UPDATE cantidad = cantidad + VALUES(cantidad), expira = VALUES(expira)
+                """,
+                (clave, producto_id, cantidad, self.duracion),
+            )
+        return stock - reservado - cantidad
+
+    def liberar(self, clave: str, producto_id: Optional[int] = None, cantidad: Optional[int] = None) -> int:
+        # Sin producto: todas las reservas de la venta; sin cantidad: toda la reserva del producto
+        with self.db.transaction() as cursor:
+            if producto_id is None:
+                cursor.execute("DELETE FROM reservas_stock WHERE clave = %s", (clave,))
+                return int(cursor.rowcount)
+            if cantidad is not None:
+                cursor.execute(
+                    "UPDATE reservas_stock SET cantidad = cantidad - %s WHERE clave = %s AND producto_id = %s",
+                    (int(cantidad), clave, int(producto_id)),
+                )
+                cursor.execute(
+                    "DELETE FROM reservas_stock WHERE clave = %s AND producto_id = %s AND cantidad <= 0",
+                    (clave, int(producto_id)),
+                )
+                return int(cantidad)
+            cursor.execute(
+                "DELETE FROM reservas_stock WHERE clave = %s AND producto_id = %s", (clave, int(producto_id))
+            )
+            return int(cursor.rowcount)
+
+    def renovar(self, clave: str) -> int:
+        return int(
+            self.db.execute(
+                "UPDATE reservas_stock SET expira = NOW() + INTERVAL %s SECOND WHERE clave = %s",
+                (self.duracion, clave),
+            )
+        )
+
+    def retener(self, clave: str, segundos: int = RETENCION_RESERVA) -> int:
+        # Venta cobrada en el diario local: sus unidades siguen apartadas hasta que
+        # registrar_ventas_diferidas las descuente (y borre la reserva) en MySQL
+        return int(
+            self.db.execute(
+                "UPDATE reservas_stock SET expira = NOW() + INTERVAL %s SECOND WHERE clave = %s AND expira > NOW()",
+                (int(segundos), clave),
+            )
+        )
+
+    def reservas(self, clave: str) -> Dict[int, int]:
+        rows = self.db.execute(
+            "SELECT producto_id, cantidad FROM reservas_stock WHERE clave = %s AND expira > NOW()", (clave,)
+        )
+        return {int(r[0]): int(r[1]) for r in rows} if rows else {}
+
+    def disponible(self, producto_id: int) -> int:
+        # Stock menos lo reservado por ventas en curso (sin bloquear)
+        rows = self.db.execute(
+            """
+            SELECT p.stock - COALESCE((SELECT SUM(r.cantidad) FROM reservas_stock r
+                                       WHERE r.producto_id = p.id AND r.expira > NOW()), 0)
+            FROM productos p WHERE p.id = %s
+            """,
+            (int(producto_id),),
+        )
+        return int(rows[0][0]) if rows else 0
+
+    def purgar_vencidas(self) -> int:
+        return int(self.db.execute("DELETE FROM reservas_stock WHERE expira <= NOW()"))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import threading
+from typing import Optional
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from nexus_core import versiones
+from nexus_core.diario_ventas import DiarioVentas
+from nexus_core.pool import es_error_conexion
+from services.venta_service import VentaService
+
+# Errores que se resuelven solos al reintentar: conexión caída, pool agotado, bloqueos
+ERRORES_TRANSITORIOS = {errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT}
+
+
+def es_transitorio(error: Exception) -> bool:
+    return (es_error_conexion(error)
+            or isinstance(error, mysql.connector.errors.PoolError)
+            or getattr(error, 'errno', None) in ERRORES_TRANSITORIOS)
+
+
+class SincronizadorVentas:
+    # Hilo que registra en MySQL las ventas del diario local, por lotes y en orden de cobro.
+    # Cada venta lleva su clave de idempotencia: si un lote se confirmó en MySQL pero no llegó
+    # a marcarse en el diario (corte a mitad), al reintentarlo no se duplica.
+    # Sin conexión espera cada vez más (hasta ``espera_max``); ``despertar()`` lo adelanta.
+
+    def __init__(self, diario: DiarioVentas, ventas: VentaService, lote: int = 50,
+                 intervalo: float = 5.0, espera_max: float = 60.0):
+        self.diario = diario
+        self.ventas = ventas
+        self.lote = lote
+        self.intervalo = intervalo
+        self.espera_max = espera_max
+        self.en_linea: Optional[bool] = None
+        self.ultimo_error: Optional[str] = None
+        self._evento = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        if self._hilo is None or not self._hilo.is_alive():
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="nexus-sincronizador", daemon=True)
+            self._hilo.start()
+
+    def detener(self, esperar: float = 5.0) -> None:
+        self._detener.set()
+        self._evento.set()
+        if self._hilo is not None:
+            self._hilo.join(esperar)
+
+    def despertar(self) -> None:
+        self._evento.set()
+
+    def _bucle(self) -> None:
+        espera = 0.0
+        while not self._detener.is_set():
+            self._evento.wait(espera)
+            self._evento.clear()
+            if self._detener.is_set():
+                break
+            try:
+                pendientes = self.sincronizar_lote()
+            except Exception as e:
+                # Sin conexión: reintentar más tarde, con espera creciente
+                self.en_linea = False
+                self.ultimo_error = str(e)
+                espera = min(self.espera_max, max(self.intervalo, espera * 2))
+                continue
+            # Con más pendientes en el diario se sigue de inmediato; si no, hasta el próximo cobro
+            espera = 0.0 if pendientes else self.intervalo
+
+    def sincronizar_lote(self) -> bool:
+        # Registra un lote; devuelve True si puede quedar más por sincronizar.
+        # Propaga los errores transitorios (conexión); los de datos se anotan por venta.
+        ventas = self.diario.pendientes(self.lote)
+        if not ventas:
+            return False
+        try:
+            resultados = self.ventas.registrar_ventas_diferidas(ventas)
+        except Exception as e:
+            if es_transitorio(e):
+                raise
+            # Una venta con datos inválidos no debe frenar al resto: se registran de a una
+            resultados = {}
+            for venta in ventas:
+                try:
+                    resultados.update(self.ventas.registrar_ventas_diferidas([venta]))
+                except Exception as error_venta:
+                    if es_transitorio(error_venta):
+                        raise
+                    self.diario.marcar_error(venta[0], str(error_venta))
+                    print(f"Error sincronizando venta {venta[0]}: {error_venta}")
+                finally:
+                    if resultados:
+                        self.diario.marcar_sincronizadas(resultados)
+                        resultados = {}
+        else:
+            self.diario.marcar_sincronizadas(resultados)
+        # El catálogo descuenta las ventas del diario aún pendientes: releerlo ya marcadas
+        versiones.incrementar("productos")
+        self.en_linea = True
+        self.ultimo_error = None
+        return len(ventas) == self.lote
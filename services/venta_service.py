@@ -1,14 +1,31 @@
 #!/usr/bin/env python3
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
+from decimal import Decimal
 
+from mysql.connector import Error, errorcode
+
+from core.utils import rango_fechas, terminos_fulltext
 from models.venta import Venta
+from nexus_core import versiones
 from nexus_core.db import MySQLDatabase
+from services.ventas_diarias_service import VentasDiariasService
+
+
+class StockInsuficienteError(ValueError):
+    def __init__(self, faltantes: List[Tuple[int, int, int]]):
+        # faltantes = [(producto_id, solicitado, disponible)]
+        self.faltantes = faltantes
+        detalle = ", ".join(
+            f"producto {pid}: solicitado {pedido}, disponible {disp}" for pid, pedido, disp in faltantes
+        )
+        super().__init__(f"Stock insuficiente ({detalle})")
 
 
 class VentaService:
     def __init__(self, db: MySQLDatabase):
         self.db = db
+        self.resumen = VentasDiariasService(db)
 
     def listar(self) -> List[Venta]:
         rows = self.db.execute(
@@ -22,6 +39,36 @@ class VentaService:
         return [Venta.from_row(r) for r in rows] if rows else []
 
     def buscar(self, texto: str) -> List[Venta]:
+        # Un número es el id de la venta: búsqueda exacta por clave primaria
+        if texto.strip().isdigit():
+            rows = self.db.execute(
+                """
+                SELECT v.id, v.cliente, v.total, v.fecha, u.nombre
+                FROM ventas v
+                LEFT JOIN usuarios u ON v.usuario_id = u.id
+                WHERE v.id = %s
+                """,
+                (int(texto.strip()),),
+            )
+            return [Venta.from_row(r) for r in rows] if rows else []
+        # FULLTEXT sobre el cliente (migración 4); LIKE con palabras cortas o sin el índice
+        terminos = terminos_fulltext(texto)
+        if terminos:
+            try:
+                rows = self.db.execute(
+                    """
+                    SELECT v.id, v.cliente, v.total, v.fecha, u.nombre
+                    FROM ventas v
+                    LEFT JOIN usuarios u ON v.usuario_id = u.id
+                    WHERE MATCH(v.cliente) AGAINST (%s IN BOOLEAN MODE)
+                    ORDER BY v.fecha DESC
+                    """,
+                    (terminos,),
+                )
+                return [Venta.from_row(r) for r in rows] if rows else []
+            except Error as e:
+                if getattr(e, 'errno', None) != errorcode.ER_FT_MATCHING_KEY_NOT_FOUND:
+                    raise
         rows = self.db.execute(
             """
             SELECT v.id, v.cliente, v.total, v.fecha, u.nombre
@@ -40,10 +87,10 @@ class VentaService:
             SELECT v.id, v.cliente, v.total, v.fecha, u.nombre
             FROM ventas v
             LEFT JOIN usuarios u ON v.usuario_id = u.id
-            WHERE DATE(v.fecha) BETWEEN %s AND %s
+            WHERE v.fecha >= %s AND v.fecha < %s
             ORDER BY v.fecha DESC
             """,
-            (desde, hasta),
+            rango_fechas(desde, hasta),
         )
         return [Venta.from_row(r) for r in rows] if rows else []
 
@@ -67,4 +114,198 @@ class VentaService:
             )
         )
 
+    @staticmethod
+    def _resolver_cliente(cursor, nombre: str) -> Optional[int]:
+        # Venta sin cliente registrado: queda con cliente_id NULL
+        nombre = (nombre or "").strip()
+        if not nombre or nombre.lower() == "cliente general":
+            return None
+        cursor.execute("SELECT id FROM clientes WHERE nombre = %s ORDER BY id LIMIT 1", (nombre,))
+        row = cursor.fetchone()
+        if row:
+            return int(row[0])
+        cursor.execute(
+            "INSERT INTO clientes (nombre, email, telefono) VALUES (%s, %s, %s)",
+            (nombre, None, None),
+        )
+        return int(cursor.lastrowid)
+
+    def registrar_venta_completa(self, cliente: str, items: Iterable[Tuple[int, int, float]],
+                                 usuario_id: Optional[int], cliente_id: Optional[int] = None,
+                                 clave: Optional[str] = None) -> int:
+        # items = [(producto_id, cantidad, precio_unitario)]
+        lineas = [(int(pid), int(cant), float(precio)) for pid, cant, precio in items]
+        if not lineas:
+            raise ValueError("La venta no tiene productos")
 
+        pedidos: Dict[int, int] = {}
+        for pid, cant, _ in lineas:
+            pedidos[pid] = pedidos.get(pid, 0) + cant
+
+        with self.db.transaction() as cursor:
+            # Reintento de una venta ya registrada (misma clave de idempotencia): no se duplica
+            if clave is not None:
+                existentes = self._ventas_por_clave(cursor, [clave])
+                if clave in existentes:
+                    return existentes[clave]
+            # Descuento condicional: con otra caja cobrando lo mismo, la que llega tarde ve el conflicto
+            faltantes = self._descontar_stock(cursor, pedidos)
+            if faltantes:
+                raise StockInsuficienteError(faltantes)
+            venta_id = self._insertar_venta(cursor, cliente, cliente_id, usuario_id, lineas, clave)
+            if clave is not None:
+                self._liberar_reservas(cursor, [clave])
+        versiones.incrementar("ventas", "detalles_venta", "productos", "clientes")
+        return venta_id
+
+    def registrar_ventas_diferidas(self, ventas: List[Tuple[str, str, Optional[int], Optional[int],
+                                                             List[Tuple[int, int, float]], datetime]]
+                                   ) -> Dict[str, Tuple[int, List[Tuple[int, int, int]]]]:
+        # Ventas ya cobradas en caja (diario local) que se registran en MySQL en una sola transacción.
+        # ventas = [(clave, cliente, cliente_id, usuario_id, items, fecha)]
+        # Devuelve {clave: (venta_id, faltantes)}: la venta se registra aunque falte stock (ya se
+        # entregó); el stock de esos productos queda en negativo por lo que faltó, y los faltantes
+        # se informan para conciliarlos.
+        resultado: Dict[str, Tuple[int, List[Tuple[int, int, int]]]] = {}
+        if not ventas:
+            return resultado
+        with self.db.transaction() as cursor:
+            existentes = self._ventas_por_clave(cursor, [v[0] for v in ventas])
+            nuevas = [v for v in ventas if v[0] not in existentes]
+            for clave, venta_id in existentes.items():
+                resultado[clave] = (venta_id, [])
+
+            # Todas las filas del lote se bloquean juntas y en orden de id (sin interbloqueos)
+            total_pedidos: Dict[int, int] = {}
+            por_venta = []
+            for clave, cliente, cliente_id, usuario_id, items, fecha in nuevas:
+                lineas = [(int(pid), int(cant), float(precio)) for pid, cant, precio in items]
+                pedidos: Dict[int, int] = {}
+                for pid, cant, _ in lineas:
+                    pedidos[pid] = pedidos.get(pid, 0) + cant
+                    total_pedidos[pid] = total_pedidos.get(pid, 0) + cant
+                por_venta.append((clave, cliente, cliente_id, usuario_id, lineas, pedidos, fecha))
+            if total_pedidos:
+                self._stock_bloqueado(cursor, total_pedidos)
+
+            for clave, cliente, cliente_id, usuario_id, lineas, pedidos, fecha in por_venta:
+                faltantes = self._descontar_stock(cursor, pedidos)
+                if faltantes:
+                    # La mercadería ya se entregó: se descuenta igual (el stock queda en negativo,
+                    # que es lo que realmente hay) y el faltante se informa
+                    cursor.executemany(
+                        "UPDATE productos SET stock = stock - %s WHERE id = %s",
+                        [(pedidos[pid], pid) for pid, _, _ in faltantes],
+                    )
+                venta_id = self._insertar_venta(cursor, cliente, cliente_id, usuario_id, lineas, clave, fecha)
+                resultado[clave] = (venta_id, faltantes)
+            # Las unidades reservadas por estas ventas ya están descontadas
+            self._liberar_reservas(cursor, [v[0] for v in ventas])
+        if len(resultado) > len(existentes):
+            versiones.incrementar("ventas", "detalles_venta", "productos", "clientes")
+        return resultado
+
+    @staticmethod
+    def _ventas_por_clave(cursor, claves: List[str]) -> Dict[str, int]:
+        marcadores = ", ".join(["%s"] * len(claves))
+        cursor.execute(
+            f"SELECT clave_idempotencia, id FROM ventas WHERE clave_idempotencia IN ({marcadores})",
+            tuple(claves),
+        )
+        return {row[0]: int(row[1]) for row in cursor.fetchall()}
+
+    @staticmethod
+    def _stock_bloqueado(cursor, pedidos: Dict[int, int]) -> Dict[int, int]:
+        # Bloquear las filas en orden de id para evitar interbloqueos entre cajas
+        ids = sorted(pedidos)
+        marcadores = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"SELECT id, stock FROM productos WHERE id IN ({marcadores}) ORDER BY id FOR UPDATE",
+            tuple(ids),
+        )
+        return {row[0]: int(row[1]) for row in cursor.fetchall()}
+
+    @staticmethod
+    def _descontar_stock(cursor, pedidos: Dict[int, int]) -> List[Tuple[int, int, int]]:
+        # UPDATE condicional por producto, en orden de id; devuelve los conflictos
+        # [(producto_id, solicitado, disponible)] de las filas que no alcanzaban
+        conflictos = []
+        for pid in sorted(pedidos):
+            cursor.execute(
+                "UPDATE productos SET stock = stock - %s WHERE id = %s AND stock >= %s",
+                (pedidos[pid], pid, pedidos[pid]),
+            )
+            if cursor.rowcount == 0:
+                conflictos.append(pid)
+        if not conflictos:
+            return []
+        marcadores = ", ".join(["%s"] * len(conflictos))
+        cursor.execute(f"SELECT id, stock FROM productos WHERE id IN ({marcadores})", tuple(conflictos))
+        stock_actual = {row[0]: int(row[1]) for row in cursor.fetchall()}
+        return [(pid, pedidos[pid], stock_actual.get(pid, 0)) for pid in conflictos]
+
+    @staticmethod
+    def _liberar_reservas(cursor, claves: List[str]) -> None:
+        # Reservas de stock (migración 8) de las ventas recién registradas
+        marcadores = ", ".join(["%s"] * len(claves))
+        try:
+            cursor.execute(f"DELETE FROM reservas_stock WHERE clave IN ({marcadores})", tuple(claves))
+        except Error as e:
+            if e.errno != errorcode.ER_NO_SUCH_TABLE:
+                raise
+
+    def _insertar_venta(self, cursor, cliente: str, cliente_id: Optional[int], usuario_id: Optional[int],
+                        lineas: List[Tuple[int, int, float]], clave: Optional[str] = None, fecha: Optional[datetime] = None) -> int:
+        # Venta, detalles y resumen diario sobre el cursor de una transacción ya abierta
+        # (el stock ya se descontó con _descontar_stock)
+        total = round(sum(cant * precio for _, cant, precio in lineas), 2)
+        if cliente_id is None:
+            cliente_id = self._resolver_cliente(cursor, cliente)
+        cursor.execute(
+            """
+            INSERT INTO ventas (cliente, cliente_id, total, usuario_id, clave_idempotencia, fecha)
+            VALUES (%s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP))
+            """,
+            (cliente, cliente_id, total, usuario_id, clave, fecha),
+        )
+        venta_id = int(cursor.lastrowid)
+
+        cursor.executemany(
+            """
+            INSERT INTO detalles_venta (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            [(venta_id, pid, cant, precio, round(cant * precio, 2)) for pid, cant, precio in lineas],
+        )
+
+        cursor.execute("SELECT DATE(fecha) FROM ventas WHERE id = %s", (venta_id,))
+        dia = cursor.fetchone()[0]
+        productos: Dict[int, Tuple[int, Decimal]] = {}
+        for pid, cant, precio in lineas:
+            cantidad, subtotal = productos.get(pid, (0, Decimal("0")))
+            productos[pid] = (cantidad + cant, subtotal + Decimal(str(round(cant * precio, 2))))
+        self.resumen.aplicar(cursor, dia, 1, Decimal(str(total)), productos)
+        return venta_id
+
+    def eliminar(self, venta_id: int) -> bool:
+        with self.db.transaction() as cursor:
+            cursor.execute("SELECT DATE(fecha), total FROM ventas WHERE id = %s FOR UPDATE", (venta_id,))
+            venta = cursor.fetchone()
+            if venta is None:
+                return False
+            dia, total = venta
+            cursor.execute(
+                """
+                SELECT producto_id, SUM(cantidad), SUM(subtotal)
+                FROM detalles_venta
+                WHERE venta_id = %s
+                GROUP BY producto_id
+                """,
+                (venta_id,),
+            )
+            productos = {int(pid): (int(cant), Decimal(subtotal)) for pid, cant, subtotal in cursor.fetchall()}
+            cursor.execute("DELETE FROM detalles_venta WHERE venta_id = %s", (venta_id,))
+            cursor.execute("DELETE FROM ventas WHERE id = %s", (venta_id,))
+            self.resumen.aplicar(cursor, dia, -1, Decimal(total), productos)
+        versiones.incrementar("ventas", "detalles_venta")
+        return True
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from nexus_core.db import MySQLDatabase
+
+
+class VentasDiariasService:
+    # Resumen por día (ventas_diarias) y por día y producto (ventas_diarias_productos).
+    # Se mantiene dentro de la misma transacción que registra o elimina la venta, de modo
+    # que nunca queda desfasado respecto de las filas de ventas confirmadas.
+
+    def __init__(self, db: MySQLDatabase):
+        self.db = db
+
+    @staticmethod
+    def aplicar(cursor, dia: date, signo: int, total: Decimal,
+                productos: Dict[int, Tuple[int, Decimal]]) -> None:
+        # signo = 1 al registrar una venta, -1 al eliminarla; productos = {producto_id: (cantidad, total)}
+        cursor.execute(
+            """
+            INSERT INTO ventas_diarias (dia, num_ventas, total) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE num_ventas = num_ventas + VALUES(num_ventas),
+                                    total = total + VALUES(total)
+            """,
+            (dia, signo, signo * total),
+        )
+        if productos:
+            cursor.executemany(
+                """
+                INSERT INTO ventas_diarias_productos (dia, producto_id, cantidad, total)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE cantidad = cantidad + VALUES(cantidad),
+                                        total = total + VALUES(total)
+                """,
+                [(dia, pid, signo * cant, signo * subtotal) for pid, (cant, subtotal) in sorted(productos.items())],
+            )
+        if signo < 0:
+            # Un día o producto sin ventas restantes no debe aparecer en series ni rankings
+            cursor.execute("DELETE FROM ventas_diarias WHERE dia = %s AND num_ventas <= 0", (dia,))
+            cursor.execute("DELETE FROM ventas_diarias_productos WHERE dia = %s AND cantidad <= 0", (dia,))
+
+    def reconstruir(self, desde: Optional[date] = None) -> int:
+        # Recalcular el resumen desde ventas/detalles_venta (carga inicial o reparación)
+        filtro_dia = "WHERE dia >= %s" if desde else ""
+        filtro_fecha = "WHERE v.fecha >= %s" if desde else ""
+        params = (desde,) if desde else ()
+        with self.db.transaction() as cursor:
+            cursor.execute(f"DELETE FROM ventas_diarias {filtro_dia}", params)
+            cursor.execute(f"DELETE FROM ventas_diarias_productos {filtro_dia}", params)
+            cursor.execute(
+                f"""
+                INSERT INTO ventas_diarias (dia, num_ventas, total)
+                SELECT DATE(v.fecha), COUNT(*), SUM(v.total)
+                FROM ventas v
+                {filtro_fecha}
+                GROUP BY DATE(v.fecha)
+                """,
+                params,
+            )
+            dias = int(cursor.rowcount or 0)
+            cursor.execute(
+                f"""
+                INSERT INTO ventas_diarias_productos (dia, producto_id, cantidad, total)
+                SELECT DATE(v.fecha), dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal)
+                FROM detalles_venta dv
+                JOIN ventas v ON dv.venta_id = v.id
+                {filtro_fecha}
+                GROUP BY DATE(v.fecha), dv.producto_id
+                """,
+                params,
+            )
+        return dias